@@ -17,14 +17,18 @@ import Connector.Mpi as Xmpi
 import Post.Mpi as Pmpi
 import Converter.Filter as Filter
 import Converter.Distributed as Distributed
+import Converter.Profiler as Profiler
 from Apps.Fast.Common import Common
 import Connector.connector as connector
 import Connector.OversetData as XOD
 import Converter
 import KCore.test as test
 import Generator
+import KCore
 import math
 import numpy
+import os
+import time
 
 from Geom.IBM import setSnear, _setSnear, setDfar, _setDfar, snearFactor, _snearFactor, \
     setFluidInside, _setFluidInside, setIBCType, _setIBCType, changeIBCType, \
@@ -1352,6 +1356,68 @@ def interpolateSolutionCoarse2Fine(tCoarse, tFine, NPprep, NPinterp):
 # distrib        : new distribution at the end of prepare1
 #===================================================================================================================
 
+#================================================================================
+# Cache des etapes de prepare
+# Les sorties de chaque etape (t, tc, tb et etat de l'objet IBM) sont
+# sauvegardees par proc dans le repertoire input_var.cache. La cle d'une
+# etape est un hash de la cle de l'etape precedente, de ses parametres et de
+# son code : une relance repart de la premiere etape invalidee.
+# Les valeurs de input_var modifiees par les etapes (dfars, yplus,
+# redistribute...) sont sauvegardees avec l'etape et restaurees a la reprise.
+# Usage : prep = IBM(); prep.input_var.cache = 'prepare.cache'
+# Attention : seul le code de prepare et des methodes listees dans
+# __PREPARESTAGES__ est pris en compte dans les cles. Apres modification d'une
+# autre fonction (_determineClosedSolidFilament__, modules appeles...),
+# le repertoire de cache doit etre efface.
+#================================================================================
+__PREPARECACHEVERSION__ = 2
+
+# Etapes de prepare : (nom, parametres de input_var, methodes appelees)
+__PREPARESTAGES__ = [
+    ('cartesian', ['balancing', 'check_snear', 'cleanCellN', 'dfarDir', 'dfars', 'dz', 'expand', 'ext', 'extrusion',
+                   'generateCartesianMeshOnly', 'optimized', 'snears', 'snearsf', 't_in', 'tbOneOver', 'tbox', 'to', 'vmin'],
+     ['generateCartesian__']),
+    ('dist2walls', ['Lref', 'cleanCellN', 'correctionMultiCorpsF42', 'dz', 'extrusion', 'frontType', 'height_in', 'snears', 'yplus'],
+     ['_distance2wallCalc__']),
+    ('blanking', ['IBCType', 'Lref', 'blankingF42', 'cleanCellN', 'correctionMultiCorpsF42', 'extrusion', 'frontType',
+                  'height_in', 'redistribute', 'tbOneOver', 'twoFronts', 'wallAdapt', 'yplus'],
+     ['blanking__']),
+    ('interpData', ['cartesian', 'conservativeFlux', 'frontType', 'interpDataType', 'nature', 'order', 'smoothing', 'twoFronts'],
+     ['setInterpDataAndSetInterpTransfer__', '_specialFront2__']),
+    ('front', ['IBCType', 'Lref', 'dz', 'frontType', 'twoFronts', 'yplus'],
+     ['_buildFront__']),
+    ('ibcInterpolation', ['cartesian', 'interpDataType', 'recomputeDist', 'twoFronts'],
+     ['_ibcInterpolation__']),
+    ('distribution', ['distrib', 'extrusion', 'redistribute'],
+     ['_recomputeDistRANS__'])]
+
+# Hash d'une valeur (arbre, liste, numpy, scalaire)
+def hashValue__(h, v):
+    if isinstance(v, numpy.ndarray):
+        h.update(('%s%s'%(v.dtype.str,v.shape)).encode())
+        if v.dtype.kind != 'O': h.update(v.ravel(order='K').view(numpy.uint8))
+        else: h.update(repr(v.tolist()).encode())
+    elif isinstance(v, (list, tuple)):
+        h.update(b'[%d'%len(v))
+        for c in v: hashValue__(h, c)
+    elif isinstance(v, (set, frozenset)):
+        h.update(b'(%d'%len(v))
+        for c in sorted(v, key=repr): hashValue__(h, c)
+    elif isinstance(v, dict):
+        h.update(b'{%d'%len(v))
+        for k in sorted(v, key=str): h.update(repr(k).encode()); hashValue__(h, v[k])
+    else: h.update(repr(v).encode())
+    return None
+
+# Hash du code d'une fonction (sans les adresses des sous-fonctions)
+def hashCode__(h, code):
+    h.update(code.co_code)
+    h.update(repr(code.co_names).encode())
+    for c in code.co_consts:
+        if hasattr(c, 'co_code'): hashCode__(h, c)
+        else: h.update(repr(c).encode())
+    return None
+
 class IBM_Input:
     def __init__(self):
         self.IBCType                   = 1
@@ -1403,6 +1469,7 @@ class IBM_Input:
         self.yplus                     = 100.
         self.yplusAdapt                = 100.
         self.conservativeFlux          = False
+        self.cache                     = None
 
 class IBM(Common):
     """Prepare IBM for FastS"""
@@ -2751,6 +2818,125 @@ class IBM(Common):
 
 
     # Prepare
+    ## Stage cache
+    # Etat de l'objet IBM sauvegarde avec chaque etape
+    def getStageState__(self):
+        state = {}
+        for k in self.__dict__:
+            if k != 'input_var' and k != 'stageCache': state[k] = self.__dict__[k]
+        return state
+
+    # Hash de chaque valeur de input_var
+    def getInputDigests__(self):
+        import hashlib
+        digests = {}
+        for k in vars(self.input_var):
+            h = hashlib.sha1(); hashValue__(h, getattr(self.input_var, k))
+            digests[k] = h.hexdigest()
+        return digests
+
+    # Valeurs de input_var modifiees depuis initStageCache__
+    # OUT: {nom: (hash de la valeur utilisateur, valeur courante)}
+    def getInputState__(self):
+        user = self.stageCache['input']
+        state = {}
+        for k, d in self.getInputDigests__().items():
+            if d != user.get(k, None): state[k] = (user.get(k, None), getattr(self.input_var, k))
+        return state
+
+    def getStageFile__(self, no):
+        name = __PREPARESTAGES__[no][0]
+        key = self.stageCache['keys'][no]
+        return os.path.join(self.input_var.cache, 'prepare_%d_%s_%s_%d.pkl'%(no, name, key, Cmpi.rank))
+
+    # Calcule les cles des etapes (identiques sur tous les procs)
+    # OUT: numero de la premiere etape a calculer
+    def initStageCache__(self, tb):
+        import hashlib
+        self.stageCache = {'keys':None, 'report':[], 'input':None}
+        if self.input_var.cache is None: return 0
+        # valeurs utilisateur (avant modification par les etapes)
+        self.stageCache['input'] = self.getInputDigests__()
+        h = hashlib.sha1()
+        h.update(('%d %d %s'%(__PREPARECACHEVERSION__, Cmpi.size, KCore.__version__)).encode())
+        hashCode__(h, type(self).prepare.__code__)
+        hashValue__(h, tb)
+        hashValue__(h, self.getStageState__())
+        keys = []
+        for (name, params, methods) in __PREPARESTAGES__:
+            h.update(name.encode())
+            for p in params:
+                h.update(p.encode()); hashValue__(h, getattr(self.input_var, p, None))
+            for m in methods: hashCode__(h, getattr(type(self), m).__code__)
+            # h n'est pas remis a zero : chaque cle depend des etapes precedentes
+            keys.append(h.hexdigest())
+        if Cmpi.size > 1:
+            allKeys = Cmpi.allgather(keys)
+            for no in range(len(keys)):
+                hk = hashlib.sha1()
+                for k in allKeys: hk.update(k[no].encode())
+                keys[no] = hk.hexdigest()
+        self.stageCache['keys'] = keys
+        # derniere etape presente sur tous les procs
+        for no in range(len(keys)-1, -1, -1):
+            hit = int(os.path.exists(self.getStageFile__(no)))
+            if Cmpi.size > 1: hit = Cmpi.allreduce(hit, op=Cmpi.MIN)
+            if hit == 1: return no+1
+        return 0
+
+    # Recharge les sorties de l'etape no
+    def loadStage__(self, no):
+        import pickle
+        t0 = time.perf_counter()
+        with open(self.getStageFile__(no), 'rb') as f: (t, tc, tb, state, inputState) = pickle.load(f)
+        self.__dict__.update(state)
+        # une valeur changee par l'utilisateur n'intervient que dans les etapes suivantes
+        user = self.stageCache['input']
+        for k, (d, v) in inputState.items():
+            if user.get(k, None) == d: setattr(self.input_var, k, v)
+        name = __PREPARESTAGES__[no][0]
+        rss = Profiler.getRss()
+        self.stageCache['report'].append(('load(%s)'%name, time.perf_counter()-t0, 0, rss))
+        if self.rank == 0: print('Info: prepare: stages up to %s read from cache.'%name)
+        return t, tc, tb
+
+    def beginStage__(self, name):
+        sc = self.stageCache
+        sc['name'] = name
+        sc['span'] = Cmpi.span(name); sc['span'].__enter__()
+        sc['rss0'] = Profiler.getRss()
+        sc['t0'] = time.perf_counter()
+        return None
+
+    # Fin de l'etape no : temps, memoire et sauvegarde des sorties
+    def endStage__(self, no, t, tc, tb):
+        import pickle
+        sc = self.stageCache
+        dt = time.perf_counter()-sc['t0']
+        rss = Profiler.getRss()
+        sc['span'].__exit__(None, None, None)
+        sc['report'].append((sc['name'], dt, rss-sc['rss0'], rss))
+        if sc['keys'] is not None:
+            os.makedirs(self.input_var.cache, exist_ok=True)
+            fileName = self.getStageFile__(no)
+            with open(fileName+'.tmp', 'wb') as f:
+                pickle.dump((t, tc, tb, self.getStageState__(), self.getInputState__()), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(fileName+'.tmp', fileName)
+        return None
+
+    # Temps et memoire (max sur les procs) de chaque etape
+    def printStages__(self):
+        report = self.stageCache['report']
+        if Cmpi.size > 1: reports = Cmpi.allgather(report)
+        else: reports = [report]
+        if Cmpi.rank == 0:
+            for no, (name, dt, drss, rss) in enumerate(report):
+                dt = max(r[no][1] for r in reports)
+                drss = max(r[no][2] for r in reports)
+                rss = max(r[no][3] for r in reports)
+                print('Info: prepare: %-22s %10.2f s, rss %10.1f MB (%+.1f MB)'%(name, dt, rss/1.e6, drss/1.e6))
+        return None
+
     def prepare(self, t_case, t_out, tc_out):
         self.rank  = Cmpi.rank
         self.DEPTH = 2
@@ -2816,7 +3002,7 @@ class IBM(Common):
         ibctypes = set()
         for node in Internal.getNodesFromName(tb,'ibctype'):
             ibctypes.add(Internal.getValue(node))
-        self.ibctypes = list(ibctypes)
+        self.ibctypes = sorted(ibctypes)
         ## ================================================
         ## ===== Generate automatic Cartesian mesh ========
         ## ================================================
@@ -2824,26 +3010,34 @@ class IBM(Common):
         ##OUT - t                     :cartesian mesh
         if self.dimPb == 2 and self.input_var.cleanCellN == False: C._initVars(tb, 'CoordinateZ', 0.) # forced
 
-        if self.input_var.t_in is None:
-            t = self.generateCartesian__(Internal.merge([tb,self.tbFilament]),ext_local=self.input_var.ext+1)
-        else:
-            self.NP = Cmpi.size
-            t = self.input_var.t_in
+        # Reprise : les etapes deja en cache sont sautees
+        t = None; tc = None
+        first = self.initStageCache__(tb)
+        if first > 0: t, tc, tb = self.loadStage__(first-1)
 
-        # Balancing
-        if self.input_var.balancing:
-            test.printMem(">>> balancing [start]")
-            import Distributor2.Mpi as D2mpi
-            ts     = Cmpi.allgatherTree(Cmpi.convert2SkeletonTree(t))
-            stats  = D2._distribute(ts, self.NP, algorithm='graph')
-            D2._copyDistribution(t , ts)
-            D2mpi._redispatch(t)
-            del ts
-            test.printMem(">>> balancing [end]")
-
-        if self.input_var.extrusion == 'cyl':
-            T._cart2Cyl(t, (0,0,0),(1,0,0))
-            T._cart2Cyl(tb, (0,0,0),(1,0,0))
+        if first <= 0:
+            self.beginStage__('cartesian')
+            if self.input_var.t_in is None:
+                t = self.generateCartesian__(Internal.merge([tb,self.tbFilament]),ext_local=self.input_var.ext+1)
+            else:
+                self.NP = Cmpi.size
+                t = self.input_var.t_in
+
+            # Balancing
+            if self.input_var.balancing:
+                test.printMem(">>> balancing [start]")
+                import Distributor2.Mpi as D2mpi
+                ts     = Cmpi.allgatherTree(Cmpi.convert2SkeletonTree(t))
+                stats  = D2._distribute(ts, self.NP, algorithm='graph')
+                D2._copyDistribution(t , ts)
+                D2mpi._redispatch(t)
+                del ts
+                test.printMem(">>> balancing [end]")
+
+            if self.input_var.extrusion == 'cyl':
+                T._cart2Cyl(t, (0,0,0),(1,0,0))
+                T._cart2Cyl(tb, (0,0,0),(1,0,0))
+            self.endStage__(0, t, tc, tb)
 
         ## ================================================
         ## ============== Distance to walls  ==============
@@ -2854,16 +3048,19 @@ class IBM(Common):
         ##IN  - filamentBases         :list of filament bases
         ##OUT - cptBody               :Number of zones/bodies for F42 and multibody
         ##OUT - tbsave                :geometry (closed & filament) tree shifted in the z direction for 2D cases
-        self._distance2wallCalc__(t,tb)
+        if first <= 1:
+            self.beginStage__('dist2walls')
+            self._distance2wallCalc__(t,tb)
 
-        if self.dimPb == 2:
-            # Creation du corps 2D pour le preprocessing IBC
-            T._addkplane(tb)
-            T._contract(tb, (0,0,0), (1,0,0), (0,1,0), self.input_var.dz)
+            if self.dimPb == 2:
+                # Creation du corps 2D pour le preprocessing IBC
+                T._addkplane(tb)
+                T._contract(tb, (0,0,0), (1,0,0), (0,1,0), self.input_var.dz)
 
-        X._applyBCOverlaps(t, depth=self.DEPTH, loc='centers', val=2, cellNName='cellN')
-        C._initVars(t,'{centers:cellNChim}={centers:cellN}')
-        C._initVars(t, 'centers:cellN', 1.)
+            X._applyBCOverlaps(t, depth=self.DEPTH, loc='centers', val=2, cellNName='cellN')
+            C._initVars(t,'{centers:cellNChim}={centers:cellN}')
+            C._initVars(t, 'centers:cellN', 1.)
+            self.endStage__(1, t, tc, tb)
 
         ## ================================================
         ## ============== Geometry blanking ===============
@@ -2871,54 +3068,57 @@ class IBM(Common):
         ##IN  - t                     :t tree (cartesian mesh or input mesh)
         ##IN  - tb                    :closed geometry tree
         ##OUT - t                     :t tree with blanked done
-        t = self.blanking__(t,tb)
-
-        C._initVars(t, '{centers:cellNIBC}={centers:cellN}')
-
-        if self.input_var.IBCType == -1:
-            #print('Points IBC interieurs: on repousse le front un peu plus loin.')
-            C._initVars(t,'{centers:cellNDummy}=({centers:cellNIBC}>0.5)*({centers:cellNIBC}<1.5)')
-            X._setHoleInterpolatedPoints(t,depth=1,dir=1,loc='centers',cellNName='cellNDummy',addGC=False)
-            C._initVars(t,'{centers:cellNFront}=logical_and({centers:cellNDummy}>0.5, {centers:cellNDummy}<1.5)')
-            C._rmVars(t, ['centers:cellNDummy'])
-            for z in Internal.getZones(t):
-                connector._updateNatureForIBM(z, self.input_var.IBCType,
-                                              Internal.__GridCoordinates__,
-                                              Internal.__FlowSolutionNodes__,
-                                              Internal.__FlowSolutionCenters__)
-        else:
-            C._initVars(t,'{centers:cellNFront}=logical_and({centers:cellNIBC}>0.5, {centers:cellNIBC}<1.5)')
-            if self.isWireModel:
-                C._initVars(t,'{centers:cellNFrontFilWMM}={centers:cellNFilWMM}*({centers:cellNFilWMM}>0.5)+1*({centers:cellNFilWMM}<0.5)')
-                C._initVars(t,'{centers:cellNFrontFilWMM}=logical_and({centers:cellNFrontFilWMM}>0.5, {centers:cellNFrontFilWMM}<1.5)')
+        if first <= 2:
+            self.beginStage__('blanking')
+            t = self.blanking__(t,tb)
+
+            C._initVars(t, '{centers:cellNIBC}={centers:cellN}')
+
+            if self.input_var.IBCType == -1:
+                #print('Points IBC interieurs: on repousse le front un peu plus loin.')
+                C._initVars(t,'{centers:cellNDummy}=({centers:cellNIBC}>0.5)*({centers:cellNIBC}<1.5)')
+                X._setHoleInterpolatedPoints(t,depth=1,dir=1,loc='centers',cellNName='cellNDummy',addGC=False)
+                C._initVars(t,'{centers:cellNFront}=logical_and({centers:cellNDummy}>0.5, {centers:cellNDummy}<1.5)')
+                C._rmVars(t, ['centers:cellNDummy'])
+                for z in Internal.getZones(t):
+                    connector._updateNatureForIBM(z, self.input_var.IBCType,
+                                                  Internal.__GridCoordinates__,
+                                                  Internal.__FlowSolutionNodes__,
+                                                  Internal.__FlowSolutionCenters__)
+            else:
+                C._initVars(t,'{centers:cellNFront}=logical_and({centers:cellNIBC}>0.5, {centers:cellNIBC}<1.5)')
+                if self.isWireModel:
+                    C._initVars(t,'{centers:cellNFrontFilWMM}={centers:cellNFilWMM}*({centers:cellNFilWMM}>0.5)+1*({centers:cellNFilWMM}<0.5)')
+                    C._initVars(t,'{centers:cellNFrontFilWMM}=logical_and({centers:cellNFrontFilWMM}>0.5, {centers:cellNFrontFilWMM}<1.5)')
 
-            for z in Internal.getZones(t):
-                if self.input_var.twoFronts:
-                    epsilon_dist = abs(C.getValue(z,'CoordinateX',1)-C.getValue(z,'CoordinateX',0))
-                    dmin = math.sqrt(3)*4*epsilon_dist
-                    if self.input_var.frontType == 42:
-                        SHIFTB = G_IBM_Height.computeModelisationHeight(Re=self.Reynolds, yplus=self.input_var.yplus, L=self.input_var.Lref)
-                        dmin = max(dmin, SHIFTB+math.sqrt(3)*2*epsilon_dist) # where shiftb = hmod
-                    C._initVars(z,'{centers:cellNIBC_2}=({centers:TurbulentDistance}>%20.16g)+(2*({centers:TurbulentDistance}<=%20.16g)*({centers:TurbulentDistance}>0))'%(dmin,dmin))
-                    C._initVars(z,'{centers:cellNFront_2}=logical_and({centers:cellNIBC_2}>0.5, {centers:cellNIBC_2}<1.5)')
-
-                connector._updateNatureForIBM(z, self.input_var.IBCType,
-                                              Internal.__GridCoordinates__,
-                                              Internal.__FlowSolutionNodes__,
-                                              Internal.__FlowSolutionCenters__)
-
-        ##Ghost kmin et kmax donneuse potentiel
-        if self.input_var.extrusion is not None:
-            listvars_local =['cellNChim','cellNIBC']
-            for z in Internal.getZones(t):
-                sol            = Internal.getNodeFromName(z,'FlowSolution#Centers')
-                for var in listvars_local:
-                    cellN          = Internal.getNodeFromName(sol,var)[1]
-                    sh             = numpy.shape(cellN)
-                    for k in [0,1, sh[2]-2, sh[2]-1]:
-                        for j in range(sh[1]):
-                            for i in range(sh[0]):
-                                if  cellN[i,j,k] != 0:  cellN[i,j,k] =1
+                for z in Internal.getZones(t):
+                    if self.input_var.twoFronts:
+                        epsilon_dist = abs(C.getValue(z,'CoordinateX',1)-C.getValue(z,'CoordinateX',0))
+                        dmin = math.sqrt(3)*4*epsilon_dist
+                        if self.input_var.frontType == 42:
+                            SHIFTB = G_IBM_Height.computeModelisationHeight(Re=self.Reynolds, yplus=self.input_var.yplus, L=self.input_var.Lref)
+                            dmin = max(dmin, SHIFTB+math.sqrt(3)*2*epsilon_dist) # where shiftb = hmod
+                        C._initVars(z,'{centers:cellNIBC_2}=({centers:TurbulentDistance}>%20.16g)+(2*({centers:TurbulentDistance}<=%20.16g)*({centers:TurbulentDistance}>0))'%(dmin,dmin))
+                        C._initVars(z,'{centers:cellNFront_2}=logical_and({centers:cellNIBC_2}>0.5, {centers:cellNIBC_2}<1.5)')
+
+                    connector._updateNatureForIBM(z, self.input_var.IBCType,
+                                                  Internal.__GridCoordinates__,
+                                                  Internal.__FlowSolutionNodes__,
+                                                  Internal.__FlowSolutionCenters__)
+
+            ##Ghost kmin et kmax donneuse potentiel
+            if self.input_var.extrusion is not None:
+                listvars_local =['cellNChim','cellNIBC']
+                for z in Internal.getZones(t):
+                    sol            = Internal.getNodeFromName(z,'FlowSolution#Centers')
+                    for var in listvars_local:
+                        cellN          = Internal.getNodeFromName(sol,var)[1]
+                        sh             = numpy.shape(cellN)
+                        for k in [0,1, sh[2]-2, sh[2]-1]:
+                            for j in range(sh[1]):
+                                for i in range(sh[0]):
+                                    if  cellN[i,j,k] != 0:  cellN[i,j,k] =1
+            self.endStage__(2, t, tc, tb)
 
         ## ================================================
         ## ========== Interpdata & InterpTransfer =========
@@ -2927,22 +3127,25 @@ class IBM(Common):
         ##OUT - tc                    :front 42 if yplus is not provided or if the wallAdapt approach is used
         ##OUT - procDict              :Dictionary of procs
         ##OUT - tbbc                  :pytree of the bounding box of tc
-        tc=self.setInterpDataAndSetInterpTransfer__(t)
+        if first <= 3:
+            self.beginStage__('interpData')
+            tc=self.setInterpDataAndSetInterpTransfer__(t)
 
-        if self.input_var.conservativeFlux: X_IBM._buildConservativeFlux(t, tc)
+            if self.input_var.conservativeFlux: X_IBM._buildConservativeFlux(t, tc)
 
-        ## ================================================
-        ## ======= Specific treatment for front 2 =========
-        ## ================================================
-        if self.input_var.frontType == 2: self._specialFront2__(t, tc)
+            ## ================================================
+            ## ======= Specific treatment for front 2 =========
+            ## ================================================
+            if self.input_var.frontType == 2: self._specialFront2__(t, tc)
 
-        C._rmVars(t,['centers:cellNFront'])
-        if self.input_var.twoFronts:C._rmVars(t,['centers:cellNFront_2', 'centers:cellNIBC_2'])
+            C._rmVars(t,['centers:cellNFront'])
+            if self.input_var.twoFronts:C._rmVars(t,['centers:cellNFront_2', 'centers:cellNIBC_2'])
 
-        C._cpVars(t,'centers:TurbulentDistance',tc,'TurbulentDistance')
+            C._cpVars(t,'centers:TurbulentDistance',tc,'TurbulentDistance')
 
-        print('Minimum distance: %f.'%C.getMinValue(t,'centers:TurbulentDistance'))
-        P._computeGrad2(t, 'centers:TurbulentDistance', ghostCells=True, withCellN=False)
+            print('Minimum distance: %f.'%C.getMinValue(t,'centers:TurbulentDistance'))
+            P._computeGrad2(t, 'centers:TurbulentDistance', ghostCells=True, withCellN=False)
+            self.endStage__(3, t, tc, tb)
 
         ## ================================================
         ## ============== Building Front ==================
@@ -2952,94 +3155,103 @@ class IBM(Common):
         ##IN  - tb  :tb tree
         ##OUT - res :IBM point for the 1st front
         ##OUT - res2:IBM point for the 2nd front
-        self._buildFront__(t, tc, tb)
+        if first <= 4:
+            self.beginStage__('front')
+            self._buildFront__(t, tc, tb)
+            self.endStage__(4, t, tc, tb)
 
 
         ## ================================================
         ## ============== IBC Interpolation ===============
         ## ================================================
-        self._ibcInterpolation__(t, tc)
-
-        C._initVars(t,'{centers:cellN}=minimum({centers:cellNChim}*{centers:cellNIBCDnr},2.)')
-        varsRM = ['centers:cellNChim','centers:cellNIBCDnr']
-        if self.model == 'Euler': varsRM += ['centers:TurbulentDistance']
-        C._rmVars(t, varsRM)
-
-        #-----------------------------------------
-        # Computes distance field for Musker only
-        #-----------------------------------------
-        ## This was added in Revision 4265 - Comment: "Apps: IBM extrude cart et cylindrique"
-        ## Need to understand why it was added before the recompute for RANS & was not included in the recompute of dist2wall for RANS.
-        ## Left here for now. Not efficient but acceptable (for now).
-        if self.model != 'Euler' and self.input_var.recomputeDist and (self.input_var.extrusion!='cyl' and self.input_var.extrusion !='cart'):
-            if 'outpress' in self.ibctypes or 'inj' in self.ibctypes or 'slip' in self.ibctypes or 'wallmodel' in self.ibctypes or 'overlap' in self.ibctypes:
-                test.printMem(">>> wall distance for viscous wall only [start]")
-                for z in Internal.getZones(tb):
-                    ibc = Internal.getNodeFromName(z,'ibctype')
-                    if Internal.getValue(ibc)=='outpress' or Internal.getValue(ibc)=='inj' or Internal.getValue(ibc)=='slip' or Internal.getValue(ibc)=='wallmodel' or Internal.getValue(ibc)=='overlap':
-                        Internal._rmNode(tb,z)
-                if self.dimPb == 2:
-                    DTW._distance2Walls(t,self.tbsave,type='ortho', signed=0, dim=self.dimPb, loc='centers')
-                else:
-                    DTW._distance2Walls(t,self.tbsave,type='ortho', signed=0, dim=self.dimPb, loc='centers')
-                test.printMem(">>> wall distance for viscous wall only [end]")
+        if first <= 5:
+            self.beginStage__('ibcInterpolation')
+            self._ibcInterpolation__(t, tc)
+
+            C._initVars(t,'{centers:cellN}=minimum({centers:cellNChim}*{centers:cellNIBCDnr},2.)')
+            varsRM = ['centers:cellNChim','centers:cellNIBCDnr']
+            if self.model == 'Euler': varsRM += ['centers:TurbulentDistance']
+            C._rmVars(t, varsRM)
+
+            #-----------------------------------------
+            # Computes distance field for Musker only
+            #-----------------------------------------
+            ## This was added in Revision 4265 - Comment: "Apps: IBM extrude cart et cylindrique"
+            ## Need to understand why it was added before the recompute for RANS & was not included in the recompute of dist2wall for RANS.
+            ## Left here for now. Not efficient but acceptable (for now).
+            if self.model != 'Euler' and self.input_var.recomputeDist and (self.input_var.extrusion!='cyl' and self.input_var.extrusion !='cart'):
+                if 'outpress' in self.ibctypes or 'inj' in self.ibctypes or 'slip' in self.ibctypes or 'wallmodel' in self.ibctypes or 'overlap' in self.ibctypes:
+                    test.printMem(">>> wall distance for viscous wall only [start]")
+                    for z in Internal.getZones(tb):
+                        ibc = Internal.getNodeFromName(z,'ibctype')
+                        if Internal.getValue(ibc)=='outpress' or Internal.getValue(ibc)=='inj' or Internal.getValue(ibc)=='slip' or Internal.getValue(ibc)=='wallmodel' or Internal.getValue(ibc)=='overlap':
+                            Internal._rmNode(tb,z)
+                    if self.dimPb == 2:
+                        DTW._distance2Walls(t,self.tbsave,type='ortho', signed=0, dim=self.dimPb, loc='centers')
+                    else:
+                        DTW._distance2Walls(t,self.tbsave,type='ortho', signed=0, dim=self.dimPb, loc='centers')
+                    test.printMem(">>> wall distance for viscous wall only [end]")
 
-                if self.dimPb == 2 and self.input_var.cleanCellN == False: C._initVars(t, '{centers:TurbulentDistanceWallBC}={centers:TurbulentDistance}')
-        else:
-            for z in Internal.getZones(t):
-                dist = Internal.getNodeFromName2(z,'TurbulentDistanceWallBC')
-                if dist is not None:  C._initVars(t, '{centers:TurbulentDistance}={centers:TurbulentDistanceWallBC}')
+                    if self.dimPb == 2 and self.input_var.cleanCellN == False: C._initVars(t, '{centers:TurbulentDistanceWallBC}={centers:TurbulentDistance}')
+            else:
+                for z in Internal.getZones(t):
+                    dist = Internal.getNodeFromName2(z,'TurbulentDistanceWallBC')
+                    if dist is not None:  C._initVars(t, '{centers:TurbulentDistance}={centers:TurbulentDistanceWallBC}')
+            self.endStage__(5, t, tc, tb)
 
         ## ================================================
         ## =========== Save IBM/IBC info ==================
         ## ================================================
         if self.input_var.check: self._printCheckIBMInfo__(tc)
 
-        if self.input_var.extrusion == 'cyl':
-            T._cyl2Cart(t, (0,0,0),(1,0,0))
-            T._cyl2Cart(tc,(0,0,0),(1,0,0))
-            # modif info maillage des zonesubregion_t
-            for z in Internal.getZones(tc):
-                for zsr in Internal.getNodesFromType(z, "ZoneSubRegion_t"):
-                    zsrname = Internal.getName(zsr)
-                    zsrname = zsrname.split('_')
-                    if zsrname[0]=='IBCD':
-                        for var in ['C','W','I']:
-                            r     = Internal.getNodeFromName(zsr,'CoordinateY_P'+var)[1]
-                            theta = Internal.getNodeFromName(zsr,'CoordinateZ_P'+var)[1]
-                            for l in range(numpy.size(r)):
-                                yy  = r[l]*numpy.cos( theta[l] )
-                                zz  = r[l]*numpy.sin( theta[l] )
-                                r[l]= yy; theta[l] = zz
-
-        ## ================================================
-        ## =========== Redistribute - Final ===============
-        ## ================================================
-        # distribution par defaut (sur NP)
-        #note:distrib does not work as tbbc does not have ID
-        #     can be deleted (in the future)
-
-        # Perform the final distribution
-        if self.input_var.distrib:
-            stats = D2._distribute(self.tbbc, self.NP, algorithm='graph', useCom='ID')
-            D2._copyDistribution(tc, self.tbbc)
-            D2._copyDistribution(t, self.tbbc)
-        self.tbbc = None
-
-        if self.input_var.redistribute:
-            import Distributor2.Mpi as D2mpi
-            tcs    = Cmpi.allgatherTree(Cmpi.convert2SkeletonTree(tc))
-            stats  = D2._distribute(tcs, self.NP, algorithm='graph')
-            D2._copyDistribution(tc, tcs)
-            D2._copyDistribution(t , tcs)
-            D2mpi._redispatch(tc)
-            D2mpi._redispatch(t)
-            self._checkNcellsNptsPerProc(tc, isAtCenter=True)
-
-        ## ================================================
-        ## === Recompute Distance for Wall (RANS Only) ====
-        ## ================================================
-        if self.model == 'NSTurbulent':self._recomputeDistRANS__(t, tb)
+        if first <= 6:
+            self.beginStage__('distribution')
+            if self.input_var.extrusion == 'cyl':
+                T._cyl2Cart(t, (0,0,0),(1,0,0))
+                T._cyl2Cart(tc,(0,0,0),(1,0,0))
+                # modif info maillage des zonesubregion_t
+                for z in Internal.getZones(tc):
+                    for zsr in Internal.getNodesFromType(z, "ZoneSubRegion_t"):
+                        zsrname = Internal.getName(zsr)
+                        zsrname = zsrname.split('_')
+                        if zsrname[0]=='IBCD':
+                            for var in ['C','W','I']:
+                                r     = Internal.getNodeFromName(zsr,'CoordinateY_P'+var)[1]
+                                theta = Internal.getNodeFromName(zsr,'CoordinateZ_P'+var)[1]
+                                for l in range(numpy.size(r)):
+                                    yy  = r[l]*numpy.cos( theta[l] )
+                                    zz  = r[l]*numpy.sin( theta[l] )
+                                    r[l]= yy; theta[l] = zz
+
+            ## ================================================
+            ## =========== Redistribute - Final ===============
+            ## ================================================
+            # distribution par defaut (sur NP)
+            #note:distrib does not work as tbbc does not have ID
+            #     can be deleted (in the future)
+
+            # Perform the final distribution
+            if self.input_var.distrib:
+                stats = D2._distribute(self.tbbc, self.NP, algorithm='graph', useCom='ID')
+                D2._copyDistribution(tc, self.tbbc)
+                D2._copyDistribution(t, self.tbbc)
+            self.tbbc = None
+
+            if self.input_var.redistribute:
+                import Distributor2.Mpi as D2mpi
+                tcs    = Cmpi.allgatherTree(Cmpi.convert2SkeletonTree(tc))
+                stats  = D2._distribute(tcs, self.NP, algorithm='graph')
+                D2._copyDistribution(tc, tcs)
+                D2._copyDistribution(t , tcs)
+                D2mpi._redispatch(tc)
+                D2mpi._redispatch(t)
+                self._checkNcellsNptsPerProc(tc, isAtCenter=True)
+
+            ## ================================================
+            ## === Recompute Distance for Wall (RANS Only) ====
+            ## ================================================
+            if self.model == 'NSTurbulent':self._recomputeDistRANS__(t, tb)
+            self.endStage__(6, t, tc, tb)
 
         ## ================================================
         ## ======== Remaning & Saving tc tree  ============
@@ -3139,6 +3351,7 @@ class IBM(Common):
             Cmpi.convertPyTree2File(tp, t_out, ignoreProcNodes=True)
 
         if Cmpi.size > 1: Cmpi.barrier()
+        self.printStages__()
         return t, tc
 
 
@@ -3274,7 +3487,7 @@ def prepare1(t_case, t_out, tc_out, t_in=None, to=None, snears=0.01, dfars=10.,
              distrib=True, expand=3, tinit=None, initWithBBox=-1., wallAdapt=None, yplusAdapt=100., dfarDir=0,
              correctionMultiCorpsF42=False, blankingF42=False, twoFronts=False, redistribute=False, IBCType=1,
              height_in=-1.0,isFilamentOnly=False, cleanCellN=True, check_snear=False, generateCartesianMeshOnly=False,
-             tbOneOver=None, conservativeFlux=False):
+             tbOneOver=None, conservativeFlux=False, cache=None):
     prep_local=IBM()
     prep_local.input_var.t_in                   =t_in
     prep_local.input_var.to                     =to
@@ -3315,6 +3528,7 @@ def prepare1(t_case, t_out, tc_out, t_in=None, to=None, snears=0.01, dfars=10.,
     prep_local.input_var.generateCartesianMeshOnly  = generateCartesianMeshOnly
     prep_local.input_var.tbOneOver              = tbOneOver
     prep_local.input_var.conservativeFlux       =conservativeFlux
+    prep_local.input_var.cache                  =cache
 
     t,tc = prep_local.prepare(t_case, t_out, tc_out)
     return t, tc
@@ -0,0 +1,41 @@
+# - Fast.IBM prepare avec cache des etapes -
+import Apps.Fast.IBM as App
+import KCore.test as test
+import os, shutil, glob
+
+LOCAL = test.getLocal()
+CACHE = LOCAL+'/prepare.cache'
+if os.path.exists(CACHE): shutil.rmtree(CACHE)
+bodySurfaceFile = '../../Connector/test/naca1DNS.cgns'
+
+def prepare(distrib, cache=None):
+    prep = App.IBM()
+    prep.input_var.snears  = 1
+    prep.input_var.dfars   = 5
+    prep.input_var.vmin    = 42
+    prep.input_var.distrib = distrib
+    prep.input_var.cache   = cache
+    t, tc = prep.prepare(bodySurfaceFile, None, None)
+    loaded = [r[0] for r in prep.stageCache['report'] if r[0][0:5] == 'load(']
+    return t, tc, loaded
+
+# sans cache
+t, tc, loaded = prepare(distrib=False)
+test.testT(t, 1)
+test.testT(tc, 2)
+
+# remplit le cache
+t, tc, loaded = prepare(distrib=True, cache=CACHE)
+
+# seul distrib change : reprise a l'etape distribution
+t, tc, loaded = prepare(distrib=False, cache=CACHE)
+test.testO(loaded, 3)
+test.testT(t, 1)
+test.testT(tc, 2)
+
+# reprise a l'etape front
+for f in glob.glob(CACHE+'/prepare_[456]_*'): os.remove(f)
+t, tc, loaded = prepare(distrib=False, cache=CACHE)
+test.testO(loaded, 4)
+test.testT(t, 1)
+test.testT(tc, 2)
@@ -0,0 +1,442 @@
+# *Cassiopee* performance benchmarks
+# Usage:
+#   benchCassiopee list
+#   benchCassiopee run [-b initVars,dist2walls] [-z 1,8] [-p 10000,100000]
+#                      [-t 1,4] [-n 1,2] [-r 5] [-o bench.json]
+#   benchCassiopee compare ref.json new.json [--threshold 0.05] [--alpha 0.01]
+# Les benchmarks sont parametres par le nombre de zones (par proc), le nombre
+# de points par zone, le nombre de threads et le nombre de procs. Chaque
+# mesure est le max sur les procs d'un appel, repete r fois apres un appel
+# de chauffe. compare signale les ecarts de mediane au dela de threshold
+# qui sont significatifs (test de permutation, seuil alpha).
+import os, sys, time, json, math, platform, socket, subprocess, tempfile, itertools
+
+__VERSION__ = 1
+
+#==============================================================================
+# Jeux de donnees
+#==============================================================================
+# Arbre de nz zones cartesiennes de npts points sur le proc courant
+# Les zones se recouvrent de deux cellules en x, les procs d'une cellule en y
+def createTree__(nz, npts, shift=0.):
+    import Converter.PyTree as C
+    import Converter.Mpi as Cmpi
+    import Generator.PyTree as G
+    n = max(int(round(npts**(1./3.))), 3)
+    h = 1./(n-1)
+    zones = []
+    for i in range(nz):
+        z = G.cart((i*(1.-2*h)+shift, Cmpi.rank*(1.-h)+shift, shift), (h,h,h), (n,n,n))
+        z[0] = 'cart%d.%d'%(Cmpi.rank, i)
+        zones.append(z)
+    t = C.newPyTree(['Base', zones])
+    Cmpi._setProc(t, Cmpi.rank)
+    C._initVars(t, '{F}=sin(3.*{CoordinateX})*cos(3.*{CoordinateY})+{CoordinateZ}-0.5')
+    return t
+
+# Fichiers temporaires d'un cas (supprimes par runBenchs apres le cas)
+__TMPFILES__ = []
+
+def getTmpFile__(ext='.cgns'):
+    import Converter.Mpi as Cmpi
+    fileName = os.path.join(tempfile.gettempdir(), 'bench%d_%d%s'%(os.getpid(), Cmpi.rank, ext))
+    __TMPFILES__.append(fileName)
+    return fileName
+
+def rmTmpFiles__():
+    for f in __TMPFILES__:
+        if os.path.exists(f): os.remove(f)
+    del __TMPFILES__[:]
+    return None
+
+#==============================================================================
+# Benchmarks
+# Chaque benchmark prepare ses donnees et retourne (before, run) :
+# run est chronometre, before (ou None) est appele avant chaque run
+#==============================================================================
+def benchInternal(nz, npts):
+    import Converter.Internal as Internal
+    t = createTree__(nz, npts)
+    paths = ['/Base/'+z[0]+'/GridCoordinates/CoordinateX' for z in Internal.getZones(t)]
+    names = [z[0] for z in Internal.getZones(t)]
+    def run():
+        for name in names: Internal.getNodeFromName(t, name)
+        for path in paths: Internal.getNodeFromPath(t, path)
+        Internal.getNodesFromType(t, 'DataArray_t')
+        Internal.getNodesFromName(t, 'Coordinate*')
+    return None, run
+
+def benchCGNSWrite(nz, npts):
+    import Converter.PyTree as C
+    t = createTree__(nz, npts)
+    fileName = getTmpFile__()
+    def before():
+        if os.path.exists(fileName): os.remove(fileName)
+    def run():
+        C.convertPyTree2File(t, fileName)
+    return before, run
+
+def benchCGNSRead(nz, npts):
+    import Converter.PyTree as C
+    t = createTree__(nz, npts)
+    fileName = getTmpFile__()
+    C.convertPyTree2File(t, fileName)
+    def run():
+        C.convertFile2PyTree(fileName)
+    return None, run
+
+def benchInitVars(nz, npts):
+    import Converter.PyTree as C
+    t = createTree__(nz, npts)
+    def run():
+        C._initVars(t, '{G}=sqrt({CoordinateX}**2+{CoordinateY}**2)*{F}+1.')
+    return None, run
+
+def benchIntersect(nz, npts):
+    import Converter.Mpi as Cmpi
+    import Connector.PyTree as X
+    t = createTree__(nz, npts)
+    def run():
+        tbb = Cmpi.createBBoxTree(t)
+        X.getIntersectingDomains(tbb)
+    return None, run
+
+def createInterpTrees__(nz, npts):
+    import Converter.PyTree as C
+    tR = createTree__(nz, npts)
+    C._initVars(tR, 'centers:cellN', 2.)
+    C._initVars(tR, 'centers:F', 0.)
+    n = max(int(round(npts**(1./3.))), 3)
+    tD = createTree__(nz, npts, shift=0.3/(n-1))
+    C._initVars(tD, '{centers:F}=sin(3.*{centers:CoordinateX})')
+    return tR, tD
+
+def benchSetInterpData(nz, npts):
+    import Connector.PyTree as X
+    tR, tD = createInterpTrees__(nz, npts)
+    def run():
+        X.setInterpData(tR, tD, loc='centers', storage='inverse', order=2)
+    return None, run
+
+def benchTransfers(nz, npts):
+    import Connector.PyTree as X
+    tR, tD = createInterpTrees__(nz, npts)
+    tD = X.setInterpData(tR, tD, loc='centers', storage='inverse', order=2)
+    def run():
+        X._setInterpTransfers(tR, tD, variables=['F'])
+    return None, run
+
+def benchDist2Walls(nz, npts):
+    import Converter.PyTree as C
+    import Geom.PyTree as D
+    import Dist2Walls.PyTree as DTW
+    t = createTree__(nz, npts)
+    body = D.sphere((0.5,0.5,0.5), 0.25, N=60)
+    body = C.convertArray2Tetra(body)
+    def run():
+        DTW._distance2Walls(t, body, type='ortho', loc='centers')
+    return None, run
+
+def benchSplitSize(nz, npts):
+    import Transform.PyTree as T
+    t = createTree__(nz, npts)
+    def run():
+        T.splitSize(t, N=max(npts//8, 27))
+    return None, run
+
+def benchIsoSurf(nz, npts):
+    import Post.PyTree as P
+    t = createTree__(nz, npts)
+    def run():
+        P.isoSurf(t, 'F', 0.)
+    return None, run
+
+def benchExtractMesh(nz, npts):
+    import Geom.PyTree as D
+    import Post.PyTree as P
+    t = createTree__(nz, npts)
+    nx = max(int(round(math.sqrt(npts))), 3)
+    s = D.sphere((0.5,0.5,0.5), 0.25, N=nx)
+    def run():
+        P.extractMesh(t, s)
+    return None, run
+
+# Codecs du Compressor (ctype de _compressFields)
+__CODECS__ = {'fpc':(5, 1.e-8), 'zstd':(7, 1), 'sz':(0, 1.e-8), 'zfp':(1, 1.e-8)}
+
+def benchCompress(codec):
+    def bench(nz, npts):
+        import Converter.Internal as Internal
+        import Compressor.PyTree as Compressor
+        (ctype, tol) = __CODECS__[codec]
+        t0 = createTree__(nz, npts)
+        a = [None]
+        def before(): a[0] = Internal.copyTree(t0)
+        def run(): Compressor._compressFields(a[0], tol=tol, ctype=ctype)
+        return before, run
+    return bench
+
+def benchUncompress(codec):
+    def bench(nz, npts):
+        import Converter.Internal as Internal
+        import Compressor.PyTree as Compressor
+        (ctype, tol) = __CODECS__[codec]
+        t0 = createTree__(nz, npts)
+        Compressor._compressFields(t0, tol=tol, ctype=ctype)
+        a = [None]
+        def before(): a[0] = Internal.copyTree(t0)
+        def run(): Compressor._uncompressAll(a[0])
+        return before, run
+    return bench
+
+BENCHS = {'internal': benchInternal,
+          'cgnsWrite': benchCGNSWrite,
+          'cgnsRead': benchCGNSRead,
+          'initVars': benchInitVars,
+          'intersect': benchIntersect,
+          'setInterpData': benchSetInterpData,
+          'transfers': benchTransfers,
+          'dist2walls': benchDist2Walls,
+          'splitSize': benchSplitSize,
+          'isoSurf': benchIsoSurf,
+          'extractMesh': benchExtractMesh}
+for codec in ['fpc', 'zstd', 'sz', 'zfp']:
+    BENCHS['compress.'+codec] = benchCompress(codec)
+    BENCHS['uncompress.'+codec] = benchUncompress(codec)
+
+#==============================================================================
+# Mesures
+#==============================================================================
+def getStats__(samples):
+    s = sorted(samples); n = len(s)
+    if n == 0: return {'min':0., 'median':0., 'mean':0., 'std':0.}
+    if n%2 == 1: median = s[n//2]
+    else: median = 0.5*(s[n//2-1]+s[n//2])
+    mean = sum(s)/n
+    if n > 1: std = math.sqrt(sum((x-mean)**2 for x in s)/(n-1))
+    else: std = 0.
+    return {'min':s[0], 'median':median, 'mean':mean, 'std':std}
+
+# Temps de repeat appels de run (max sur les procs), apres warmup appels
+def timeBench__(before, run, repeat, warmup=1):
+    import Converter.Mpi as Cmpi
+    samples = []
+    for i in range(warmup+repeat):
+        if before is not None: before()
+        Cmpi.barrier()
+        t0 = time.perf_counter()
+        run()
+        dt = time.perf_counter()-t0
+        dt = Cmpi.allreduce(dt, op=Cmpi.MAX)
+        if i >= warmup: samples.append(dt)
+    return samples
+
+def getMeta__():
+    import KCore
+    meta = {'version':__VERSION__, 'date':time.strftime('%Y-%m-%d %H:%M:%S'),
+            'host':socket.gethostname(), 'platform':platform.platform(),
+            'python':platform.python_version(), 'kcore':KCore.__version__}
+    try:
+        import numpy; meta['numpy'] = numpy.__version__
+    except: pass
+    try:
+        path = os.getenv('CASSIOPEE', os.path.dirname(os.path.abspath(__file__)))
+        rev = subprocess.check_output(['git', '-C', path, 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL)
+        meta['git'] = rev.decode().strip()
+    except: pass
+    return meta
+
+# Lance les benchmarks sur les procs courants
+def runBenchs(benchs, zones, points, threads, repeat, verbose=True):
+    """Run benchmarks for all (zones, points, threads) on current processes."""
+    import KCore
+    import Converter.Mpi as Cmpi
+    import Converter.Profiler as Profiler
+    results = []
+    nt0 = KCore.kcore.getOmpMaxThreads()
+    for name in benchs:
+        for (nz, npts, nt) in itertools.product(zones, points, threads):
+            KCore.kcore.setOmpMaxThreads(nt)
+            entry = {'bench':name, 'zones':nz, 'points':npts, 'threads':nt,
+                     'ranks':Cmpi.size, 'repeat':repeat}
+            try:
+                before, run = BENCHS[name](nz, npts)
+                entry['samples'] = timeBench__(before, run, repeat)
+                entry.update(getStats__(entry['samples']))
+            except Exception as e:
+                entry['samples'] = []; entry['error'] = str(e)
+                entry.update(getStats__([]))
+            rmTmpFiles__()
+            entry['peakRss'] = Cmpi.allreduce(Profiler.getPeakRss(), op=Cmpi.MAX)
+            results.append(entry)
+            if verbose and Cmpi.rank == 0:
+                if 'error' in entry: print('%-18s z=%-5d p=%-9d t=%-3d n=%-4d error: %s'%(name, nz, npts, nt, Cmpi.size, entry['error']))
+                else: print('%-18s z=%-5d p=%-9d t=%-3d n=%-4d median %10.4g s  std %10.4g s'%(name, nz, npts, nt, Cmpi.size, entry['median'], entry['std']))
+                sys.stdout.flush()
+    KCore.kcore.setOmpMaxThreads(nt0)
+    return results
+
+#==============================================================================
+# Comparaison de deux runs
+#==============================================================================
+def getKey__(entry):
+    return (entry['bench'], entry['zones'], entry['points'], entry['threads'], entry['ranks'])
+
+# p-value unilaterale (b plus lent que a) d'un test de permutation sur la
+# moyenne des log des temps. Exact si le nombre de partitions est petit.
+def permutationTest__(a, b, nperm=20000):
+    import random
+    la = [math.log(max(x, 1.e-30)) for x in a]
+    lb = [math.log(max(x, 1.e-30)) for x in b]
+    pool = la+lb; na = len(la); nb = len(lb)
+    if na == 0 or nb == 0: return 1.
+    obs = sum(lb)/nb-sum(la)/na
+    total = sum(pool)
+    eps = 1.e-12*max(1., abs(obs))
+    count = 0; n = 0
+    if math.comb(na+nb, nb) <= nperm:
+        for idx in itertools.combinations(range(na+nb), nb):
+            sb = sum(pool[i] for i in idx)
+            if sb/nb-(total-sb)/na >= obs-eps: count += 1
+            n += 1
+    else:
+        rng = random.Random(0)
+        for i in range(nperm):
+            idx = rng.sample(range(na+nb), nb)
+            sb = sum(pool[i] for i in idx)
+            if sb/nb-(total-sb)/na >= obs-eps: count += 1
+        # la permutation observee est comptee
+        count += 1; n = nperm+1
+    return count/n
+
+def compareResults(ref, new, threshold=0.05, alpha=0.01):
+    """Compare two benchmark results. Return the list of compared entries."""
+    refs = {}
+    for e in ref['results']: refs[getKey__(e)] = e
+    news = {}
+    for e in new['results']: news[getKey__(e)] = e
+    out = []
+    for key in sorted(set(refs)|set(news), key=str):
+        r = refs.get(key, None); n = news.get(key, None)
+        c = {'bench':key[0], 'zones':key[1], 'points':key[2], 'threads':key[3], 'ranks':key[4]}
+        if r is None or n is None or r['samples'] == [] or n['samples'] == []:
+            if r is None: c['status'] = 'new'
+            elif n is None: c['status'] = 'missing'
+            else: c['status'] = 'error'
+            out.append(c); continue
+        c['ref'] = r['median']; c['new'] = n['median']
+        c['ratio'] = n['median']/max(r['median'], 1.e-30)
+        c['pSlower'] = permutationTest__(r['samples'], n['samples'])
+        c['pFaster'] = permutationTest__(n['samples'], r['samples'])
+        if c['ratio'] > 1.+threshold and c['pSlower'] < alpha: c['status'] = 'REGRESSION'
+        elif c['ratio'] < 1.-threshold and c['pFaster'] < alpha: c['status'] = 'improved'
+        else: c['status'] = 'ok'
+        out.append(c)
+    return out
+
+def printComparison(out, file=None):
+    """Print a comparison of benchmark results."""
+    if file is None: file = sys.stdout
+    file.write('%-18s %6s %9s %4s %5s %12s %12s %8s %8s  %s\n'%('bench', 'zones', 'points', 'thr', 'ranks', 'ref(s)', 'new(s)', 'ratio', 'p', 'status'))
+    for c in out:
+        if 'ratio' in c:
+            if c['ratio'] >= 1.: p = c['pSlower']
+            else: p = c['pFaster']
+            file.write('%-18s %6d %9d %4d %5d %12.4g %12.4g %8.3f %8.4f  %s\n'%(c['bench'], c['zones'], c['points'], c['threads'], c['ranks'],
+                                                                            c['ref'], c['new'], c['ratio'], p, c['status']))
+        else:
+            file.write('%-18s %6d %9d %4d %5d %12s %12s %8s %8s  %s\n'%(c['bench'], c['zones'], c['points'], c['threads'], c['ranks'],
+                                                                      '-', '-', '-', '-', c['status']))
+    return None
+
+#==============================================================================
+# Ligne de commande
+#==============================================================================
+def parseList__(s, type=int):
+    return [type(x) for x in s.split(',') if x != '']
+
+def runMain__(args):
+    import Converter.Mpi as Cmpi
+    if args.benchs == 'all': benchs = list(BENCHS.keys())
+    else: benchs = parseList__(args.benchs, str)
+    for b in benchs:
+        if b not in BENCHS: raise ValueError('benchCassiopee: unknown benchmark %s.'%b)
+    zones = parseList__(args.zones); points = parseList__(args.points)
+    if args.threads is None:
+        import KCore
+        threads = [KCore.kcore.getOmpMaxThreads()]
+    else: threads = parseList__(args.threads)
+
+    # balayage en nombre de procs : un run par nombre de procs
+    if args.ranks is not None and Cmpi.size == 1:
+        results = []; meta = None
+        for n in parseList__(args.ranks):
+            fd, fileName = tempfile.mkstemp(suffix='.json'); os.close(fd)
+            script = [os.path.abspath(__file__), 'run', '-b', ','.join(benchs), '-z', args.zones, '-p', args.points,
+                      '-t', ','.join(str(t) for t in threads), '-r', str(args.repeat), '-o', fileName]
+            launcher = args.launcher.format(n=n).split()
+            if n == 1: cmd = [sys.executable]+script
+            # kpython lance lui-meme python sur le script
+            elif os.path.basename(launcher[0]) == 'kpython': cmd = launcher+script
+            else: cmd = launcher+[sys.executable]+script
+            subprocess.check_call(cmd)
+            with open(fileName, 'r') as f: res = json.load(f)
+            os.remove(fileName)
+            if meta is None: meta = res['meta']
+            results += res['results']
+    else:
+        meta = getMeta__()
+        results = runBenchs(benchs, zones, points, threads, args.repeat)
+
+    if Cmpi.rank == 0:
+        with open(args.output, 'w') as f: json.dump({'meta':meta, 'results':results}, f, indent=1)
+        print('Info: benchmark results written in %s.'%args.output)
+    return 0
+
+def compareMain__(args):
+    with open(args.ref, 'r') as f: ref = json.load(f)
+    with open(args.new, 'r') as f: new = json.load(f)
+    out = compareResults(ref, new, args.threshold, args.alpha)
+    printComparison(out)
+    if args.output is not None:
+        with open(args.output, 'w') as f: json.dump(out, f, indent=1)
+    nreg = sum(1 for c in out if c['status'] == 'REGRESSION')
+    if nreg > 0:
+        print('Info: %d significant regression(s).'%nreg)
+        return 1
+    return 0
+
+def parseArgs():
+    import argparse
+    parser = argparse.ArgumentParser(description='Cassiopee performance benchmarks.')
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('list', help='list benchmarks')
+    p = sub.add_parser('run', help='run benchmarks and write json results')
+    p.add_argument('-b', '--benchs', default='all', help='comma separated benchmarks (default: all)')
+    p.add_argument('-z', '--zones', default='1,8', help='comma separated numbers of zones per process')
+    p.add_argument('-p', '--points', default='10000,100000', help='comma separated numbers of points per zone')
+    p.add_argument('-t', '--threads', default=None, help='comma separated numbers of threads')
+    p.add_argument('-n', '--ranks', default=None, help='comma separated numbers of processes (one launch each)')
+    p.add_argument('-r', '--repeat', default=5, type=int, help='timed repetitions per case (>= 5 for alpha=0.01)')
+    p.add_argument('-o', '--output', default='bench.json', help='json output file')
+    p.add_argument('--launcher', default='kpython -n {n}', help='mpi launcher for the process sweep (kpython or mpirun -np {n}...)')
+    p = sub.add_parser('compare', help='compare two json results')
+    p.add_argument('ref', help='reference json results')
+    p.add_argument('new', help='new json results')
+    p.add_argument('--threshold', default=0.05, type=float, help='relative median change reported (default 0.05)')
+    p.add_argument('--alpha', default=0.01, type=float, help='significance level of the permutation test')
+    p.add_argument('-o', '--output', default=None, help='write comparison to this json file')
+    return parser, parser.parse_args()
+
+def main():
+    parser, args = parseArgs()
+    if args.command == 'list':
+        for name in BENCHS: print(name)
+        return 0
+    elif args.command == 'run': return runMain__(args)
+    elif args.command == 'compare': return compareMain__(args)
+    parser.print_help()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -27,30 +27,141 @@ def writeUnsteadyCoefs(iteration, indices, filename, loc, format="b"):
     """Write interpolation coefficients for unsteady computation."""
     compressor.writeUnsteadyCoefs(iteration, indices, filename, loc, format)
 
+#==============================================================================
+# Moteur de compression parallele
+# Les codecs C relachent le GIL : un pool de threads compresse plusieurs
+# tableaux (ou plusieurs morceaux d'un grand tableau) en parallele.
+#==============================================================================
+# taille des morceaux (octets) pour la compression zstd par morceaux
+__CHUNKSIZE__ = 4*1024*1024
+__POOL__ = None
+__POOLSIZE__ = 0
+
+# Retourne le nombre de threads (OMP_NUM_THREADS ou nbre de coeurs par defaut)
+def getThreads__(threads=None):
+    if threads is not None: return max(int(threads), 1)
+    import os
+    n = os.getenv('OMP_NUM_THREADS', None)
+    if n is not None:
+        try: return max(int(n), 1)
+        except: pass
+    n = os.cpu_count()
+    if n is None: n = 1
+    return n
+
+# Pool de threads partage (recree si le nombre de threads change)
+def getPool__(threads):
+    global __POOL__, __POOLSIZE__
+    if __POOL__ is None or __POOLSIZE__ != threads:
+        from concurrent.futures import ThreadPoolExecutor
+        if __POOL__ is not None: __POOL__.shutdown(wait=True)
+        __POOL__ = ThreadPoolExecutor(max_workers=threads)
+        __POOLSIZE__ = threads
+    return __POOL__
+
+# Applique F a chaque tache, en parallele si threads > 1
+def map__(F, tasks, threads=None):
+    threads = getThreads__(threads)
+    if threads <= 1 or len(tasks) <= 1: return [F(t) for t in tasks]
+    return list(getPool__(threads).map(F, tasks))
+
+# Vue en octets d'un tableau contigu (ou de bytes)
+def getBytes__(a):
+    if isinstance(a, numpy.ndarray): return numpy.ravel(a, order='K').view(numpy.uint8)
+    return numpy.frombuffer(a, dtype=numpy.uint8)
+
+# Decoupe un buffer d'octets en morceaux de chunkSize
+def getChunks__(b, chunkSize):
+    n = b.size
+    if n == 0: return [b]
+    return [b[i:i+chunkSize] for i in range(0, n, chunkSize)]
+
+#==============================================================================
+# Compression zstd par morceaux d'un tableau contigu (ou de bytes)
+# OUT: liste de tableaux d'octets compresses (un par morceau)
+#==============================================================================
+def compressChunks(a, level=1, chunkSize=__CHUNKSIZE__, threads=None):
+    """Compress a contiguous array in chunks with zstd."""
+    chunks = getChunks__(getBytes__(a), chunkSize)
+    return map__(lambda c: compressor.compressZstd(c, level), chunks, threads)
+
+#==============================================================================
+# Idem, mais rend les morceaux compresses dans l'ordre au fur et a mesure
+# pour les envoyer a un ecrivain sans tout garder en memoire
+#==============================================================================
+def iterCompressChunks(a, level=1, chunkSize=__CHUNKSIZE__, threads=None):
+    """Yield zstd compressed chunks of a contiguous array in order."""
+    chunks = getChunks__(getBytes__(a), chunkSize)
+    threads = getThreads__(threads)
+    if threads <= 1:
+        for c in chunks: yield compressor.compressZstd(c, level)
+        return
+    pool = getPool__(threads)
+    # au plus 2*threads morceaux en vol
+    pending = []; i = 0
+    while i < len(chunks) or pending:
+        while i < len(chunks) and len(pending) < 2*threads:
+            pending.append(pool.submit(compressor.compressZstd, chunks[i], level)); i += 1
+        yield pending.pop(0).result()
+
+#==============================================================================
+# Decompression par morceaux dans un tableau out deja alloue
+# IN: chunks: morceaux compresses (compressChunks)
+# IN: out: tableau contigu de la taille du tableau d'origine
+#==============================================================================
+def uncompressChunks(chunks, out, chunkSize=__CHUNKSIZE__, threads=None):
+    """Uncompress zstd chunks into preallocated array out."""
+    b = getBytes__(out)
+    dsts = getChunks__(b, chunkSize)
+    if len(dsts) != len(chunks):
+        raise ValueError("uncompressChunks: number of chunks does not match output size.")
+    def F(i):
+        n = compressor.uncompressZstd(chunks[i], dsts[i])
+        if n != dsts[i].size: raise ValueError("uncompressChunks: corrupted chunk.")
+        return None
+    map__(F, list(range(len(chunks))), threads)
+    return out
+
 #==============================================================================
 # Serialize/compress
 # method=0: pickle
-# method=1: pickle+zlib
+# method=1: pickle+zlib (level)
+# method=2: pickle+zstd (level), par morceaux compresses en parallele
 #==============================================================================
-def pack(a, method=0):
+def pack(a, method=0, level=1, threads=None):
     """Serialize or compress a."""
     if method == 0:
         return pickle.dumps(a, protocol=pickle.HIGHEST_PROTOCOL)
     elif method == 1:
         import zlib
-        return zlib.compress(pickle.dumps(a, protocol=pickle.HIGHEST_PROTOCOL), level=1)
+        return zlib.compress(pickle.dumps(a, protocol=pickle.HIGHEST_PROTOCOL), level=level)
+    elif method == 2:
+        b = pickle.dumps(a, protocol=pickle.HIGHEST_PROTOCOL)
+        chunks = compressChunks(b, level, __CHUNKSIZE__, threads)
+        # entete : taille, taille des morceaux, nbre de morceaux, taille de chaque morceau
+        header = numpy.array([len(b), __CHUNKSIZE__, len(chunks)]+[c.size for c in chunks], dtype=numpy.int64)
+        return b''.join([header]+chunks)
     else:
         return pickle.dumps(a, protocol=pickle.HIGHEST_PROTOCOL)
 
 #==============================================================================
 # Unserialize/decompress
 #==============================================================================
-def unpack(a, method=0):
+def unpack(a, method=0, threads=None):
     """Deserialize or decompress a."""
     if method == 0:
         return pickle.loads(a)
     elif method == 1:
         import zlib
         return pickle.loads(zlib.decompress(a))
+    elif method == 2:
+        (size, chunkSize, nchunks) = numpy.frombuffer(a, dtype=numpy.int64, count=3)
+        sizes = numpy.frombuffer(a, dtype=numpy.int64, count=nchunks, offset=24)
+        b = numpy.frombuffer(a, dtype=numpy.uint8)
+        off = 8*(3+nchunks); chunks = []
+        for s in sizes: chunks.append(b[off:off+s]); off += s
+        out = numpy.empty((size), dtype=numpy.uint8)
+        uncompressChunks(chunks, out, chunkSize, threads)
+        return pickle.loads(out)
     else:
         return pickle.loads(a)
@@ -368,6 +368,7 @@ def _uncompressCartesian(t):
 # ctype=4: compress ngon connectivity (losless)
 # ctype=5: compress with fpc (lossless)
 # ctype=6: reserve pour compressCartesian (lossless)
+# ctype=7: compress with zstd by chunks (lossless), tol is the zstd level
 def _packNode(node, tol=1.e-8, ctype=0):
     if Internal.getNodeFromName1(node, 'ZData') is not None: return None # already compressed node
     if ctype == 0: # sz
@@ -408,6 +409,8 @@ def _packNode(node, tol=1.e-8, ctype=0):
         shape = [5.,0.,float(ret[2])]+list(ret[0])
         node[1] = ret[1]
         Internal._createUniqueChild(node, 'ZData', 'DataArray_t', value=shape)
+    elif ctype == 7: # zstd par morceaux
+        _packChunks__(node, Compressor.compressChunks(node[1], getZstdLevel__(tol), threads=1), tol)
     else:
         raise ValueError("packNode: unknow compression type.")
     return None
@@ -448,41 +451,120 @@ def _unpackNode(node):
             ret = Compressor.compressor.uncompressFpc((shape,node[1],iscorder))
             node[1] = ret
             Internal._rmNodesFromName1(node, 'ZData')
+        elif ctype == 7: # zstd par morceaux
+            (out, chunks, chunkSize) = _unpackChunks__(node, shape, iscorder)
+            Compressor.uncompressChunks(chunks, out, chunkSize, threads=1)
+            node[1] = out
+            Internal._rmNodesFromName1(node, 'ZData')
+            Internal._rmNodesFromName1(node, 'ZChunks')
         else:
             raise ValueError("unpackNode: unknown compression type.")
     return None
 
+# Niveau zstd pour ctype=7 (tol >= 1), 1 sinon
+def getZstdLevel__(tol):
+    if tol >= 1.: return int(tol)
+    return 1
+
+# Remplace la valeur de node par ses morceaux compresses
+# ZChunks: [kind, itemsize, chunkSize, taille de chaque morceau]
+def _packChunks__(node, chunks, tol):
+    a = node[1]
+    iscorder = not numpy.isfortran(a)
+    shape = [7.,float(getZstdLevel__(tol)),float(iscorder)]+list(a.shape)
+    sizes = [ord(a.dtype.kind), a.dtype.itemsize, Compressor.__CHUNKSIZE__]+[c.size for c in chunks]
+    node[1] = numpy.concatenate(chunks)
+    Internal._createUniqueChild(node, 'ZData', 'DataArray_t', value=shape)
+    Internal._createUniqueChild(node, 'ZChunks', 'DataArray_t', value=numpy.array(sizes, dtype=numpy.int64))
+    return None
+
+# Retourne le tableau de sortie, les morceaux compresses et leur taille
+def _unpackChunks__(node, shape, iscorder):
+    sizes = Internal.getNodeFromName1(node, 'ZChunks')[1]
+    dtype = numpy.dtype('%s%d'%(chr(int(sizes[0])), int(sizes[1])))
+    if iscorder: out = numpy.empty(shape, dtype=dtype, order='C')
+    else: out = numpy.empty(shape, dtype=dtype, order='F')
+    b = node[1].ravel()
+    chunks = []; off = 0
+    for s in sizes[3:]: chunks.append(b[off:off+s]); off += s
+    return (out, chunks, int(sizes[2]))
+
+# codecs utilisables depuis plusieurs threads (sz a un etat global)
+__THREADSAFE__ = [1,2,3,4,5,7]
+
+# Compresse une liste de noeuds en parallele
+# ctype=7: les morceaux de tous les noeuds sont repartis sur les threads
+def _packNodes__(nodes, tol=1.e-8, ctype=0, threads=None):
+    nodes = [n for n in nodes if Internal.getNodeFromName1(n, 'ZData') is None]
+    if ctype not in __THREADSAFE__: threads = 1
+    if ctype == 7:
+        level = getZstdLevel__(tol)
+        tasks = []; nchunks = []
+        for n in nodes:
+            chunks = Compressor.getChunks__(Compressor.getBytes__(n[1]), Compressor.__CHUNKSIZE__)
+            tasks += chunks; nchunks.append(len(chunks))
+        cprs = Compressor.map__(lambda c: Compressor.compressor.compressZstd(c, level), tasks, threads)
+        off = 0
+        for c, n in enumerate(nodes):
+            _packChunks__(n, cprs[off:off+nchunks[c]], tol); off += nchunks[c]
+    else:
+        Compressor.map__(lambda n: _packNode(n, tol, ctype), nodes, threads)
+    return None
+
+# Decompresse une liste de noeuds en parallele
+def _unpackNodes__(nodes, threads=None):
+    tasks = []; others = []; serial = []
+    outs = []
+    for n in nodes:
+        zdata = Internal.getNodeFromName1(n, 'ZData')
+        if zdata is None or n[1] is None: continue
+        ctype = int(zdata[1][0])
+        if ctype == 7:
+            shape = tuple([int(i) for i in zdata[1][3:]])
+            (out, chunks, chunkSize) = _unpackChunks__(n, shape, bool(zdata[1][2]))
+            dsts = Compressor.getChunks__(Compressor.getBytes__(out), chunkSize)
+            tasks += list(zip(chunks, dsts)); outs.append((n, out))
+        elif ctype in __THREADSAFE__: others.append(n)
+        else: serial.append(n)
+    for n in serial: _unpackNode(n)
+    Compressor.map__(_unpackNode, others, threads)
+    def F(t):
+        if Compressor.compressor.uncompressZstd(t[0], t[1]) != t[1].size:
+            raise ValueError("unpackNode: corrupted chunk.")
+        return None
+    Compressor.map__(F, tasks, threads)
+    for (n, out) in outs:
+        n[1] = out
+        Internal._rmNodesFromName1(n, 'ZData')
+        Internal._rmNodesFromName1(n, 'ZChunks')
+    return None
+
 # compressCoords of zones
-def _compressCoords(t, tol=1.e-8, ctype=0):
+def _compressCoords(t, tol=1.e-8, ctype=0, threads=None):
     """Compress coordinates lossless or with a relative tolerance."""
     zones = Internal.getZones(t)
+    fields = []
     for z in zones:
         GC = Internal.getNodesFromType1(z, 'GridCoordinates_t')
-        fields = []
         for c in GC: fields += Internal.getNodesFromType1(c, 'DataArray_t')
-        for f in fields:
-            if Internal.getNodeFromName1(f, 'ZData') is None:
-                _packNode(f, tol, ctype)
+    _packNodes__(fields, tol, ctype, threads)
     return None
 
-def compressCoords(t, tol=1.e-8, ctype=0):
+def compressCoords(t, tol=1.e-8, ctype=0, threads=None):
     """Compress coordinates lossless or with a relative tolerance."""
     tp = Internal.copyRef(t)
-    _compressCoords(tp, tol, ctype)
+    _compressCoords(tp, tol, ctype, threads)
     return tp
 
-def _compressFields(t, tol=1.e-8, ctype=0, varNames=None):
+def _compressFields(t, tol=1.e-8, ctype=0, varNames=None, threads=None):
     """Compress fields lossless or with a relative tolerance."""
     zones = Internal.getZones(t)
+    fields = []
     for z in zones:
         if varNames is None:
             # Compress all FlowSolution_t containers
             FS = Internal.getNodesFromType1(z, 'FlowSolution_t')
-            fields = []
             for c in FS: fields += Internal.getNodesFromType1(c, 'DataArray_t')
-            for f in fields:
-                if Internal.getNodeFromName1(f, 'ZData') is None:
-                    _packNode(f, tol, ctype)
         else:
             # Compress only given variables
             for v in varNames:
@@ -496,97 +578,103 @@ def _compressFields(t, tol=1.e-8, ctype=0, varNames=None):
                 else: varname = v
                 FS = Internal.getNodeFromName1(z, container)
                 f = Internal.getNodeFromName1(FS, varname)
-                if f is not None:
-                    if Internal.getNodeFromName1(f, 'ZData') is None:
-                        _packNode(f, tol, ctype)
+                if f is not None: fields.append(f)
                 else: print("Warning: compressFields: field %s not found."%v)
+    _packNodes__(fields, tol, ctype, threads)
     return None
 
-def compressFields(t, tol=1.e-8, ctype=0, varNames=None):
+def compressFields(t, tol=1.e-8, ctype=0, varNames=None, threads=None):
     """Compress fields lossless or with a relative tolerance."""
     tp = Internal.copyRef(t)
-    _compressFields(tp, tol, ctype, varNames)
+    _compressFields(tp, tol, ctype, varNames, threads)
     return tp
 
 # Compresse un cellN 0,1,2
-def _compressCellN(t, varNames=['cellN']):
+def _compressCellN(t, varNames=['cellN'], threads=None):
     """Compress cellN (0,1,2) lossless on 2 bits."""
     zones = Internal.getZones(t)
+    cellNs = []
     for name in varNames:
         spl = name.split(':')
         if len(spl) == 2: spl = spl[1]
         else: spl = name
         for z in zones:
-            cellNs = Internal.getNodesFromName2(z, spl)
-            for cellN in cellNs: _packNode(cellN, 0., 2)
+            cellNs += Internal.getNodesFromName2(z, spl)
+    _packNodes__(cellNs, 0., 2, threads)
     return None
 
-def compressCellN(t, varNames=['cellN']):
+def compressCellN(t, varNames=['cellN'], threads=None):
     """Compress cellN (0,1,2) lossless on 2 bits."""
     tp = Internal.copyRef(t)
-    _compressCellN(tp, varNames)
+    _compressCellN(tp, varNames, threads)
     return tp
 
 # Compress Elements_t (elts basiques ou NGONs)
-def _compressElements(t):
+def _compressElements(t, threads=None):
     """Compress lossless Element connectivities."""
     zones = Internal.getZones(t)
+    ngons = []; basics = {}
     for z in zones:
         elts = Internal.getNodesFromType1(z, 'Elements_t')
         for e in elts:
             eltno = e[1][0]
             if eltno == 22 or eltno == 23: # NGON
                 n = Internal.getNodeFromName1(e, 'ElementConnectivity')
-                _packNode(n, 0, 4)
+                ngons.append(n)
             else:
                 (stype, net) = Internal.eltNo2EltName(eltno)
                 n = Internal.getNodeFromName1(e, 'ElementConnectivity')
-                _packNode(n, net, 3)
+                if net not in basics: basics[net] = []
+                basics[net].append(n)
+    _packNodes__(ngons, 0, 4, threads)
+    for net in basics: _packNodes__(basics[net], net, 3, threads)
     return None
 
-def compressElements(t):
+def compressElements(t, threads=None):
     """Compress lossless Element connectivity."""
     tp = Internal.copyRef(t)
-    _compressElements(tp)
+    _compressElements(tp, threads)
     return tp
 
 # uncompressFields of zones (si ZData est trouve dans le noeud DataArray_t)
-def _uncompressAll(t):
+def _uncompressAll(t, threads=None):
     """Uncompress all compressed data."""
     zones = Internal.getZones(t)
+    fields = []
     for z in zones:
         # unpack field
         GC = Internal.getNodesFromType1(z, 'GridCoordinates_t')
         FS = Internal.getNodesFromType1(z, 'FlowSolution_t')
-        fields = []
         for c in GC+FS:
             fields += Internal.getNodesFromType1(c, 'DataArray_t')
-        for f in fields:
-            _unpackNode(f)
         # unpack connectivity
         elts = Internal.getNodesFromType1(z, 'Elements_t')
         for e in elts:
             cn = Internal.getNodeFromName1(e, 'ElementConnectivity')
-            _unpackNode(cn)
+            if cn is not None: fields.append(cn)
+    _unpackNodes__(fields, threads)
     return None
 
-def uncompressAll(t):
+def uncompressAll(t, threads=None):
     """Uncompress all compressed data."""
     tp = Internal.copyRef(t)
-    _uncompressAll(tp)
+    _uncompressAll(tp, threads)
     return tp
 
 # compresse le plus possible en lossless (sauf le cartesien)
-def _compressAll(t):
+# ctype=5 (fpc) ou ctype=7 (zstd, level)
+def _compressAll(t, ctype=5, level=1, threads=None):
     """Compress coords, fields and connectivity (lossless)."""
-    _compressCellN(t)
-    _compressCoords(t, ctype=5)
-    _compressFields(t, ctype=5)
-    _compressElements(t)
+    if ctype == 7: tol = level
+    else: tol = 1.e-8
+    _compressCellN(t, threads=threads)
+    _compressCoords(t, tol=tol, ctype=ctype, threads=threads)
+    _compressFields(t, tol=tol, ctype=ctype, threads=threads)
+    _compressElements(t, threads=threads)
     return None
 
-def compressAll(t):
+def compressAll(t, ctype=5, level=1, threads=None):
     """Compress coords, fields and connectivity (lossless)."""
     tp = Internal.copyRef(t)
-    _compressAll(tp)
+    _compressAll(tp, ctype, level, threads)
     return tp
\ No newline at end of file
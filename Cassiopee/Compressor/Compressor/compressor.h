@@ -34,5 +34,7 @@ namespace K_COMPRESSOR
   PyObject* py_indices_uncompress(PyObject* self, PyObject* args);
   PyObject* py_ngon_indices_compress(PyObject* self, PyObject* args);
   PyObject* py_ngon_indices_uncompress(PyObject* self, PyObject* args);
+  PyObject* py_zstd_compress(PyObject* self, PyObject* args);
+  PyObject* py_zstd_uncompress(PyObject* self, PyObject* args);
 }
 #endif
@@ -78,7 +78,11 @@ PyObject* py_fpc_compress(PyObject *self, PyObject *args)
         memset(dfcm, 0, sizeof(dfcm));
         //for (E_Int i = 0; i < an_array_length; i++) printf("%g ", array_data[i]);
         
-        E_Int size = fpc_encode(&ctx, array_data, an_array_length, out_compressed);
+        // le codage ne touche pas aux objets python : on relache le GIL
+        E_Int size;
+        Py_BEGIN_ALLOW_THREADS
+        size = fpc_encode(&ctx, array_data, an_array_length, out_compressed);
+        Py_END_ALLOW_THREADS
         //printf("compression: init=%d, compressed=%d, reserved=%d\n", an_array_length*8, size, outSize);
         //printf("outcompress %d\n", size);
         //for (E_Int i = 0; i < size; i++) printf("%u ", out_compressed[i]);
@@ -284,7 +288,9 @@ PyObject* py_fpc_uncompress(PyObject *self, PyObject *args)
         //for (E_Int i = 0; i < cpr_length; i++) printf("%u ", cpr_data[i]);
         
         //for (E_Int i = 0; i < array_length; i++) py_array_data[i] = 0.;
+        Py_BEGIN_ALLOW_THREADS
         fpc_decode(&ctx, cpr_data, py_array_data, array_length);
+        Py_END_ALLOW_THREADS
         //double* decompressed = new double [array_length];
         //fpc_decode(&ctx, cpr_data, decompressed, array_length);
         //for (E_Int j = 0; j < array_length; j++) printf("%f ", py_array_data[j]);
@@ -138,8 +138,11 @@ py_indices_compress(PyObject* self, PyObject* args)
         //= Compression de rel_indices with zstd :
         std::size_t maxSize = ZSTD_compressBound(an_array_length*sizeof(E_Int));
         std::vector<std::uint8_t> compressed_data(maxSize);
-        std::size_t szCompress = ZSTD_compress(compressed_data.data(), maxSize, rel_indices.data(), an_array_length*sizeof(E_Int), 
-                                               ZSTD_maxCLevel());
+        std::size_t szCompress;
+        Py_BEGIN_ALLOW_THREADS
+        szCompress = ZSTD_compress(compressed_data.data(), maxSize, rel_indices.data(), an_array_length*sizeof(E_Int), 
+                                   ZSTD_maxCLevel());
+        Py_END_ALLOW_THREADS
         npy_intp sz = npy_intp(szCompress);
         PyArrayObject* cpr_arr = (PyArrayObject*)PyArray_SimpleNew(1, &sz, NPY_BYTE);
         std::uint8_t* buffer = (std::uint8_t*)PyArray_DATA(cpr_arr);
@@ -259,8 +262,11 @@ PyObject* py_indices_uncompress(PyObject *self, PyObject *args)
         std::uint8_t *cpr_data = (std::uint8_t *)PyArray_DATA(np_cpr_arrays[i]);
         std::size_t compressed_size = PyArray_SIZE((PyArrayObject*)np_cpr_arrays[i]);
         std::vector<E_Int> uncompressed_data(length);
-        std::size_t lgth_uncompress = ZSTD_decompress(uncompressed_data.data(), length*sizeof(E_Int), 
-                                                      cpr_data, compressed_size);
+        std::size_t lgth_uncompress;
+        Py_BEGIN_ALLOW_THREADS
+        lgth_uncompress = ZSTD_decompress(uncompressed_data.data(), length*sizeof(E_Int), 
+                                          cpr_data, compressed_size);
+        Py_END_ALLOW_THREADS
         if (lgth_uncompress != length*sizeof(E_Int))
         {
             PyErr_SetString(PyExc_RuntimeError, "Uncompatible size between indice array and decompressed data size !");
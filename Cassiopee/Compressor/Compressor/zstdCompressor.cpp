@@ -0,0 +1,109 @@
+/*    
+    Copyright 2013-2025 Onera.
+
+    This file is part of Cassiopee.
+
+    Cassiopee is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Cassiopee is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Cassiopee.  If not, see <http://www.gnu.org/licenses/>.
+*/
+// Compression zstd de buffers bruts (tableaux numpy contigus ou bytes)
+// Le GIL est relache pendant la compression : plusieurs threads python
+// peuvent compresser des tableaux (ou des morceaux de tableau) en parallele.
+#include <cstdint>
+#include <cstring>
+#include "zstd/zstd.h"
+#include "compressor.h"
+
+namespace K_COMPRESSOR
+{
+//=============================================================================
+// IN: src: tableau numpy contigu (C ou fortran) ou bytes
+// IN: level: niveau de compression zstd
+// OUT: tableau numpy de bytes compresses
+//=============================================================================
+PyObject* py_zstd_compress(PyObject* self, PyObject* args)
+{
+  PyObject* src; int level;
+  if (!PyArg_ParseTuple(args, "Oi", &src, &level)) return NULL;
+
+  Py_buffer view;
+  if (PyObject_GetBuffer(src, &view, PyBUF_ANY_CONTIGUOUS) != 0)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "compressZstd: first argument must be a contiguous array or bytes.");
+    return NULL;
+  }
+  if (level > ZSTD_maxCLevel()) level = ZSTD_maxCLevel();
+
+  std::size_t srcSize = view.len;
+  std::size_t maxSize = ZSTD_compressBound(srcSize);
+  char* buffer = new char [maxSize];
+  std::size_t size;
+  Py_BEGIN_ALLOW_THREADS
+  size = ZSTD_compress(buffer, maxSize, view.buf, srcSize, level);
+  Py_END_ALLOW_THREADS
+  PyBuffer_Release(&view);
+  if (ZSTD_isError(size))
+  {
+    delete [] buffer;
+    PyErr_Format(PyExc_ValueError, "compressZstd: %s.", ZSTD_getErrorName(size));
+    return NULL;
+  }
+
+  npy_intp sz = size;
+  PyArrayObject* cpr_arr = (PyArrayObject*)PyArray_SimpleNew(1, &sz, NPY_BYTE);
+  memcpy(PyArray_DATA(cpr_arr), buffer, size);
+  delete [] buffer;
+  return (PyObject*)cpr_arr;
+}
+
+//=============================================================================
+// IN: src: bytes compresses (tableau numpy ou bytes)
+// IN: dst: tableau numpy contigu deja alloue, rempli en place
+// OUT: nombre d'octets decompresses
+//=============================================================================
+PyObject* py_zstd_uncompress(PyObject* self, PyObject* args)
+{
+  PyObject* src; PyObject* dst;
+  if (!PyArg_ParseTuple(args, "OO", &src, &dst)) return NULL;
+
+  Py_buffer vsrc;
+  if (PyObject_GetBuffer(src, &vsrc, PyBUF_ANY_CONTIGUOUS) != 0)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "uncompressZstd: first argument must be a contiguous array or bytes.");
+    return NULL;
+  }
+  Py_buffer vdst;
+  if (PyObject_GetBuffer(dst, &vdst, PyBUF_ANY_CONTIGUOUS | PyBUF_WRITABLE) != 0)
+  {
+    PyBuffer_Release(&vsrc);
+    PyErr_SetString(PyExc_TypeError,
+                    "uncompressZstd: second argument must be a writable contiguous array.");
+    return NULL;
+  }
+
+  std::size_t size;
+  Py_BEGIN_ALLOW_THREADS
+  size = ZSTD_decompress(vdst.buf, vdst.len, vsrc.buf, vsrc.len);
+  Py_END_ALLOW_THREADS
+  PyBuffer_Release(&vsrc);
+  PyBuffer_Release(&vdst);
+  if (ZSTD_isError(size))
+  {
+    PyErr_Format(PyExc_ValueError, "uncompressZstd: %s.", ZSTD_getErrorName(size));
+    return NULL;
+  }
+  return PyLong_FromSize_t(size);
+}
+}
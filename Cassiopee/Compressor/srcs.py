@@ -11,7 +11,8 @@ cpp_srcs = ["Compressor/deltaIndex.cpp",
             "Compressor/fpcCompressor.cpp",
             "Compressor/fpc.cpp",
             "Compressor/indicesCompressor.cpp",
-            "Compressor/NGonConnectivityCompressor.cpp"]
+            "Compressor/NGonConnectivityCompressor.cpp",
+            "Compressor/zstdCompressor.cpp"]
 
 if ZSTD:
 	zstd_srcs = ["Compressor/zstd/common/debug.c",
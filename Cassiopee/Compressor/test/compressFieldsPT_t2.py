@@ -0,0 +1,24 @@
+# - compressFields (pyTree) zstd -
+import Compressor.PyTree as Compressor
+import Generator.PyTree as G
+import Converter.PyTree as C
+import KCore.test as test
+
+a = G.cart((0,0,0), (1,1,1), (100,100,10))
+C._initVars(a, '{F}={CoordinateX}')
+C._initVars(a, '{centers:G}={centers:CoordinateY}')
+b = G.cart((100,0,0), (1,1,1), (10,10,10))
+C._initVars(b, '{F}={CoordinateX}')
+C._initVars(b, '{centers:G}={centers:CoordinateY}')
+t = C.newPyTree(['Base', [a,b]])
+
+# sequentiel
+t1 = Compressor.compressFields(t, tol=3, ctype=7, threads=1)
+Compressor._compressCoords(t1, ctype=7, threads=1)
+Compressor._uncompressAll(t1, threads=1)
+test.testT(t1, 1)
+
+# threads
+t2 = Compressor.compressAll(t, ctype=7, level=3, threads=4)
+Compressor._uncompressAll(t2, threads=4)
+test.testT(t2, 1)
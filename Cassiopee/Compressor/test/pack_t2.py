@@ -0,0 +1,9 @@
+# - pack (zstd) -
+import Compressor
+import KCore.test as test
+import Generator.PyTree as G
+a = G.cart((0,0,0), (1,1,1), (100,100,10))
+for threads in [1, 4]:
+    b = Compressor.pack(a, method=2, level=3, threads=threads)
+    c = Compressor.unpack(b, method=2, threads=threads)
+    test.testT(c, 1)
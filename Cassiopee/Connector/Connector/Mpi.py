@@ -251,20 +251,29 @@ def _setInterpTransfers(aR, aD, variables=[], cellNVariable='',
                         bcType=0, varType=1, compact=0, graph=None,
                         procDict=None, type='ALLD',
                         Gamma=1.4, Cv=1.7857142857142865, MuS=1.e-08,
-                        Cs=0.3831337844872463, Ts=1.0, alpha=1.):
+                        Cs=0.3831337844872463, Ts=1.0, alpha=1.,
+                        plan=None):
+
+    # Plan deja construit : seules les valeurs sont echangees
+    if plan is not None and plan._built:
+        plan.execute__(aD, variables=variables, cellNVariable=cellNVariable, variablesIBC=variablesIBC,
+                       bcType=bcType, varType=varType, compact=compact, Gamma=Gamma, Cv=Cv, MuS=MuS,
+                       Cs=Cs, Ts=Ts, alpha=alpha)
+        return None
 
     if procDict is None: procDict = Cmpi.getProcDict(aD)
     if graph is None: graph = Cmpi.computeGraph(aD, type=type)
 
     # Transferts locaux/globaux
     # Calcul des solutions interpolees par arbre donneur
-    # On envoie aussi les indices receveurs pour l'instant
+    # On envoie aussi les indices receveurs (sauf avec un plan construit)
     datas = {}
     zonesD = Internal.getZones(aD)
     for zD in zonesD:
         infos = X.setInterpTransfersD(zD, variables=variables, cellNVariable=cellNVariable, variablesIBC=variablesIBC,
                                       bcType=bcType, varType=varType, compact=compact, Gamma=Gamma, Cv=Cv, MuS=MuS,
                                       Cs=Cs, Ts=Ts, alpha=alpha)
+        if plan is not None: plan.addDonor__(infos)
         for n in infos:
             rcvName = n[0]
             proc = procDict[rcvName]
@@ -275,11 +284,14 @@ def _setInterpTransfers(aR, aD, variables=[], cellNVariable='',
                     listIndices = n[2]
                     z = Internal.getNodeFromName2(aR, rcvName)
                     C._setPartialFields(z, [field], [listIndices], loc=n[3])
+                    if plan is not None: plan.addLocal__(z)
+                elif plan is not None: plan.addLocal__(None)
             else:
                 rcvNode = procDict[rcvName]
                 #print(Cmpi.rank, 'envoie a ',rcvNode)
                 if rcvNode not in datas: datas[rcvNode] = [n]
                 else: datas[rcvNode] += [n]
+                if plan is not None: plan.addSend__(rcvNode, n[1])
                 #print datas
     # Envoie des numpys suivant le graph
     rcvDatas = Cmpi.sendRecv(datas, graph)
@@ -287,6 +299,7 @@ def _setInterpTransfers(aR, aD, variables=[], cellNVariable='',
     # Remise des champs interpoles dans l'arbre receveur
     for i in rcvDatas:
         #print(Cmpi.rank, 'recoit de',i, '->', len(rcvDatas[i]))
+        if plan is not None: plan.addSource__(i)
         for n in rcvDatas[i]:
             rcvName = n[0]
             #print('reception', Cmpi.rank, rcvName)
@@ -295,8 +308,111 @@ def _setInterpTransfers(aR, aD, variables=[], cellNVariable='',
                 listIndices = n[2]
                 z = Internal.getNodeFromName2(aR, rcvName)
                 C._setPartialFields(z, [field], [listIndices], loc=n[3])
+                if plan is not None: plan.addRecv__(i, z, field, listIndices, n[3])
+    if plan is not None: plan.build__()
     return None
 
+#===============================================================================
+# Plan de transferts persistant pour _setInterpTransfers
+# Le plan est construit lors du premier appel a _setInterpTransfers(..., plan=plan)
+# (echange classique avec graph et procDict). Les noms et indices receveurs
+# ne sont echanges qu'a ce moment et les zones receveuses sont resolues une
+# fois pour toutes. Aux appels suivants, seules les valeurs interpolees sont
+# envoyees, dans des buffers contigus prealloues par voisin.
+# aR doit rester le meme arbre (memes zones) et la connectivite de aD ne
+# doit pas changer, sinon il faut reconstruire un plan.
+#===============================================================================
+__TRANSFERPLANTAG__ = 5471
+
+class TransferPlan:
+    """Persistent transfer plan for _setInterpTransfers."""
+    def __init__(self):
+        self._built = False
+        # par zone donneuse, par info: (proc, zone receveuse locale, offset, taille)
+        self._routes = []
+        # proc -> buffer d'envoi
+        self._sendBufs = {}
+        self._sendSizes = {}
+        self._sendDtypes = {}
+        # proc -> (buffer de reception, [(zone, indices, loc, varString, nvars, npts, offset)])
+        self._recvs = {}
+        self._recvSizes = {}
+
+    def addDonor__(self, infos):
+        self._routes.append([])
+
+    def addLocal__(self, z):
+        self._routes[-1].append((Cmpi.rank, z, 0, 0))
+
+    def addSend__(self, proc, field):
+        if field != []: size = field[1].size
+        else: size = 0
+        off = self._sendSizes.get(proc, 0)
+        self._routes[-1].append((proc, None, off, size))
+        self._sendSizes[proc] = off+size
+        if size > 0 or proc not in self._sendDtypes:
+            if size > 0: self._sendDtypes[proc] = field[1].dtype
+            else: self._sendDtypes[proc] = numpy.float64
+
+    # Un message est recu de proc a chaque transfert
+    def addSource__(self, proc):
+        self._recvs[proc] = [numpy.float64, []]
+        self._recvSizes[proc] = 0
+
+    def addRecv__(self, proc, z, field, indices, loc):
+        (nvars, npts) = field[1].shape
+        off = self._recvSizes[proc]
+        self._recvs[proc][0] = field[1].dtype
+        self._recvs[proc][1].append((z, indices, loc, field[0], nvars, npts, off))
+        self._recvSizes[proc] = off+nvars*npts
+
+    # Alloue les buffers par voisin
+    def build__(self):
+        for proc in self._sendSizes:
+            self._sendBufs[proc] = numpy.empty(self._sendSizes[proc], dtype=self._sendDtypes[proc])
+        recvs = {}
+        for proc in self._recvs:
+            (dtype, entries) = self._recvs[proc]
+            recvs[proc] = (numpy.empty(self._recvSizes[proc], dtype=dtype), entries)
+        self._recvs = recvs
+        self._built = True
+
+    # Transferts avec le plan : seules les valeurs sont envoyees
+    def execute__(self, aD, **kwargs):
+        zonesD = Internal.getZones(aD)
+        if len(zonesD) != len(self._routes):
+            raise ValueError("setInterpTransfers: transfer plan does not match donor tree.")
+        reqs = []
+        for proc in self._recvs:
+            reqs.append(Cmpi.KCOMM.Irecv(self._recvs[proc][0], source=proc, tag=__TRANSFERPLANTAG__))
+
+        for c, zD in enumerate(zonesD):
+            infos = X.setInterpTransfersD(zD, **kwargs)
+            routes = self._routes[c]
+            if len(infos) != len(routes):
+                raise ValueError("setInterpTransfers: transfer plan does not match donor tree.")
+            for n, (proc, z, off, size) in zip(infos, routes):
+                field = n[1]
+                if z is not None: # local
+                    C._setPartialFields(z, [field], [n[2]], loc=n[3])
+                elif size > 0:
+                    a = field[1]
+                    if a.size != size:
+                        raise ValueError("setInterpTransfers: transfer plan does not match donor tree.")
+                    self._sendBufs[proc][off:off+size].reshape(a.shape)[:] = a
+
+        for proc in self._sendBufs:
+            reqs.append(Cmpi.KCOMM.Isend(self._sendBufs[proc], dest=proc, tag=__TRANSFERPLANTAG__))
+        for r in reqs: r.Wait()
+
+        # Remise des champs interpoles dans l'arbre receveur
+        for proc in self._recvs:
+            (buf, entries) = self._recvs[proc]
+            for (z, indices, loc, varString, nvars, npts, off) in entries:
+                field = [varString, buf[off:off+nvars*npts].reshape(nvars, npts), npts, 1, 1]
+                C._setPartialFields(z, [field], [indices], loc=loc)
+        return None
+
 #===============================================================================
 # setInterpTransfers for pressure gradients information (compact = 0)
 #===============================================================================
@@ -12,6 +12,7 @@ try:
     import Converter.Internal as Internal
     import Converter.PyTree as C
     import Converter
+    import Converter.converter
     import KCore
 except:
     raise ImportError("Connector.OversetData requires Converter module.")
@@ -150,9 +151,11 @@ def getIntersectingDomains(t, t2=None, method='AABB', taabb=None, tobb=None,
             if not taabb2: taabb2 = G.BB(t2)
             zones1 = Internal.getZones(taabb)
             zones2 = Internal.getZones(taabb2)
-            for z1 in zones1:
+            cands = getCandidateDomains__(zones1, zones2, tol=1.e-10)
+            for c, z1 in enumerate(zones1):
                 IntDict[z1[0]] = []
-                for z2 in zones2:
+                for j in cands[c]:
+                    z2 = zones2[j]
                     if z1[0] != z2[0]:
                         if G.bboxIntersection(z1, z2, tol=1.e-10, isBB=True, method='AABB') == 1:
                             IntDict[z1[0]].append(z2[0]) # saves the intersected zones names
@@ -162,14 +165,17 @@ def getIntersectingDomains(t, t2=None, method='AABB', taabb=None, tobb=None,
         if not tobb: tobb = G.BB(t, method='OBB')
         if not t2: tobb2 = tobb
         elif not tobb2: tobb2 = G.BB(t2, method='OBB')
-        for z1 in zonesNames:
-            obb1 = Internal.getZones(tobb)
-            obb1 = Internal.getNodeFromName(obb1, z1)
+        obbs1 = getZonesFromNames__(tobb, zonesNames)
+        obbs2 = getZonesFromNames__(tobb2, zonesNames2)
+        # pre-selection par les AABB englobant les OBB
+        cands = getCandidateDomains__(obbs1, obbs2)
+        for c, z1 in enumerate(zonesNames):
+            obb1 = obbs1[c]
             IntDict[z1] = []
-            for z2 in zonesNames2:
+            for j in cands[c]:
+                z2 = zonesNames2[j]
                 if z1 != z2:
-                    obb2 = Internal.getZones(tobb2)
-                    obb2 = Internal.getNodeFromName(obb2,z2)
+                    obb2 = obbs2[j]
                     if G.bboxIntersection(obb1, obb2, isBB=True, method='OBB') == 1:
                         IntDict[z1].append(z2) # saves the intersected zones names
                         #TotInter += 1
@@ -182,18 +188,19 @@ def getIntersectingDomains(t, t2=None, method='AABB', taabb=None, tobb=None,
             tobb2 = tobb
         if not not t2 and not taabb2: taabb2 = G.BB(t2)
         if not not t2 and not tobb2: tobb2 = G.BB(t2, method='OBB')
-        for z1 in zonesNames:
-            aabb1 = Internal.getZones(taabb)
-            aabb1 = Internal.getNodeFromName(aabb1, z1)
-            obb1 = Internal.getZones(tobb)
-            obb1 = Internal.getNodeFromName(obb1, z1)
+        aabbs1 = getZonesFromNames__(taabb, zonesNames)
+        obbs1 = getZonesFromNames__(tobb, zonesNames)
+        aabbs2 = getZonesFromNames__(taabb2, zonesNames2)
+        obbs2 = getZonesFromNames__(tobb2, zonesNames2)
+        # pre-selection par les AABB
+        cands = getCandidateDomains__(aabbs1, aabbs2, tol=1.e-10)
+        for c, z1 in enumerate(zonesNames):
+            aabb1 = aabbs1[c]; obb1 = obbs1[c]
             IntDict[z1] = []
-            for z2 in zonesNames2:
+            for j in cands[c]:
+                z2 = zonesNames2[j]
                 if z1 != z2:
-                    obb2 = Internal.getZones(tobb2)
-                    obb2 = Internal.getNodeFromName(obb2,z2)
-                    aabb2 = Internal.getZones(taabb2)
-                    aabb2 = Internal.getNodeFromName(aabb2,z2)
+                    obb2 = obbs2[j]; aabb2 = aabbs2[j]
                     if G.bboxIntersection(obb1, obb2, isBB=True,method='OBB') == 0:
                         continue
                     elif G.bboxIntersection(aabb1, aabb2, tol=1.e-10, isBB=True,method='AABB') == 0:
@@ -212,6 +219,38 @@ def getIntersectingDomains(t, t2=None, method='AABB', taabb=None, tobb=None,
     #print('Total zone/zone intersections: %d.'%TotInter)
     return IntDict
 
+#------------------------------------------------------------------------------
+# Retourne les zones de t de noms names (dans l'ordre de names)
+def getZonesFromNames__(t, names):
+    zones = {}
+    for z in Internal.getZones(t):
+        if z[0] not in zones: zones[z[0]] = z
+    return [zones.get(n, None) for n in names]
+
+# Retourne les boites englobantes alignees sur les axes des zones
+# (xmin,ymin,zmin,xmax,ymax,zmax), elargies de tol
+def getAABBs__(zones, tol=0.):
+    bb = numpy.empty((len(zones),6), dtype=numpy.float64)
+    for c, z in enumerate(zones):
+        gc = Internal.getNodeFromName1(z, Internal.__GridCoordinates__)
+        for i, name in enumerate(['CoordinateX', 'CoordinateY', 'CoordinateZ']):
+            x = Internal.getNodeFromName1(gc, name)[1]
+            bb[c,i] = numpy.min(x)-tol; bb[c,3+i] = numpy.max(x)+tol
+    return bb
+
+# Pre-selection des intersections par bbtree
+# IN: zones1, zones2: listes de zones bbox (AABB ou OBB)
+# OUT: pour chaque zone de zones1, liste triee des indices des zones de
+# zones2 dont la boite englobante intersecte la sienne
+def getCandidateDomains__(zones1, zones2, tol=1.e-6):
+    if len(zones1) == 0 or len(zones2) == 0: return [[] for z in zones1]
+    bb2 = getAABBs__(zones2, tol)
+    hook = Converter.converter.createBBTree(bb2[:,0:3].tolist(), bb2[:,3:6].tolist())
+    bb1 = getAABBs__(zones1, tol)
+    ret = Converter.converter.intersect2(bb1.ravel(), hook)
+    Converter.converter.deleteBBTree(hook)
+    return [sorted(r) for r in ret]
+
 #------------------------------------------------------------------------------
 def getCEBBIntersectingDomains(basis0, bases0, sameBase=0):
     """Return the list of interpolation domains defined in bases for any zone in basis.
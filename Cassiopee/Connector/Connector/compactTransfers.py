@@ -14,11 +14,138 @@ ibm_lbm_variables_2 ='Qstar_'
 ibm_lbm_variables_3 ='Qneq_'
 NEQ_LBM =  89
 
+#==============================================================================
+# Cache de la mise a plat
+# Les buffers param_int/param_real sont sauvegardes dans le repertoire cache,
+# avec la position des numpys de tc qui pointent dans ces buffers. La cle est
+# un hash du contenu de tc, des zones et du graph (tous procs confondus).
+# Sur un hit, les buffers sont mappes en memoire (copy-on-write) et la mise
+# a plat n'est pas refaite.
+#==============================================================================
+__MISEAPLATCACHEVERSION__ = 1
+
+def hashNode__(h, node):
+    h.update(node[0].encode()); h.update(node[3].encode())
+    v = node[1]
+    if isinstance(v, numpy.ndarray):
+        h.update(('%s%s'%(v.dtype.str,v.shape)).encode())
+        if v.dtype.kind != 'O': h.update(v.ravel(order='K').view(numpy.uint8))
+    else: h.update(repr(v).encode())
+    h.update(b'%d'%len(node[2]))
+    for c in node[2]: hashNode__(h, c)
+
+# Cle du cache (identique sur tous les procs)
+def getMiseAPlatKey__(zones, tc, graph, list_graph, nbpts_linelets):
+    import hashlib, pickle
+    import Converter.Mpi as Cmpi
+    h = hashlib.sha1()
+    h.update(b'%d %d %d'%(__MISEAPLATCACHEVERSION__, Cmpi.size, nbpts_linelets))
+    for c in tc[2]:
+        if c[0] == 'Parameter_int' or c[0] == 'Parameter_real': continue
+        hashNode__(h, c)
+    for z in zones:
+        h.update(z[0].encode())
+        n = Internal.getNodeFromName2(z, 'Parameter_int')
+        if n is not None: hashNode__(h, n)
+        for bc in Internal.getNodesFromType2(z, 'BC_t'): h.update(('%s %s'%(bc[0], Internal.getValue(bc))).encode())
+    h.update(pickle.dumps((graph, list_graph)))
+    keys = Cmpi.allgather(h.hexdigest())
+    h = hashlib.sha1()
+    for k in keys: h.update(k.encode())
+    return h.hexdigest()
+
+def getMiseAPlatCacheFile__(cache, key):
+    import os
+    import Converter.Mpi as Cmpi
+    return os.path.join(cache, 'miseAPlat_%s_%d'%(key, Cmpi.rank))
+
+# Vrai si v pointe dans le buffer b
+def isViewOf__(v, b):
+    if v.dtype != b.dtype: return False
+    p = v.ctypes.data; p0 = b.ctypes.data
+    return p >= p0 and p < p0+b.nbytes
+
+# Noeuds de tc dont le numpy est une vue sur param_int (0) ou param_real (1)
+def getMiseAPlatViews__(node, pi, pr, path, out):
+    for i, c in enumerate(node[2]):
+        if len(path) == 0 and (c[0] == 'Parameter_int' or c[0] == 'Parameter_real'): continue
+        v = c[1]
+        if isinstance(v, numpy.ndarray) and v.base is not None and v.size > 0:
+            kind = -1
+            if isViewOf__(v, pi): kind = 0; b = pi
+            elif pr is not None and isViewOf__(v, pr): kind = 1; b = pr
+            if kind >= 0:
+                if v.flags.c_contiguous: order = 'C'
+                elif v.flags.f_contiguous: order = 'F'
+                else: return False
+                off = (v.ctypes.data-b.ctypes.data)//b.itemsize
+                out.append((path, c[0], c[3], kind, off, v.size, v.shape, order))
+        if not getMiseAPlatViews__(c, pi, pr, path+(i,), out): return False
+    return True
+
+def saveMiseAPlatCache__(tc, cache, key):
+    import os, pickle
+    pi = Internal.getNodeFromName1(tc, 'Parameter_int')[1]
+    pr = Internal.getNodeFromName1(tc, 'Parameter_real')
+    if pr is not None: pr = pr[1]
+    views = []
+    if not getMiseAPlatViews__(tc, pi, pr, (), views):
+        print('Warning: miseAPlatDonorTree: can not cache this tree.'); return None
+    os.makedirs(cache, exist_ok=True)
+    prefix = getMiseAPlatCacheFile__(cache, key)
+    numpy.save(prefix+'_int.tmp.npy', pi)
+    os.replace(prefix+'_int.tmp.npy', prefix+'_int.npy')
+    if pr is not None:
+        numpy.save(prefix+'_real.tmp.npy', pr)
+        os.replace(prefix+'_real.tmp.npy', prefix+'_real.npy')
+    # le fichier des vues est ecrit en dernier : il valide le cache
+    with open(prefix+'.tmp.pkl', 'wb') as f:
+        pickle.dump((pr is not None, views), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(prefix+'.tmp.pkl', prefix+'.pkl')
+    return None
+
+# Recharge la mise a plat depuis le cache
+# OUT: True si hit sur tous les procs
+def loadMiseAPlatCache__(tc, cache, key):
+    import os, pickle
+    import Converter.Mpi as Cmpi
+    prefix = getMiseAPlatCacheFile__(cache, key)
+    views = None
+    if os.path.exists(prefix+'.pkl'):
+        with open(prefix+'.pkl', 'rb') as f: (hasReal, views) = pickle.load(f)
+        # verification des chemins
+        places = []
+        for (path, name, ntype, kind, off, size, shape, order) in views:
+            parent = tc
+            for i in path:
+                if i >= len(parent[2]): parent = None; break
+                parent = parent[2][i]
+            if parent is None: views = None; break
+            places.append(parent)
+    hit = 1 if views is not None else 0
+    if Cmpi.size > 1: hit = Cmpi.allreduce(hit, op=Cmpi.MIN)
+    if hit == 0: return False
+
+    pi = numpy.load(prefix+'_int.npy', mmap_mode='c')
+    Internal.createUniqueChild(tc, 'Parameter_int', 'DataArray_t', pi)
+    if hasReal:
+        pr = numpy.load(prefix+'_real.npy', mmap_mode='c')
+        Internal.createUniqueChild(tc, 'Parameter_real', 'DataArray_t', pr)
+    for (path, name, ntype, kind, off, size, shape, order), parent in zip(views, places):
+        if kind == 0: v = pi[off:off+size].reshape(shape, order=order)
+        else: v = pr[off:off+size].reshape(shape, order=order)
+        n = Internal.getNodeFromName1(parent, name)
+        if n is None: parent[2].append([name, v, [], ntype])
+        else: n[1] = v
+    return True
+
 #==============================================================================
 # Mise a plat (compactage) arbre donneur au niveau de la base
 # fonctionne avec ___setInterpTransfer
+# IN: cache: si un repertoire est donne, la mise a plat est sauvegardee et
+# relue dans ce repertoire si tc, zones et graph n'ont pas change
 #==============================================================================
-def miseAPlatDonorTree__(zones, tc, graph=None, list_graph=None, nbpts_linelets=0):
+def miseAPlatDonorTree__(zones, tc, graph=None, list_graph=None, nbpts_linelets=0, cache=None):
     if isinstance(graph, list):
         ###########################IMPORTANT ######################################
         #test pour savoir si graph est une liste de dictionnaires (explicite local)
@@ -30,6 +157,10 @@ def miseAPlatDonorTree__(zones, tc, graph=None, list_graph=None, nbpts_linelets=
     import Converter.Mpi as Cmpi
     rank = Cmpi.rank
 
+    if cache is not None:
+        key = getMiseAPlatKey__(zones, tc, graph, list_graph, nbpts_linelets)
+        if loadMiseAPlatCache__(tc, cache, key): return None
+
     if graph is not None and graphliste==False:
         procDict  = graph['procDict']
         graphID   = graph['graphID']
@@ -1219,6 +1350,7 @@ def miseAPlatDonorTree__(zones, tc, graph=None, list_graph=None, nbpts_linelets=
 
         c += 1
 
+    if cache is not None: saveMiseAPlatCache__(tc, cache, key)
     return None
 
 #==============================================================================
@@ -0,0 +1,36 @@
+# - getIntersectingDomains (pyTree) -
+# - nombreux blocs, avec t2 -
+import Generator.PyTree as G
+import Connector.PyTree as X
+import Converter.PyTree as C
+import Transform.PyTree as T
+import KCore.test as test
+
+zones = []
+for i in range(6):
+    for j in range(6):
+        z = G.cart((i*0.9,j*0.9,0.),(0.1,0.1,0.1),(11,11,3))
+        if (i+j)%3 == 0: z = T.rotate(z, (i*0.9,j*0.9,0.), (0,0,1), 30.)
+        zones.append(z)
+t = C.newPyTree(['Base1', zones])
+
+zones2 = []
+for i in range(4):
+    z = G.cart((i*1.3+0.5,0.5,-0.1),(0.2,0.2,0.1),(6,6,3))
+    zones2.append(z)
+t2 = C.newPyTree(['Base2', zones2])
+
+interDict = X.getIntersectingDomains(t, method='AABB')
+test.testO(interDict, 1)
+interDict = X.getIntersectingDomains(t, t2=t2, method='AABB')
+test.testO(interDict, 2)
+
+interDict = X.getIntersectingDomains(t, method='OBB')
+test.testO(interDict, 3)
+interDict = X.getIntersectingDomains(t, t2=t2, method='OBB')
+test.testO(interDict, 4)
+
+interDict = X.getIntersectingDomains(t, method='hybrid')
+test.testO(interDict, 5)
+interDict = X.getIntersectingDomains(t, t2=t2, method='hybrid')
+test.testO(interDict, 6)
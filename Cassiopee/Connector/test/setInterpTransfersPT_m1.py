@@ -0,0 +1,38 @@
+# - setInterpTransfers with persistent plan (pyTree) -
+import Generator.PyTree as G
+import Connector.Mpi as Xmpi
+import Converter.PyTree as C
+import Converter.Filter as Filter
+import Converter.Mpi as Cmpi
+import KCore.test as test
+
+LOCAL = test.getLocal()
+
+if Cmpi.rank == 0:
+    aD = G.cart((0,0,0),(1,1,1), (11,11,11))
+    Cmpi._setProc(aD,0)
+    aR = G.cart((0,0,0),(0.5,0.5,0.5), (21,21,21))
+    Cmpi._setProc(aR,Cmpi.size-1)
+    C.convertPyTree2File(aR, LOCAL+'/rcv.cgns')
+    C.convertPyTree2File(aD, LOCAL+'/dnr.cgns')
+Cmpi.barrier()
+
+hR = Filter.Handle(LOCAL+'/rcv.cgns')
+hD = Filter.Handle(LOCAL+'/dnr.cgns')
+aR = hR.loadFromProc()
+aD = hD.loadFromProc()
+
+Xmpi._setInterpData2(aR, aD, loc='centers', cartesian=False)
+C._initVars(aR, 'centers:F', 0.)
+
+plan = Xmpi.TransferPlan()
+for it in range(3):
+    C._initVars(aD, '{centers:F}={centers:CoordinateX}+%g*{centers:CoordinateY}'%it)
+    Xmpi._setInterpTransfers(aR, aD, variables=['F'], plan=plan)
+
+# meme resultat sans plan
+aR2 = C.initVars(aR, 'centers:F', 0.)
+Xmpi._setInterpTransfers(aR2, aD, variables=['F'])
+if Cmpi.rank == Cmpi.size-1:
+    test.testT(aR, 1)
+    test.testT(aR2, 1)
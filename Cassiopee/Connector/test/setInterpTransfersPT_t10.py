@@ -0,0 +1,50 @@
+# - setInterpTransfers IBC avec cache de la mise a plat (pyTree) -
+import Converter.PyTree as C
+import Converter.Internal as Internal
+import Generator.PyTree as G
+import Connector.PyTree as X
+import Post.PyTree as P
+import numpy as N
+import Dist2Walls.PyTree as DTW
+import Transform.PyTree as T
+import KCore.test as test
+import shutil
+
+LOCAL = test.getLocal()
+
+a = G.cart((-1,-1,-1),(0.04,0.04,1),(51,51,3))
+s = G.cylinder((0,0,-1), 0, 0.4, 360, 0, 4, (30,30,5))
+s = C.convertArray2Tetra(s); s = T.join(s); s = P.exteriorFaces(s)
+t = C.newPyTree(['Base', a])
+bodies = [[s]]
+BM = N.array([[1]], Internal.E_NpyInt)
+t = X.blankCells(t, bodies, BM, blankingType='center_in')
+X._setHoleInterpolatedPoints(t, depth=-2)
+DTW._distance2Walls(t,[s],type='ortho',loc='centers',signed=1)
+t = C.center2Node(t,'centers:TurbulentDistance')
+t = P.computeGrad(t, 'TurbulentDistance')
+C._initVars(t,"centers:Density",1.)
+C._initVars(t,"centers:VelocityX",0.2)
+C._initVars(t,"centers:VelocityY",0.)
+C._initVars(t,"centers:VelocityZ",0.)
+C._initVars(t,"centers:Temperature",1.)
+C._addState(t, adim='adim1',MInf=0.2, GoverningEquations='Euler',EquationDimension=3)
+tc = C.node2Center(t)
+X._setIBCData(t, tc, loc='centers', storage='inverse')
+tc2 = Internal.copyTree(tc)
+
+cache = LOCAL+'/miseAPlat.cache'
+shutil.rmtree(cache, ignore_errors=True)
+zones = Internal.getNodesFromType2(t, 'Zone_t')
+# miss : mise a plat et sauvegarde
+X.miseAPlatDonorTree__(zones, tc, graph=None, cache=cache)
+# hit : relecture mappee
+X.miseAPlatDonorTree__(zones, tc2, graph=None, cache=cache)
+test.testO(Internal.getNodeFromName1(tc2, 'Parameter_int')[1].tolist(), 1)
+
+vars=['Density','VelocityX','VelocityY','VelocityZ','Temperature']
+t1 = X.setInterpTransfers(t, tc, bcType=0,varType=2,variablesIBC=vars,compact=0,compactD=1)
+t2 = X.setInterpTransfers(t, tc2, bcType=0,varType=2,variablesIBC=vars,compact=0,compactD=1)
+test.testT(t2,2)
+test.testT(t1,2)
+shutil.rmtree(cache, ignore_errors=True)
@@ -451,11 +451,14 @@ def checkUniqueNames(t, ntype):
                     else: errors += [n, gc, "GridConnectivity name %s (zone %s) is already used."%(n[0],z[0])]
     else:
         nodes = Internal.getNodesFromType(t, ntype)
+        parents = None
         for n in nodes:
             name = n[0]
             if name not in nameServer: nameServer[name] = 0
             else:
-                (p,c) = Internal.getParentOfNode(t, n)
+                if parents is None: parents = Internal.getParentMap(t)
+                p = parents[id(n)][0]
+                if p is None: p = t
                 errors += [n, p, "Node name %s is already used."%n[0]]
     return errors
 
@@ -30,7 +30,7 @@ __all__ = ['array', 'getApi', 'addVars', '_addVars', 'addVars2',
            'createGlobalIndex', '_createGlobalIndex', 'recoverGlobalIndex', '_recoverGlobalIndex',
            'createSockets', 'diffArrays', 'diffArrayGeom', 'isFinite', 'setNANValuesAt', 'extCenter2Node',
            'extractVars', 'getIndexField',
-           'freeHook', 'getArgMax', 'getArgMin', 'getMaxValue', 'getMeanRangeValue', 'getMeanValue', 'getMinValue',
+           'freeHook', 'saveHook', 'loadHook', 'shareHook', 'loadSharedHook', 'getArgMax', 'getArgMin', 'getMaxValue', 'getMeanRangeValue', 'getMeanValue', 'getMinValue',
            'getNCells', 'getNPts', 'getValue', 'getVarNames', 'identifyElements', 'identifyFaces', 'identifyNodes',
            'identifySolutions', 'initVars', '_initVars', 'isNamePresent', 'listen', 'magnitude',
            'nearestElements', 'nearestFaces', 'nearestNodes', 'node2Center', 'node2ExtCenter', 'normL0', 'normL2',
@@ -599,88 +599,203 @@ def _initVarByFunction__(a, var, F, fargs=[], isVectorized=False):
                         a[1][posvar,:] = res[i]
     return None
 
-# Initialisation par une formule par numpy
-def _initVarByEq__(a, eq):
-    # Extrait les variables de a
-    varstring = a[0]
-    vars = varstring.split(',')
-
-    eq = eq.replace('centers:', '')
-    eq = eq.replace('nodes:', '')
-
-    pi = numpy.pi
-    eq = eq.replace('minimum(', 'numpy.minimum(')
-    eq = eq.replace('maximum(', 'numpy.maximum(')
-    eq = eq.replace('cos(', 'numpy.cos(')
-    eq = eq.replace('cosh(', 'numpy.cosh(')
-    eq = eq.replace('sin(', 'numpy.sin(')
-    eq = eq.replace('sinh(', 'numpy.sinh(')
-    eq = eq.replace('sqrt(', 'numpy.sqrt(')
-    eq = eq.replace('log(', 'numpy.log(')
-    eq = eq.replace('tan(', 'numpy.tan(')
-    eq = eq.replace('atan(', 'numpy.atan(')
-    eq = eq.replace('exp(', 'numpy.exp(')
-    eq = eq.replace('degrees(', 'numpy.degrees(')
-    eq = eq.replace('arctan2(', 'numpy.arctan2(')
-    #eq = eq.replace('and(', 'numpy.logical_and(')
-    eq = eq.replace('logical_and(', 'numpy.logical_and(')
-
-    # Split suivant ; si plusieurs formules sont definies
-    eq = eq.split(';')
-
-    for eq0 in eq:
-        # Extrait la variable a initialiser de eq
-        s = eq0.split('=', 1)
-        #if len(s) != 2:
-        #    print('Error: initVars: equation is incorrect.'); return None
+#==============================================================================
+# Formules compilees pour initVars
+# Une formule '{F}={a}+2*cos({b});{G}=...' est analysee une seule fois et
+# gardee dans __FORMULAS__. Chaque equation est compilee en un arbre d'ufuncs
+# numpy. Les sous-arbres constants sont evalues une fois par python (meme
+# resultat qu'avant, ex: 10**-3). Les tableaux temporaires sont alloues a
+# chaque evaluation et reutilises entre les noeuds de l'arbre.
+# Si l'equation contient une construction non geree, elle est evaluee par
+# un code object compile une seule fois (meme syntaxe qu'avant).
+#==============================================================================
+__FORMULAS__ = {}
+__MAXFORMULAS__ = 512
+
+# Fonctions disponibles dans les formules
+__FORMULAFUNCS__ = {'minimum':numpy.minimum, 'maximum':numpy.maximum,
+                    'cos':numpy.cos, 'cosh':numpy.cosh, 'sin':numpy.sin,
+                    'sinh':numpy.sinh, 'sqrt':numpy.sqrt, 'log':numpy.log,
+                    'tan':numpy.tan, 'atan':numpy.arctan, 'exp':numpy.exp,
+                    'degrees':numpy.degrees, 'arctan2':numpy.arctan2,
+                    'logical_and':numpy.logical_and}
+
+def getFormulaBinOps__():
+    import ast
+    return {ast.Add:numpy.add, ast.Sub:numpy.subtract,
+            ast.Mult:numpy.multiply, ast.Div:numpy.true_divide,
+            ast.Pow:numpy.power, ast.Mod:numpy.remainder,
+            ast.FloorDiv:numpy.floor_divide,
+            ast.Gt:numpy.greater, ast.GtE:numpy.greater_equal,
+            ast.Lt:numpy.less, ast.LtE:numpy.less_equal,
+            ast.Eq:numpy.equal, ast.NotEq:numpy.not_equal}
+
+# Evalue par python une expression constante (None si erreur)
+def evalFormulaConstant__(node):
+    import ast
+    env = {'numpy':numpy, 'pi':numpy.pi}
+    env.update(__FORMULAFUNCS__)
+    try:
+        code = compile(ast.fix_missing_locations(ast.Expression(node)), '<initVars>', 'eval')
+        return ('c', eval(code, env))
+    except: return None
+
+# Transforme une expression python en arbre d'evaluation:
+# ('v', no de variable) | ('c', constante) | ('f', ufunc, [fils])
+# Retourne None si l'expression n'est pas geree
+def compileFormulaTree__(node, ops):
+    import ast
+    if isinstance(node, ast.Expression): return compileFormulaTree__(node.body, ops)
+    tree = compileFormulaTree___(node, ops)
+    # sous-arbre constant : evalue avec les operateurs python
+    if tree is not None and tree[0] == 'f' and all(c[0] == 'c' for c in tree[2]):
+        return evalFormulaConstant__(node)
+    return tree
+
+def compileFormulaTree___(node, ops):
+    import ast
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return ('c', node.value)
+        return None
+    if isinstance(node, ast.Name):
+        if node.id.startswith('__v'): return ('v', int(node.id[3:]))
+        if node.id == 'pi': return ('c', numpy.pi)
+        return None
+    if isinstance(node, ast.BinOp):
+        op = ops.get(type(node.op), None)
+        if op is None: return None
+        l = compileFormulaTree__(node.left, ops)
+        r = compileFormulaTree__(node.right, ops)
+        if l is None or r is None: return None
+        return ('f', op, [l, r])
+    if isinstance(node, ast.UnaryOp):
+        o = compileFormulaTree__(node.operand, ops)
+        if o is None: return None
+        if isinstance(node.op, ast.UAdd): return o
+        if isinstance(node.op, ast.USub): return ('f', numpy.negative, [o])
+        return None
+    if isinstance(node, ast.Compare):
+        if len(node.ops) != 1: return None
+        op = ops.get(type(node.ops[0]), None)
+        if op is None: return None
+        l = compileFormulaTree__(node.left, ops)
+        r = compileFormulaTree__(node.comparators[0], ops)
+        if l is None or r is None: return None
+        return ('f', op, [l, r])
+    if isinstance(node, ast.Call):
+        if node.keywords: return None
+        f = None
+        if isinstance(node.func, ast.Name): f = __FORMULAFUNCS__.get(node.func.id, None)
+        elif isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name) and node.func.value.id == 'numpy':
+            f = getattr(numpy, node.func.attr, None)
+        if not isinstance(f, numpy.ufunc) or f.nout != 1 or f.nin != len(node.args): return None
+        args = [compileFormulaTree__(a, ops) for a in node.args]
+        if None in args: return None
+        return ('f', f, args)
+    return None
 
-        var = s[0]; var = var.replace('{', ''); var = var.replace('}', '')
-        var = var.lstrip(); var = var.rstrip()
+# Compile une formule (plusieurs equations separees par ;)
+# Retourne une liste d'equations [lhs, noms des variables, arbre, code]
+def compileFormula__(eq):
+    import re
+    import ast
+    formula = __FORMULAS__.get(eq, None)
+    if formula is not None: return formula
+    ops = getFormulaBinOps__()
+    eqs = []
+    for eq0 in eq.replace('centers:', '').replace('nodes:', '').split(';'):
+        s = eq0.split('=', 1)
+        if len(s) != 2: raise ValueError("initVars: equation is incorrect (%s)."%eq0)
+        var = s[0].replace('{', '').replace('}', '').strip()
+        names = []
+        def repl(m):
+            n = m.group(1).strip()
+            if n not in names: names.append(n)
+            return '__v%d'%names.index(n)
+        rhs = re.sub(r'\{([^{}]*)\}', repl, s[1].strip())
+        code = compile(rhs, '<initVars>', 'eval')
+        tree = compileFormulaTree__(ast.parse(rhs, mode='eval'), ops)
+        eqs.append([var, names, tree, code])
+    formula = {'eqs':eqs}
+    if len(__FORMULAS__) >= __MAXFORMULAS__: __FORMULAS__.clear()
+    __FORMULAS__[eq] = formula
+    return formula
+
+# Evalue un arbre de formule. Le resultat du noeud est ecrit dans out ou
+# dans le tampon de rang k (les fils utilisent les rangs k, k+1, ...)
+def evalFormulaTree__(tree, fields, buffers, k, size, out=None):
+    t = tree[0]
+    if t == 'v': return fields[tree[1]]
+    if t == 'c': return tree[1]
+    vals = [evalFormulaTree__(c, fields, buffers, k+i, size) for i, c in enumerate(tree[2])]
+    if out is None:
+        while len(buffers) <= k: buffers.append(numpy.empty(size, dtype=numpy.float64))
+        if buffers[k].size != size: buffers[k] = numpy.empty(size, dtype=numpy.float64)
+        out = buffers[k]
+    return tree[1](*vals, out=out)
+
+# Evalue une formule compilee sur un array (array1 ou array2/3)
+def _evalFormula__(a, formula):
+    buffers = [] # temporaires (liberes en sortie)
+    for (var, names, tree, code) in formula['eqs']:
         varp = KCore.isNamePresent(a, var)
         if varp == -1:
             _addVars(a, var); varp = KCore.isNamePresent(a, var)
-
-        # Initialisation de la variable
-        if not isinstance(a[1], list): # array1
-            loc = s[1]; c = 0
-            for v in vars:
-                loc = loc.replace('{%s}'%v, 'ap[%d,:]'%c); c += 1
-            ap = a[1]
-            ap[varp,:] = eval(loc)
+        vars = a[0].split(',')
+        ap = a[1]
+        if not isinstance(ap, list): # array1
+            ap1 = [ap[c,:] for c in range(ap.shape[0])]
         else: # array2/3
-            loc = s[1]; ap = a[1]
-            ap1 = [ ap[c].ravel(order='K') for c in range(len(ap)) ]
-            c = 0
-            for v in vars:
-                loc = loc.replace('{%s}'%v, 'ap1[%d][:]'%c); c += 1
-            ap1[varp][:] = eval(loc)
+            ap1 = [ap[c].ravel(order='K') for c in range(len(ap))]
+        fields = []
+        for n in names:
+            if n not in vars: raise ValueError("initVars: variable %s not found."%n)
+            fields.append(ap1[vars.index(n)])
+        dest = ap1[varp]
+        if tree is not None:
+            # le resultat final est ecrit directement dans dest
+            res = evalFormulaTree__(tree, fields, buffers, 0, dest.size, out=dest)
+            if res is dest: continue
+        else:
+            env = {'__v%d'%c:f for c, f in enumerate(fields)}
+            env['pi'] = numpy.pi
+            env.update(__FORMULAFUNCS__)
+            res = eval(code, globals(), env)
+        dest[:] = res
+    return None
+
+# Initialisation par une formule par numpy
+def _initVarByEq__(a, eq):
+    _evalFormula__(a, compileFormula__(eq))
     return None
 
 # Initialisation par une formule avec expression.ast
 def _initVarByEq2__(a, eq):
-    from . import expression as expr
-    # Extrait les variables de a
-    varstring = a[0]
-    vars = varstring.split(',')
-
-    eq = eq.replace('centers:', '')
-    eq = eq.replace('nodes:', '')
-
-    # Split suivant ; si plusieurs formules sont definies
-    eq = eq.split(';')
-
-    for eq0 in eq:
-        ast_eq = expr.ast(eq0)
-        # Extrait la variable a initialiser de eq
-        s = eq0.split('=', 1)
-
-        var = s[0]; var = var.replace('{', ''); var = var.replace('}', '')
-        var = var.lstrip(); var = var.rstrip()
+    # Les ast des equations sont gardes dans le cache des formules
+    key = 'expression:'+eq
+    eqs = __FORMULAS__.get(key, None)
+    if eqs is None:
+        from . import expression as expr
+        eqs = []
+        # Split suivant ; si plusieurs formules sont definies
+        for eq0 in eq.replace('centers:', '').replace('nodes:', '').split(';'):
+            # Extrait la variable a initialiser de eq
+            s = eq0.split('=', 1)
+            var = s[0].replace('{', '').replace('}', '').strip()
+            eqs.append((var, expr.ast(eq0)))
+        if len(__FORMULAS__) >= __MAXFORMULAS__: __FORMULAS__.clear()
+        __FORMULAS__[key] = eqs
+
+    for (var, ast_eq) in eqs:
         varp = KCore.isNamePresent(a, var)
         if varp == -1:
             _addVars(a, var); varp = KCore.isNamePresent(a, var)
 
-        ast_eq.run(a)
+    if len(eqs) == 1: eqs[0][1].run(a)
+    else: # toutes les equations en une seule passe sur les points
+        from . import expression as expr
+        expr.run_fused([e[1] for e in eqs], a)
     return None
 
 # Get index field
@@ -1631,6 +1746,111 @@ def freeHook(hook):
     else:
         if hook is not None: converter.freeHook(hook)
 
+#==============================================================================
+# Sauvegarde/chargement des hooks (KdTree et ADT)
+# Format du fichier (int64 puis blocs de donnees alignes sur 8 octets):
+# [magic, taille entete, version, taille des entiers, isList, nentries,
+#  par entree: kind (0: None, 1: hook, 2: numpy), type, nparts, (ni,nf)*nparts]
+# Un hook peut etre une liste (createHook sur une liste d'arrays) contenant
+# aussi l'indirection de createGlobalHook(indir=1).
+#==============================================================================
+__HOOKMAGIC__ = 0x4b4f4f48
+__HOOKVERSION__ = 1
+
+def getHookEntries__(hook):
+    if isinstance(hook, list): (hooks, isList) = (hook, 1)
+    else: (hooks, isList) = ([hook], 0)
+    entries = []
+    for h in hooks:
+        if h is None: entries.append((0, 0, []))
+        elif isinstance(h, numpy.ndarray):
+            entries.append((2, 0, [(numpy.ascontiguousarray(h, dtype=E_NpyInt), numpy.empty(0, numpy.float64))]))
+        else:
+            (type, parts) = converter.getHookData(h)
+            entries.append((1, type, parts))
+    return entries, isList
+
+def align8__(n): return (n+7)//8*8
+
+def saveHook(hook, fileName):
+    """Save a hook (or a list of hooks) to a flat binary file.
+    Usage: saveHook(hook, fileName)"""
+    entries, isList = getHookEntries__(hook)
+    header = [__HOOKMAGIC__, 0, __HOOKVERSION__, numpy.dtype(E_NpyInt).itemsize, isList, len(entries)]
+    for (kind, type, parts) in entries:
+        header += [kind, type, len(parts)]
+        for (ints, floats) in parts: header += [ints.size, floats.size]
+    header[1] = len(header)
+    header = numpy.array(header, dtype=numpy.int64)
+    # ecriture dans un fichier temporaire puis renommage (lecteurs concurrents)
+    tmpName = '%s.tmp%d'%(fileName, os.getpid())
+    with open(tmpName, 'wb') as f:
+        f.write(header.tobytes())
+        for (kind, type, parts) in entries:
+            for (ints, floats) in parts:
+                for b in (ints, floats):
+                    f.write(b.tobytes())
+                    pad = align8__(b.nbytes)-b.nbytes
+                    if pad > 0: f.write(b'\0'*pad)
+    os.replace(tmpName, fileName)
+    return None
+
+def loadHook(fileName, mmap=True):
+    """Load a hook saved by saveHook.
+    If mmap is True, the file is memory mapped and kd-trees are not copied.
+    Usage: hook = loadHook(fileName, mmap)"""
+    if mmap: buf = numpy.memmap(fileName, dtype=numpy.uint8, mode='r')
+    else: buf = numpy.fromfile(fileName, dtype=numpy.uint8)
+    header = buf[0:16].view(numpy.int64)
+    if header[0] != __HOOKMAGIC__: raise ValueError("loadHook: %s is not a hook file."%fileName)
+    header = buf[0:8*int(header[1])].view(numpy.int64)
+    if header[2] > __HOOKVERSION__: raise ValueError("loadHook: unknown hook file version.")
+    if header[3] != numpy.dtype(E_NpyInt).itemsize:
+        raise ValueError("loadHook: integer size of hook file does not match.")
+    isize = int(header[3]); isList = int(header[4]); nentries = int(header[5])
+    off = 8*int(header[1]); h = 6
+    hooks = []
+    for e in range(nentries):
+        kind = int(header[h]); type = int(header[h+1]); nparts = int(header[h+2]); h += 3
+        parts = []
+        for p in range(nparts):
+            ni = int(header[h]); nf = int(header[h+1]); h += 2
+            nb = ni*isize
+            ints = buf[off:off+nb].view(E_NpyInt); off += align8__(nb)
+            floats = buf[off:off+8*nf].view(numpy.float64); off += 8*nf
+            parts.append((ints, floats))
+        if kind == 0: hooks.append(None)
+        elif kind == 2: hooks.append(parts[0][0])
+        else: hooks.append(converter.setHookData(type, parts, 1))
+    if isList == 1: return hooks
+    else: return hooks[0]
+
+# Partage d'un hook entre processus d'un meme noeud
+# Le hook est ecrit en memoire partagee (/dev/shm si possible), les
+# processus le recuperent avec loadSharedHook (fichier mappe: une seule
+# copie des KdTrees en memoire).
+def getSharedHookFileName__(name):
+    import tempfile
+    if os.path.isdir('/dev/shm'): dir = '/dev/shm'
+    else: dir = tempfile.gettempdir()
+    return os.path.join(dir, 'hook_%s.bin'%name)
+
+def shareHook(hook, name):
+    """Write hook in shared memory to be loaded by other processes with loadSharedHook.
+    Usage: fileName = shareHook(hook, name)"""
+    fileName = getSharedHookFileName__(name)
+    saveHook(hook, fileName)
+    return fileName
+
+def loadSharedHook(name, remove=False):
+    """Load a hook shared by shareHook.
+    If remove is True, the shared file is removed once mapped.
+    Usage: hook = loadSharedHook(name, remove)"""
+    fileName = getSharedHookFileName__(name)
+    hook = loadHook(fileName, mmap=True)
+    if remove: os.remove(fileName)
+    return hook
+
 #==============================================================================
 # Fonctions d'identification geometrique
 #==============================================================================
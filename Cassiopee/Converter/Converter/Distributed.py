@@ -60,6 +60,11 @@ def _readPyTreeFromPaths(t, fileName, paths, format=None, maxFloatSize=-1, maxDe
     if len(paths) != len(nodes):
         print("Warning: readPyTreeFromPaths: some paths can not be loaded. Nothing added to pyTree.")
         return None
+    _setNodesFromPaths__(t, paths, nodes, maxDepth, setOnlyValue)
+    return None
+
+# Place les noeuds lus aux chemins paths dans t
+def _setNodesFromPaths__(t, paths, nodes, maxDepth=-1, setOnlyValue=True):
     c = 0
     for p in paths:
         n = nodes[c]
@@ -460,6 +465,32 @@ def getProcGlobal__(zoneName, t, procDict=None):
         else: proc = -1
         return proc
 
+#==============================================================================
+# Retourne la table nom de zone -> proc pour les zones de t
+# Utilise procDict si il existe
+#==============================================================================
+def getProcTable__(t, procDict=None):
+    if procDict is not None: return procDict
+    procs = {}
+    for z in Internal.getZones(t):
+        if z[0] not in procs: procs[z[0]] = getProc(z)
+    return procs
+
+#==============================================================================
+# Inverse intersectionsDict pour les zones de t
+# OUT: opps[zoneName]: noms des zones z2 de t telles que zoneName est dans
+# intersectionsDict[z2]
+#==============================================================================
+def getIntersectingOpps__(zones, intersectionsDict):
+    names = set(z[0] for z in zones)
+    opps = {}
+    for zn2 in intersectionsDict:
+        if zn2 not in names: continue
+        for zn in intersectionsDict[zn2]:
+            if zn not in opps: opps[zn] = [zn2]
+            else: opps[zn].append(zn2)
+    return opps
+
 #==============================================================================
 # Calcule le graph
 # IN: t: arbre contenant des noeuds 'proc' entierement charge
@@ -480,6 +511,8 @@ def getProcGlobal__(zoneName, t, procDict=None):
 # l'utilisateur doit fournir l'arbre t2 et intersectionDict doit decrire les
 # intersections entre t et t2, comme produit par "X.getIntersectingDomains(t,t2)".
 # exploc: True si explicite local
+# size: pour les types bbox, si size > 1, seules les zones rank::size sont
+# traitees (graphe partiel a reduire ensuite sur les procs)
 # OUT: graph: dictionnaire contenant des informations d'envoie
 # des zones entre processeurs
 # graph est construit de telle sorte que:
@@ -490,67 +523,46 @@ def getProcGlobal__(zoneName, t, procDict=None):
 #==============================================================================
 def computeGraph(t, type='bbox', t2=None, procDict=None, rank=0,
                  intersectionsDict=None, exploc=False, procDict2=None,
-                 it=None, reduction=True):
+                 it=None, reduction=True, size=1):
     """Return the communication graph for different block relation types."""
     zones = Internal.getZones(t)
     graph = {}
+    # zones traitees par ce proc (types bbox)
+    if size > 1: myZones = zones[rank::size]
+    else: myZones = zones
     if type == 'bbox': # zone de t de P0 intersectent une zone de t de P1
         if not intersectionsDict:
             try: import Connector.PyTree as X
             except: raise ImportError("computeGraph: requires Connector module.")
             intersectionsDict = X.getIntersectingDomains(t)
-        for z in zones:
+        procs = getProcTable__(t, procDict)
+        opps = getIntersectingOpps__(zones, intersectionsDict)
+        for z in myZones:
             proc = getProcLocal__(z, procDict)
-            for z2 in zones:
-                if z2[0] in intersectionsDict and z[0] in intersectionsDict[z2[0]]:
-                    popp = getProcGlobal__(z2[0], t, procDict)
-                    updateGraph__(graph, proc, popp, z[0])
-        #import Connector.PyTree as X
-        #for z in zones:
-        #    proc = getProcLocal__(z, procDict)
-        #    doms = X.getBBIntersectingDomains(t, z, tol=1.e-12)
-        #    for d in doms:
-        #        popp = getProcGlobal__(d[0], t, procDict)
-        #        updateGraph__(graph, proc, popp, z[0])
+            for zn2 in opps.get(z[0], []):
+                updateGraph__(graph, proc, procs[zn2], z[0])
 
     elif type == 'bbox2': # zone de t de P0 qui intersecte une zone de t de P1 mais qui n'est pas sur la meme base
         if not intersectionsDict:
             try: import Connector.PyTree as X
             except: raise ImportError("computeGraph: requires Connector module.")
             intersectionsDict = X.getIntersectingDomains(t)
+        parents = Internal.getParentMap(t)
+        procs = getProcTable__(t, procDict)
+        opps = getIntersectingOpps__(zones, intersectionsDict)
+        bases = {} # bases des zones de nom donne
         for z in zones:
-            (p, c) = Internal.getParentOfNode(t, z)
-            base = p[0]
+            based = parents[id(z)][0][0]
+            if z[0] not in bases: bases[z[0]] = [based]
+            else: bases[z[0]].append(based)
+        for z in myZones:
+            base = parents[id(z)][0][0]
             proc = getProcLocal__(z, procDict)
-            for z2 in zones:
-                if z2[0] in intersectionsDict and z[0] in intersectionsDict[z2[0]]:
-                    (p, c) = Internal.getParentOfNode(t, z2)
-                    based = p[0]
-                    popp = getProcGlobal__(z2[0], t, procDict)
-                    if popp != proc and base != based:
-                        if proc not in graph: graph[proc] = {popp:[z[0]]}
-                        else:
-                            if popp not in graph[proc]: graph[proc][popp] = [z[0]]
-                            else:
-                                if z[0] not in graph[proc][popp]:
-                                    graph[proc][popp].append(z[0])
-        # import Connector.PyTree as X
-        # for z in zones:
-        #     (p, c) = Internal.getParentOfNode(t, z)
-        #     base = p[0]
-        #     proc = getProcLocal__(z, procDict)
-        #     doms = X.getBBIntersectingDomains(t, z, tol=1.e-12)
-        #     for d in doms:
-        #         (p, c) = Internal.getParentOfNode(t, d)
-        #         based = p[0]
-        #         popp = getProcGlobal__(d[0], t, procDict)
-        #         if (popp != proc and base != based):
-        #             if proc not in graph: graph[proc] = {popp:[z[0]]}
-        #             else:
-        #                 if popp not in graph[proc]: graph[proc][popp] = [z[0]]
-        #                 else:
-        #                     if z[0] not in graph[proc][popp]:
-        #                         graph[proc][popp].append(z[0])
+            for zn2 in opps.get(z[0], []):
+                popp = procs[zn2]
+                if popp == proc: continue
+                for based in bases[zn2]:
+                    if base != based: updateGraph__(graph, proc, popp, z[0])
 
     elif type == 'bbox3': # zone de t sur P0 qui intersecte une zone de t2 sur P1
         #if not t2: raise ValueError("computeGraph: type bbox3 requires a t2.")
@@ -559,22 +571,13 @@ def computeGraph(t, type='bbox', t2=None, procDict=None, rank=0,
             try: import Connector.PyTree as X
             except: raise ImportError("computeGraph: requires Connector module.")
             intersectionsDict = X.getIntersectingDomains(t, t2)
-        for z in zones:
+        procs2 = getProcTable__(t2, procDict2)
+        names2 = set(z2[0] for z2 in zones2)
+        for z in myZones:
+            if z[0] not in intersectionsDict: continue
             proc = getProcLocal__(z, procDict)
-            for z2 in zones2:
-                if z[0] in intersectionsDict and z2[0] in intersectionsDict[z[0]]:
-                    popp = getProcGlobal__(z2[0], t2, procDict2)
-                    updateGraph__(graph, proc, popp, z[0])
-                    #updateGraphSet__(graph, proc, popp, z[0])
-        #for p in graph:
-        #  for opp in graph[p]: graph[p][opp] = list(graph[p][opp])
-        #import Connector.PyTree as X
-        #for z in zones:
-        #    proc = getProcLocal__(z, procDict)
-        #    doms = X.getBBIntersectingDomains(t2, z, tol=1.e-12)
-        #    for d in doms:
-        #        popp = getProcGlobal__(d[0], t2, None)
-        #        updateGraph__(graph, proc, popp, z[0])
+            for zn2 in intersectionsDict[z[0]]:
+                if zn2 in names2: updateGraph__(graph, proc, procs2[zn2], z[0])
 
     elif type == 'POST':
         if procDict is None:
@@ -994,3 +997,94 @@ def getProperty(a, propname):
     if nprop is not None: nprop = Internal.getValue(nprop)
     else: nprop = -1
     return nprop
+
+#==============================================================================
+# Serialisation de noeuds dans un buffer numpy contigu (sans pickle des
+# donnees)
+# Un paquet est: [int64 taille du squelette][squelette (pickle)][donnees]
+# Le squelette contient noms, types, dtypes et shapes. Les donnees numpy
+# sont concatenees (alignees sur 8 octets) dans l'ordre du parcours.
+#==============================================================================
+def alignPack__(n):
+    return (n+7)//8*8
+
+# Squelette d'un noeud, ajoute les numpys a arrays
+def getPackSkeleton__(node, arrays):
+    v = node[1]
+    if isinstance(v, numpy.ndarray) and v.dtype.kind != 'O':
+        if v.ndim > 1 and v.flags.f_contiguous: order = 'F'
+        else: order = 'C'
+        arrays.append((v, order))
+        v = (v.dtype.str, v.shape, order); kind = 1
+    else: kind = 0
+    return [node[0], kind, v, [getPackSkeleton__(c, arrays) for c in node[2]], node[3]]
+
+# Prepare la serialisation de node
+# OUT: (squelette, numpys, taille du paquet en octets)
+def preparePack__(node):
+    import pickle
+    arrays = []
+    skel = pickle.dumps(getPackSkeleton__(node, arrays), protocol=pickle.HIGHEST_PROTOCOL)
+    size = 8+alignPack__(len(skel))
+    for (a, order) in arrays: size += alignPack__(a.nbytes)
+    return (skel, arrays, size)
+
+# Ecrit le paquet prepare par preparePack__ dans buf (uint8) a partir de off
+# OUT: position apres le paquet
+def packInto__(buf, off, prep):
+    (skel, arrays, size) = prep
+    ls = len(skel)
+    buf[off:off+8] = numpy.array([ls], dtype=numpy.int64).view(numpy.uint8)
+    off += 8
+    buf[off:off+ls] = numpy.frombuffer(skel, dtype=numpy.uint8)
+    off += alignPack__(ls)
+    for (a, order) in arrays:
+        n = a.nbytes
+        if n > 0: buf[off:off+n] = numpy.ravel(a, order=order).view(numpy.uint8)
+        off += alignPack__(n)
+    return off
+
+def unpackSkeleton__(skel, buf, off):
+    [name, kind, v, children, ntype] = skel
+    if kind == 1:
+        (dtype, shape, order) = v
+        dtype = numpy.dtype(dtype)
+        n = dtype.itemsize
+        for s in shape: n *= s
+        v = buf[off:off+n].view(dtype).reshape(shape, order=order)
+        off += alignPack__(n)
+    nodes = []
+    for c in children:
+        (cn, off) = unpackSkeleton__(c, buf, off)
+        nodes.append(cn)
+    return ([name, v, nodes, ntype], off)
+
+# Relit un paquet de buf (uint8) a partir de off
+# Les numpys du noeud sont des vues sur buf (pas de copie)
+# OUT: (noeud, position apres le paquet)
+def unpackFrom__(buf, off):
+    import pickle
+    ls = int(buf[off:off+8].view(numpy.int64)[0])
+    off += 8
+    skel = pickle.loads(buf[off:off+ls].tobytes())
+    off += alignPack__(ls)
+    return unpackSkeleton__(skel, buf, off)
+
+# Serialise une liste de noeuds dans un seul buffer uint8
+def packNodes__(nodes):
+    preps = [preparePack__(n) for n in nodes]
+    size = 0
+    for p in preps: size += p[2]
+    buf = numpy.empty(size, dtype=numpy.uint8)
+    off = 0
+    for p in preps: off = packInto__(buf, off, p)
+    return buf
+
+# Relit tous les noeuds d'un buffer uint8 (ou d'une partie [off,end[)
+def unpackNodes__(buf, off=0, end=None):
+    if end is None: end = buf.size
+    nodes = []
+    while off < end:
+        (n, off) = unpackFrom__(buf, off)
+        nodes.append(n)
+    return nodes
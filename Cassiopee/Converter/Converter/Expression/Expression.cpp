@@ -851,8 +851,109 @@ namespace {
     }
 }
 // ===========================================================================================================
+namespace {
+    const char *run_fused_doc =
+        R"DOC(
+        Evaluate a group of expressions in a single pass over the points of the arrays.
+
+        Each expression must have an assignment operator. The points are processed by blocks : for
+        each block, all the expressions are evaluated in the order of the list, so that an expression
+        can use the result of a previous one. No temporary array of the size of the fields is created.
+        All the variables used and assigned by the expressions must exist in the arrays.
+
+        Example :
+        ========
+            >>> import Converter as C
+            >>> import Converter.expression as expr
+            >>> a = C.array('x,y,norm,inv', 100, 1, 1)
+            >>> e1 = expr.ast("{norm} = sqrt({x}**2+{y}**2)")
+            >>> e2 = expr.ast("{inv} = 1./({norm}+1.)")
+            >>> expr.run_fused([e1, e2], a)
+            >>> expr.run_fused([e1, e2], [a], blockSize=4096, parallel=0)
+    )DOC";
+    PyObject *py_run_fused(PyObject *self, PyObject *args, PyObject *kwds) {
+        PyObject*  py_asts;
+        PyObject*  py_arrays;
+        Py_ssize_t block_size = 0;
+        int        parallel   = 1;
+        static const char* kwlist[] = {"asts", "arrays", "blockSize", "parallel", NULL};
+        if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|ni", (char**)kwlist, &py_asts, &py_arrays,
+                                         &block_size, &parallel)) return NULL;
+        if (!PyList_Check(py_asts) && !PyTuple_Check(py_asts)) {
+            PyErr_SetString(PyExc_TypeError, "run_fused: asts must be a list of expressions.");
+            return NULL;
+        }
+        PyObject* seq_asts = PySequence_Fast(py_asts, "run_fused: asts must be a list of expressions.");
+        Py_ssize_t nasts = PySequence_Fast_GET_SIZE(seq_asts);
+        std::vector<Expression::ast*> exprs; exprs.reserve(nasts);
+        for (Py_ssize_t i = 0; i < nasts; ++i) {
+            PyObject* o = PySequence_Fast_GET_ITEM(seq_asts, i);
+            if (!PyObject_TypeCheck(o, &py_ast_handler_type)) {
+                Py_DECREF(seq_asts);
+                PyErr_SetString(PyExc_TypeError, "run_fused: asts must be a list of expressions.");
+                return NULL;
+            }
+            exprs.push_back(((py_ast_handler*)o)->pt_ast);
+        }
+        Py_DECREF(seq_asts);
+
+        // Un array ou une liste d'arrays de meme taille
+        std::vector<PyObject*> l_arrays;
+        if (PyList_Check(py_arrays) && PyList_Size(py_arrays) > 0 && PyList_Check(PyList_GetItem(py_arrays, 0))) {
+            for (Py_ssize_t i = 0; i < PyList_Size(py_arrays); ++i) l_arrays.push_back(PyList_GetItem(py_arrays, i));
+        }
+        else l_arrays.push_back(py_arrays);
+
+        auto symbol_kwds = list_of_symbols();
+        std::unordered_map<std::string, vector_view<double>> cpp_dico;
+        std::vector<data_array> arrays(l_arrays.size());
+        E_Int npts = -1;
+        for (size_t iarr = 0; iarr < l_arrays.size(); ++iarr) {
+            E_Int ni, nj, nk;
+            char* varString; char* eltType;
+            arrays[iarr].array = l_arrays[iarr];
+            arrays[iarr].res = K_ARRAY::getFromArray2(l_arrays[iarr], varString, arrays[iarr].f, ni, nj, nk,
+                                                      arrays[iarr].cn, eltType);
+            bool valid = (arrays[iarr].res == 1 || arrays[iarr].res == 2);
+            if (valid && npts == -1) npts = arrays[iarr].f->getSize();
+            if (!valid || arrays[iarr].f->getSize() != npts) {
+                PyErr_SetString(PyExc_ValueError, "run_fused: invalid array or incompatible array sizes.");
+                if (valid) RELEASESHAREDB(arrays[iarr].res, arrays[iarr].array, arrays[iarr].f, arrays[iarr].cn);
+                for (size_t j = 0; j < iarr; ++j)
+                    RELEASESHAREDB(arrays[j].res, arrays[j].array, arrays[j].f, arrays[j].cn);
+                return NULL;
+            }
+            std::vector<char *> vars;
+            K_ARRAY::extractVars(varString, vars);
+            for (size_t ivar = 0; ivar < vars.size(); ++ivar) {
+                std::string key_var = vars[ivar];
+                if (std::find(symbol_kwds.begin(), symbol_kwds.end(), key_var) != symbol_kwds.end())
+                    cpp_dico[key_var] = vector_view<double>((double *)arrays[iarr].f->begin(ivar + 1), npts);
+            }
+            for (auto &v : vars) delete[] v;
+        }
+
+        bool ok = true;
+        std::string s_error;
+        Py_BEGIN_ALLOW_THREADS;
+        try {
+            Expression::ast::eval_fused(exprs, cpp_dico, std::size_t(block_size), parallel != 0);
+        } catch(std::exception& e) { ok = false; s_error = std::string("run_fused: ") + e.what(); }
+        Py_END_ALLOW_THREADS;
+
+        for (size_t j = 0; j < arrays.size(); ++j)
+            RELEASESHAREDB(arrays[j].res, arrays[j].array, arrays[j].f, arrays[j].cn);
+        if (!ok) {
+            PyErr_SetString(PyExc_ValueError, s_error.c_str());
+            return NULL;
+        }
+        Py_RETURN_NONE;
+    }
+}
+// ===========================================================================================================
 static PyMethodDef expression_methods[] = {
     {"derivate", (PyCFunction)py_derivate, METH_VARARGS, derivate_doc},
+    {"run_fused", (PyCFunction)py_run_fused, METH_VARARGS | METH_KEYWORDS, run_fused_doc},
     {NULL, NULL}
 };
 #if PY_MAJOR_VERSION >= 3
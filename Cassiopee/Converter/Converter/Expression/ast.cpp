@@ -220,6 +220,47 @@ namespace Expression {
             }
     }
 
+    const std::size_t ast::default_block_size = 16*simd_vector_wrapper::max_size;
+
+    void ast::eval_fused(const std::vector<ast*> &exprs,
+                         const std::unordered_map<std::string, vector_view<double>> &params,
+                         std::size_t block_size, bool parallel) {
+        auto &st = symbol_table::get();
+        for (auto &v : st) v.second = symbol_table::data_t();
+        std::size_t sz = 0;
+        for (auto v : params) {
+            auto &d = st.at(v.first);
+            d.size  = v.second.size();
+            if (d.size > 1) {
+                if (sz == 0) sz = d.size;
+                if (sz != d.size) throw std::invalid_argument("Uncompatible dimensions between vectors");
+            }
+            d.data = v.second.data();
+        }
+        std::vector<ast::node*> roots; roots.reserve(exprs.size());
+        for (auto pt_expr : exprs) roots.push_back(&pt_expr->m_pt_tree->root());
+        const std::size_t nroots = roots.size();
+
+        // Blocs de block_size points ( multiple de la taille des vecteurs simd )
+        const std::size_t simd_size = simd_vector_wrapper::max_size;
+        if (block_size == 0) block_size = default_block_size;
+        block_size = std::max(simd_size, (block_size/simd_size)*simd_size);
+        const std::size_t nsimd   = sz/simd_size; // nbre de vecteurs simd complets
+        const std::size_t nchunks = block_size/simd_size; // nbre de vecteurs simd par bloc
+        const std::size_t nblocks = (nsimd+nchunks-1)/nchunks;
+#       pragma omp parallel for schedule(static) if (parallel && nblocks > 1)
+        for (std::size_t b = 0; b < nblocks; ++b) {
+            std::size_t cbeg = b*nchunks;
+            std::size_t cend = std::min(nsimd, cbeg+nchunks);
+            // Toutes les expressions sur le bloc avant de passer au suivant
+            for (std::size_t e = 0; e < nroots; ++e)
+                for (std::size_t c = cbeg; c < cend; ++c) roots[e]->eval_simd(c*simd_size);
+        }
+        // Reste (moins d'un vecteur simd)
+        for (std::size_t i = nsimd*simd_size; i < sz; ++i)
+            for (std::size_t e = 0; e < nroots; ++e) (*roots[e])(i);
+    }
+
     ast ast::derivate() {
         ast a(std::make_shared<tree>(m_pt_tree->root().derivate()));
         a.m_pt_tree->optimize();
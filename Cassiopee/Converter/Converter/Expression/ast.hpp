@@ -92,6 +92,28 @@ public:
      */
     void eval(const std::unordered_map<std::string, vector_view<double>> &params);
 
+    /**
+     * @brief Evaluate a group of expressions in a single pass over the points
+     * @details Evaluate several expressions ( each one with an assign operator ) in one
+     *          loop over the points. Points are processed by blocks of block_size values : for each block,
+     *          all the expressions are evaluated one after the other, so an expression can use the
+     *          result of a previous expression of the group while this result is still in cache.
+     *          No temporary array of the size of the vectors is created. Blocks are distributed among
+     *          OpenMP threads if parallel is true.
+     *
+     * @param exprs The expressions to evaluate, in order
+     * @param params The dictionnary of the values and variables used
+     * @param block_size Number of points per block ( rounded to a multiple of simd_vector_wrapper::max_size ),
+     *                   default_block_size if 0
+     * @param parallel If true, blocks are evaluated in parallel
+     */
+    static void eval_fused(const std::vector<ast*> &exprs,
+                           const std::unordered_map<std::string, vector_view<double>> &params,
+                           std::size_t block_size = 0, bool parallel = true);
+
+    /// Default number of points per block for eval_fused ( 16 simd vectors )
+    static const std::size_t default_block_size;
+
     /**
      * @brief Return the derivate of the expression
      * @details Return the derivate of the expression, addind some new variables in the table of symbol
@@ -54,6 +54,77 @@ def readNodesFromFilter(fileName, filter, format='bin_hdf', com=None):
     ret = Converter.converter.convertFile2PartialPyTree(fileName, format, None, com, filter2, 0)
     return ret
 
+# Lecture groupee de filtres de plusieurs zones (sequentiel)
+# Les filtres sont fusionnes en un minimum de lectures (un chemin n'est lu
+# qu'une fois par lecture, des zones issues d'un meme bloc sont donc lues
+# dans des lectures differentes).
+# IN: filters: liste de filtres (cf readNodesFromFilter)
+# OUT: liste des dictionnaires lus (un par filtre)
+def readNodesFromFilterBatch(fileName, filters, format='bin_hdf'):
+    """Read nodes from file given a list of filters."""
+    out = [{} for f in filters]
+    todo = list(range(len(filters)))
+    while todo != []:
+        filter2 = {}; owner = {}; rest = []
+        for i in todo:
+            fpaths = fixPaths__(list(filters[i].keys()))
+            collide = False
+            for b in fpaths:
+                if b in filter2: collide = True; break
+            if collide: rest.append(i); continue
+            for b, k in zip(fpaths, filters[i]):
+                filter2[b] = filters[i][k]; owner[b] = i
+        if filter2 != {}:
+            ret = Converter.converter.convertFile2PartialPyTree(fileName, format, None, None, filter2, 0)
+            for b in ret: out[owner[b]][b] = ret[b]
+        todo = rest
+    return out
+
+#==============================================================================
+# Lecture groupee de chemins de plusieurs zones
+# Tous les chemins des groupes (en general un groupe par zone) sont lus en
+# une seule ouverture du fichier, dans l'ordre des zones du fichier (ordre
+# des zones de a).
+# Comme pour _readPyTreeFromPaths, un groupe dont un chemin est absent du
+# fichier n'est pas charge (les groupes sont alors relus par dichotomie).
+# IN: groups: liste de listes de chemins
+#==============================================================================
+def _readPyTreeFromPathsBatch(a, fileName, groups, format=None, maxFloatSize=-1, maxDepth=-1,
+                              setOnlyValue=True, skipTypes=None):
+    """Read groups of paths for many zones and complete a."""
+    groups = [g for g in groups if g != []]
+    if groups == []: return None
+    groups = sortGroups__(a, groups)
+    _readGroups__(a, fileName, groups, format, maxFloatSize, maxDepth, setOnlyValue, skipTypes)
+    return None
+
+# Trie les groupes dans l'ordre des zones de a (ordre du fichier)
+def sortGroups__(a, groups):
+    order = {}
+    for ib, b in enumerate(Internal.getBases(a)):
+        for iz, z in enumerate(Internal.getZones(b)): order[(b[0],z[0])] = (ib,iz)
+    last = (len(order),0)
+    def key(g):
+        p = fixPaths__([g[0]])[0].strip('/').split('/')
+        if len(p) < 2: return (-1,0)
+        return order.get((p[0],p[1]), last)
+    return sorted(groups, key=key)
+
+def _readGroups__(a, fileName, groups, format, maxFloatSize, maxDepth, setOnlyValue, skipTypes):
+    paths = []
+    for g in groups: paths += g
+    nodes = readNodesFromPaths(fileName, paths, format, maxFloatSize, maxDepth, None, skipTypes)
+    if len(nodes) == len(paths):
+        Distributed._setNodesFromPaths__(a, paths, nodes, maxDepth, setOnlyValue)
+    elif len(groups) == 1:
+        print("Warning: readPyTreeFromPaths: some paths can not be loaded. Nothing added to pyTree.")
+    else:
+        nodes = None
+        h = len(groups)//2
+        _readGroups__(a, fileName, groups[:h], format, maxFloatSize, maxDepth, setOnlyValue, skipTypes)
+        _readGroups__(a, fileName, groups[h:], format, maxFloatSize, maxDepth, setOnlyValue, skipTypes)
+    return None
+
 # Ecrit des tableaux ou des morceaux de tableau a certains endroits du fichier
 # definis par filter
 # t: pyTree avec les memes chemins
@@ -119,11 +190,19 @@ def readZoneHeaders(fileName, format=None, baseNames=None, familyZoneNames=None,
             families += families2
         znp = []
         bases = Internal.getBases(a)
+        # lecture groupee des ZoneBC (si le squelette a les enfants des zones,
+        # seules les zones ayant un ZoneBC sont lues)
+        groups = []
+        for b in bases:
+            zones = Internal.getZones(b)
+            for z in zones:
+                if (maxDepth < 0 or maxDepth >= 3) and Internal.getNodeFromName1(z, 'ZoneBC') is None: continue
+                groups.append(['/'+b[0]+'/'+z[0]+'/ZoneBC'])
+        _readPyTreeFromPathsBatch(a, fileName, groups, format)
         for b in bases:
             zones = Internal.getZones(b)
             for z in zones:
                 path = '/'+b[0]+'/'+z[0]
-                _readPyTreeFromPaths(a, fileName, path+'/ZoneBC', format)
                 nodes = Internal.getNodesFromValue(z, BCType)
                 nodes += PyTree.getFamilyBCs(z, families)
                 #_convert2SkeletonTree(z)
@@ -165,10 +244,12 @@ def _loadContainer(a, fileName, znp, cont, format=None):
     else: conts = [cont]
     if isinstance(znp, list): znps = znp
     else: znps = [znp]
+    groups = []
     for p in znps:
         paths = []
         for c in conts: paths.append('%s/%s'%(p,c))
-        _readPyTreeFromPaths(a, fileName, paths, format)
+        groups.append(paths)
+    _readPyTreeFromPathsBatch(a, fileName, groups, format)
     return None
 
 # variablesN = ['GridCoordinates/CoordinateX',...]
@@ -176,6 +257,7 @@ def _loadContainer(a, fileName, znp, cont, format=None):
 def _loadContainerPartial(a, fileName, znp, variablesN=[], variablesC=[], format=None):
     if isinstance(znp, list): znps = znp
     else: znps = [znp]
+    filters = []; infos = []
     for p in znps:
         f = {}
         spl = p.rsplit('/',1)
@@ -229,9 +311,12 @@ def _loadContainerPartial(a, fileName, znp, variablesN=[], variablesC=[], format
             DataSpaceGLOBC = [[0]]
 
         for pp in paths: f[pp] = DataSpaceMMRYC+DataSpaceFILEC+DataSpaceGLOBC
+        filters.append(f); infos.append((zname, pname))
 
-        r = readNodesFromFilter(fileName, f, format)
+    # Lecture groupee des filtres de toutes les zones
+    rs = readNodesFromFilterBatch(fileName, filters, format)
 
+    for r, (zname, pname) in zip(rs, infos):
         # Repositionne les chemins dans la zone
         for k in r:
             k2 = k.replace(pname, zname)
@@ -258,12 +343,14 @@ def _loadContainerPartial(a, fileName, znp, variablesN=[], variablesC=[], format
 def _loadConnectivity(a, fileName, znp, format=None):
     if isinstance(znp, list): znps = znp
     else: znps = [znp]
+    groups = []
     for p in znps:
         z = Internal.getNodeFromPath(a, p)
         elts = Internal.getNodesFromType1(z, 'Elements_t')
         paths = []
         for e in elts: paths.append(p+'/'+e[0])
-        _readPyTreeFromPaths(a, fileName, paths, format)
+        groups.append(paths)
+    _readPyTreeFromPathsBatch(a, fileName, groups, format)
     return None
 
 # force le proc node des zones au processeur courant
@@ -300,10 +387,14 @@ def _loadVariables(a, fileName, znp, var, format):
             else:
                 fvars.append(Internal.__FlowSolutionNodes__+'/'+v); cont = Internal.__FlowSolutionNodes__
 
+    groups = []
     for p in znps:
         paths = []
         for v in fvars: paths.append('%s/%s'%(p,v))
-        _readPyTreeFromPaths(a, fileName, paths, format)
+        groups.append(paths)
+    _readPyTreeFromPathsBatch(a, fileName, groups, format)
+
+    for p, paths in zip(znps, groups):
         # Ensure location in containers
         zp = Internal.getNodeFromPath(a, p)
         fp = Internal.getNodeFromPath(a, paths[0])
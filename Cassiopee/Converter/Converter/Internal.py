@@ -317,6 +317,7 @@ def setName(node, name):
     else:
       raise TypeError("setName: name of node must be a string (%s)."%(name.__repr__()[:min(len(name.__repr__()),60)]))
   else: raise TypeError("setName: name of node must be a string (%s)."%(name.__repr__()[:min(len(name.__repr__()),60)]))
+  if __TREEINDEX__: invalidateTreeIndex__(node)
   return None
 
 def _setName(node, name):
@@ -344,7 +345,9 @@ def createNode(name, ntype, value=None, children=None, parent=None):
   setName(node, name)
   setType(node, ntype)
   setValue(node, value)
-  if parent is not None: parent[2].append(node)
+  if parent is not None:
+    parent[2].append(node)
+    if __TREEINDEX__: invalidateTreeIndex__(parent)
   return node
 
 # -- addChild (modify node)
@@ -365,6 +368,7 @@ def _addChild(node, child, pos=-1):
     if pos == -1: node2.extend(child)
     elif pos == 0: node2[:] = child+node2
     else: node2[:] = node2[:pos]+child+node2[pos:]
+  if __TREEINDEX__: invalidateTreeIndex__(node)
   return None
 
 # -- createChild (modify node)
@@ -390,7 +394,9 @@ def createUniqueChild(node, name, ntype, value=None, children=None, pos=-1):
     child = node[2][e]
     setValue(child, value)
     setType(child, ntype)
-    if children is not None: child[2] = children
+    if children is not None:
+      child[2] = children
+      if __TREEINDEX__: invalidateTreeIndex__(child)
   return child
 
 def _createUniqueChild(node, name, ntype, value=None, children=None, pos=-1):
@@ -1231,6 +1237,157 @@ def newParentElementsPosition(value=None, parent=None):
   node = newDataArray('ParentElementsPosition', value=value, parent=parent)
   return node
 
+#==============================================================================
+# -- Tree index --
+#==============================================================================
+# Index optionnel d'un arbre (par nom, par type et par chemin).
+# Une fois cree sur t, il est utilise par getNodeFromName, getNodesFromName,
+# getNodeFromType, getNodesFromType, getNodeFromNameAndType,
+# getNodesFromNameAndType et getNodeFromPath appeles sur t.
+# Il est invalide par les fonctions _addChild, setName, _rmNode*,
+# _moveNodeFromPaths, createNode (avec parent), createUniqueChild et
+# reconstruit a la prochaine recherche.
+# Toute autre modification en place (ex: node[2].append) doit etre suivie
+# d'un appel a invalidateTreeIndex(t).
+# Le registre garde une reference sur t : l'index doit etre supprime par
+# rmTreeIndex(t) pour que t soit libere.
+
+# Registre des index: id(t) -> index
+__TREEINDEX__ = {}
+
+# -- createTreeIndex
+# Cree l'index de t (arbre ou noeud standard)
+def createTreeIndex(t):
+  """Create a name/type/path index on t, used by node access functions.
+  The index keeps a reference on t: call rmTreeIndex(t) to release it."""
+  if isStdNode(t) != -1:
+    raise TypeError("createTreeIndex: t must be a standard pyTree node.")
+  idx = {'root':t, 'valid':False}
+  __TREEINDEX__[id(t)] = idx
+  buildTreeIndex__(idx)
+  return None
+
+# -- rmTreeIndex
+# Supprime l'index de t (si t=None, supprime tous les index)
+def rmTreeIndex(t=None):
+  """Remove the index of t."""
+  if t is None: __TREEINDEX__.clear(); return None
+  idx = __TREEINDEX__.get(id(t), None)
+  if idx is not None and idx['root'] is t: del __TREEINDEX__[id(t)]
+  return None
+
+# -- invalidateTreeIndex
+# Marque l'index de t comme perime (si t=None, tous les index)
+# Il sera reconstruit a la prochaine recherche
+def invalidateTreeIndex(t=None):
+  """Invalidate the index of t. It will be rebuilt on next access."""
+  if t is None:
+    for idx in __TREEINDEX__.values(): idx['valid'] = False
+    return None
+  idx = __TREEINDEX__.get(id(t), None)
+  if idx is not None and idx['root'] is t: idx['valid'] = False
+  return None
+
+# -- refreshTreeIndex
+# Reconstruit immediatement l'index de t (si t=None, tous les index)
+def refreshTreeIndex(t=None):
+  """Rebuild the index of t."""
+  if t is None:
+    for idx in __TREEINDEX__.values(): buildTreeIndex__(idx)
+    return None
+  idx = __TREEINDEX__.get(id(t), None)
+  if idx is not None and idx['root'] is t: buildTreeIndex__(idx)
+  return None
+
+# -- hasTreeIndex
+def hasTreeIndex(t):
+  """Return True if t has an index."""
+  idx = __TREEINDEX__.get(id(t), None)
+  return idx is not None and idx['root'] is t
+
+# Retourne l'index valide de t ou None
+def getTreeIndex__(t):
+  idx = __TREEINDEX__.get(id(t), None)
+  if idx is None or idx['root'] is not t: return None
+  if not idx['valid']: buildTreeIndex__(idx)
+  return idx
+
+# Construit l'index (parcours en profondeur, ordre des fonctions getNode*)
+# parents: id(node) -> (parent, position de node dans parent[2])
+def buildTreeIndex__(idx):
+  t = idx['root']
+  names = {}; types = {}; paths = {}; parents = {}
+  names[t[0]] = [t]; types[t[3]] = [t]; parents[id(t)] = (None, 0)
+  for pos, c in enumerate(t[2]):
+    buildTreeIndex___(c, t, pos, c[0], True, names, types, paths, parents)
+  idx['names'] = names; idx['types'] = types; idx['paths'] = paths
+  idx['parents'] = parents; idx['valid'] = True
+  return None
+
+def buildTreeIndex___(node, parent, pos, path, firstPath, names, types, paths, parents):
+  l = names.get(node[0], None)
+  if l is None: names[node[0]] = [node]
+  else: l.append(node)
+  l = types.get(node[3], None)
+  if l is None: types[node[3]] = [node]
+  else: l.append(node)
+  if id(node) not in parents: parents[id(node)] = (parent, pos) # premier trouve
+  # seul le premier noeud d'un chemin est atteignable par getNodeFromPath
+  if firstPath:
+    if path in paths: firstPath = False
+    else: paths[path] = node
+  for p, c in enumerate(node[2]):
+    buildTreeIndex___(c, node, p, path+'/'+c[0], firstPath, names, types, paths, parents)
+  return None
+
+# Retourne (parent, position) de node a partir de l'index de t
+# Si l'entree est perimee, l'index est reconstruit une fois
+# Retourne None si node n'est pas dans l'index valide
+def getIndexedParent__(idx, node):
+  for i in range(2):
+    e = idx['parents'].get(id(node), None)
+    if e is None: return None
+    (p, c) = e
+    if p is None:
+      if node is idx['root']: return e
+    elif c < len(p[2]) and p[2][c] is node: return e
+    if i == 0: buildTreeIndex__(idx)
+  return None
+
+# -- getParentMap
+# Retourne le dictionnaire id(node) -> (parent, position) des noeuds de t
+# p[2][c] = node. Pour t, l'entree vaut (None, 0).
+# Le dictionnaire est toujours reconstruit (l'index de t peut etre perime
+# apres des modifications directes de t)
+def getParentMap(t):
+  """Return a dictionary id(node) -> (parent, position) for all nodes of t."""
+  parents = {}
+  isStd = isStdNode(t)
+  if isStd == 0:
+    for c in t:
+      parents[id(c)] = (None, 0)
+      for pos, d in enumerate(c[2]): getParentMap__(d, c, pos, parents)
+  else:
+    parents[id(t)] = (None, 0)
+    for pos, c in enumerate(t[2]): getParentMap__(c, t, pos, parents)
+  return parents
+
+def getParentMap__(node, parent, pos, parents):
+  if id(node) not in parents: parents[id(node)] = (parent, pos)
+  for p, c in enumerate(node[2]): getParentMap__(c, node, p, parents)
+  return None
+
+# Invalide les index contenant node (appele par les fonctions de modification)
+def invalidateTreeIndex__(node):
+  isStd = isStdNode(node)
+  if isStd == 0:
+    for c in node: invalidateTreeIndex__(c)
+    return None
+  i = id(node)
+  for idx in __TREEINDEX__.values():
+    if idx['valid'] and i in idx['parents']: idx['valid'] = False
+  return None
+
 #==============================================================================
 # -- Node access --
 #==============================================================================
@@ -1242,6 +1399,18 @@ def newParentElementsPosition(value=None, parent=None):
 def getPath(t, node, pyCGNSLike=False):
   """Return the path of node."""
   if t is node: return ''
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None:
+      path = []; n = node
+      while n is not t:
+        e = getIndexedParent__(idx, n)
+        if e is None or e[0] is None: return None
+        path.append(n[0]); n = e[0]
+      path.append(t[0]); path.reverse()
+      spath = '/'.join(path)
+      if pyCGNSLike: spath = spath.replace('CGNSTree', '')
+      return spath
   path = ''; found = []
   getPath__(t, node, path, found)
   if len(found) == 0: return None
@@ -1270,6 +1439,10 @@ def getNodeFromPath(t, path):
   p = p.split('/')
   if p[0] == '.' or p[0] == t[0]: p = p[1:] # full path=normal mode
 
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None: return idx['paths'].get('/'.join(p), None)
+
   isStd = isStdNode(t)
   if isStd >= 0:
     for c in t[isStd:]:
@@ -1291,6 +1464,9 @@ def getNodeFromPath__(node, path):
 # On demarre le parcours a partir de node. Parcours complet de l'arbre.
 def getNodesFromType(t, ntype):
   """Return a list of nodes matching given type."""
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None: return idx['types'].get(ntype, [])[:]
   result = []
   isStd = isStdNode(t)
   if isStd >= 0:
@@ -1369,6 +1545,12 @@ def getByType(t, ntype, recursive=-1):
 # -- Retourne un seul noeud (no wildcard) - Fast
 def getNodeFromType(t, ntype):
   """Return the first matching node with given type."""
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None:
+      l = idx['types'].get(ntype, None)
+      if l is None: return None
+      return l[0]
   isStd = isStdNode(t)
   if isStd >= 0:
     for c in t[isStd:]:
@@ -1676,6 +1858,9 @@ def getBases(t):
 # Parcours tout l'arbre. Wildcards possibles.
 def getNodesFromName(t, name):
   """Return a list of nodes matching given name."""
+  if __TREEINDEX__ and not (('*' in name)|('?' in name)|('[' in name)):
+    idx = getTreeIndex__(t)
+    if idx is not None: return idx['names'].get(name, [])[:]
   result = []
   isStd = isStdNode(t)
   if isStd >= 0:
@@ -1764,6 +1949,12 @@ def getByName(t, name, recursive=-1):
 # -- Retourne un seul noeud (no wildcard) - Fast
 def getNodeFromName(t, name):
   """Return the first matching node with given name."""
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None:
+      l = idx['names'].get(name, None)
+      if l is None: return None
+      return l[0]
   isStd = isStdNode(t)
   if isStd >= 0:
     for c in t[isStd:]:
@@ -1839,6 +2030,10 @@ def getNodesFromValue__(node, value, result):
 # Parcours tout l'arbre. Wildcards possibles.
 def getNodesFromNameAndType(t, name, ntype):
   """Return a list of nodes matching given name and type."""
+  if __TREEINDEX__ and not (('*' in name)|('?' in name)|('[' in name) or ('*' in ntype)|('?' in ntype)|('[' in ntype)):
+    idx = getTreeIndex__(t)
+    if idx is not None:
+      return [n for n in idx['names'].get(name, []) if n[3] == ntype]
   result = []
   isStd = isStdNode(t)
   if isStd >= 0:
@@ -1863,6 +2058,12 @@ def getNodesFromNameAndType___(node, name, ntype, result):
 # -- Retourne un seul noeud (no wildcard) - Fast
 def getNodeFromNameAndType(t, name, ntype):
   """Return the first matching node with given name and type."""
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None:
+      for n in idx['names'].get(name, []):
+        if n[3] == ntype: return n
+      return None
   isStd = isStdNode(t)
   if isStd >= 0:
     for c in t[isStd:]:
@@ -1924,6 +2125,12 @@ def getChildrenFromType(node, ntype):
 # Remarque: start doit etre au dessus de node
 def getParentOfNode(t, node):
   """Return the parent of given node in t."""
+  if __TREEINDEX__:
+    idx = getTreeIndex__(t)
+    if idx is not None:
+      e = getIndexedParent__(idx, node)
+      if e is None or e[0] is None: return (None, 0)
+      return e
   idNode = id(node)
   isStd = isStdNode(t)
   if isStd >= 0:
@@ -2079,6 +2286,7 @@ def rmNode(t, node):
   if p is not None:
     if isStdNode(t) == 0 and id(p) == id(t): del p[c]
     else: del p[2][c]
+  if __TREEINDEX__: invalidateTreeIndex__(node)
   return None
 
 def _rmNode(t, node):
@@ -2086,6 +2294,7 @@ def _rmNode(t, node):
   if p is not None:
     if isStdNode(t) == 0 and id(p) == id(t): del p[c]
     else: del p[2][c]
+  if __TREEINDEX__: invalidateTreeIndex__(node)
   return None
 
 # -- rmNodeByPath
@@ -2109,6 +2318,7 @@ def _rmNodeByPath(t, path):
   if isStd >= 0:
     for c in t: rmNodeByPath__(c, p[1:])
   else: rmNodeByPath__(t, p)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 def rmNodeByPath__(t, path):
@@ -2135,6 +2345,7 @@ def _rmNodesByName(t, name):
   if isStd >= 0:
     for c in t: rmNodesByName__(c, name)
   else: rmNodesByName__(t, name)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromName = _rmNodesByName # alias
@@ -2150,6 +2361,7 @@ def _rmNodesByName1(t, name):
   children = list(range(len(t[2])-1,-1,-1))
   for ichild in children:
     if t[2][ichild][0] == name: t[2].pop(ichild)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromName1 = _rmNodesByName1 # alias
@@ -2163,6 +2375,7 @@ def _rmNodesByName2(t, name):
       children = list(range(len(n[2])-1,-1,-1))
       for ichild in children:
         if n[2][ichild][0] == name: n[2].pop(ichild)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromName2 = _rmNodesByName2 # alias
@@ -2181,6 +2394,7 @@ def _rmNodesByType(t, ntype):
   if isStd >= 0:
     for c in t: rmNodesByType__(c, ntype)
   else: rmNodesByType__(t, ntype)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromType = _rmNodesByType # alias
@@ -2196,6 +2410,7 @@ def _rmNodesByType1(t, ntype):
   children = list(range(len(t[2])-1,-1,-1))
   for ichild in children:
     if t[2][ichild][3] == ntype: t[2].pop(ichild)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromType1 = _rmNodesByType1 # alias
@@ -2209,6 +2424,7 @@ def _rmNodesByType2(t, ntype):
       children = list(range(len(n[2])-1,-1,-1))
       for ichild in children:
         if n[2][ichild][3] == ntype: n[2].pop(ichild)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromType2 = _rmNodesByType2 # alias
@@ -2227,6 +2443,7 @@ def _rmNodesByNameAndType(t, name, ntype):
   if isStd >= 0:
     for c in t: rmNodesByNameAndType__(c, name, ntype)
   else: rmNodesByNameAndType__(t, name, ntype)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 _rmNodesFromPathAndType = _rmNodesByNameAndType # alias
@@ -2260,6 +2477,7 @@ def _rmNodesByValue(t, value):
   if isStd >= 0:
     for c in t: rmNodesByValue__(c, value)
   else: rmNodesByValue__(t, value)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 def rmNodesByValue__(t, value):
@@ -2288,6 +2506,7 @@ def _moveNodeFromPaths(t, path1, path2):
     raise ValueError("moveNodeFromPaths: path %s doesnt exist."%path2)
   dest[2].append(child)
   parent[2].remove(child)
+  if __TREEINDEX__: invalidateTreeIndex__(t)
   return None
 
 def moveNodeFromPaths(t, path1, path2):
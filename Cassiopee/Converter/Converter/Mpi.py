@@ -5,6 +5,8 @@ from .Distributed import _readZones, _convert2PartialTree, _convert2SkeletonTree
 from . import PyTree as C
 from . import Internal
 from . import Distributed
+from . import Profiler
+from .Profiler import span
 
 if 'MPIRUN' in os.environ: # si MPIRUN=0, force sequentiel
     if int(os.environ['MPIRUN'])>0:
@@ -28,11 +30,15 @@ if 'MPIRUN' in os.environ: # si MPIRUN=0, force sequentiel
         def recv(source=0, tag=0): return None # pb here
         def sendRecv(a, source=0, dest=0): return []
         def sendRecvC(a, source=0, dest=0): return []
+        def setSendRecvMode(mode='barrier'): return None
         def reduce(a, op=None, root=0): return a
         def Reduce(a, b, op=None, root=0): return a
         def allreduce(a, op=None): return a
         def Allreduce(a, b, op=None): b[:] = a[:]; return None
         def seq(F, *args): F(*args)
+        def createSharedHook(t, function='None', globalHook=False, indir=0):
+            if globalHook: return C.createGlobalHook(t, function, indir)
+            else: return C.createHook(t, function)
         def convertFile2PyTree(fileName, format=None, proc=None): return C.convertFile2PyTree(fileName, format)
         def convertPyTree2File(t, fileName, format=None, links=[], ignoreProcNodes=False, merge=True): return C.convertPyTree2File(t, fileName, format, links)
         def addXZones(t, graph, variables=None, noCoordinates=False, cartesian=False, subr=True, keepOldNodes=True, zoneGC=True): return Internal.copyRef(t)
@@ -69,11 +75,15 @@ else: # try import (may fail - core or hang)
         def recv(source=0, tag=0): return None # pb here
         def sendRecv(a, source=0, dest=0): return []
         def sendRecvC(a, source=0, dest=0): return []
+        def setSendRecvMode(mode='barrier'): return None
         def reduce(a, op=None, root=0): return a
         def Reduce(a, b, op=None, root=0): return a
         def allreduce(a, op=None): return a
         def Allreduce(a, b, op=None): b[:] = a[:]; return None
         def seq(F, *args): F(*args)
+        def createSharedHook(t, function='None', globalHook=False, indir=0):
+            if globalHook: return C.createGlobalHook(t, function, indir)
+            else: return C.createHook(t, function)
         def convertFile2PyTree(fileName, format=None, proc=None): return C.convertFile2PyTree(fileName, format)
         def convertPyTree2File(t, fileName, format=None, links=[], ignoreProcNodes=False, merge=True): return C.convertPyTree2File(t, fileName, format, links)
         def addXZones(t, graph, variables=None, noCoordinates=False, cartesian=False, subr=True, keepOldNodes=True, zoneGC=True): return Internal.copyRef(t)
@@ -215,6 +225,7 @@ def isFinite(t, var=None):
 def trace(text=">>> IN XXX: ", cpu=True, mem=True, stdout=False, reset=False, fileName="stdout"):
     """Write a trace of cpu and memory in a file or to stdout for current node."""
     global PREVFULLTIME
+    Profiler.mark(text)
     msg = text
     if cpu:
         if PREVFULLTIME is None:
@@ -253,11 +264,7 @@ def trace(text=">>> IN XXX: ", cpu=True, mem=True, stdout=False, reset=False, fi
         print('%d: %s'%(rank, msg))
         sys.stdout.flush()
     else: # dans des fichiers par processes
-        fileName = fileName.split('.')
-        if '%' in fileName[0]: fileName[0] = fileName[0]%rank
-        else: fileName[0] += '%03d'%rank
-        if len(fileName) == 1: fileName[0] += '.out'
-        fileName = '.'.join(s for s in fileName)
+        fileName = getRankFileName__(fileName, '.out')
         if reset: f = open(fileName, "w")
         else: f = open(fileName, "a")
         f.write(msg)
@@ -265,6 +272,63 @@ def trace(text=">>> IN XXX: ", cpu=True, mem=True, stdout=False, reset=False, fi
         f.close()
     return None
 
+# Nom de fichier par process : ajoute le rank (%03d) si fileName n'a pas
+# de format et l'extension ext si fileName n'en a pas
+def getRankFileName__(fileName, ext):
+    fileName = fileName.split('.')
+    if '%' in fileName[0]: fileName[0] = fileName[0]%rank
+    else: fileName[0] += '%03d'%rank
+    if len(fileName) == 1: fileName[0] += ext
+    return '.'.join(s for s in fileName)
+
+#==============================================================================
+# Profilage par spans (cf Converter.Profiler)
+# with Cmpi.span('name'): ... ou @Cmpi.span('name')
+#==============================================================================
+# Fonctions de communication instrumentees si mpiWait=True
+__MPIWAITFUNCTIONS__ = ['barrier', 'bcast', 'Bcast', 'gather', 'Gather',
+                        'allgather', 'allgatherDict', 'allgatherTree',
+                        'allgatherZones', 'gatherZones', 'send', 'recv',
+                        'sendRecv', 'sendRecvC', 'reduce', 'Reduce',
+                        'allreduce', 'Allreduce']
+
+# Active le profilage sur ce process
+# si mem=True, echantillonne la RSS a chaque span
+# si events=True, garde les evenements pour une sortie chrome trace
+# si mpiWait=True, les fonctions de communication de Cmpi sont comptees
+# comme temps d'attente MPI (colonne mpi des spans parents)
+def profile(mem=True, events=False, mpiWait=False):
+    """Enable span profiling."""
+    Profiler.enable(mem=mem, events=events)
+    if mpiWait:
+        g = globals()
+        for name in __MPIWAITFUNCTIONS__:
+            F = g.get(name, None)
+            if F is None or hasattr(F, '__wrapped__'): continue
+            g[name] = Profiler.span('mpi.'+name, mpi=True)(F)
+    return None
+
+# Ecrit le profil de chaque process dans un fichier (cf trace pour le nom)
+# format='json' ou 'chrome'
+def writeProfile(fileName='profile.json', format='json'):
+    """Write span profile of each process."""
+    Profiler.write(getRankFileName__(fileName, '.json'), rank, format)
+    return None
+
+# Reduit les profils de tous les process (min/moyenne/max par span)
+# Si fileName, ecrit la reduction (json) sur le proc 0
+# Si stdout=True, l'affiche sur le proc 0
+def reduceProfile(fileName=None, stdout=True):
+    """Reduce span profiles over processes."""
+    import json
+    stats = allgather([Profiler.getStats()])
+    red = Profiler.reduceStats([s[0] for s in stats])
+    if rank == 0:
+        if stdout: Profiler.printStats(red); sys.stdout.flush()
+        if fileName is not None:
+            with open(fileName, 'w') as f: json.dump(red, f)
+    return red
+
 #==============================================================================
 # Construit un arbre de BBox a partir d'un arbre squelette charge
 # ou d'un arbre partiel
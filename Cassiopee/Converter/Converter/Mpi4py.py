@@ -9,6 +9,7 @@ from .Distributed import readZones, _readZones, convert2PartialTree, _convert2Pa
 
 __all__ = ['rank', 'size', 'KCOMM', 'COMM_WORLD', 'SUM', 'MIN', 'MAX', 'LAND',
            'setCommunicator', 'barrier', 'send', 'recv', 'sendRecv', 'sendRecvC',
+           'setSendRecvMode',
            'bcast', 'Bcast', 'gather', 'Gather',
            'reduce', 'Reduce', 'allreduce', 'Allreduce',
            'bcastZone', 'gatherZones', 'allgatherZones',
@@ -21,11 +22,12 @@ __all__ = ['rank', 'size', 'KCOMM', 'COMM_WORLD', 'SUM', 'MIN', 'MAX', 'LAND',
            'createBboxDict', 'computeGraph', 'addXZones',
            '_addXZones', '_addMXZones', '_addBXZones', '_addLXZones',
            'rmXZones', '_rmXZones', '_rmMXZones', '_rmBXZones', 'getProcDict',
-           'getProc', 'setProc', '_setProc', 'getPropertyDict', 'getProperty', 'COMM_WORLD']
+           'getProc', 'setProc', '_setProc', 'getPropertyDict', 'getProperty', 'COMM_WORLD',
+           'createSharedHook']
 
 from mpi4py import MPI
 import numpy
-import os
+import os, pickle
 
 COMM_WORLD = MPI.COMM_WORLD
 KCOMM = COMM_WORLD
@@ -50,6 +52,8 @@ def writeZones(t, fileName, format=None, proc=None, zoneNames=None, links=None):
 def setCommunicator(com):
     """Set MPI communicator to com."""
     global KCOMM, rank, size
+    freeDistGraphs__()
+    freeNodeComm__()
     KCOMM = com
     rank = KCOMM.rank
     size = KCOMM.size
@@ -118,15 +122,89 @@ def allreduce(data, op=MPI.SUM):
 def Allreduce(dataIn, dataOut, op=MPI.SUM):
     return KCOMM.Allreduce(dataIn, dataOut, op=op)
 
+#==============================================================================
+# Mode d'echange de sendRecv/sendRecvC
+# 'barrier': isend, barrier global puis recv ordonnes par rang
+# 'neighbor': isend puis recv des voisins du graphe dans l'ordre d'arrivee
+# 'collective': collectives de voisinage MPI-3 sur un communicateur
+# dist graph cache par graphe (sendRecv seulement)
+#==============================================================================
+__SENDRECVMODE__ = 'barrier'
+__DISTGRAPHS__ = {} # communicateurs dist graph par graphe
+__MAXDISTGRAPHS__ = 32
+
+def setSendRecvMode(mode='barrier'):
+    """Set the exchange mode of sendRecv."""
+    global __SENDRECVMODE__
+    if mode not in ['barrier', 'neighbor', 'collective']:
+        raise ValueError("setSendRecvMode: unknown mode %s."%str(mode))
+    __SENDRECVMODE__ = mode
+    return None
+
+# Retourne les procs sources et destinations de rank dans graph (tries)
+def getGraphNeighbors__(graph):
+    if rank in graph: dests = sorted(graph[rank].keys())
+    else: dests = []
+    sources = sorted([node for node in graph if rank in graph[node]])
+    return sources, dests
+
+# Retourne le communicateur dist graph associe a graph (collectif)
+# graph doit etre identique sur tous les procs
+def getDistGraphComm__(graph, sources, dests):
+    key = tuple([(p, tuple(sorted(graph[p].keys()))) for p in sorted(graph.keys())])
+    comm = __DISTGRAPHS__.get(key, None)
+    if comm is None:
+        if len(__DISTGRAPHS__) >= __MAXDISTGRAPHS__: freeDistGraphs__()
+        comm = KCOMM.Create_dist_graph_adjacent(sources, dests, reorder=False)
+        __DISTGRAPHS__[key] = comm
+    return comm
+
+# Libere les communicateurs dist graph (collectif)
+def freeDistGraphs__():
+    for comm in __DISTGRAPHS__.values(): comm.Free()
+    __DISTGRAPHS__.clear()
+    return None
+
+# Recoit un message de chaque proc de sources, dans l'ordre d'arrivee
+# Probe bloquant sur tous les procs (sans attente active). Si le premier
+# message en attente vient d'un proc hors de pending (echange suivant),
+# les messages restants sont recus dans l'ordre des sources.
+def recvInArrivalOrder__(sources, recvF):
+    rcvDatas = {}
+    pending = set(sources)
+    status = MPI.Status()
+    while pending:
+        KCOMM.Probe(source=MPI.ANY_SOURCE, tag=0, status=status)
+        node = status.Get_source()
+        if node not in pending: break
+        pending.discard(node)
+        rec = recvF(node)
+        if rec is not None: rcvDatas[node] = rec
+    for node in sorted(pending):
+        rec = recvF(node)
+        if rec is not None: rcvDatas[node] = rec
+    return rcvDatas
+
 #==============================================================================
 # Send and receive with a graph
 # IN: datas: un dictionnaire des donnees a envoyer par proc de destination
+# IN: mode: mode d'echange (si None, mode fixe par setSendRecvMode)
 # OUT: un dictionnaire des donnees recues par proc d'origine
 #==============================================================================
-def sendRecv(datas, graph):
+def sendRecv(datas, graph, mode=None):
     if graph == {}: return {}
-    reqs = []
+    if mode is None: mode = __SENDRECVMODE__
+
+    if mode == 'collective':
+        sources, dests = getGraphNeighbors__(graph)
+        comm = getDistGraphComm__(graph, sources, dests)
+        rcv = comm.neighbor_alltoall([datas.get(d, None) for d in dests])
+        rcvDatas = {}
+        for node, rec in zip(sources, rcv):
+            if rec is not None: rcvDatas[node] = rec
+        return rcvDatas
 
+    reqs = []
     if rank in graph:
         g = graph[rank] # graph du proc courant
         for oppNode in g:
@@ -135,6 +213,13 @@ def sendRecv(datas, graph):
             if oppNode in datas: s = KCOMM.isend(datas[oppNode], dest=oppNode)
             else: s = KCOMM.isend(None, dest=oppNode)
             reqs.append(s)
+
+    if mode == 'neighbor':
+        sources, dests = getGraphNeighbors__(graph)
+        rcvDatas = recvInArrivalOrder__(sources, lambda node: KCOMM.recv(source=node))
+        MPI.Request.waitall(reqs)
+        return rcvDatas
+
     barrier()
     rcvDatas={}
     for node in graph:
@@ -149,11 +234,14 @@ def sendRecv(datas, graph):
 #==============================================================================
 # Send and receive with a graph - C version - no pickle
 # IN: datas: un dictionnaire des donnees a envoyer par proc de destination
+# IN: mode: mode d'echange (si None, mode fixe par setSendRecvMode)
+# 'collective' se ramene a 'neighbor' (serialisation C)
 # OUT: un dictionnaire des donnees recues par proc d'origine
 # Attention: ne fonctionne que pour certaines datas (issues de transfer)
 #==============================================================================
-def sendRecvC(datas, graph):
+def sendRecvC(datas, graph, mode=None):
     if graph == {}: return {}
+    if mode is None: mode = __SENDRECVMODE__
     reqs = []
 
     if rank in graph:
@@ -166,6 +254,13 @@ def sendRecvC(datas, graph):
             else:
                 s = converter.iSend(None, oppNode, rank, KCOMM)
             reqs.append(s)
+
+    if mode == 'neighbor' or mode == 'collective':
+        sources, dests = getGraphNeighbors__(graph)
+        rcvDatas = recvInArrivalOrder__(sources, lambda node: converter.recv(node, rank, KCOMM))
+        a = converter.waitAll(reqs)
+        return rcvDatas
+
     barrier()
     rcvDatas={}
     for node in graph:
@@ -238,6 +333,71 @@ def intersect2(t, BBTree):
 #        if zone[0] not in dictIntersect: dictIntersect[zone[0]] = []
 #    return dictIntersect
 
+#==============================================================================
+# Serialisation zero copie des zones (pickle protocole 5)
+# Le squelette (noms, types, petites valeurs) est pickle dans un entete,
+# les numpys de plus de __OOBSIZE__ octets sont envoyes hors bande, tels
+# quels, en buffers MPI. A la reception, les numpys sont des vues sur les
+# buffers recus (pas de copie, ordre F conserve).
+#==============================================================================
+__OOBSIZE__ = 4096
+
+# OUT: (entete, liste des buffers hors bande)
+def dumps__(obj):
+    bufs = []
+    def callback(b):
+        m = b.raw()
+        if m.nbytes < __OOBSIZE__: return True # dans l'entete
+        bufs.append(m); return False
+    header = pickle.dumps(obj, protocol=5, buffer_callback=callback)
+    return (header, bufs)
+
+def loads__(header, bufs):
+    return pickle.loads(header, buffers=bufs)
+
+# isend de obj vers dest, retourne les requetes
+def isend__(obj, dest, tag=0):
+    (header, bufs) = dumps__(obj)
+    reqs = [KCOMM.isend((header, [b.nbytes for b in bufs]), dest=dest, tag=tag)]
+    for b in bufs: reqs.append(KCOMM.Isend([b, MPI.BYTE], dest=dest, tag=tag))
+    return reqs
+
+# recv d'un objet envoye par isend__
+def recv__(source, tag=0):
+    (header, sizes) = KCOMM.recv(source=source, tag=tag)
+    bufs = []
+    for n in sizes:
+        b = numpy.empty(n, dtype=numpy.uint8)
+        KCOMM.Recv([b, MPI.BYTE], source=source, tag=tag)
+        bufs.append(b)
+    return loads__(header, bufs)
+
+# bcast de obj depuis root
+def bcast__(obj, root=0):
+    if rank == root:
+        (header, bufs) = dumps__(obj)
+        info = (header, [b.nbytes for b in bufs])
+    else: info = None
+    (header, sizes) = KCOMM.bcast(info, root)
+    if rank != root: bufs = [numpy.empty(n, dtype=numpy.uint8) for n in sizes]
+    for b in bufs: KCOMM.Bcast([b, MPI.BYTE], root)
+    if rank == root: return obj
+    return loads__(header, bufs)
+
+# allgather de obj, retourne la liste des objets de chaque proc
+# L'objet du proc courant est une copie de obj (comme KCOMM.allgather)
+def allgather__(obj):
+    (header, bufs) = dumps__(obj)
+    infos = KCOMM.allgather((header, [b.nbytes for b in bufs]))
+    out = []
+    for i in range(size):
+        (h, sizes) = infos[i]
+        if i == rank: rbufs = [numpy.array(b, dtype=numpy.uint8) for b in bufs]
+        else: rbufs = [numpy.empty(n, dtype=numpy.uint8) for n in sizes]
+        for b in rbufs: KCOMM.Bcast([b, MPI.BYTE], i)
+        out.append(loads__(h, rbufs))
+    return out
+
 #==============================================================================
 # allGather dictionnaire (rejete les doublons de keys et values)
 #==============================================================================
@@ -284,7 +444,7 @@ def allgather(data):
 
 def allgatherTree(t):
     """Gather a distributed tree on all processors."""
-    d = KCOMM.allgather(t)
+    d = allgather__(t)
     return Internal.merge(d)
 
 #==============================================================================
@@ -318,73 +478,8 @@ def bcastTree(t, root=0):
 
 # data=zone
 # if variables == [] and coord == True, envoie uniquement les coords de z
+# La zone est envoyee sans ses ZoneSubRegion
 def bcastZone(z, root=0, coord=True, variables=[]):
-    # zp = squelette envoye en pickle
-    if rank == root:
-        zp = Internal.copyRef(z)
-        Internal._rmNodesFromType(zp, 'GridCoordinates_t')
-        Internal._rmNodesFromType(zp, 'FlowSolution_t')
-        Internal._rmNodesFromType(zp, 'ZoneSubRegion_t')
-    else: zp = None
-
-    zp = KCOMM.bcast((zp), root)
-
-    if coord:
-        if rank == root:
-            px = Internal.getNodeFromName2(z, 'CoordinateX')[1]
-            py = Internal.getNodeFromName2(z, 'CoordinateY')[1]
-            pz = Internal.getNodeFromName2(z, 'CoordinateZ')[1]
-            sx = px.shape; sy = py.shape; sz = pz.shape
-        else:
-            sx = None; sy = None; sz = None
-
-        sx, sy, sz = KCOMM.bcast((sx, sy, sz), root)
-
-        if rank != root:
-            px = numpy.empty(sx, dtype=numpy.float64, order='F')
-            py = numpy.empty(sy, dtype=numpy.float64, order='F')
-            pz = numpy.empty(sz, dtype=numpy.float64, order='F')
-
-        KCOMM.Bcast([px,MPI.DOUBLE], root)
-        KCOMM.Bcast([py,MPI.DOUBLE], root)
-        KCOMM.Bcast([pz,MPI.DOUBLE], root)
-
-        if rank != root:
-            # Reconstruction de la zone
-            Internal._createUniqueChild(zp, Internal.__GridCoordinates__, 'GridCoordinates_t')
-            n = Internal.getNodeFromName1(zp, Internal.__GridCoordinates__)
-            Internal._createUniqueChild(n, 'CoordinateX', 'DataArray_t', value=px)
-            Internal._createUniqueChild(n, 'CoordinateY', 'DataArray_t', value=py)
-            Internal._createUniqueChild(n, 'CoordinateZ', 'DataArray_t', value=pz)
-
-    for cpt, var in enumerate(variables):
-        loc = 'centers' if 'centers' in var else 'nodes'
-        var = var.replace('centers:','')
-
-        if rank == root:
-            pv = Internal.getNodeFromName2(z, var)[1]
-            sv = pv.shape
-        else:
-            sv = None
-
-        sv = KCOMM.bcast((sv), root)
-
-        if rank != root:
-            pv = numpy.empty(sv, dtype=numpy.float64, order='F')
-
-        KCOMM.Bcast([pv,MPI.DOUBLE], root)
-
-        if rank != root:
-            # Reconstruction de la zone
-            flowSol = Internal.__FlowSolutionNodes__ if loc == 'nodes' else Internal.__FlowSolutionCenters__
-            if cpt == 0:
-                Internal._createUniqueChild(zp, flowSol, 'FlowSolution_t')
-                n = Internal.getNodeFromName1(zp, flowSol)
-                if loc == 'centers': Internal._createUniqueChild(n, 'GridLocation', 'GridLocation_t', 'CellCenter')
-            else:
-                n = Internal.getNodeFromName1(zp, flowSol)
-            Internal._createUniqueChild(n, var, 'DataArray_t', value=pv)
-
     if rank == root:
         zp = Internal.copyRef(z)
         # suppression coord si coord=False et des autres champs
@@ -395,7 +490,13 @@ def bcastZone(z, root=0, coord=True, variables=[]):
             for var in varszp:
                 if var not in variables:
                     Internal._rmNodesFromName(zp, var.replace('centers:',''))
-    return zp
+        zs = Internal.rmNodesFromType(zp, 'ZoneSubRegion_t')
+    else: zs = None
+
+    zs = bcast__(zs, root)
+
+    if rank == root: return zp
+    return zs
 
 # All gather une liste de zones, recuperation identique sur tous les procs
 # dans une liste a plat
@@ -555,6 +656,50 @@ def printA(A):
     def fprint(A): print(A)
     seq(fprint, A)
 
+#==============================================================================
+# Hook partage par les procs d'un meme noeud
+# Le hook est construit une seule fois par noeud (par le premier proc du
+# noeud), ecrit en memoire partagee puis mappe par les autres procs.
+# IN: t: zones du hook (seules celles du premier proc du noeud sont utilisees)
+# IN: function: cf createHook/createGlobalHook
+# IN: globalHook: si True, cree un hook global (createGlobalHook)
+# IN: indir: cf createGlobalHook
+# Collectif sur KCOMM.
+#==============================================================================
+__NODECOMM__ = None # communicateur des procs du noeud
+__SHAREDHOOKNO__ = 0
+
+def getNodeComm__():
+    global __NODECOMM__
+    if __NODECOMM__ is None:
+        __NODECOMM__ = KCOMM.Split_type(MPI.COMM_TYPE_SHARED, key=rank)
+    return __NODECOMM__
+
+def freeNodeComm__():
+    global __NODECOMM__
+    if __NODECOMM__ is not None: __NODECOMM__.Free()
+    __NODECOMM__ = None
+    return None
+
+def createSharedHook(t, function='None', globalHook=False, indir=0):
+    """Create a hook once per node and share it between node processes.
+    Usage: hook = createSharedHook(t, function, globalHook, indir)"""
+    global __SHAREDHOOKNO__
+    comm = getNodeComm__()
+    name = None; hook = None
+    if comm.rank == 0:
+        if globalHook: hook = C.createGlobalHook(t, function, indir)
+        else: hook = C.createHook(t, function)
+        name = '%d_%d'%(os.getpid(), __SHAREDHOOKNO__)
+        fileName = C.shareHook(hook, name)
+    __SHAREDHOOKNO__ += 1
+    name = comm.bcast(name, root=0)
+    if comm.rank > 0: hook = C.loadSharedHook(name)
+    # le fichier peut etre supprime une fois mappe par tous
+    comm.barrier()
+    if comm.rank == 0: os.remove(fileName)
+    return hook
+
 #==============================================================================
 # Calcule le dictionnaire des bbox de l'arbre complet
 # Utile pour addXZones optimises
@@ -587,11 +732,16 @@ def createBboxDict(t):
 # computeGraph dans Distributed.py pour plus de details.
 #==============================================================================
 def computeGraph(t, type='bbox', t2=None, procDict=None, reduction=True,
-                 intersectionsDict=None, exploc=False, procDict2=None, it=0):
+                 intersectionsDict=None, exploc=False, procDict2=None, it=0,
+                 split=False):
     """Return the communication graph for different block relation types."""
     if not procDict: procDict = getProcDict(t)
+    # split: les zones sont reparties entre procs pour les types bbox
+    if split and type in ['bbox', 'bbox2', 'bbox3']: nranks = size; reduction = True
+    else: nranks = 1
     graph = Distributed.computeGraph(t, type, t2, procDict, rank,
-                                     intersectionsDict, exploc, procDict2, it)
+                                     intersectionsDict, exploc, procDict2, it,
+                                     size=nranks)
 
     if reduction:
         # Assure que le graph est le meme pour tous les processeurs
@@ -599,11 +749,12 @@ def computeGraph(t, type='bbox', t2=None, procDict=None, reduction=True,
         graph = {}
         for i in g:
             for k in i:
-                if not k in graph: graph[k] = {}
+                if k not in graph: graph[k] = {}
                 for j in i[k]:
-                    if not j in graph[k]: graph[k][j] = []
-                    graph[k][j] += i[k][j]
-                    graph[k][j] = sorted(list(set(graph[k][j])))
+                    if j not in graph[k]: graph[k][j] = set(i[k][j])
+                    else: graph[k][j].update(i[k][j])
+        for k in graph:
+            for j in graph[k]: graph[k][j] = sorted(graph[k][j])
 
     return graph
 
@@ -674,15 +825,14 @@ def _addXZones(t, graph, variables=None, noCoordinates=False,
                     if cartesian: Compressor._compressCartesian(zonep)
                 if base is not None: zonep[0] = base[0]+'/'+zone[0]
                 data.append(zonep)
-            s = KCOMM.isend(data, dest=oppNode)
-            reqs.append(s)
+            reqs += isend__(data, dest=oppNode)
 
     # Reception
     for node in graph:
         #print(rank, graph[node].keys())
         if rank in graph[node]:
             #print('%d: On doit recevoir de %d: %s'%(rank,node,graph[node][rank]))
-            data = KCOMM.recv(source=node)
+            data = recv__(source=node)
             for z in data: # data est une liste de zones
                 if cartesian:
                     import Compressor.PyTree as Compressor
@@ -772,15 +922,14 @@ def _addLXZones(t, graph, variables=None, cartesian=False, interDict=[], bboxDic
                                 Compressor._compressCartesian(zonep, bbox=bbox, layers=layers)
                                 data.append(zonep)
                     else: data.append(zone)
-            s = KCOMM.isend(data, dest=oppNode)
-            reqs.append(s)
+            reqs += isend__(data, dest=oppNode)
 
     # Reception
     for node in graph:
         #print(rank, graph[node].keys())
         if rank in graph[node]:
             #print('%d: On doit recevoir de %d: %s'%(rank,node,graph[node][rank]))
-            data = KCOMM.recv(source=node)
+            data = recv__(source=node)
             for z in data: # data est une liste de zones
                 if cartesian:
                     import Compressor.PyTree as Compressor
@@ -1035,11 +1184,10 @@ def _addMXZones(a, depth=2, variables=None, noCoordinates=False, keepOldNodes=Tr
                         C._rmVars(zs, v)
                     for zl in zs: zl[0] = b[0]+'/'+zl[0]
                     data += zs
-            s = KCOMM.isend(data, dest=oppNode)
-            reqs.append(s)
+            reqs += isend__(data, dest=oppNode)
     for node in graph:
         if rank in graph[node]:
-            data = KCOMM.recv(source=node)
+            data = recv__(source=node)
             for d in data:
                 (baseName, zoneName) = d[0].split('/',1)
                 d[0] = zoneName
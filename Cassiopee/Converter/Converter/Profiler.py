@@ -0,0 +1,269 @@
+# Profileur par spans imbriques
+# Un span mesure le temps (et la memoire) d'un bloc de code. Les spans
+# sont imbriques et agreges par chemin ('prepare/blanking/dist2walls').
+# Desactive, un span ne coute qu'un test ; active, deux lectures d'horloge
+# et une lecture de /proc/self/statm (si mem=True).
+# Sorties : stats JSON par rank, trace chrome (chrome://tracing, perfetto),
+# reduction min/moyenne/max sur les ranks (reduceStats ou en ligne de
+# commande : python -m Converter.Profiler profile*.json).
+import os, sys, time, json, functools
+
+__ENABLED__ = False
+# echantillonne la RSS en entree/sortie de span
+__MEM__ = True
+# garde les evenements pour la trace chrome
+__EVENTS__ = False
+__MAXEVENTS__ = 1000000
+# spans ouverts : [path, t0, rss0, mpi, isMpi]
+__STACK__ = []
+# path -> [count, total, min, max, mpi, rssMax, rssDelta]
+__STATS__ = {}
+__EVENTLIST__ = []
+__T0__ = time.perf_counter()
+try: __PAGESIZE__ = os.sysconf('SC_PAGE_SIZE')
+except: __PAGESIZE__ = 4096
+
+#==============================================================================
+# Memoire
+#==============================================================================
+# RSS courante en octets (0 si non disponible)
+# /proc/self/statm reste ouvert (une lecture par echantillon),
+# il est rouvert apres un fork
+__STATM__ = None
+__STATMPID__ = -1
+def getRss():
+    """Return current resident set size in bytes."""
+    global __STATM__, __STATMPID__
+    try:
+        pid = os.getpid()
+        if pid != __STATMPID__:
+            if __STATM__ is not None: os.close(__STATM__)
+            __STATM__ = os.open('/proc/self/statm', os.O_RDONLY); __STATMPID__ = pid
+        s = os.pread(__STATM__, 128, 0).split()
+        return int(s[1])*__PAGESIZE__
+    except: return 0
+
+# Pic de RSS en octets
+def getPeakRss():
+    """Return peak resident set size in bytes."""
+    try:
+        import resource
+        r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin': return r
+        return r*1024
+    except: return 0
+
+#==============================================================================
+# Activation
+#==============================================================================
+def enable(mem=True, events=False, maxEvents=1000000):
+    """Enable profiling."""
+    global __ENABLED__, __MEM__, __EVENTS__, __MAXEVENTS__
+    __ENABLED__ = True; __MEM__ = mem
+    __EVENTS__ = events; __MAXEVENTS__ = maxEvents
+    return None
+
+def disable():
+    """Disable profiling."""
+    global __ENABLED__
+    __ENABLED__ = False
+    return None
+
+def isEnabled():
+    """Return True if profiling is enabled."""
+    return __ENABLED__
+
+def reset():
+    """Reset all profiling data."""
+    global __T0__
+    __STACK__[:] = []
+    __STATS__.clear()
+    __EVENTLIST__[:] = []
+    __T0__ = time.perf_counter()
+    return None
+
+#==============================================================================
+# Spans
+#==============================================================================
+def push__(name, isMpi):
+    if __STACK__: path = __STACK__[-1][0]+'/'+name
+    else: path = name
+    if __MEM__: rss = getRss()
+    else: rss = 0
+    __STACK__.append([path, time.perf_counter(), rss, 0., isMpi])
+    return None
+
+def pop__():
+    t1 = time.perf_counter()
+    (path, t0, rss0, mpi, isMpi) = __STACK__.pop()
+    dt = t1-t0
+    if isMpi: mpi = dt
+    # le temps mpi remonte aux spans parents
+    if __STACK__: __STACK__[-1][3] += mpi
+    if __MEM__: rss = getRss()
+    else: rss = 0
+    st = __STATS__.get(path, None)
+    if st is None:
+        __STATS__[path] = [1, dt, dt, dt, mpi, max(rss0,rss), rss-rss0]
+    else:
+        st[0] += 1; st[1] += dt
+        if dt < st[2]: st[2] = dt
+        if dt > st[3]: st[3] = dt
+        st[4] += mpi
+        if rss > st[5]: st[5] = rss
+        st[6] += rss-rss0
+    if __EVENTS__ and len(__EVENTLIST__) < __MAXEVENTS__:
+        __EVENTLIST__.append((path, t0-__T0__, dt, rss, isMpi))
+    return None
+
+class Span:
+    """Timed span (context manager or decorator)."""
+    __slots__ = ('name', 'mpi', 'on')
+    def __init__(self, name, mpi=False):
+        self.name = name
+        self.mpi = mpi
+        # une entree par with ouvert (le meme span peut etre reentrant)
+        self.on = []
+
+    def __enter__(self):
+        on = __ENABLED__
+        self.on.append(on)
+        if on: push__(self.name, self.mpi)
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if self.on.pop(): pop__()
+        return False
+
+    def __call__(self, F):
+        name = self.name; isMpi = self.mpi
+        @functools.wraps(F)
+        def wrapper(*args, **kwargs):
+            if not __ENABLED__: return F(*args, **kwargs)
+            push__(name, isMpi)
+            try: return F(*args, **kwargs)
+            finally: pop__()
+        return wrapper
+
+# Retourne un span
+# IN: name: nom du span
+# IN: mpi: si True, le temps du span est compte comme temps d'attente MPI
+def span(name, mpi=False):
+    """Return a profiling span usable as context manager or decorator."""
+    return Span(name, mpi)
+
+# Evenement instantane (trace chrome)
+def mark(name):
+    """Record an instant event."""
+    if __ENABLED__ and __EVENTS__ and len(__EVENTLIST__) < __MAXEVENTS__:
+        if __MEM__: rss = getRss()
+        else: rss = 0
+        __EVENTLIST__.append((name, time.perf_counter()-__T0__, -1., rss, False))
+    return None
+
+#==============================================================================
+# Sorties
+#==============================================================================
+# Retourne les stats par chemin de span
+def getStats():
+    """Return profiling statistics of spans."""
+    spans = {}
+    for path in __STATS__:
+        st = __STATS__[path]
+        spans[path] = {'count':st[0], 'total':st[1], 'min':st[2], 'max':st[3],
+                       'mpi':st[4], 'rss':st[5], 'rssDelta':st[6]}
+    return {'spans':spans, 'peakRss':getPeakRss(), 'rss':getRss()}
+
+# Evenements au format chrome trace
+def getChromeTrace(rank=0):
+    """Return spans as a chrome trace dictionary."""
+    events = []
+    for (path, t0, dt, rss, isMpi) in __EVENTLIST__:
+        name = path.rsplit('/', 1)[-1]
+        if dt < 0.:
+            events.append({'name':name, 'ph':'i', 's':'t', 'ts':t0*1.e6,
+                           'pid':rank, 'tid':0})
+        else:
+            if isMpi: cat = 'mpi'
+            else: cat = 'span'
+            events.append({'name':name, 'cat':cat, 'ph':'X', 'ts':t0*1.e6,
+                           'dur':dt*1.e6, 'pid':rank, 'tid':0,
+                           'args':{'path':path, 'rss':rss}})
+        if __MEM__ and rss > 0:
+            events.append({'name':'rss', 'ph':'C', 'ts':(t0+max(dt,0.))*1.e6,
+                           'pid':rank, 'args':{'rss':rss}})
+    return {'traceEvents':events, 'displayTimeUnit':'ms'}
+
+# Ecrit le profil
+# format='json': stats par span, format='chrome': trace chrome
+def write(fileName, rank=0, format='json'):
+    """Write profiling data to file."""
+    if format == 'chrome': data = getChromeTrace(rank)
+    else: data = getStats(); data['rank'] = rank
+    with open(fileName, 'w') as f: json.dump(data, f)
+    return None
+
+#==============================================================================
+# Reduction sur les ranks
+# IN: stats: liste de stats (getStats) de chaque rank
+# OUT: path -> {'ranks':n, 'count':(min,mean,max), 'total':(min,mean,max),
+# 'mpi':(min,mean,max), 'rss':(min,mean,max)}
+#==============================================================================
+def reduceStats(stats):
+    """Reduce statistics of several ranks."""
+    out = {}
+    for s in stats:
+        for path in s['spans']:
+            st = s['spans'][path]
+            r = out.get(path, None)
+            if r is None:
+                r = {'ranks':0}
+                for k in ['count','total','mpi','rss']: r[k] = [st[k], 0., st[k]]
+                out[path] = r
+            r['ranks'] += 1
+            for k in ['count','total','mpi','rss']:
+                v = st[k]; a = r[k]
+                if v < a[0]: a[0] = v
+                a[1] += v
+                if v > a[2]: a[2] = v
+    for path in out:
+        r = out[path]; n = r['ranks']
+        for k in ['count','total','mpi','rss']:
+            r[k][1] = r[k][1]/n; r[k] = tuple(r[k])
+    return out
+
+def reduceFiles(fileNames):
+    """Reduce statistics stored in json files."""
+    stats = []
+    for fileName in fileNames:
+        with open(fileName, 'r') as f: stats.append(json.load(f))
+    return reduceStats(stats)
+
+# Affiche une reduction (spans dans l'ordre des chemins)
+def printStats(red, file=None):
+    """Print reduced statistics."""
+    if file is None: file = sys.stdout
+    file.write('%-50s %6s %10s %10s %10s %10s %10s\n'%('span', 'ranks', 'count', 'min(s)', 'mean(s)', 'max(s)', 'mpi(s)'))
+    for path in sorted(red):
+        r = red[path]
+        name = '  '*path.count('/')+path.rsplit('/', 1)[-1]
+        file.write('%-50s %6d %10g %10g %10g %10g %10g\n'%(name, r['ranks'], r['count'][2],
+                                                          r['total'][0], r['total'][1], r['total'][2], r['mpi'][1]))
+    return None
+
+def main__():
+    import argparse
+    parser = argparse.ArgumentParser(description='Reduce Cassiopee profiles over ranks.')
+    parser.add_argument('files', nargs='+', help='json profile files (one per rank)')
+    parser.add_argument('-o', '--output', default=None, help='write reduction to this json file')
+    args = parser.parse_args()
+    red = reduceFiles(args.files)
+    printStats(red)
+    if args.output is not None:
+        with open(args.output, 'w') as f: json.dump(red, f)
+    return None
+
+# Activation par l'environnement : CASSIOPEE_PROFILE=1
+if os.getenv('CASSIOPEE_PROFILE', '0') not in ['0', '']: enable()
+
+if __name__ == '__main__': main__()
@@ -936,25 +936,108 @@ def _rmNodes(z, name):
     return None
 
 # Upgrade tree (applique apres lecture)
-def _upgradeTree(t, uncompress=True, oldcompress=False):
-    #Internal._adaptTypes(t)
-    _relaxCGNSProfile__(t)
-    Internal._correctPyTree(t, level=10) # force CGNS names
-    Internal._correctPyTree(t, level=2) # force unique name
-    Internal._correctPyTree(t, level=7) # create familyNames
-    registerAllNames(t)
+def _upgradeTree(t, uncompress=True, oldcompress=False, normalize=True):
+    """Normalize a tree read from a file in a single traversal.
+    Fix CGNS variable names, make base names unique, create missing families,
+    register names and uncompress compressed data.
+    If normalize=False, the tree is supposed clean: only name registration
+    and uncompression are performed."""
+    Compressor = None
     if uncompress:
+        try: import Compressor.PyTree as Compressor
+        except: pass
+    relax = (Internal.E_NpyInt != numpy.int32)
+    baseServer = {}
+    for b in Internal.getBases(t):
+        # Rend le nom de base unique (correctPyTree level 2)
+        if normalize: b[0] = getUniqueNodeName__(b[0], baseServer)
+        __BaseNameServer__[b[0]] = 0
+
+        zoneFamilies = []; bcFamilies = []
+        for z in Internal.getNodesFromType1(b, 'Zone_t'):
+            __ZoneNameServer__[z[0]] = 0
+            cartesian = []
+            for n in z[2]:
+                ntype = n[3]
+                if ntype == 'FlowSolution_t':
+                    for d in n[2]:
+                        if d[3] != 'DataArray_t': continue
+                        # Nom de variable CGNS (correctPyTree level 10)
+                        if normalize: d[0] = Internal.getCGNSName(d[0])
+                        if Compressor is not None and not oldcompress: unpackNode__(Compressor, d)
+                elif ntype == 'GridCoordinates_t':
+                    if n[0] == 'GridCoordinates#Init' or n[0] == Internal.__GridCoordinates__:
+                        if Internal.getNodeFromName1(n, 'CartesianData') is not None: cartesian.append(n)
+                elif ntype == 'ZoneBC_t':
+                    for bc in n[2]:
+                        if bc[3] != 'BC_t': continue
+                        __BCNameServer__[bc[0]] = 0
+                        if normalize:
+                            for d in Internal.getBCDataSet(z, bc): d[0] = Internal.getCGNSName(d[0])
+                            f = Internal.getNodeFromType1(bc, 'FamilyName_t')
+                            if f is not None: bcFamilies.append(Internal.getValue(f))
+                elif ntype == 'ZoneGridConnectivity_t':
+                    for gc in n[2]:
+                        if gc[3] == 'GridConnectivity1to1_t' or gc[3] == 'GridConnectivity_t':
+                            __BCNameServer__[gc[0]] = 0
+                elif ntype == 'FamilyName_t' or ntype == 'AdditionalFamilyName_t':
+                    if normalize: zoneFamilies.append(Internal.getValue(n))
+                elif ntype == 'Rind_t':
+                    if relax: Internal._adaptValueType([n], Internal.E_NpyInt)
+            if Compressor is not None and not oldcompress:
+                # Reconstruit les coordonnees cartesiennes (modifie z[2])
+                if cartesian:
+                    ztype = Internal.getZoneDim(z)
+                    if ztype[0] != 'Unstructured':
+                        for n in cartesian:
+                            try: Compressor._uncompressCartesian__(z, ztype, n)
+                            except: pass # laisse compresse
+                for n in z[2]:
+                    if n[3] == 'GridCoordinates_t':
+                        for d in n[2]:
+                            if d[3] == 'DataArray_t': unpackNode__(Compressor, d)
+                    elif n[3] == 'Elements_t':
+                        cn = Internal.getNodeFromName1(n, 'ElementConnectivity')
+                        if cn is not None: unpackNode__(Compressor, cn)
+
+        # Cree les familles manquantes (correctPyTree level 7)
+        if zoneFamilies:
+            for name in zoneFamilies:
+                ref = Internal.getNodeFromName1(b, name)
+                if ref is None or ref[3] != 'Family_t': _addFamily2Base(b, name)
+        if bcFamilies:
+            for name in bcFamilies:
+                refs = [r for r in Internal.getNodesFromName1(b, name) if r[3] == 'Family_t']
+                if refs == []: _addFamily2Base(b, name, bndType='UserDefined')
+
+    if Compressor is not None and oldcompress:
         try:
-            import Compressor.PyTree as Compressor
-            if oldcompress:
-                Compressor._uncompressCartesian_old(t)
-                Compressor._uncompressAll_old(t)
-            else:
-                Compressor._uncompressCartesian(t)
-                Compressor._uncompressAll(t)
+            Compressor._uncompressCartesian_old(t)
+            Compressor._uncompressAll_old(t)
         except: pass
     return None
 
+# Decompresse node ; un noeud corrompu ou de codec non disponible reste
+# compresse
+def unpackNode__(Compressor, node):
+    try: Compressor._unpackNode(node)
+    except: pass
+    return None
+
+# Retourne un nom unique pour name dans server (comme Check._correctNames)
+def getUniqueNodeName__(name, server):
+    if name not in server:
+        server[name] = 0
+        return name
+    c = server[name]
+    while True:
+        name2 = '%s.%d'%(name,c)
+        c += 1
+        if name2 not in server: break
+    server[name2] = 0
+    server[name] = c
+    return name2
+
 # Hack pour les arrays en centres avec sentinelle - 1.79769e+308
 # copie sur les champs - plus utilise depuis que l'on sort directement
 # les champs en centres
@@ -997,7 +1080,7 @@ def convertFile2PyTree(fileName, format=None, nptsCurve=20, nptsLine=2,
                        density=-1., skeletonData=None, dataShape=None,
                        links=None, skipTypes=None, uncompress=True,
                        hmax=0.0, hausd=1., grow=0.0, mergeTol=-1, occAlgo=4,
-                       oldcompress=False, readMode=0, api=1):
+                       oldcompress=False, readMode=0, api=1, normalize=True):
     """Read a file and return a pyTree containing file data.
     Usage: convertFile2PyTree(fileName, format, options)"""
     if format is None:
@@ -1013,7 +1096,7 @@ def convertFile2PyTree(fileName, format=None, nptsCurve=20, nptsLine=2,
         try:
             t = Converter.converter.convertFile2PyTree(fileName, format, skeletonData, dataShape, links, skipTypes, readMode)
             t = Internal.createRootNode(children=t[2])
-            _upgradeTree(t, uncompress, oldcompress)
+            _upgradeTree(t, uncompress, oldcompress, normalize)
             CAD = Internal.getNodeFromName1(t, 'CAD')
             if CAD is not None: # reload CAD
                 file = Internal.getNodeFromName1(CAD, 'file')
@@ -1031,14 +1114,14 @@ def convertFile2PyTree(fileName, format=None, nptsCurve=20, nptsLine=2,
                 try:
                     t = Converter.converter.convertFile2PyTree(fileName, 'bin_hdf', skeletonData, dataShape, links, skipTypes, readMode)
                     t = Internal.createRootNode(children=t[2])
-                    _upgradeTree(t, uncompress, oldcompress)
+                    _upgradeTree(t, uncompress, oldcompress, normalize)
                     return t
                 except: pass
             else: # adf par defaut
                 try:
                     t = Converter.converter.convertFile2PyTree(fileName, 'bin_adf', skeletonData, dataShape, links, skipTypes, readMode)
                     t = Internal.createRootNode(children=t[2])
-                    _upgradeTree(t)
+                    _upgradeTree(t, uncompress, oldcompress, normalize)
                     return t
                 except: pass
     elif format == 'unknown':
@@ -1194,16 +1277,6 @@ def _forceCGNSProfile__(t):
         Internal._adaptValueType(nodes, numpy.int32)
     return None
 
-# Relax type of specific nodes as prescribed by v4 CGNS norm
-def _relaxCGNSProfile__(t):
-    if Internal.E_NpyInt == numpy.int32: return None
-    # Rind_t cannot be forced to I4 internally
-    zones = Internal.getZones(t)
-    for z in zones:
-        nodes = Internal.getNodesFromType1(z, "Rind_t")
-        Internal._adaptValueType(nodes, Internal.E_NpyInt)
-    return None
-
 # -- convertPyTree2File
 def convertPyTree2File(t, fileName, format=None, isize=4, rsize=8,
                        endian='big', colormap=0, dataFormat='%.9e ', links=[]):
@@ -7171,6 +7244,30 @@ def freeHook(hook):
     Usage: freeHook(hook)"""
     Converter.freeHook(hook)
 
+# -- saveHook: sauvegarde un hook dans un fichier binaire
+def saveHook(hook, fileName):
+    """Save a hook to a flat binary file.
+    Usage: saveHook(hook, fileName)"""
+    Converter.saveHook(hook, fileName)
+
+# -- loadHook: recharge un hook (fichier mappe par defaut)
+def loadHook(fileName, mmap=True):
+    """Load a hook saved by saveHook.
+    Usage: hook = loadHook(fileName, mmap)"""
+    return Converter.loadHook(fileName, mmap)
+
+# -- shareHook: ecrit un hook en memoire partagee
+def shareHook(hook, name):
+    """Write hook in shared memory to be loaded by other processes.
+    Usage: fileName = shareHook(hook, name)"""
+    return Converter.shareHook(hook, name)
+
+# -- loadSharedHook: recupere un hook partage par shareHook
+def loadSharedHook(name, remove=False):
+    """Load a hook shared by shareHook.
+    Usage: hook = loadSharedHook(name, remove)"""
+    return Converter.loadSharedHook(name, remove)
+
 #==============================================================================
 # -- Fonctions d'identification geometrique --
 #==============================================================================
@@ -124,6 +124,8 @@ static PyMethodDef Pyconverter [] =
   {"registerAllNodes", K_CONVERTER::registerAllNodes, METH_VARARGS},
   {"registerAllElements", K_CONVERTER::registerAllElements, METH_VARARGS},
   {"freeHook", K_CONVERTER::freeHook, METH_VARARGS},
+  {"getHookData", K_CONVERTER::getHookData, METH_VARARGS},
+  {"setHookData", K_CONVERTER::setHookData, METH_VARARGS},
   {"identifyElements", K_CONVERTER::identifyElements, METH_VARARGS},
   {"identifyFaces", K_CONVERTER::identifyFaces, METH_VARARGS},
   {"identifyNodes", K_CONVERTER::identifyNodes, METH_VARARGS},
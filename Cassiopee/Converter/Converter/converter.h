@@ -135,6 +135,9 @@ namespace K_CONVERTER
   PyObject* registerAllElements(PyObject* self, PyObject* args);
   // free hook
   PyObject* freeHook(PyObject* self, PyObject* args);
+  // hook serialization
+  PyObject* getHookData(PyObject* self, PyObject* args);
+  PyObject* setHookData(PyObject* self, PyObject* args);
   // identification
   PyObject* identifyElements(PyObject* self, PyObject* args);
   PyObject* identifyFaces(PyObject* self, PyObject* args);
@@ -1073,6 +1073,12 @@ PyObject* K_CONVERTER::freeHook(PyObject* self, PyObject* args)
 
   delete [] typep;
   delete [] packet;
+#if (PY_MAJOR_VERSION == 2 && PY_MINOR_VERSION < 7) || (PY_MAJOR_VERSION == 3 && PY_MINOR_VERSION < 1)
+#else
+  // numpys partages par un hook recharge (cf setHookData)
+  PyObject* owner = (PyObject*)PyCapsule_GetContext(hook);
+  if (owner != NULL) { PyCapsule_SetContext(hook, NULL); Py_DECREF(owner); }
+#endif
   Py_INCREF(Py_None);
   return Py_None;
 }
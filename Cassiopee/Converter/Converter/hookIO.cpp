@@ -0,0 +1,285 @@
+/*
+    Copyright 2013-2025 Onera.
+
+    This file is part of Cassiopee.
+
+    Cassiopee is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Cassiopee is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Cassiopee.  If not, see <http://www.gnu.org/licenses/>.
+*/
+
+// Serialisation des hooks (KdTree et ADT) en tableaux a plat
+
+# include "converter.h"
+
+using namespace K_FLD;
+using namespace std;
+
+// Nbre de parametres flottants d'un ADT
+#define NADTPARAMS 15
+
+// ============================================================================
+/* Retourne les donnees a plat d'un hook
+   IN: hook: hook de type 0,2,3,100,102,103 (KdTree) ou 1 (ADT)
+   OUT: [type, [(ints, floats), ...]]
+   KdTree: une seule partie
+     ints: [npts, nnodes, tree(3*nnodes)]
+     floats: [tol, x(npts), y(npts), z(npts)]
+   ADT: une partie par zone
+     ints: [topology, cylCoord, nnodes, npts, ind, left, right (nnodes)]
+     floats: [xmin,ymin,zmin,xmax,ymax,zmax, center(3), axis(3),
+              thetaMin, thetaMax, thetaShift, bb(6*nnodes),
+              xlc,ylc,zlc (npts, si cylCoord)] */
+// ============================================================================
+PyObject* K_CONVERTER::getHookData(PyObject* self, PyObject* args)
+{
+  PyObject* hook;
+  if (!PyArg_ParseTuple(args, "O", &hook)) return NULL;
+
+  // recupere le hook
+  void** packet = NULL;
+#if (PY_MAJOR_VERSION == 2 && PY_MINOR_VERSION < 7) || (PY_MAJOR_VERSION == 3 && PY_MINOR_VERSION < 1)
+  packet = (void**) PyCObject_AsVoidPtr(hook);
+#else
+  packet = (void**) PyCapsule_GetPointer(hook, NULL);
+#endif
+  E_Int* typep = (E_Int*)packet[0]; // type of hook
+  E_Int type = *typep;
+
+  PyObject* parts = PyList_New(0);
+  switch (type)
+  {
+    case 0:
+    case 2:
+    case 3:
+    case 100:
+    case 102:
+    case 103:
+    {
+      FldArrayF* pt = (FldArrayF*)packet[1];
+      K_SEARCH::KdTree<FldArrayF>* globalKdt =
+        (K_SEARCH::KdTree<FldArrayF>*) packet[3];
+      E_Int npts = pt->getSize();
+      E_Int nnodes = globalKdt->nb_nodes();
+      const K_FLD::IntArray& tree = globalKdt->tree();
+
+      PyObject* ints = K_NUMPY::buildNumpyArray(2+3*nnodes, 1, 1);
+      E_Int* pi = K_NUMPY::getNumpyPtrI(ints);
+      pi[0] = npts; pi[1] = nnodes;
+      for (E_Int i = 0; i < nnodes; i++)
+      {
+        pi[2+3*i] = tree(0,i); pi[3+3*i] = tree(1,i); pi[4+3*i] = tree(2,i);
+      }
+      PyObject* floats = K_NUMPY::buildNumpyArray(1+3*npts, 1, 0);
+      E_Float* pf = K_NUMPY::getNumpyPtrF(floats);
+      pf[0] = globalKdt->tolerance();
+      for (E_Int n = 1; n <= 3; n++)
+      {
+        E_Float* c = pt->begin(n);
+        E_Float* pfn = pf+1+(n-1)*npts;
+        for (E_Int i = 0; i < npts; i++) pfn[i] = c[i];
+      }
+      PyObject* tpl = Py_BuildValue("(OO)", ints, floats);
+      Py_DECREF(ints); Py_DECREF(floats);
+      PyList_Append(parts, tpl); Py_DECREF(tpl);
+    }
+    break;
+
+    case 1:
+    {
+      E_Int s1 = typep[1];
+      for (E_Int no = 0; no < s1; no++)
+      {
+        K_INTERP::InterpAdt* adt = (K_INTERP::InterpAdt*)(packet[no+1]);
+        E_Int nnodes = adt->getTreeSize();
+        E_Int npts = 0;
+        if (adt->_cylCoord) npts = adt->_npts;
+
+        PyObject* ints = K_NUMPY::buildNumpyArray(4+3*nnodes, 1, 1);
+        E_Int* pi = K_NUMPY::getNumpyPtrI(ints);
+        pi[0] = adt->_topology; pi[1] = adt->_cylCoord;
+        pi[2] = nnodes; pi[3] = npts;
+        PyObject* floats = K_NUMPY::buildNumpyArray(NADTPARAMS+6*nnodes+3*npts, 1, 0);
+        E_Float* pf = K_NUMPY::getNumpyPtrF(floats);
+        pf[0] = adt->_xmin; pf[1] = adt->_ymin; pf[2] = adt->_zmin;
+        pf[3] = adt->_xmax; pf[4] = adt->_ymax; pf[5] = adt->_zmax;
+        pf[6] = adt->_centerX; pf[7] = adt->_centerY; pf[8] = adt->_centerZ;
+        pf[9] = adt->_axisX; pf[10] = adt->_axisY; pf[11] = adt->_axisZ;
+        pf[12] = adt->_theta_min; pf[13] = adt->_theta_max;
+        pf[14] = adt->_thetaShift;
+        adt->getFlatTree(pi+4, pi+4+nnodes, pi+4+2*nnodes, pf+NADTPARAMS);
+        E_Float* pc = pf+NADTPARAMS+6*nnodes;
+        for (E_Int i = 0; i < npts; i++)
+        {
+          pc[i] = adt->_xlc[i]; pc[i+npts] = adt->_ylc[i];
+          pc[i+2*npts] = adt->_zlc[i];
+        }
+        PyObject* tpl = Py_BuildValue("(OO)", ints, floats);
+        Py_DECREF(ints); Py_DECREF(floats);
+        PyList_Append(parts, tpl); Py_DECREF(tpl);
+      }
+    }
+    break;
+
+    default:
+      Py_DECREF(parts);
+      PyErr_SetString(PyExc_TypeError,
+                      "getHookData: this type of hook can not be serialized.");
+      return NULL;
+  }
+
+  PyObject* ret = Py_BuildValue("[lO]", (long)type, parts);
+  Py_DECREF(parts);
+  return ret;
+}
+
+// ============================================================================
+/* Reconstruit un hook a partir des donnees a plat (cf getHookData)
+   IN: type: type du hook
+   IN: parts: [(ints, floats), ...] (numpys contigus)
+   IN: shared: si 1, les coordonnees et l'arbre d'un KdTree ne sont pas
+   copies mais references (numpys en lecture seule possibles, par ex.
+   fichier mappe). Les numpys sont alors gardes par le hook jusqu'a freeHook.
+   Les ADT sont toujours reconstruits (arbre de pointeurs), sans
+   recalcul des bbox ni insertion.
+   OUT: hook */
+// ============================================================================
+PyObject* K_CONVERTER::setHookData(PyObject* self, PyObject* args)
+{
+  E_Int type; PyObject* parts; E_Int shared;
+  if (!PYPARSETUPLE_(args, I_ O_ I_, &type, &parts, &shared)) return NULL;
+
+  if (PyList_Check(parts) == false)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "setHookData: parts must be a list.");
+    return NULL;
+  }
+  E_Int nparts = PyList_Size(parts);
+
+  // Recupere les pointeurs (partages)
+  vector<E_Int*> ints(nparts); vector<E_Float*> floats(nparts);
+  vector<PyObject*> objs;
+  E_Int ok = 1;
+  for (E_Int no = 0; no < nparts; no++)
+  {
+    PyObject* tpl = PyList_GetItem(parts, no);
+    if (PyTuple_Check(tpl) == false || PyTuple_Size(tpl) != 2) { ok = 0; break; }
+    PyObject* oi = PyTuple_GetItem(tpl, 0);
+    PyObject* of = PyTuple_GetItem(tpl, 1);
+    E_Int si, sf;
+    if (K_NUMPY::getFromNumpyArray(oi, ints[no], si, true) == 0) { ok = 0; break; }
+    objs.push_back(oi);
+    if (K_NUMPY::getFromNumpyArray(of, floats[no], sf, true) == 0) { ok = 0; break; }
+    objs.push_back(of);
+  }
+  if (ok == 0)
+  {
+    for (size_t i = 0; i < objs.size(); i++) Py_DECREF(objs[i]);
+    PyErr_SetString(PyExc_TypeError,
+                    "setHookData: parts must be a list of (ints, floats) numpys.");
+    return NULL;
+  }
+
+  void** packet = NULL;
+  E_Int* typep = NULL;
+  E_Boolean keep = false; // les numpys sont gardes par le hook
+  switch (type)
+  {
+    case 0:
+    case 2:
+    case 3:
+    case 100:
+    case 102:
+    case 103:
+    {
+      if (nparts != 1) { ok = 0; break; }
+      E_Int* pi = ints[0]; E_Float* pf = floats[0];
+      E_Int npts = pi[0]; E_Int nnodes = pi[1];
+      FldArrayF* coords;
+      if (shared == 1) coords = new FldArrayF(npts, 3, pf+1, true);
+      else coords = new FldArrayF(npts, 3, pf+1, false);
+      ArrayAccessor<FldArrayF>* coordAcc =
+        new ArrayAccessor<FldArrayF>(*coords, 1, 2, 3); // ref sur coords
+      K_SEARCH::KdTree<FldArrayF>* globalKdt =
+        new K_SEARCH::KdTree<FldArrayF>(*coordAcc, pi+2, nnodes, pf[0],
+                                        shared == 1);
+      keep = (shared == 1);
+      typep = new E_Int [1]; typep[0] = type;
+      packet = new void* [4];
+      packet[0] = typep; // hook type
+      packet[1] = coords;
+      packet[2] = coordAcc;
+      packet[3] = globalKdt;
+    }
+    break;
+
+    case 1:
+    {
+      typep = new E_Int [2]; typep[0] = 1; typep[1] = nparts;
+      packet = new void* [nparts+1];
+      packet[0] = typep; // hook type
+      for (E_Int no = 0; no < nparts; no++)
+      {
+        E_Int* pi = ints[no]; E_Float* pf = floats[no];
+        E_Int nnodes = pi[2]; E_Int npts = pi[3];
+        K_INTERP::InterpAdt* adt = new K_INTERP::InterpAdt(
+          nnodes, pi+4, pi+4+nnodes, pi+4+2*nnodes, pf+NADTPARAMS);
+        adt->_topology = pi[0];
+        adt->_xmin = pf[0]; adt->_ymin = pf[1]; adt->_zmin = pf[2];
+        adt->_xmax = pf[3]; adt->_ymax = pf[4]; adt->_zmax = pf[5];
+        adt->_centerX = pf[6]; adt->_centerY = pf[7]; adt->_centerZ = pf[8];
+        adt->_axisX = pf[9]; adt->_axisY = pf[10]; adt->_axisZ = pf[11];
+        adt->_theta_min = pf[12]; adt->_theta_max = pf[13];
+        adt->_thetaShift = pf[14];
+        if (pi[1] == 1) // coordonnees cylindriques
+        {
+          adt->_cylCoord = true; adt->_npts = npts;
+          adt->_xlc = new E_Float [npts];
+          adt->_ylc = new E_Float [npts];
+          adt->_zlc = new E_Float [npts];
+          E_Float* pc = pf+NADTPARAMS+6*nnodes;
+          for (E_Int i = 0; i < npts; i++)
+          {
+            adt->_xlc[i] = pc[i]; adt->_ylc[i] = pc[i+npts];
+            adt->_zlc[i] = pc[i+2*npts];
+          }
+        }
+        packet[no+1] = (void*)adt;
+      }
+    }
+    break;
+
+    default:
+      ok = 0;
+  }
+
+  if (ok == 0)
+  {
+    for (size_t i = 0; i < objs.size(); i++) Py_DECREF(objs[i]);
+    PyErr_SetString(PyExc_TypeError,
+                    "setHookData: invalid hook type or data.");
+    return NULL;
+  }
+
+  PyObject* hook;
+#if (PY_MAJOR_VERSION == 2 && PY_MINOR_VERSION < 7) || (PY_MAJOR_VERSION == 3 && PY_MINOR_VERSION < 1)
+  hook = PyCObject_FromVoidPtr(packet, NULL);
+  if (keep) { Py_INCREF(parts); } // jamais relache
+#else
+  hook = PyCapsule_New(packet, NULL, NULL);
+  // le hook garde les numpys references (relache dans freeHook)
+  if (keep) { Py_INCREF(parts); PyCapsule_SetContext(hook, parts); }
+#endif
+  for (size_t i = 0; i < objs.size(); i++) Py_DECREF(objs[i]);
+  return hook;
+}
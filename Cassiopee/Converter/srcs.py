@@ -111,6 +111,7 @@ cpp_srcs =  ['Converter/Converter1.cpp',
              'Converter/identifySolutions.cpp',
              'Converter/hook.cpp',
              'Converter/globalHook.cpp',
+             'Converter/hookIO.cpp',
              'Converter/globalIndex.cpp',
              'Converter/createBBTree.cpp',
              'Converter/ADF/ADF_interface.cpp',
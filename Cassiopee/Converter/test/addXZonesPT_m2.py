@@ -0,0 +1,39 @@
+# - addXZones (pyTree) -
+# zones avec gros champs (echange sans copie)
+import Converter.PyTree as C
+import Converter.Mpi as Cmpi
+import Converter.Internal as Internal
+import Distributor2.PyTree as Distributor2
+import Generator.PyTree as G
+import KCore.test as test
+
+LOCAL = test.getLocal()
+
+# Cree le fichier test
+if Cmpi.rank == 0:
+    a = G.cart((0,0,0), (1,1,1), (30,30,30))
+    b = G.cart((29,0,0), (1,1,1), (30,30,30))
+    C._initVars(a, '{F}={CoordinateX}*{CoordinateY}')
+    C._initVars(b, '{centers:G}={centers:CoordinateZ}')
+    t = C.newPyTree(['Base',a,b])
+    C.convertPyTree2File(t, LOCAL+'/test.cgns')
+Cmpi.barrier()
+
+# Relit des zones par procs
+t = Cmpi.convertFile2SkeletonTree(LOCAL+'/test.cgns')
+(t, dic) = Distributor2.distribute(t, NProc=Cmpi.size, algorithm='fast')
+t = Cmpi.readZones(t, LOCAL+'/test.cgns', rank=Cmpi.rank)
+Cmpi._convert2PartialTree(t)
+
+tb = Cmpi.createBBoxTree(t)
+graph = Cmpi.computeGraph(tb)
+t = Cmpi.addXZones(t, graph)
+# les numpys recus gardent leur ordre
+for z in Internal.getZones(t):
+    x = Internal.getNodeFromName2(z, 'CoordinateX')[1]
+    if not x.flags.f_contiguous: print('FAILED: numpy order is lost.')
+if Cmpi.rank == 0: test.testT(t, 1)
+
+# allgatherTree
+t = Cmpi.allgatherTree(t)
+if Cmpi.rank == 0: test.testT(t, 2)
@@ -22,3 +22,9 @@ t = Cmpi.readZones(t, LOCAL+'/test.cgns', rank=Cmpi.rank)
 t = Cmpi.convert2PartialTree(t)
 t = Cmpi.allgatherTree(t) # full tree on every processors
 if Cmpi.rank == 0: test.testT(t, 1)
+
+# gathered tree does not share its arrays with the local tree
+tg = Cmpi.allgatherTree(t)
+C._initVars(tg, 'F', 1.)
+C._initVars(tg, 'CoordinateX', 0.)
+if Cmpi.rank == 0: test.testT(t, 2)
@@ -0,0 +1,24 @@
+# - computeGraph (pyTree) -
+# - construction repartie du graphe bbox -
+import Converter.PyTree as C
+import Converter.Mpi as Cmpi
+import Distributor2.PyTree as Distributor2
+import Generator.PyTree as G
+import KCore.test as test
+
+zones = []
+for i in range(5):
+    for j in range(4):
+        zones.append(G.cart((i*9,j*9,0), (1,1,1), (10,10,10)))
+t = C.newPyTree(['Base', zones[:10], 'Base2', zones[10:]])
+(t, dic) = Distributor2.distribute(t, NProc=Cmpi.size, algorithm='fast')
+tb = Cmpi.createBBoxTree(t)
+
+graph = Cmpi.computeGraph(tb, type='bbox')
+if Cmpi.rank == 0: test.testO(graph, 1)
+
+graph = Cmpi.computeGraph(tb, type='bbox', split=True)
+if Cmpi.rank == 0: test.testO(graph, 2)
+
+graph = Cmpi.computeGraph(tb, type='bbox2', split=True)
+if Cmpi.rank == 0: test.testO(graph, 3)
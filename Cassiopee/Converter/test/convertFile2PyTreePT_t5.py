@@ -0,0 +1,25 @@
+# - convertFile2PyTree (pyTree) -
+# - normalisation des arbres lus (hdf) -
+import Converter.PyTree as C
+import Converter.Internal as Internal
+import Generator.PyTree as G
+import KCore.test as test
+
+LOCAL = test.getLocal()
+
+# Arbre a corriger : familles manquantes, noms de variables non CGNS
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+C._initVars(a, 'centers:ro', 1.)
+C._addBC2Zone(a, 'wall', 'FamilySpecified:WALL', 'imin')
+C._tagWithFamily(a, 'CART')
+b = G.cart((10,0,0), (1,1,1), (10,10,10))
+t = C.newPyTree(['Base', a, b])
+Internal._rmNodesByType(t, 'Family_t')
+C.convertPyTree2File(t, LOCAL+'/out.hdf')
+
+t = C.convertFile2PyTree(LOCAL+'/out.hdf')
+test.testT(t, 1)
+
+# Arbre suppose propre
+t = C.convertFile2PyTree(LOCAL+'/out.hdf', normalize=False)
+test.testT(t, 2)
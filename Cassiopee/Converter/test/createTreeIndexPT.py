@@ -0,0 +1,23 @@
+# - createTreeIndex (pyTree) -
+import Converter.PyTree as C
+import Generator.PyTree as G
+import Converter.Internal as Internal
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+b = G.cart((10,0,0), (1,1,1), (10,10,10))
+t = C.newPyTree(['Base', a, b])
+
+# Index t: following searches on t don't traverse the tree anymore
+Internal.createTreeIndex(t)
+z = Internal.getNodeFromName(t, 'cart.0'); print(z[0])
+#>> cart.0
+zones = Internal.getNodesFromType(t, 'Zone_t'); print(len(zones))
+#>> 2
+
+# Index is updated after _rmNode*, _addChild, _setName
+Internal._setName(z, 'myZone')
+print(Internal.getNodeFromPath(t, 'Base/myZone')[0])
+#>> myZone
+
+# Release index
+Internal.rmTreeIndex(t)
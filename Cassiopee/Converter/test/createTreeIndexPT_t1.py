@@ -0,0 +1,39 @@
+# - createTreeIndex (pyTree) -
+import Converter.PyTree as C
+import Generator.PyTree as G
+import Converter.Internal as Internal
+import KCore.test as test
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+b = G.cart((10,0,0), (1,1,1), (10,10,10))
+t = C.newPyTree(['Base', a, b])
+C._addBC2Zone(t, 'wall', 'BCWall', 'imin')
+Internal.createTreeIndex(t)
+
+# searches on indexed tree
+n1 = Internal.getNodeFromName(t, 'cart.0')
+n2 = Internal.getNodesFromType(t, 'BC_t')
+n3 = Internal.getNodeFromPath(t, 'Base/cart/GridCoordinates')
+n4 = Internal.getNodesFromNameAndType(t, 'wall*', 'BC_t')
+test.testT([n1,n2,n3,n4], 1)
+
+# index follows in place modifications
+Internal.setName(n1, 'myZone')
+Internal._rmNodesByType(t, 'ZoneBC_t')
+Internal._addChild(Internal.getNodeFromName(t, 'Base'), G.cart((20,0,0), (1,1,1), (5,5,5)))
+n1 = Internal.getNodeFromName(t, 'myZone')
+n2 = Internal.getNodesFromType(t, 'BC_t')
+n3 = Internal.getNodesFromType(t, 'Zone_t')
+test.testT([n1,n2,n3], 2)
+
+# index follows node creation
+z = Internal.getNodeFromName(t, 'myZone')
+Internal.newFlowSolution('FlowSolution#Mine', parent=z)
+Internal.createUniqueChild(z, 'GridCoordinates', 'GridCoordinates_t', children=[])
+n1 = Internal.getNodeFromName(t, 'FlowSolution#Mine')
+n2 = Internal.getNodesFromType(t, 'DataArray_t')
+test.testO([n1[0], len(n2)], 4)
+
+# index removal
+Internal.rmTreeIndex(t)
+test.testO(Internal.hasTreeIndex(t), 3)
@@ -0,0 +1,11 @@
+# - getParentMap (pyTree) -
+import Converter.PyTree as C
+import Generator.PyTree as G
+import Converter.Internal as Internal
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+t = C.newPyTree(['Base', a])
+
+parents = Internal.getParentMap(t)
+(p, c) = parents[id(a)]; print(p[0], c)
+#>> Base 2
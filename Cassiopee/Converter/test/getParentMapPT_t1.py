@@ -0,0 +1,40 @@
+# - getParentMap (pyTree) -
+import Converter.PyTree as C
+import Generator.PyTree as G
+import Converter.Internal as Internal
+import KCore.test as test
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+b = G.cart((10,0,0), (1,1,1), (10,10,10))
+t = C.newPyTree(['Base', a, 'Base2', b])
+
+# from tree
+parents = Internal.getParentMap(t)
+(p, c) = parents[id(b)]
+test.testO([p[0],c], 1)
+
+# from list
+parents = Internal.getParentMap(Internal.getZones(t))
+(p, c) = parents[id(Internal.getNodeFromName(a, 'GridCoordinates'))]
+test.testO([p[0],c], 2)
+
+# getParentOfNode and getPath with an indexed tree
+Internal.createTreeIndex(t)
+(p, c) = Internal.getParentOfNode(t, b)
+path = Internal.getPath(t, b)
+test.testO([p[0],c,path], 3)
+
+# after modification
+d = G.cart((20,0,0), (1,1,1), (10,10,10))
+Internal._addChild(Internal.getNodeFromName(t, 'Base2'), d, pos=0)
+(p, c) = Internal.getParentOfNode(t, b)
+path = Internal.getPath(t, d, pyCGNSLike=True)
+test.testO([p[0],c,path], 4)
+
+# after direct modification of an indexed tree
+base = Internal.getNodeFromName(t, 'Base2')
+del base[2][0]
+parents = Internal.getParentMap(t)
+(p, c) = parents[id(b)]
+test.testO([p[0],c], 5)
+Internal.rmTreeIndex(t)
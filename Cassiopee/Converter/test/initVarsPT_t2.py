@@ -0,0 +1,21 @@
+# - initVars (pyTree) -
+# Same formula applied on many zones (compiled once)
+import Converter.PyTree as C
+import Generator.PyTree as G
+import KCore.test as test
+
+zones = []
+for i in range(20):
+    zones.append(G.cart((i*10,0,0), (1,1,1), (10+i,10,10)))
+t = C.newPyTree(['Base', zones])
+eq = '{F}=2.*cos({CoordinateX})+sqrt({CoordinateY}**2+1.)-minimum({CoordinateX},{CoordinateZ})/3.;{G}=({F}>0.)*{CoordinateZ}+pi'
+C._initVars(t, eq)
+C._initVars(t, '{centers:H}=logical_and({centers:CoordinateX}>5.,{centers:CoordinateY}<5.)*1.')
+C._initVars(t, '{F}=numpy.where({CoordinateY}>5., {F}, -{G})')
+test.testT(t, 1)
+
+# constant subexpressions evaluated as in python
+t = C.newPyTree(['Base', G.cart((0,0,0), (1,1,1), (10,10,10))])
+C._initVars(t, '{F}=10**-3*{CoordinateX}+7//2+7/2-2**-1')
+C._initVars(t, '{G}=10**-3')
+test.testT(t, 2)
@@ -0,0 +1,19 @@
+# - initVars (array) -
+# Several equations evaluated in a single fused pass (mode=1)
+import Converter as C
+import Generator as G
+import Converter.expression as expr
+import KCore.test as test
+
+a = G.cart((0,0,0), (0.1,0.1,0.1), (30,30,30))
+a = C.initVars(a, '{ro}={x}+1.;{u}={ro}*{y}**2;{v}=sqrt({u}+{z})*min({x},{y})', mode=1)
+test.testA([a], 1)
+
+# direct call with block size, sequential
+b = G.cart((0,0,0), (0.1,0.1,0.1), (30,30,30))
+C._addVars(b, ['ro','u','v'])
+e1 = expr.ast('{ro}={x}+1.')
+e2 = expr.ast('{u}={ro}*{y}**2')
+e3 = expr.ast('{v}=sqrt({u}+{z})*min({x},{y})')
+expr.run_fused([e1, e2, e3], b, blockSize=1024, parallel=0)
+test.testA([b], 1)
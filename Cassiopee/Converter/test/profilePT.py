@@ -0,0 +1,19 @@
+# - profile (pyTree) -
+import Generator.PyTree as G
+import Converter.PyTree as C
+import Converter.Mpi as Cmpi
+
+Cmpi.profile(mem=True, events=True, mpiWait=True)
+
+@Cmpi.span('center2Node')
+def F(a): return C.center2Node(a)
+
+with Cmpi.span('prepare'):
+    with Cmpi.span('cart'):
+        a = G.cart((0,0,0), (1,1,1), (100,100,100))
+    a = F(a)
+    Cmpi.barrier()
+
+Cmpi.writeProfile('profile.json')
+Cmpi.writeProfile('profile.trace.json', format='chrome')
+Cmpi.reduceProfile()
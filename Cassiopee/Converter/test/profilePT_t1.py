@@ -0,0 +1,27 @@
+# - profile (pyTree) -
+import Generator.PyTree as G
+import Converter.PyTree as C
+import Converter.Mpi as Cmpi
+import Converter.Profiler as Profiler
+import KCore.test as test
+
+Cmpi.profile(mem=True, events=True, mpiWait=True)
+
+@Cmpi.span('center2Node')
+def F(a): return C.center2Node(a)
+
+with Cmpi.span('prepare'):
+    for i in range(3):
+        with Cmpi.span('cart'):
+            a = G.cart((0,0,0), (1,1,1), (10,10,10))
+        a = F(a)
+    Cmpi.barrier()
+
+stats = Profiler.getStats()['spans']
+counts = {}
+for path in stats: counts[path] = stats[path]['count']
+test.testO(counts, 1)
+red = Cmpi.reduceProfile(stdout=False)
+test.testO(sorted(red.keys()), 2)
+trace = Profiler.getChromeTrace(Cmpi.rank)
+test.testO(len([e for e in trace['traceEvents'] if e['ph'] == 'X']), 3)
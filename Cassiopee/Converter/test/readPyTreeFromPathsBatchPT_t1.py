@@ -0,0 +1,32 @@
+# - _readPyTreeFromPathsBatch (pyTree) -
+import Converter.PyTree as C
+import Converter.Filter as Filter
+import Generator.PyTree as G
+import KCore.test as test
+
+LOCAL = test.getLocal()
+
+# Cree le fichier test
+zones = []
+for i in range(10):
+    a = G.cart((10*i,0,0), (1,1,1), (10,10,10))
+    a[0] = 'cart%d'%i
+    if i%2 == 0: C._initVars(a, 'centers:F', float(i))
+    zones.append(a)
+t = C.newPyTree(['Base', zones])
+C.convertPyTree2File(t, LOCAL+'/test.hdf')
+
+# Lecture groupee (les zones impaires n'ont pas de FlowSolution#Centers)
+t, znp = Filter.readZoneHeaders(LOCAL+'/test.hdf')
+groups = []
+for p in znp[::-1]:
+    groups.append([p+'/GridCoordinates', p+'/FlowSolution#Centers'])
+Filter._readPyTreeFromPathsBatch(t, LOCAL+'/test.hdf', groups)
+test.testT(t, 1)
+
+# Lecture groupee par filtres
+filters = []
+for p in znp:
+    filters.append({p+'/GridCoordinates/CoordinateX': [[0,0,0], [1,1,1], [2,2,2], [1,1,1]]+[[1,1,1], [1,1,1], [2,2,2], [1,1,1]]+[[0]]})
+r = Filter.readNodesFromFilterBatch(LOCAL+'/test.hdf', filters)
+test.testO(r, 2)
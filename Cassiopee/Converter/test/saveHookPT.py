@@ -0,0 +1,14 @@
+# - saveHook (pyTree) -
+import Converter.PyTree as C
+import Generator.PyTree as G
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+hook = C.createHook(a, function='nodes')
+C.saveHook(hook, 'hook.bin')
+C.freeHook(hook)
+
+# Recharge le hook par mapping du fichier (pas de reconstruction)
+hook = C.loadHook('hook.bin')
+b = G.cart((2,2,2), (1,1,1), (3,3,3))
+nodes = C.identifyNodes(hook, b); print(nodes)
+C.freeHook(hook)
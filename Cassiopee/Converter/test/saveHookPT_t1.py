@@ -0,0 +1,42 @@
+# - saveHook (pyTree) -
+import Converter.PyTree as C
+import Generator.PyTree as G
+import Post.PyTree as P
+import KCore.test as test
+
+LOCAL = test.getLocal()
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+b = G.cart((2.2,2.2,2.2), (1,1,1), (3,3,3))
+
+# k-d tree de noeuds
+hook = C.createHook(a, function='nodes')
+C.saveHook(hook, LOCAL+'/hook.bin')
+ref = C.nearestNodes(hook, b)
+C.freeHook(hook)
+for mmap in [True, False]:
+    hook = C.loadHook(LOCAL+'/hook.bin', mmap)
+    res = C.nearestNodes(hook, b)
+    C.freeHook(hook)
+    test.testO(res, 1)
+test.testO(ref, 1)
+
+# hook global avec indirection
+c = G.cart((9,0,0), (1,1,1), (5,5,5))
+hook = C.createGlobalHook([a,c], function='nodes', indir=1)
+C.saveHook(hook, LOCAL+'/hookg.bin')
+C.freeHook(hook[0])
+hook = C.loadHook(LOCAL+'/hookg.bin')
+res = C.identifyNodes(hook[0], b)
+test.testO([res, hook[1]], 2)
+C.freeHook(hook[0])
+
+# ADT (extractMesh)
+C._initVars(a, '{F}={CoordinateX}+2*{CoordinateY}')
+hook = C.createHook(a, function='extractMesh')
+C.saveHook(hook, LOCAL+'/hooka.bin')
+C.freeHook(hook)
+hook = C.loadHook(LOCAL+'/hooka.bin')
+e = P.extractMesh(a, b, hook=[hook])
+C.freeHook(hook)
+test.testT(e, 3)
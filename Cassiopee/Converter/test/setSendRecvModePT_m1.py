@@ -0,0 +1,27 @@
+# - setSendRecvMode (pyTree) -
+import Converter.PyTree as C
+import Converter.Mpi as Cmpi
+import Distributor2.PyTree as Distributor2
+import Generator.PyTree as G
+import KCore.test as test
+
+a = G.cart((0,0,0), (1,1,1), (10,10,10))
+b = G.cart((9,0,0), (1,1,1), (10,10,10))
+c = G.cart((18,0,0), (1,1,1), (10,10,10))
+t = C.newPyTree(['Base',a,b,c])
+(t, dic) = Distributor2.distribute(t, NProc=Cmpi.size, algorithm='fast')
+t = Cmpi.convert2PartialTree(t)
+tb = Cmpi.createBBoxTree(t)
+graph = Cmpi.computeGraph(tb, type='bbox')
+
+# Envoie le nom des zones locales aux procs voisins
+datas = {}
+if Cmpi.rank in graph:
+    for opp in graph[Cmpi.rank]: datas[opp] = graph[Cmpi.rank][opp]
+
+for mode in ['barrier', 'neighbor', 'collective']:
+    Cmpi.setSendRecvMode(mode)
+    rcvDatas = Cmpi.sendRecv(datas, graph)
+    rcvDatas = Cmpi.allgatherDict(rcvDatas)
+    if Cmpi.rank == 0: test.testO(rcvDatas, 1)
+Cmpi.setSendRecvMode('barrier')
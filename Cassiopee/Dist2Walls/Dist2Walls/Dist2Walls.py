@@ -33,19 +33,113 @@ def signDistance__(zones, distances, bodies, loc, dimPb):
     distances = C.extractVars(distances, ['TurbulentDistance'])
     return distances
 
+# Recuperation du cellN des corps (aux noeuds) et conversion en triangles
+def prepareBodies__(bodies, cellnbodies):
+    bodies0 = []  # argument dans la fonction c associe a bodies et cellN
+    if cellnbodies == []:
+        bodies0 = C.initVars(bodies, 'cellN', 1.)
+    elif len(cellnbodies) != len(bodies):
+        print('Warning: distance2Walls: cellN not defined for some bodies: cellN set to 1 for invalid body zones.')
+        bodies0 = C.initVars(bodies, 'cellN', 1.)
+    else:
+        bodies0 = bodies
+        for c in range(len(bodies0)):
+            if cellnbodies[c] == []:
+                bodies0[c] = C.initVars(bodies0[c], 'cellN', 1.)
+            elif bodies0[c][1].shape[1] == cellnbodies[c][1].shape[1]:
+                bodies0[c] = C.addVars([bodies0[c], cellnbodies[c]])
+            else:
+                print('Warning: distance2Walls: bodies and celln must be of same dimensions: cellN set to 1 for invalid body zones.')
+                bodies0[c] = C.initVars(bodies0[c], 'cellN', 1.)
+    # conversion en triangles de bodies (important pour les champs aux centres
+    # sur maillages en centres)
+    return C.convertArray2Tetra(bodies0, split='withBarycenters')
+
+# Nombre de threads (OMP_NUM_THREADS ou nombre de coeurs par defaut)
+def getThreads__(threads=None):
+    if threads is not None: return max(int(threads), 1)
+    import os
+    n = os.getenv('OMP_NUM_THREADS', None)
+    if n is not None:
+        try: return max(int(n), 1)
+        except: pass
+    n = os.cpu_count()
+    if n is None: n = 1
+    return n
+
+# ==============================================================================
+# Structure de recherche sur les parois (corps triangules, kdtree des sommets
+# et bbtrees des elements). Construite une fois, elle est reutilisee par
+# distance2Walls(wallTree=...) et partagee par les threads.
+# ==============================================================================
+class WallTree:
+    """Search structure on bodies for distance2Walls."""
+    def __init__(self, tree, bodies, type):
+        self.tree = tree # capsule C
+        self.bodies = bodies # corps triangules avec cellN (distance signee)
+        self.type = type
+
+def createWallTree(bodies, cellnbodies=[], type='ortho'):
+    """Create a reusable search structure on bodies for distance2Walls.
+       Usage: createWallTree(bodies, cellnbodies, type)"""
+    if type != 'ortho' and type != 'ortho_local':
+        raise ValueError("createWallTree: type must be ortho or ortho_local.")
+    if not isinstance(bodies[0], list): bodies = [bodies]
+    bodies0 = prepareBodies__(bodies, cellnbodies)
+    isminortho = 0
+    if type == 'ortho_local': isminortho = 1
+    return WallTree(dist2walls.createWallTree(bodies0, isminortho), bodies0, type)
+
+# Distance ortho zone par zone avec un pool de threads
+# Chaque appel C relache le GIL, calcule les centres de sa zone a la volee
+# et utilise ompThreads threads openMP.
+# Les distances sont retournees dans l'ordre de distance2WallsOrtho
+# (zones structurees puis non structurees).
+# Si dolds est fourni (distances precedentes), mise a jour incrementale.
+def distance2WallsZones__(zones, wallTree, flags, loc, isIBM_F1, dTarget, threads,
+                          dolds=None, band=0., delta=0., rtol=0.):
+    import numpy
+    threads = getThreads__(threads)
+    nzones = len(zones)
+    if loc == 'centers': iloc = 1
+    else: iloc = 0
+    # grosses zones d'abord pour equilibrer les threads
+    order = sorted(range(nzones), key=lambda noz: -C.getNPts(zones[noz]))
+    workers = min(threads, nzones)
+    ompThreads = max(1, threads//workers)
+    def F(noz):
+        flag = None
+        if flags is not None and flags[noz] != []:
+            flag = numpy.ascontiguousarray(numpy.ravel(flags[noz][1][0], order='K'), dtype=numpy.float64)
+        dold = None
+        if dolds is not None and dolds[noz] != []:
+            dold = numpy.ascontiguousarray(numpy.ravel(dolds[noz][1][0], order='K'), dtype=numpy.float64)
+        return dist2walls.distance2WallsOrthoZone(wallTree.tree, zones[noz], flag, iloc,
+                                                  int(isIBM_F1), dTarget, ompThreads,
+                                                  dold, band, delta, rtol)
+    if workers <= 1: res = [F(noz) for noz in order]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            res = list(pool.map(F, order))
+    dist = [None]*nzones
+    for c, noz in enumerate(order): dist[noz] = res[c]
+    return [dist[noz] for noz in range(nzones) if len(zones[noz]) == 5] + \
+        [dist[noz] for noz in range(nzones) if len(zones[noz]) == 4]
 
 # ==============================================================================
 # Calcul de la distance a des surfaces pour une liste de zones, a partir d'une
 # liste de surfaces (bodies) et d'une liste de champs celln associee a bodies
 # ==============================================================================
 def distance2Walls(zones, bodies, flags=None, cellnbodies=[], type='ortho',
-                   loc='centers', signed=0, dim=3, isIBM_F1=False, dTarget=1000.):
+                   loc='centers', signed=0, dim=3, isIBM_F1=False, dTarget=1000.,
+                   wallTree=None, threads=None):
     """Compute distance to walls.
-       Usage: distance2Walls(zones, bodies, cellnbodies, type, loc, signed, dim)"""
+       Usage: distance2Walls(zones, bodies, cellnbodies, type, loc, signed, dim, wallTree, threads)"""
 
     # firewalls
     if len(zones) == 0: return
-    if bodies == []:
+    if bodies == [] and wallTree is None:
         print('Warning: distance2Walls: no body defined, no distance computed.')
         return zones
 
@@ -59,26 +153,19 @@ def distance2Walls(zones, bodies, flags=None, cellnbodies=[], type='ortho',
     if type != 'ortho' and type != 'mininterf' and type != 'mininterf_ortho' and type != 'ortho_local':
         raise ValueError("distance2Walls: type must be ortho, mininterf, mininterf_ortho or ortho_local.")
 
-    # Recuperation du cellN en noeuds ou centres selon loc
-    bodies0 = []  # argument dans la fonction c associe a bodies et cellN
-    if cellnbodies == []:
-        bodies0 = C.initVars(bodies, 'cellN', 1.)
-    elif len(cellnbodies) != len(bodies):
-        print('Warning: distance2Walls: cellN not defined for some bodies: cellN set to 1 for invalid body zones.')
-        bodies0 = C.initVars(bodies, 'cellN', 1.)
-    else:
-        bodies0 = bodies
-        for c in range(len(bodies0)):
-            if cellnbodies[c] == []:
-                bodies0[c] = C.initVars(bodies0[c], 'cellN', 1.)
-            elif bodies0[c][1].shape[1] == cellnbodies[c][1].shape[1]:
-                bodies0[c] = C.addVars([bodies0[c], cellnbodies[c]])
-            else:
-                print('Warning: distance2Walls: bodies and celln must be of same dimensions: cellN set to 1 for invalid body zones.')
-                bodies0[c] = C.initVars(bodies0[c], 'cellN', 1.)
-    # conversion en triangles de bodies (important pour les champs aux centres
-    # sur maillages en centres)
-    bodies0 = C.convertArray2Tetra(bodies0, split='withBarycenters')
+    # Structure de parois reutilisable et zones traitees en parallele
+    if (wallTree is not None or threads is not None) and \
+       (type == 'ortho' or type == 'ortho_local'):
+        if wallTree is None: wallTree = createWallTree(bodies, cellnbodies, type)
+        elif wallTree.type != type:
+            raise ValueError("distance2Walls: wallTree was built for type %s."%wallTree.type)
+        dist = distance2WallsZones__(zones, wallTree, flags, loc, isIBM_F1, dTarget, threads)
+        if signed == 1:
+            dist = signDistance__(zones, dist, wallTree.bodies, loc, dim)
+        if onezone == 1: return dist[0]
+        else: return dist
+
+    bodies0 = prepareBodies__(bodies, cellnbodies)
 
     # calcul de la distance a la paroi localisee aux centres ou aux noeuds
     dist = []
@@ -118,6 +205,73 @@ def distance2Walls(zones, bodies, flags=None, cellnbodies=[], type='ortho',
     if onezone == 1: return dist[0]
     else: return dist
 
+# ==============================================================================
+# Deplacement maximal des sommets entre deux positions des corps
+# IN: bodies, oldBodies: memes corps (meme topologie) apres et avant mouvement
+# ==============================================================================
+def getCoords__(a):
+    import KCore
+    px = KCore.isCoordinateXPresent(a)
+    py = KCore.isCoordinateYPresent(a)
+    pz = KCore.isCoordinateZPresent(a)
+    return a[1][[px,py,pz],:]
+
+def getDisplacement__(bodies, oldBodies):
+    import numpy
+    if not isinstance(bodies[0], list): bodies = [bodies]
+    if not isinstance(oldBodies[0], list): oldBodies = [oldBodies]
+    if len(bodies) != len(oldBodies):
+        raise ValueError("updateDistance2Walls: bodies and previous bodies differ.")
+    delta = 0.
+    for c in range(len(bodies)):
+        b1 = getCoords__(bodies[c]); b0 = getCoords__(oldBodies[c])
+        if b1.shape != b0.shape:
+            raise ValueError("updateDistance2Walls: bodies and previous bodies differ.")
+        if b1.size > 0: delta = max(delta, numpy.sqrt(((b1-b0)**2).sum(axis=0).max()))
+    return delta
+
+# ==============================================================================
+# Mise a jour de la distance aux parois apres deplacement des corps
+# IN: distances: distances precedentes (TurbulentDistance, meme ordre que zones)
+# IN: displacement: deplacement maximal des parois (float) ou corps avant
+# le deplacement
+# IN: band: les points a moins de band des parois sont recalcules
+# (par defaut dTarget si dTarget est fourni)
+# IN: rtol: tolerance relative des points non recalcules
+# ==============================================================================
+def updateDistance2Walls(zones, distances, bodies, displacement, flags=None,
+                         cellnbodies=[], type='ortho', loc='centers', signed=0,
+                         dim=3, isIBM_F1=False, dTarget=1000., band=None,
+                         rtol=1.e-2, wallTree=None, threads=None):
+    """Update distance to walls after a motion of bodies.
+       Usage: updateDistance2Walls(zones, distances, bodies, displacement, cellnbodies, type, loc, signed, dim, band, rtol, wallTree, threads)"""
+    if len(zones) == 0: return
+    onezone = 0
+    if not isinstance(zones[0], list):
+        onezone = 1
+        zones = [zones]; distances = [distances]
+        if flags is not None: flags = [flags]
+    if loc != 'centers' and loc != 'nodes':
+        raise ValueError("updateDistance2Walls: loc must be centers or nodes.")
+    if type != 'ortho' and type != 'ortho_local':
+        raise ValueError("updateDistance2Walls: type must be ortho or ortho_local.")
+    if len(distances) != len(zones):
+        raise ValueError("updateDistance2Walls: one previous distance is required per zone.")
+    if isinstance(displacement, list): delta = getDisplacement__(bodies, displacement)
+    else: delta = float(displacement)
+    if band is None:
+        if dTarget < 999.: band = dTarget
+        else: band = 0.
+    if wallTree is None: wallTree = createWallTree(bodies, cellnbodies, type)
+    elif wallTree.type != type:
+        raise ValueError("updateDistance2Walls: wallTree was built for type %s."%wallTree.type)
+    dist = distance2WallsZones__(zones, wallTree, flags, loc, isIBM_F1, dTarget, threads,
+                                 distances, band, delta, rtol)
+    if signed == 1:
+        dist = signDistance__(zones, dist, wallTree.bodies, loc, dim)
+    if onezone == 1: return dist[0]
+    else: return dist
+
 # ========================================================================================
 # Solve eikonal on a Cartesian grid
 # ========================================================================================
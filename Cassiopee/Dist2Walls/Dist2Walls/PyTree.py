@@ -18,19 +18,17 @@ fim_old = 2
 #==============================================================================
 # Calcul de la distance a la paroi pour a (tree, base, zone)
 #==============================================================================
-def distance2Walls(t, bodies, type='ortho', loc='centers', signed=0, dim=3, isIBM_F1=False, dTarget=1000.):
+def distance2Walls(t, bodies, type='ortho', loc='centers', signed=0, dim=3, isIBM_F1=False, dTarget=1000.,
+                   wallTree=None, threads=None):
     """Compute distance field.
-    Usage: distance2Walls(a, bodies, type, loc, signed, dim)"""
+    Usage: distance2Walls(a, bodies, type, loc, signed, dim, wallTree, threads)"""
     tp = Internal.copyRef(t)
-    _distance2Walls(tp, bodies, type, loc, signed, dim, isIBM_F1=isIBM_F1, dTarget=dTarget)
+    _distance2Walls(tp, bodies, type, loc, signed, dim, isIBM_F1=isIBM_F1, dTarget=dTarget,
+                    wallTree=wallTree, threads=threads)
     return tp
 
-#==============================================================================
-def _distance2Walls(t, bodies, type='ortho', loc='centers', signed=0, dim=3, isIBM_F1=False, dTarget=1000.):
-    """Compute distance field.
-    Usage: distance2Walls(a, bodies, type, loc, signed, dim)"""
-    if loc != 'centers': loc = 'nodes'
-
+# Retourne les coordonnees des corps et leur cellN (cellN ou cellnf)
+def getBodies__(bodies):
     bodyZones = Internal.getZones(bodies)
     bodiesa = C.getFields(Internal.__GridCoordinates__, bodyZones)
     cellnba = [] # cellN localise au meme endroit que bodies
@@ -42,6 +40,26 @@ def _distance2Walls(t, bodies, type='ortho', loc='centers', signed=0, dim=3, isI
             posn = C.isNamePresent(zb, varn2)
             if posn != -1: cellnba += C.getField(varn2, zb)
             else: cellnba.append([])
+    return bodiesa, cellnba
+
+#==============================================================================
+# Structure de recherche sur les parois reutilisable par distance2Walls
+#==============================================================================
+def createWallTree(bodies, type='ortho'):
+    """Create a reusable search structure on bodies for distance2Walls.
+    Usage: createWallTree(bodies, type)"""
+    bodiesa, cellnba = getBodies__(bodies)
+    return Dist2Walls.createWallTree(bodiesa, cellnba, type)
+
+#==============================================================================
+def _distance2Walls(t, bodies, type='ortho', loc='centers', signed=0, dim=3, isIBM_F1=False, dTarget=1000.,
+                    wallTree=None, threads=None):
+    """Compute distance field.
+    Usage: distance2Walls(a, bodies, type, loc, signed, dim, wallTree, threads)"""
+    if loc != 'centers': loc = 'nodes'
+
+    if wallTree is None: bodiesa, cellnba = getBodies__(bodies)
+    else: bodiesa = []; cellnba = []
 
     # we sort structured then unstructured
     orderedZones=[]
@@ -57,7 +75,65 @@ def _distance2Walls(t, bodies, type='ortho', loc='centers', signed=0, dim=3, isI
 
     distances = Dist2Walls.distance2Walls(
         coords, bodiesa, flags=flag, cellnbodies=cellnba, type=type,
-        loc=loc, signed=signed, dim=dim, isIBM_F1=isIBM_F1, dTarget=dTarget)
+        loc=loc, signed=signed, dim=dim, isIBM_F1=isIBM_F1, dTarget=dTarget,
+        wallTree=wallTree, threads=threads)
+
+    for nz in range(len(distances)):
+        nozorig = orderedZones[nz]
+        zorig = zones[nozorig]
+        C.setFields([distances[nz]], zorig, loc)
+    return None
+
+#==============================================================================
+# Mise a jour de la distance a la paroi apres deplacement des corps
+# Utilise la distance precedente TurbulentDistance stockee dans t
+# IN: displacement: deplacement maximal des parois (float) ou corps avant
+# le deplacement
+#==============================================================================
+def updateDistance2Walls(t, bodies, displacement, type='ortho', loc='centers', signed=0, dim=3,
+                         isIBM_F1=False, dTarget=1000., band=None, rtol=1.e-2,
+                         wallTree=None, threads=None):
+    """Update distance field after a motion of bodies.
+    Usage: updateDistance2Walls(a, bodies, displacement, type, loc, signed, dim, band, rtol, wallTree, threads)"""
+    tp = Internal.copyRef(t)
+    _updateDistance2Walls(tp, bodies, displacement, type, loc, signed, dim, isIBM_F1=isIBM_F1,
+                          dTarget=dTarget, band=band, rtol=rtol, wallTree=wallTree, threads=threads)
+    return tp
+
+#==============================================================================
+def _updateDistance2Walls(t, bodies, displacement, type='ortho', loc='centers', signed=0, dim=3,
+                          isIBM_F1=False, dTarget=1000., band=None, rtol=1.e-2,
+                          wallTree=None, threads=None):
+    """Update distance field after a motion of bodies.
+    Usage: updateDistance2Walls(a, bodies, displacement, type, loc, signed, dim, band, rtol, wallTree, threads)"""
+    if loc != 'centers': loc = 'nodes'
+
+    if wallTree is None: bodiesa, cellnba = getBodies__(bodies)
+    else: bodiesa = []; cellnba = []
+    if not isinstance(displacement, (float, int)):
+        displacement = C.getFields(Internal.__GridCoordinates__, Internal.getZones(displacement))
+        if wallTree is not None: bodiesa = C.getFields(Internal.__GridCoordinates__, Internal.getZones(bodies))
+
+    # we sort structured then unstructured
+    orderedZones=[]
+    zones = Internal.getZones(t)
+    for i,z in enumerate(zones):
+        if Internal.getZoneType(z)==1: orderedZones.append(i)
+    for i, z in enumerate(zones):
+        if Internal.getZoneType(z)==2: orderedZones.append(i)
+
+    coords = C.getFields(Internal.__GridCoordinates__,zones)
+    if loc == 'centers':
+        flag = C.getField('centers:flag',zones)
+        dold = C.getField('centers:TurbulentDistance',zones)
+    else:
+        flag = C.getField('flag',zones)
+        dold = C.getField('TurbulentDistance',zones)
+
+    distances = Dist2Walls.updateDistance2Walls(
+        coords, dold, bodiesa, displacement, flags=flag, cellnbodies=cellnba, type=type,
+        loc=loc, signed=signed, dim=dim, isIBM_F1=isIBM_F1, dTarget=dTarget,
+        band=band, rtol=rtol, wallTree=wallTree, threads=threads)
 
     for nz in range(len(distances)):
         nozorig = orderedZones[nz]
@@ -30,6 +30,8 @@ static PyMethodDef Pydist2walls [] =
   {"distance2WallsOrtho", K_DIST2WALLS::distance2WallsOrtho, METH_VARARGS},
   {"distance2WallsOrthoSigned", K_DIST2WALLS::distance2WallsOrthoSigned, METH_VARARGS},
   {"eikonal", K_DIST2WALLS::eikonal, METH_VARARGS},
+  {"createWallTree", K_DIST2WALLS::createWallTree, METH_VARARGS},
+  {"distance2WallsOrthoZone", K_DIST2WALLS::distance2WallsOrthoZone, METH_VARARGS},
   {NULL, NULL}
 };
 
@@ -21,6 +21,9 @@
 # define _DIST2WALLS_DIST2WALLS_H_
 
 # include "kcore.h"
+# include "Nuga/include/KdTree.h"
+# include "Nuga/include/BbTree.h"
+# include "Nuga/include/ArrayAccessor.h"
 
 namespace K_DIST2WALLS
 { 
@@ -40,6 +43,42 @@ namespace K_DIST2WALLS
     std::vector<E_Int>& poscv, std::vector<K_FLD::FldArrayF*>& fieldsw, 
     E_Int possx, E_Int possy, E_Int possz,
     std::vector<K_FLD::FldArrayF*>& distances);
+  /* Structure de recherche sur les parois (TRI + cellN) pour la distance 
+     ortho : kdtree des sommets valides, bbtree des elements de chaque paroi.
+     Construite une fois, elle peut etre partagee par plusieurs threads. */
+  struct WallTree
+  {
+    E_Int nwalls;
+    E_Int isminortho;
+    E_Boolean owner; // fieldsw et cntw appartiennent a la structure
+    std::vector<K_FLD::FldArrayF*> fieldsw;
+    std::vector<K_FLD::FldArrayI*> cntw;
+    std::vector<E_Int> posxv; std::vector<E_Int> posyv;
+    std::vector<E_Int> poszv; std::vector<E_Int> poscv;
+    K_FLD::FldArrayF* wallpts; // sommets valides des parois
+    K_FLD::FldArrayF* lmax; // taille de l'element associe a chaque sommet
+    K_FLD::ArrayAccessor<K_FLD::FldArrayF>* coordAcc;
+    K_SEARCH::KdTree<K_FLD::FldArrayF>* kdt; // NULL si aucun sommet valide
+    std::vector< std::vector<K_SEARCH::BoundingBox<3>*> > boxes;
+    std::vector<K_SEARCH::BbTree3D*> bbtrees;
+    std::vector< std::vector< std::vector<E_Int> > > cVE_all;
+    std::vector<E_Int> npts_walls_limit;
+  };
+  WallTree* buildWallTree(
+    std::vector<E_Int>& posxv, std::vector<E_Int>& posyv, std::vector<E_Int>& poszv, 
+    std::vector<E_Int>& poscv, 
+    std::vector<K_FLD::FldArrayF*>& fieldsw, 
+    std::vector<K_FLD::FldArrayI*>& cntw, E_Int isminortho, E_Boolean owner);
+  void deleteWallTree(WallTree* w);
+  void computeOrthoDistZone(
+    WallTree& w, E_Int npts, E_Float* xt, E_Float* yt, E_Float* zt,
+    E_Float* flagp, E_Float* distancep, E_Int isIBM_F1, E_Float dTarget,
+    E_Int nthreads);
+  void updateOrthoDistZone(
+    WallTree& w, E_Int npts, E_Float* xt, E_Float* yt, E_Float* zt,
+    E_Float* flagp, E_Float* dold, E_Float* distancep,
+    E_Float band, E_Float delta, E_Float rtol,
+    E_Int isIBM_F1, E_Float dTarget, E_Int nthreads);
   void computeOrthoDist(
     std::vector<E_Int>& ncellst,
     E_Int posx, E_Int posy, E_Int posz, std::vector<E_Int>& posflag,
@@ -64,5 +103,7 @@ namespace K_DIST2WALLS
   PyObject* distance2WallsOrtho(PyObject* self, PyObject* args);
   PyObject* distance2WallsOrthoSigned(PyObject* self, PyObject* args);
   PyObject* eikonal(PyObject* self, PyObject* args);
+  PyObject* createWallTree(PyObject* self, PyObject* args);
+  PyObject* distance2WallsOrthoZone(PyObject* self, PyObject* args);
 }
 #endif
@@ -18,9 +18,6 @@
 */
 
 # include "dist2walls.h"
-# include "Nuga/include/KdTree.h"
-# include "Nuga/include/BbTree.h"
-# include "Nuga/include/ArrayAccessor.h"
 
 using namespace std;
 using namespace K_FLD;
@@ -256,179 +253,19 @@ void K_DIST2WALLS::computeOrthoDist(
 {
   E_Int nzones = fields.size();
   /* 1 - creation du kdtree et du bbtree */
-  typedef K_SEARCH::BoundingBox<3> BBox3DType; 
-  vector< vector<BBox3DType*> > vectOfBoxes; // a detruire a la fin
-  // allocate kdtree array: kdtree points are cell vertices
-  E_Int nwalls = cntw.size();
-  E_Int nptsmax = 0;
-  E_Int npts_local = 0;
-  vector<vector< vector<E_Int>  > >cVE_all;
-  vector<E_Int> npts_walls_limit;
-  for (E_Int v = 0; v < nwalls; v++)
-  {
-    nptsmax += fieldsw[v]->getSize();
-    #include "mininterf_ortho_npts_limit.h"
-  }
-  FldArrayF* wallpts = new FldArrayF(nptsmax, 3);
-  FldArrayF* lmax = new FldArrayF(nptsmax);
-
-  E_Float* xw2 = wallpts->begin(1);
-  E_Float* yw2 = wallpts->begin(2);
-  E_Float* zw2 = wallpts->begin(3);
-  E_Float* lmaxp = lmax->begin();
-
-  // create kdtree elements and bbtree information
-  E_Int nop = 0;
-  E_Int ind;
-  vector<FldArrayF> bboxes;
-  E_Float minB[3]; E_Float maxB[3];
-  
-  for (E_Int now = 0; now < nwalls; now++)
-  {
-    FldArrayF* fieldv = fieldsw[now];
-    E_Int posxw = posxv[now]; E_Int posyw = posyv[now]; E_Int poszw = poszv[now];  
-    E_Float* xw = fieldv->begin(posxw);
-    E_Float* yw = fieldv->begin(posyw);
-    E_Float* zw = fieldv->begin(poszw);
-    E_Int poscw = poscv[now]; E_Float* cellnw = fieldv->begin(poscw);
-    E_Int npts = fieldv->getSize();
-    FldArrayI& cnloc = *cntw[now];
-    E_Int nelts = cnloc.getSize(); E_Int nvert = cnloc.getNfld();
-    vector<BBox3DType*> boxes(nelts); // liste des bbox de ts les elements de la paroi courante
-    FldArrayF bbox(nelts, 6); // xmin, ymin, zmin, xmax, ymax, zmax
-    K_COMPGEOM::boundingBoxOfUnstrCells(cnloc, xw, yw, zw, bbox); bboxes.push_back(bbox);
-    E_Float* xminp = bbox.begin(1); E_Float* xmaxp = bbox.begin(4);
-    E_Float* yminp = bbox.begin(2); E_Float* ymaxp = bbox.begin(5);
-    E_Float* zminp = bbox.begin(3); E_Float* zmaxp = bbox.begin(6);
-    FldArrayIS dejavu(npts); dejavu.setAllValuesAtNull();
-    short* dejavup = dejavu.begin();
-    for (E_Int et = 0; et < nelts; et++)
-    {
-      minB[0] = xminp[et]; minB[1] = yminp[et]; minB[2] = zminp[et];
-      maxB[0] = xmaxp[et]; maxB[1] = ymaxp[et]; maxB[2] = zmaxp[et]; 
-      boxes[et] = new BBox3DType(minB, maxB);
-      for (E_Int nov = 1; nov <= nvert; nov++)
-      {
-        ind = cnloc(et, nov)-1;
-        if (cellnw[ind] == 1. && dejavup[ind] == 0) 
-        {
-          xw2[nop] = xw[ind]; yw2[nop] = yw[ind]; zw2[nop] = zw[ind];
-          lmaxp[nop] = K_FUNC::E_max(maxB[0]-minB[0], maxB[1]-minB[1], maxB[2]-minB[2]);
-          nop++; dejavup[ind] = 1;
-        }
-      }
-    }
-    vectOfBoxes.push_back(boxes);
-  }
-  wallpts->reAllocMat(nop, 3); lmax->resize(nop);
-  xw2 = wallpts->begin(1); yw2 = wallpts->begin(2); zw2 = wallpts->begin(3);
-  lmaxp = lmax->begin();
-  if (nop == 0)
-  {
-    E_Int nboxes = vectOfBoxes.size();
-    for (E_Int v0 = 0; v0 < nboxes; v0++)
-    {
-      vector<BBox3DType*>& boxes = vectOfBoxes[v0];
-      E_Int size = boxes.size();
-      for (E_Int v = 0; v < size; v++) delete boxes[v];
-    }
-    for (E_Int v = 0; v < nzones; v++) 
-    {
-      E_Int ncells = ncellst[v];
-      E_Float* distancep = distances[v]->begin();
-      for (ind = 0; ind < ncells; ind++)
-        distancep[ind] = sqrt(distancep[ind]); 
-    }
-    return;
-  }
-
-  // Build the kdtree
-  ArrayAccessor<FldArrayF> coordAcc(*wallpts, 1,2,3);
-  KdTree<FldArrayF> kdt(coordAcc, E_EPSILON);
-
-  // Build the bbtrees
-  vector<K_SEARCH::BbTree3D*> vectOfBBTrees;
-  for (E_Int v = 0; v < nwalls; v++)
-  {
-    K_SEARCH::BbTree3D* bbtree = new K_SEARCH::BbTree3D(vectOfBoxes[v]);
-    vectOfBBTrees.push_back(bbtree);
-  }
-
-  /* Compute the distance with orthogonal projection */    
-  #pragma omp parallel
-  {
-    E_Float pt[3]; 
-    vector<E_Int> indicesBB; vector<E_Int> candidates;
-    E_Float minB[3]; E_Float maxB[3];
-    E_Int ret,vw;
-    E_Float dist, dx, dy, dz, xp, yp, zp, rx, ry, rz, rad;
-    E_Float distmin, prod;
-    E_Int et, ind10, indw2, nbb, nvert;
-    E_Int posxw, posyw, poszw, poscw;
-    E_Float A, rad2, alpha, R, xQ, yQ, zQ, rmax;
-    E_Float* xw; E_Float* yw; E_Float* zw; E_Float* cellnw;
-    E_Float p0[3]; E_Float p1[3]; E_Float p2[3]; E_Float p[3];
-
-    for (E_Int v = 0; v < nzones; v++)
-    {
-      E_Float* xt = fields[v]->begin(posx);
-      E_Float* yt = fields[v]->begin(posy);
-      E_Float* zt = fields[v]->begin(posz);
-      E_Float* distancep = distances[v]->begin(); 
-      E_Int npts = distances[v]->getSize();
-      E_Int isFlagged=false;
-      E_Float* flagp = NULL;
-      if (posflag[v] > 0 )
-      { 
-        flagp = fields[v]->begin(posflag[v]);
-        isFlagged = true;
-      }
-      if (isFlagged == true)
-      {
-        #pragma omp for schedule(dynamic)
-        for (E_Int ind = 0; ind < npts; ind++)
-        {
-          if (flagp[ind] == 0.) { ; }
-          else
-          {
-            #include "algoOrtho.h"
-          }
-        }   
-      }
-      else
-      {
-        #pragma omp for schedule(dynamic)
-        for (E_Int ind = 0; ind < npts; ind++)
-        {   
-          #include "algoOrtho.h"
-        }  
-      }
-    }
-  }
-  
-  // Computes the distance (sqrt)
-  #pragma omp parallel
-  {
-    for (E_Int v = 0; v < nzones; v++)
-    {
-        E_Float* distancep = distances[v]->begin();
-        E_Int npts = distances[v]->getSize();
-        #pragma omp for
-        for (E_Int ind = 0; ind < npts; ind++)
-          distancep[ind] = sqrt(distancep[ind]);
-    }
-  }
+  WallTree* w = buildWallTree(posxv, posyv, poszv, poscv, fieldsw, cntw,
+                              isminortho, false);
 
-  // Cleaning
-  E_Int nboxes = vectOfBoxes.size();
-  for (E_Int v0 = 0; v0 < nboxes; v0++)
+  /* 2 - distance ortho zone par zone */
+  for (E_Int v = 0; v < nzones; v++)
   {
-    vector<BBox3DType*>& boxes = vectOfBoxes[v0];
-    E_Int size = boxes.size();
-    for (E_Int v = 0; v < size; v++) delete boxes[v];
-    delete vectOfBBTrees[v0];
+    E_Float* flagp = NULL;
+    if (posflag[v] > 0) flagp = fields[v]->begin(posflag[v]);
+    computeOrthoDistZone(*w, distances[v]->getSize(),
+                         fields[v]->begin(posx), fields[v]->begin(posy),
+                         fields[v]->begin(posz), flagp, distances[v]->begin(),
+                         isIBM_F1, dTarget, __NUMTHREADS__);
   }
-  vectOfBoxes.clear(); vectOfBBTrees.clear();
-  delete wallpts; delete lmax;
+  deleteWallTree(w);
   return;
 }
@@ -0,0 +1,506 @@
+/*
+    Copyright 2013-2025 Onera.
+
+    This file is part of Cassiopee.
+
+    Cassiopee is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Cassiopee is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Cassiopee.  If not, see <http://www.gnu.org/licenses/>.
+*/
+// Structure de recherche sur les parois reutilisable et distance ortho
+// zone par zone.
+// La structure (kdtree + bbtrees) est construite une fois et partagee en
+// lecture seule par les threads. distance2WallsOrthoZone relache le GIL :
+// plusieurs threads python peuvent traiter des zones differentes en
+// parallele. Les centres sont calcules a la volee dans un buffer temporaire
+// de la zone.
+// Mise a jour incrementale (corps mobiles) : si les parois se sont deplacees
+// d'au plus delta, la nouvelle distance d verifie |d-dold| <= delta. Seuls
+// les points dans la bande (dold-delta <= band) ou dont l'encadrement
+// [dold-delta, min(dold+delta, distance au sommet le plus proche)] est
+// trop large (> rtol*(dold-delta)) sont recalcules exactement.
+
+# include "dist2walls.h"
+# include <string.h>
+
+using namespace std;
+using namespace K_FLD;
+using namespace K_SEARCH;
+
+//=============================================================================
+/* Construction de la structure de recherche sur les parois.
+   IN: fieldsw, cntw: parois TRI avec cellN
+   IN: owner: si true, fieldsw et cntw sont detruits avec la structure */
+//=============================================================================
+K_DIST2WALLS::WallTree* K_DIST2WALLS::buildWallTree(
+  vector<E_Int>& posxv, vector<E_Int>& posyv, vector<E_Int>& poszv,
+  vector<E_Int>& poscv,
+  vector<FldArrayF*>& fieldsw, vector<FldArrayI*>& cntw,
+  E_Int isminortho, E_Boolean owner)
+{
+  typedef K_SEARCH::BoundingBox<3> BBox3DType;
+  WallTree* w = new WallTree;
+  w->isminortho = isminortho; w->owner = owner;
+  w->fieldsw = fieldsw; w->cntw = cntw;
+  w->posxv = posxv; w->posyv = posyv; w->poszv = poszv; w->poscv = poscv;
+  w->coordAcc = NULL; w->kdt = NULL;
+
+  // allocate kdtree array: kdtree points are cell vertices
+  E_Int nwalls = cntw.size(); w->nwalls = nwalls;
+  E_Int nptsmax = 0;
+  E_Int npts_local = 0;
+  vector< vector< vector<E_Int> > >& cVE_all = w->cVE_all;
+  vector<E_Int>& npts_walls_limit = w->npts_walls_limit;
+  for (E_Int v = 0; v < nwalls; v++)
+  {
+    nptsmax += fieldsw[v]->getSize();
+    #include "mininterf_ortho_npts_limit.h"
+  }
+  w->wallpts = new FldArrayF(nptsmax, 3);
+  w->lmax = new FldArrayF(nptsmax);
+  E_Float* xw2 = w->wallpts->begin(1);
+  E_Float* yw2 = w->wallpts->begin(2);
+  E_Float* zw2 = w->wallpts->begin(3);
+  E_Float* lmaxp = w->lmax->begin();
+
+  // create kdtree elements and bbtree information
+  E_Int nop = 0;
+  E_Int ind;
+  E_Float minB[3]; E_Float maxB[3];
+  for (E_Int now = 0; now < nwalls; now++)
+  {
+    FldArrayF* fieldv = fieldsw[now];
+    E_Float* xw = fieldv->begin(posxv[now]);
+    E_Float* yw = fieldv->begin(posyv[now]);
+    E_Float* zw = fieldv->begin(poszv[now]);
+    E_Float* cellnw = fieldv->begin(poscv[now]);
+    E_Int npts = fieldv->getSize();
+    FldArrayI& cnloc = *cntw[now];
+    E_Int nelts = cnloc.getSize(); E_Int nvert = cnloc.getNfld();
+    vector<BBox3DType*> boxes(nelts);
+    FldArrayF bbox(nelts, 6); // xmin, ymin, zmin, xmax, ymax, zmax
+    K_COMPGEOM::boundingBoxOfUnstrCells(cnloc, xw, yw, zw, bbox);
+    E_Float* xminp = bbox.begin(1); E_Float* xmaxp = bbox.begin(4);
+    E_Float* yminp = bbox.begin(2); E_Float* ymaxp = bbox.begin(5);
+    E_Float* zminp = bbox.begin(3); E_Float* zmaxp = bbox.begin(6);
+    FldArrayIS dejavu(npts); dejavu.setAllValuesAtNull();
+    short* dejavup = dejavu.begin();
+    for (E_Int et = 0; et < nelts; et++)
+    {
+      minB[0] = xminp[et]; minB[1] = yminp[et]; minB[2] = zminp[et];
+      maxB[0] = xmaxp[et]; maxB[1] = ymaxp[et]; maxB[2] = zmaxp[et];
+      boxes[et] = new BBox3DType(minB, maxB);
+      for (E_Int nov = 1; nov <= nvert; nov++)
+      {
+        ind = cnloc(et, nov)-1;
+        if (cellnw[ind] == 1. && dejavup[ind] == 0)
+        {
+          xw2[nop] = xw[ind]; yw2[nop] = yw[ind]; zw2[nop] = zw[ind];
+          lmaxp[nop] = K_FUNC::E_max(maxB[0]-minB[0], maxB[1]-minB[1], maxB[2]-minB[2]);
+          nop++; dejavup[ind] = 1;
+        }
+      }
+    }
+    w->boxes.push_back(boxes);
+  }
+  w->wallpts->reAllocMat(nop, 3); w->lmax->resize(nop);
+  if (nop == 0) return w;
+
+  // Build the kdtree
+  w->coordAcc = new ArrayAccessor<FldArrayF>(*w->wallpts, 1,2,3);
+  w->kdt = new KdTree<FldArrayF>(*w->coordAcc, E_EPSILON);
+
+  // Build the bbtrees
+  for (E_Int v = 0; v < nwalls; v++)
+    w->bbtrees.push_back(new K_SEARCH::BbTree3D(w->boxes[v]));
+  return w;
+}
+
+//=============================================================================
+void K_DIST2WALLS::deleteWallTree(WallTree* w)
+{
+  if (w == NULL) return;
+  delete w->kdt; delete w->coordAcc;
+  for (size_t v = 0; v < w->bbtrees.size(); v++) delete w->bbtrees[v];
+  for (size_t v0 = 0; v0 < w->boxes.size(); v0++)
+  {
+    vector<K_SEARCH::BoundingBox<3>*>& boxes = w->boxes[v0];
+    for (size_t v = 0; v < boxes.size(); v++) delete boxes[v];
+  }
+  delete w->wallpts; delete w->lmax;
+  if (w->owner)
+  {
+    for (E_Int v = 0; v < w->nwalls; v++)
+    { delete w->fieldsw[v]; delete w->cntw[v]; }
+  }
+  delete w;
+}
+
+//=============================================================================
+/* Distance ortho des points (xt,yt,zt) d'une zone aux parois de w.
+   IN: flagp: si non NULL, seuls les points de flag non nul sont calcules
+   IN/OUT: distancep: initialisee par l'appelant (E_INFINITE),
+   en sortie distance (et non son carre) */
+//=============================================================================
+void K_DIST2WALLS::computeOrthoDistZone(
+  WallTree& w, E_Int npts, E_Float* xt, E_Float* yt, E_Float* zt,
+  E_Float* flagp, E_Float* distancep, E_Int isIBM_F1, E_Float dTarget,
+  E_Int nthreads)
+{
+  if (nthreads < 1) nthreads = 1;
+  if (w.kdt != NULL)
+  {
+    // noms utilises par algoOrtho.h
+    KdTree<FldArrayF>& kdt = *w.kdt;
+    E_Int nwalls = w.nwalls; E_Int isminortho = w.isminortho;
+    vector<FldArrayF*>& fieldsw = w.fieldsw;
+    vector<FldArrayI*>& cntw = w.cntw;
+    vector<E_Int>& posxv = w.posxv; vector<E_Int>& posyv = w.posyv;
+    vector<E_Int>& poszv = w.poszv; vector<E_Int>& poscv = w.poscv;
+    vector<K_SEARCH::BbTree3D*>& vectOfBBTrees = w.bbtrees;
+    vector< vector< vector<E_Int> > >& cVE_all = w.cVE_all;
+    vector<E_Int>& npts_walls_limit = w.npts_walls_limit;
+    E_Float* xw2 = w.wallpts->begin(1);
+    E_Float* yw2 = w.wallpts->begin(2);
+    E_Float* zw2 = w.wallpts->begin(3);
+    E_Float* lmaxp = w.lmax->begin();
+
+    #pragma omp parallel num_threads(nthreads)
+    {
+      E_Float pt[3];
+      vector<E_Int> indicesBB; vector<E_Int> candidates;
+      E_Float minB[3]; E_Float maxB[3];
+      E_Int ret,vw;
+      E_Float dist, dx, dy, dz, xp, yp, zp, rx, ry, rz, rad;
+      E_Float distmin, prod;
+      E_Int et, ind10, indw2, nbb, nvert;
+      E_Int posxw, posyw, poszw, poscw;
+      E_Float A, rad2, alpha, R, xQ, yQ, zQ, rmax;
+      E_Float* xw; E_Float* yw; E_Float* zw; E_Float* cellnw;
+      E_Float p0[3]; E_Float p1[3]; E_Float p2[3]; E_Float p[3];
+
+      #pragma omp for schedule(dynamic)
+      for (E_Int ind = 0; ind < npts; ind++)
+      {
+        if (flagp != NULL && flagp[ind] == 0.) continue;
+        #include "algoOrtho.h"
+      }
+    }
+  }
+
+  // Computes the distance (sqrt)
+  #pragma omp parallel for num_threads(nthreads)
+  for (E_Int ind = 0; ind < npts; ind++)
+    distancep[ind] = sqrt(distancep[ind]);
+}
+
+//=============================================================================
+/* Mise a jour de la distance ortho d'une zone apres deplacement des parois.
+   IN: dold: distance precedente (eventuellement signee)
+   IN: band: les points de distance inferieure a band sont recalcules
+   IN: delta: deplacement maximal des parois depuis le calcul de dold
+   IN: rtol: tolerance relative sur l'encadrement des autres points
+   OUT: distancep: distance mise a jour */
+//=============================================================================
+void K_DIST2WALLS::updateOrthoDistZone(
+  WallTree& w, E_Int npts, E_Float* xt, E_Float* yt, E_Float* zt,
+  E_Float* flagp, E_Float* dold, E_Float* distancep,
+  E_Float band, E_Float delta, E_Float rtol,
+  E_Int isIBM_F1, E_Float dTarget, E_Int nthreads)
+{
+  if (nthreads < 1) nthreads = 1;
+  // recompute: 1 si le point est recalcule exactement
+  FldArrayF recompute(npts);
+  E_Float* rp = recompute.begin();
+  KdTree<FldArrayF>* kdt = w.kdt;
+
+  #pragma omp parallel num_threads(nthreads)
+  {
+    E_Float pt[3];
+    E_Float d0, dv, lo, hi, dist;
+    E_Int indw;
+    #pragma omp for
+    for (E_Int ind = 0; ind < npts; ind++)
+    {
+      distancep[ind] = K_CONST::E_INFINITE; rp[ind] = 1.;
+      if (flagp != NULL && flagp[ind] == 0.) { rp[ind] = 0.; continue; }
+      d0 = K_FUNC::E_abs(dold[ind]);
+      lo = d0-delta;
+      if (kdt == NULL || lo <= band) continue;
+      // borne sup : distance au sommet de paroi le plus proche
+      pt[0] = xt[ind]; pt[1] = yt[ind]; pt[2] = zt[ind];
+      indw = kdt->getClosest(pt, dist);
+      if (indw == IDX_NONE) continue;
+      dv = sqrt(dist);
+      hi = K_FUNC::E_min(d0+delta, dv);
+      if (hi-lo <= rtol*lo)
+      {
+        d0 = K_FUNC::E_min(d0, dv);
+        distancep[ind] = d0*d0; rp[ind] = 0.;
+      }
+    }
+  }
+  computeOrthoDistZone(w, npts, xt, yt, zt, rp, distancep,
+                       isIBM_F1, dTarget, nthreads);
+}
+
+//=============================================================================
+static void deleteWallTreeCapsule__(PyObject* capsule)
+{
+  K_DIST2WALLS::WallTree* w =
+    (K_DIST2WALLS::WallTree*)PyCapsule_GetPointer(capsule, "WallTree");
+  K_DIST2WALLS::deleteWallTree(w);
+}
+
+//=============================================================================
+/* Construit la structure de recherche sur les parois.
+   Les corps doivent etre en TRI avec le cellN aux noeuds.
+   Les parois sont copiees : la structure est independante des arrays. */
+//=============================================================================
+PyObject* K_DIST2WALLS::createWallTree(PyObject* self, PyObject* args)
+{
+  PyObject* bodiesC;
+  E_Int isminortho;
+  if (!PYPARSETUPLE_(args, O_ I_, &bodiesC, &isminortho)) return NULL;
+
+  if (PyList_Check(bodiesC) == 0)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "createWallTree: 1st argument must be a list.");
+    return NULL;
+  }
+  vector<E_Int> resl;
+  vector<char*> structVarString; vector<char*> unstrVarString;
+  vector<FldArrayF*> structF; vector<FldArrayF*> unstrF;
+  vector<E_Int> nit; vector<E_Int> njt; vector<E_Int> nkt;
+  vector<FldArrayI*> cnt;
+  vector<char*> eltTypeb;
+  vector<PyObject*> objs, obju;
+  E_Boolean skipNoCoord = true;
+  E_Boolean skipStructured = true;
+  E_Boolean skipUnstructured = false;
+  E_Boolean skipDiffVars = true;
+  K_ARRAY::getFromArrays(
+    bodiesC, resl, structVarString, unstrVarString,
+    structF, unstrF, nit, njt, nkt, cnt, eltTypeb, objs, obju,
+    skipDiffVars, skipNoCoord, skipStructured, skipUnstructured, true);
+  E_Int nwalls = unstrF.size();
+  if (nwalls == 0)
+  {
+    PyErr_SetString(PyExc_TypeError,"createWallTree: invalid list of surfaces.");
+    return NULL;
+  }
+
+  vector<E_Int> posxv; vector<E_Int> posyv; vector<E_Int> poszv;
+  vector<E_Int> poscv;
+  for (E_Int v = 0; v < nwalls; v++)
+  {
+    E_Int posxv0 = K_ARRAY::isCoordinateXPresent(unstrVarString[v]);
+    E_Int posyv0 = K_ARRAY::isCoordinateYPresent(unstrVarString[v]);
+    E_Int poszv0 = K_ARRAY::isCoordinateZPresent(unstrVarString[v]);
+    E_Int poscv0 = K_ARRAY::isCellNatureField2Present(unstrVarString[v]);
+    posxv0++; posxv.push_back(posxv0);
+    posyv0++; posyv.push_back(posyv0);
+    poszv0++; poszv.push_back(poszv0);
+    poscv0++; poscv.push_back(poscv0);
+    if (poscv0 == 0)
+    {
+      PyErr_SetString(PyExc_TypeError, "createWallTree: cellN must be defined for bodies.");
+      for (E_Int nos = 0; nos < nwalls; nos++)
+        RELEASESHAREDU(obju[nos], unstrF[nos], cnt[nos]);
+      return NULL;
+    }
+  }
+
+  // copie des parois
+  vector<FldArrayF*> fieldsw(nwalls); vector<FldArrayI*> cntw(nwalls);
+  for (E_Int v = 0; v < nwalls; v++)
+  {
+    fieldsw[v] = new FldArrayF(*unstrF[v]);
+    cntw[v] = new FldArrayI(*cnt[v]);
+    RELEASESHAREDU(obju[v], unstrF[v], cnt[v]);
+  }
+
+  WallTree* w;
+  Py_BEGIN_ALLOW_THREADS
+  w = buildWallTree(posxv, posyv, poszv, poscv, fieldsw, cntw,
+                    isminortho, true);
+  Py_END_ALLOW_THREADS
+  return PyCapsule_New((void*)w, "WallTree", deleteWallTreeCapsule__);
+}
+
+//=============================================================================
+/* Distance ortho d'une zone aux parois d'une structure createWallTree.
+   IN: array: zone en noeuds (coordonnees)
+   IN: flag: numpy (aux points de calcul) ou None
+   IN: loc: 0: distance aux noeuds, 1: distance aux centres (les centres
+   sont calcules a la volee)
+   IN: nthreads: nombre de threads openMP pour cette zone
+   IN: dold: distance precedente (numpy aux points de calcul) ou None.
+   Si dold est fourni, mise a jour incrementale (band, delta, rtol, 
+   cf updateOrthoDistZone)
+   Le GIL est relache pendant le calcul. */
+//=============================================================================
+PyObject* K_DIST2WALLS::distance2WallsOrthoZone(PyObject* self, PyObject* args)
+{
+  PyObject *wallTree, *array, *flag, *distOld;
+  E_Int loc, isIBM_F1, nthreads;
+  E_Float dTarget, band, delta, rtol;
+  if (!PYPARSETUPLE_(args, OOO_ II_ R_ I_ O_ RRR_, &wallTree, &array, &flag,
+                     &loc, &isIBM_F1, &dTarget, &nthreads,
+                     &distOld, &band, &delta, &rtol)) return NULL;
+
+  if (PyCapsule_IsValid(wallTree, "WallTree") == 0)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "distance2Walls: invalid wall tree.");
+    return NULL;
+  }
+  WallTree* w = (WallTree*)PyCapsule_GetPointer(wallTree, "WallTree");
+
+  E_Int ni, nj, nk;
+  char* varString; char* eltType;
+  FldArrayF* f; FldArrayI* cn;
+  E_Int res = K_ARRAY::getFromArray3(array, varString, f, ni, nj, nk,
+                                     cn, eltType);
+  if (res != 1 && res != 2)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "distance2Walls: array is invalid.");
+    return NULL;
+  }
+  E_Int posx = K_ARRAY::isCoordinateXPresent(varString);
+  E_Int posy = K_ARRAY::isCoordinateYPresent(varString);
+  E_Int posz = K_ARRAY::isCoordinateZPresent(varString);
+  if (posx == -1 || posy == -1 || posz == -1)
+  {
+    RELEASESHAREDB(res, array, f, cn);
+    PyErr_SetString(PyExc_TypeError,
+                    "distance2Walls: coordinates not found in array.");
+    return NULL;
+  }
+  posx++; posy++; posz++;
+
+  // Taille du champ de distance
+  E_Int api = f->getApi();
+  E_Int nil = ni, njl = nj, nkl = nk;
+  E_Int ncells = f->getSize();
+  char* eltType2 = NULL;
+  if (res == 1 && loc == 1)
+  {
+    if (ni == 1 && nj == 1) { nil = nk-1; nkl = 1; }
+    else if (ni == 1 && nk == 1) { nil = nj-1; njl = 1; }
+    else
+    {
+      if (ni != 1) nil = ni-1;
+      if (nj != 1) njl = nj-1;
+      if (nk != 1) nkl = nk-1;
+    }
+    ncells = nil*njl*nkl;
+  }
+  else if (res == 2)
+  {
+    eltType2 = new char[K_ARRAY::VARSTRINGLENGTH];
+    if (loc == 1)
+    {
+      K_ARRAY::starVarString(eltType, eltType2);
+      if (strcmp(eltType, "NGON") == 0) ncells = cn->getNElts();
+      else if (strcmp(eltType, "NODE") != 0)
+      {
+        ncells = 0;
+        E_Int nc = cn->getNConnect();
+        for (E_Int ic = 0; ic < nc; ic++) ncells += cn->getConnect(ic)->getSize();
+      }
+    }
+    else strcpy(eltType2, eltType);
+  }
+
+  E_Float* flagp = NULL; E_Int sizef = 0;
+  if (flag != Py_None)
+  {
+    E_Int ok = K_NUMPY::getFromNumpyArray(flag, flagp, sizef, true);
+    if (ok == 0 || sizef != ncells)
+    {
+      if (ok != 0) Py_DECREF(flag);
+      RELEASESHAREDB(res, array, f, cn); delete [] eltType2;
+      PyErr_SetString(PyExc_TypeError,
+                      "distance2Walls: flag must be a numpy of the size of the distance field.");
+      return NULL;
+    }
+  }
+
+  E_Float* dold = NULL; E_Int sized = 0;
+  if (distOld != Py_None)
+  {
+    E_Int ok = K_NUMPY::getFromNumpyArray(distOld, dold, sized, true);
+    if (ok == 0 || sized != ncells)
+    {
+      if (ok != 0) Py_DECREF(distOld);
+      if (flagp != NULL) Py_DECREF(flag);
+      RELEASESHAREDB(res, array, f, cn); delete [] eltType2;
+      PyErr_SetString(PyExc_TypeError,
+                      "distance2Walls: previous distance must be a numpy of the size of the distance field.");
+      return NULL;
+    }
+  }
+
+  FldArrayF* distance = new FldArrayF(ncells);
+  E_Int ret = 1;
+  Py_BEGIN_ALLOW_THREADS
+  distance->setAllValuesAt(K_CONST::E_INFINITE);
+  E_Float* xt = f->begin(posx);
+  E_Float* yt = f->begin(posy);
+  E_Float* zt = f->begin(posz);
+  FldArrayF* centers = NULL;
+  if (loc == 1 && (res == 1 || strcmp(eltType, "NODE") != 0))
+  {
+    // centres de la zone (buffer temporaire)
+    E_Int npts = f->getSize();
+    FldArrayF coords(npts, 3);
+    E_Float* cx = coords.begin(1); E_Float* cy = coords.begin(2); E_Float* cz = coords.begin(3);
+    for (E_Int i = 0; i < npts; i++) { cx[i] = xt[i]; cy[i] = yt[i]; cz[i] = zt[i]; }
+    centers = new FldArrayF(ncells, 3);
+    if (res == 1) ret = K_LOC::node2centerStruct(coords, ni, nj, nk, -1, 0, *centers);
+    else if (strcmp(eltType, "NGON") == 0) ret = K_LOC::node2centerNGon(coords, *cn, *centers);
+    else ret = K_LOC::node2centerUnstruct(coords, *cn, -1, 0, *centers);
+    xt = centers->begin(1); yt = centers->begin(2); zt = centers->begin(3);
+  }
+  if (ret != 0 && dold != NULL)
+    updateOrthoDistZone(*w, ncells, xt, yt, zt, flagp, dold, distance->begin(),
+                        band, delta, rtol, isIBM_F1, dTarget, nthreads);
+  else if (ret != 0)
+    computeOrthoDistZone(*w, ncells, xt, yt, zt, flagp, distance->begin(),
+                         isIBM_F1, dTarget, nthreads);
+  delete centers;
+  Py_END_ALLOW_THREADS
+
+  if (flagp != NULL) Py_DECREF(flag);
+  if (dold != NULL) Py_DECREF(distOld);
+  if (ret == 0)
+  {
+    delete distance; delete [] eltType2; RELEASESHAREDB(res, array, f, cn);
+    PyErr_SetString(PyExc_ValueError,
+                    "distance2Walls: centers computation failed.");
+    return NULL;
+  }
+
+  PyObject* tpl;
+  if (res == 1)
+    tpl = K_ARRAY::buildArray3(*distance, "TurbulentDistance",
+                               nil, njl, nkl, api);
+  else
+    tpl = K_ARRAY::buildArray3(*distance, "TurbulentDistance", *cn,
+                               eltType2, api);
+  delete distance; delete [] eltType2;
+  RELEASESHAREDB(res, array, f, cn);
+  return tpl;
+}
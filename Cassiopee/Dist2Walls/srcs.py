@@ -5,6 +5,7 @@ cpp_srcs = ["Dist2Walls/distance2walls.cpp",
             "Dist2Walls/distance2walls_signed.cpp",
             "Dist2Walls/distance2walls_ortho.cpp",
             "Dist2Walls/distance2walls_orthosigned.cpp",
+            "Dist2Walls/wallTree.cpp",
             "Dist2Walls/Eikonal/eikonal.cpp",
             "Dist2Walls/Eikonal/eikonalSolver.cpp",
             "Dist2Walls/Eikonal/eikonalFMMSolver.cpp",
@@ -0,0 +1,13 @@
+# - createWallTree (pyTree) -
+import Dist2Walls.PyTree as DW
+import Generator.PyTree as G
+import Converter.PyTree as C
+import Geom.PyTree as D
+
+sphere = D.sphere((1.2,0.,0.), 0.2, 100)
+wt = DW.createWallTree(sphere)
+a = G.cart((0.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+b = G.cart((-1.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+t = C.newPyTree(['Base',a,b])
+t = DW.distance2Walls(t, sphere, wallTree=wt, threads=2)
+C.convertPyTree2File(t, 'out.cgns')
@@ -0,0 +1,27 @@
+# - createWallTree (pyTree) -
+import KCore.test as test
+import Dist2Walls.PyTree as DW
+import Generator.PyTree as G
+import Converter.PyTree as C
+import Geom.PyTree as D
+
+sphere = D.sphere((1.2,0.,0.), 0.2, 30)
+a = G.cart((0.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+b = G.cartHexa((-1.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+t = C.newPyTree(['Base',a,b])
+
+# reference: appel global
+t1 = DW.distance2Walls(t, sphere, type='ortho', loc='centers')
+
+# zones en parallele avec structure de parois reutilisee
+wt = DW.createWallTree(sphere, type='ortho')
+t2 = DW.distance2Walls(t, sphere, type='ortho', loc='centers', wallTree=wt, threads=2)
+test.testT(t2, 1)
+d1 = C.getField('centers:TurbulentDistance', t1)
+d2 = C.getField('centers:TurbulentDistance', t2)
+for c in range(len(d1)):
+    test.testO(abs(d1[c][1]-d2[c][1]).max() < 1.e-12, 2+c)
+
+# aux noeuds, meme structure
+t2 = DW.distance2Walls(t, sphere, type='ortho', loc='nodes', wallTree=wt)
+test.testT(t2, 4)
@@ -0,0 +1,15 @@
+# - updateDistance2Walls (pyTree) -
+import Dist2Walls.PyTree as DW
+import Generator.PyTree as G
+import Converter.PyTree as C
+import Geom.PyTree as D
+import Transform.PyTree as T
+
+a = G.cart((0.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+sphere = D.sphere((1.2,0.,0.), 0.2, 100)
+t = C.newPyTree(['Base',a])
+DW._distance2Walls(t, sphere)
+# deplacement du corps
+sphere2 = T.translate(sphere, (0.05,0.,0.))
+t = DW.updateDistance2Walls(t, sphere2, sphere)
+C.convertPyTree2File(t, 'out.cgns')
@@ -0,0 +1,31 @@
+# - updateDistance2Walls (pyTree) -
+import KCore.test as test
+import Dist2Walls.PyTree as DW
+import Generator.PyTree as G
+import Converter.PyTree as C
+import Geom.PyTree as D
+import Transform.PyTree as T
+
+sphere = D.sphere((1.2,0.,0.), 0.2, 30)
+a = G.cart((0.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+b = G.cartHexa((-1.,0.,0.), (0.1,0.1,0.1), (10,10,10))
+t = C.newPyTree(['Base',a,b])
+DW._distance2Walls(t, sphere, type='ortho', loc='centers')
+
+# deplacement du corps
+sphere2 = T.translate(sphere, (0.05,0.,0.))
+# reference : calcul complet
+t1 = DW.distance2Walls(t, sphere2, type='ortho', loc='centers')
+
+# mise a jour incrementale (corps avant mouvement)
+t2 = DW.updateDistance2Walls(t, sphere2, sphere, type='ortho', loc='centers', rtol=1.e-2)
+test.testT(t2, 1)
+d1 = C.getField('centers:TurbulentDistance', t1)
+d2 = C.getField('centers:TurbulentDistance', t2)
+for c in range(len(d1)):
+    err = abs(d1[c][1]-d2[c][1])/d1[c][1]
+    test.testO(err.max() <= 1.e-2, 2+c)
+
+# deplacement donne directement, bande de recalcul exacte
+t2 = DW.updateDistance2Walls(t, sphere2, 0.05, type='ortho', loc='centers', band=0.5, threads=2)
+test.testT(t2, 4)
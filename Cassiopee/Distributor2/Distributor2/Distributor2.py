@@ -100,3 +100,85 @@ def distribute(arrays, NProc, prescribed=None, perfo=None, weight=None, com=None
     out = distributor2.distribute(nbPts, setArrays, perfProcs, weight,
                                   volCom, volComd, NProc, algorithm)
     return out
+
+#==============================================================================
+# - rebalance -
+# Reequilibrage incremental a partir d'une distribution existante.
+# Les blocs sont deplaces un par un du proc le plus charge vers le proc le
+# moins charge (le bloc qui diminue le plus la charge max de la paire),
+# tant que le volume de donnees migrees reste inferieur a maxMigration.
+# IN: costs: cout mesure de chaque bloc (temps solveur par exemple)
+# IN: procs: proc actuel de chaque bloc
+# IN: NProc: le nombre de processeurs (defaut: max(procs)+1)
+# IN: sizes: volume de donnees de chaque bloc (defaut: costs)
+# IN: prescribed: prescribed[i] >= 0 si le bloc i ne doit pas bouger
+# IN: maxMigration: volume max migre. Si float <= 1., fraction du volume
+# total, sinon volume absolu. None: pas de limite.
+# IN: tol: arret si (charge max-charge min) < tol*charge moyenne
+# OUT: dict: 'distrib': nouveau proc de chaque bloc,
+# 'moves': liste de (bloc, ancien proc, nouveau proc),
+# 'volume': volume migre, 'imbalance0'/'imbalance': charge max/moyenne-1
+# avant et apres
+#==============================================================================
+def rebalance(costs, procs, NProc=None, sizes=None, prescribed=None,
+              maxMigration=None, tol=0.):
+    """Rebalance an existing distribution with measured costs.
+    Usage: rebalance(costs, procs, NProc, sizes, prescribed, maxMigration)"""
+    Nb = len(costs)
+    if len(procs) != Nb:
+        raise ValueError("rebalance: costs and procs must have the same size.")
+    if NProc is None: NProc = max(procs)+1
+    if NProc <= 0:
+        raise ValueError("rebalance: can not distribute on %d (<=0) processors."%NProc)
+    if sizes is None: sizes = costs
+    costs = [float(c) for c in costs]
+    orig = [int(p) for p in procs]
+    for p in orig:
+        if p < 0 or p >= NProc:
+            raise ValueError("rebalance: invalid proc %d in procs."%p)
+
+    volTot = float(sum(sizes))
+    if maxMigration is None: cap = volTot
+    elif isinstance(maxMigration, float) and maxMigration <= 1.: cap = maxMigration*volTot
+    else: cap = float(maxMigration)
+
+    loads = numpy.zeros((NProc), dtype=numpy.float64)
+    for i in range(Nb): loads[orig[i]] += costs[i]
+    mean = loads.sum()/NProc
+    imbalance0 = 0.
+    if mean > 0.: imbalance0 = loads.max()/mean-1.
+
+    # blocs deplacables de chaque proc
+    blocks = [[] for p in range(NProc)]
+    for i in range(Nb):
+        if prescribed is not None and prescribed[i] >= 0: continue
+        blocks[orig[i]].append(i)
+
+    new = list(orig)
+    used = 0.
+    for it in range(Nb*NProc+1):
+        pmax = int(numpy.argmax(loads)); pmin = int(numpy.argmin(loads))
+        gap = loads[pmax]-loads[pmin]
+        if gap <= tol*mean or gap <= 0.: break
+        best = -1; bestMax = loads[pmax]; bestDv = 0.
+        for i in blocks[pmax]:
+            c = costs[i]
+            if c <= 0. or c >= gap: continue
+            # variation du volume migre
+            if new[i] == orig[i]: dv = sizes[i]
+            elif pmin == orig[i]: dv = -sizes[i]
+            else: dv = 0.
+            if used+dv > cap: continue
+            m = max(loads[pmax]-c, loads[pmin]+c)
+            if m < bestMax or (m == bestMax and best >= 0 and dv < bestDv):
+                best = i; bestMax = m; bestDv = dv
+        if best < 0: break
+        blocks[pmax].remove(best); blocks[pmin].append(best)
+        loads[pmax] -= costs[best]; loads[pmin] += costs[best]
+        new[best] = pmin; used += bestDv
+
+    moves = [(i, orig[i], new[i]) for i in range(Nb) if new[i] != orig[i]]
+    imbalance = 0.
+    if mean > 0.: imbalance = loads.max()/mean-1.
+    return {'distrib':new, 'moves':moves, 'volume':used,
+            'imbalance0':imbalance0, 'imbalance':imbalance}
@@ -7,16 +7,20 @@ from . import PyTree as D2
 #==============================================================================
 # redispatch
 # IN: graph: graph 'proc'
+# IN: alltoall: si True, echange en un seul alltoallv (ou par vagues
+# si maxMemory) avec des buffers numpy contigus
+# IN: maxMemory: taille max (octets) envoyee par proc et par vague (alltoall)
 #==============================================================================
-def redispatch(t, graph=None, verbose=0):
+def redispatch(t, graph=None, verbose=0, alltoall=False, maxMemory=0):
     """Redistribute tree from graph."""
     tp = Internal.copyRef(t)
-    _redispatch(tp, graph, verbose)
+    _redispatch(tp, graph, verbose, alltoall, maxMemory)
     return tp
 
-def _redispatch(t, graph=None, verbose=0):
+def _redispatch(t, graph=None, verbose=0, alltoall=False, maxMemory=0):
     """Redistribute tree from graph."""
     import copy
+    if alltoall: return _redispatchAlltoall__(t, graph, verbose, maxMemory)
 
     if graph is None: graph = Cmpi.computeGraph(t, type='proc')
 
@@ -36,16 +40,19 @@ def _redispatch(t, graph=None, verbose=0):
 
         nzonesMax = max(nzonesMax, len(Internal.getZones(t)))
 
+        parents = Internal.getParentMap(t)
+        removed = []
         for z in Internal.getZones(t):
             tag = Internal.getNodeFromName1(z, 'XZone')
             if tag is None:
                 proc = Cmpi.getProc(z)
-                if proc == (Cmpi.rank+i)%Cmpi.size:
-                    (p, c) = Internal.getParentOfNode(t, z)
-                    del p[2][c]
+                if proc == (Cmpi.rank+i)%Cmpi.size: removed.append(parents[id(z)])
             else: # remove node tag xzone
-                (p, c) = Internal.getParentOfNode(z, tag)
-                del p[2][c]
+                Internal._rmNodesByName1(z, 'XZone')
+        # remove sent zones (decreasing positions)
+        removed.sort(key=lambda e: e[1], reverse=True)
+        for (p, c) in removed: del p[2][c]
+        Internal.invalidateTreeIndex(t)
 
     if verbose > 0:
         nzones = len(Internal.getZones(t))
@@ -55,6 +62,187 @@ def _redispatch(t, graph=None, verbose=0):
 
     return None
 
+#==============================================================================
+# Reequilibrage incremental d'un arbre partiel (chaque proc a ses zones)
+# IN: costs: dict nom de zone -> cout mesure pour les zones locales
+# IN: maxMigration: volume max migre (cf Distributor2.PyTree.rebalance)
+# IN: redispatch: si True, les zones sont migrees (_redispatch)
+# Le plan est calcule de facon identique sur tous les procs.
+# OUT: stats (cf Distributor2.PyTree.rebalance)
+#==============================================================================
+def rebalance(t, costs, maxMigration=0.1, prescribed=None, mode='nodes',
+              redispatch=True, verbose=0, alltoall=False):
+    """Rebalance a distributed tree with measured zone costs."""
+    tp = Internal.copyRef(t)
+    out = _rebalance(tp, costs, maxMigration, prescribed, mode, redispatch, verbose, alltoall)
+    return tp, out
+
+def _rebalance(t, costs, maxMigration=0.1, prescribed=None, mode='nodes',
+               redispatch=True, verbose=0, alltoall=False):
+    """Rebalance a distributed tree with measured zone costs."""
+    import Converter.PyTree as C
+    zones = Internal.getZones(t)
+    local = []
+    for z in zones:
+        if mode == 'cells': size = C.getNCells(z)
+        else: size = C.getNPts(z)
+        local.append((z[0], Cmpi.rank, size, costs.get(z[0], None)))
+    allz = []
+    for l in Cmpi.allgather(local): allz += l
+    # ordre independant du nombre de procs
+    allz.sort(key=lambda x: x[0])
+    names = [a[0] for a in allz]
+    procs = [a[1] for a in allz]
+    sizes = [a[2] for a in allz]
+    acosts = {}
+    for a in allz:
+        if a[3] is not None: acosts[a[0]] = a[3]
+    out = D2.rebalanceData__(names, procs, sizes, acosts, Cmpi.size, maxMigration, prescribed)
+    news = {}
+    for (name, p0, p1) in out['moves']: news[name] = p1
+    for z in zones:
+        if z[0] in news: Cmpi._setProc(z, news[z[0]])
+    if verbose > 0 and Cmpi.rank == 0:
+        print("Info: rebalance: %d zones moved (volume %g), imbalance %g%% -> %g%%"%(len(out['moves']), out['volume'], 100*out['imbalance0'], 100*out['imbalance']))
+    if redispatch: _redispatch(t, out['graph'], verbose, alltoall)
+    return out
+
+#==============================================================================
+# redispatch en alltoallv
+# Les zones a envoyer sont serialisees dans des buffers numpy contigus
+# (Distributed.packInto__) et echangees en un alltoallv par vague. Les
+# vagues sont limitees a maxMemory octets envoyes et recus par proc (et 2Go
+# par contrainte MPI). Les zones envoyees sont supprimees apres chaque vague.
+#==============================================================================
+def _redispatchAlltoall__(t, graph=None, verbose=0, maxMemory=0):
+    import numpy
+    import Converter.Distributed as Distributed
+    if Cmpi.size == 1: return None
+    from mpi4py import MPI
+    rank = Cmpi.rank; size = Cmpi.size; comm = Cmpi.KCOMM
+
+    # zones a envoyer (dest, zone, parent)
+    parents = Internal.getParentMap(t)
+    zones = Internal.getZones(t)
+    removed = {} # zones locales a supprimer (proc != rank)
+    for z in zones:
+        proc = Cmpi.getProc(z)
+        if proc >= 0 and proc < size and proc != rank: removed[id(z)] = z
+    sends = []
+    if graph is None:
+        for z in zones:
+            if id(z) in removed and not Distributed.isZoneSkeleton__(z):
+                sends.append((Cmpi.getProc(z), z))
+    elif rank in graph:
+        byName = {}
+        for z in zones:
+            if z[0] not in byName: byName[z[0]] = z
+        g = graph[rank]
+        for dest in g:
+            if dest == rank: continue
+            for n in g[dest]: sends.append((dest, byName[n]))
+    sends.sort(key=lambda e: e[0])
+
+    # parents des zones seulement (ne garde pas de references sur les
+    # noeuds envoyes)
+    zoneParents = {}
+    for z in zones: zoneParents[id(z)] = parents[id(z)][0]
+    parents = None; zones = None; byName = None
+
+    # prepare les paquets (nom de la zone prefixe par le nom de sa base)
+    items = []
+    for (dest, z) in sends:
+        p = zoneParents[id(z)]
+        zp = [z[0], z[1], z[2], z[3]]
+        if p is not None and p[3] == 'CGNSBase_t': zp[0] = p[0]+'/'+z[0]
+        items.append((dest, z, Distributed.preparePack__(zp)))
+    sends = None
+
+    # decoupage en vagues (identique sur tous les procs) : chaque zone va
+    # dans la premiere vague ou les totaux envoyes par sa source et recus
+    # par sa destination restent inferieurs a cap
+    cap = 2**31-1
+    if maxMemory > 0: cap = min(cap, maxMemory)
+    allSizes = comm.allgather([(it[0], it[1][0], it[2][2]) for it in items])
+    sendW = []; recvW = []; myWaves = []
+    for src in range(size):
+        for (dest, name, s) in allSizes[src]:
+            if s > cap:
+                raise ValueError("redispatch: zone %s (%d bytes) on proc %d exceeds maxMemory (%d bytes)."%(name, s, src, cap))
+            w = 0
+            while w < len(sendW) and (sendW[w][src]+s > cap or recvW[w][dest]+s > cap): w += 1
+            if w == len(sendW):
+                sendW.append(numpy.zeros(size, dtype=numpy.int64))
+                recvW.append(numpy.zeros(size, dtype=numpy.int64))
+            sendW[w][src] += s; recvW[w][dest] += s
+            if src == rank: myWaves.append(w)
+    nwaves = len(sendW)
+    waves = [[] for w in range(nwaves)]
+    for it, w in zip(items, myWaves): waves[w].append(it) # ordre par dest conserve
+    items = None; allSizes = None; sendW = None; recvW = None; myWaves = None
+
+    peak = 0
+    for w in range(nwaves):
+        wave = waves[w]; waves[w] = None
+        sendCounts = numpy.zeros(size, dtype=numpy.int64)
+        for (dest, z, prep) in wave: sendCounts[dest] += prep[2]
+        sendBuf = numpy.empty(int(sendCounts.sum()), dtype=numpy.uint8)
+        off = 0
+        for (dest, z, prep) in wave: off = Distributed.packInto__(sendBuf, off, prep)
+        recvCounts = numpy.zeros(size, dtype=numpy.int64)
+        comm.Alltoall(sendCounts, recvCounts)
+        recvBuf = numpy.empty(int(recvCounts.sum()), dtype=numpy.uint8)
+        sendDispls = numpy.zeros(size, dtype=numpy.int64); sendDispls[1:] = numpy.cumsum(sendCounts)[:-1]
+        recvDispls = numpy.zeros(size, dtype=numpy.int64); recvDispls[1:] = numpy.cumsum(recvCounts)[:-1]
+        comm.Alltoallv([sendBuf, (sendCounts.tolist(), sendDispls.tolist()), MPI.BYTE],
+                       [recvBuf, (recvCounts.tolist(), recvDispls.tolist()), MPI.BYTE])
+        peak = max(peak, sendBuf.size+recvBuf.size)
+        del sendBuf
+
+        # supprime les zones envoyees
+        sent = {}
+        for (dest, z, prep) in wave:
+            if id(z) in removed: sent[id(z)] = z; del removed[id(z)]
+        rmZones__(zoneParents, sent)
+        sent = None; wave = None
+
+        # ajoute les zones recues (vues sur recvBuf)
+        for z in Distributed.unpackNodes__(recvBuf):
+            ret = z[0].split('/', 1)
+            if len(ret) == 2:
+                z[0] = ret[1]
+                base = Internal.getNodeFromName1(t, ret[0])
+                if base is None: base = Internal.newCGNSBase(ret[0], parent=t)
+                base[2].append(z)
+            else:
+                bases = Internal.getBases(t)
+                bases[0][2].append(z)
+        Internal.invalidateTreeIndex(t)
+
+    # supprime les zones restantes attribuees a d'autres procs
+    rmZones__(zoneParents, removed)
+    Internal.invalidateTreeIndex(t)
+
+    if verbose > 0:
+        import resource
+        nzones = len(Internal.getZones(t))
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss/1024.
+        Cmpi.barrier()
+        print("Info: _redispatch: proc {} has {} zones ({} waves, max exchanged {:2.2f} MB, peak RSS {:2.2f} MB)".format(rank, nzones, nwaves, peak/1048576., rss))
+        Cmpi.barrier()
+    return None
+
+# Supprime de leurs parents les zones de removed (dict id -> zone)
+def rmZones__(zoneParents, removed):
+    if not removed: return None
+    ps = {}
+    for i in removed:
+        p = zoneParents[i]
+        if p is not None: ps[id(p)] = p
+    for p in ps.values():
+        p[2][:] = [n for n in p[2] if id(n) not in removed]
+    return None
+
 def redispatch_old(t, graph=None):
     """Redistribute tree from graph."""
     tp = Internal.copyRef(t)
@@ -69,13 +257,15 @@ def _redispatch_old(t, graph=None):
     Cmpi._addXZones(t, graph)
     # Enleve les zones envoyees
     zones = Internal.getZones(t)
+    parents = Internal.getParentMap(t)
+    removed = []
     for z in zones:
         tag = Internal.getNodeFromName1(z, 'XZone')
         if tag is None:
-            if procs[z[0]] != Cmpi.rank:
-                (p, c) = Internal.getParentOfNode(t, z)
-                del p[2][c]
+            if procs[z[0]] != Cmpi.rank: removed.append(parents[id(z)])
         else: # enleve le noeud tag XZone
-            (p, c) = Internal.getParentOfNode(z, tag)
-            del p[2][c]
+            Internal._rmNodesByName1(z, 'XZone')
+    removed.sort(key=lambda e: e[1], reverse=True)
+    for (p, c) in removed: del p[2][c]
+    Internal.invalidateTreeIndex(t)
     return None
@@ -3,6 +3,7 @@
 import Distributor2
 import Converter.Internal as Internal
 import Converter.PyTree as C
+import Converter.Distributed as Distributed
 import Generator as G
 import numpy
 __version__ = Distributor2.__version__
@@ -264,6 +265,66 @@ def getData__(t, NProc, prescribed=None, weight=None, useCom='match', mode='node
                     addCom__(comd, mdict[zname], mdict[oppname], Nb, 1)
     return (nbPts, aset, com, comd, weightlist)
 
+#==============================================================================
+# Reequilibrage incremental de t (pyTree) a partir des procs actuels
+# IN: costs: dict nom de zone -> cout mesure (temps solveur par exemple).
+# Les zones sans cout sont estimees au prorata de leur nombre de points.
+# IN: NProc: nombre de procs (defaut: max des procs+1)
+# IN: maxMigration: volume max migre (cf Distributor2.rebalance). Le volume
+# d'une zone est son nombre de points (mode='nodes') ou de cellules.
+# IN: prescribed: dict des zones qui ne doivent pas bouger (nom -> proc)
+# OUT: stats: 'distrib', 'moves' [(nom de zone, ancien proc, nouveau proc)],
+# 'graph': graph 'proc' des migrations (pour Distributor2.Mpi._redispatch),
+# 'volume', 'imbalance0', 'imbalance'
+#==============================================================================
+def rebalance(t, costs, NProc=None, maxMigration=0.1, prescribed=None, mode='nodes'):
+    """Rebalance a distributed pyTree with measured zone costs.
+    Usage: rebalance(t, costs, NProc, maxMigration, prescribed, mode)"""
+    tp = Internal.copyRef(t)
+    out = _rebalance(tp, costs, NProc=NProc, maxMigration=maxMigration,
+                     prescribed=prescribed, mode=mode)
+    return tp, out
+
+def _rebalance(t, costs, NProc=None, maxMigration=0.1, prescribed=None, mode='nodes'):
+    """Rebalance a distributed pyTree with measured zone costs."""
+    zones = Internal.getZones(t)
+    names = []; procs = []; sizes = []
+    for z in zones:
+        names.append(z[0])
+        procs.append(getProc(z))
+        if mode == 'cells': sizes.append(C.getNCells(z))
+        else: sizes.append(C.getNPts(z))
+    out = rebalanceData__(names, procs, sizes, costs, NProc, maxMigration, prescribed)
+    for c, z in enumerate(zones):
+        if out['distrib'][c] != procs[c]: Distributed._setProc(z, out['distrib'][c])
+    return out
+
+# Reequilibrage a partir des listes des zones (noms, procs, volumes)
+def rebalanceData__(names, procs, sizes, costs, NProc=None, maxMigration=0.1, prescribed=None):
+    for c, p in enumerate(procs):
+        if p < 0: raise ValueError("rebalance: zone %s has no proc."%names[c])
+    # estimation des couts non mesures
+    cm = 0.; sm = 0
+    for c, n in enumerate(names):
+        if n in costs: cm += costs[n]; sm += sizes[c]
+    if sm > 0: ratio = cm/sm
+    else: ratio = 1.
+    zcosts = []
+    for c, n in enumerate(names): zcosts.append(costs.get(n, sizes[c]*ratio))
+    aset = None
+    if prescribed is not None: aset = [prescribed.get(n, -1) for n in names]
+
+    out = Distributor2.rebalance(zcosts, procs, NProc=NProc, sizes=sizes,
+                                 prescribed=aset, maxMigration=maxMigration)
+    moves = []; graph = {}
+    for (i, p0, p1) in out['moves']:
+        moves.append((names[i], p0, p1))
+        if p0 not in graph: graph[p0] = {}
+        if p1 not in graph[p0]: graph[p0][p1] = []
+        graph[p0][p1].append(names[i])
+    out['moves'] = moves; out['graph'] = graph
+    return out
+
 #==============================================================================
 # Retourne le dictionnaire proc['blocName']
 # a partir d'un arbre distribue contenant des noeuds proc
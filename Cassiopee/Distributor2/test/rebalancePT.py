@@ -0,0 +1,25 @@
+# - rebalance (pyTree) -
+import Generator.PyTree as G
+import Distributor2.PyTree as D2
+import Converter.PyTree as C
+import Converter.Internal as Internal
+import Connector.PyTree as X
+
+N = 11
+t = C.newPyTree(['Base'])
+pos = 0
+for i in range(N):
+    a = G.cart((pos,0,0), (1,1,1), (10+i, 10, 10))
+    pos += 10 + i - 1
+    t[2][1][2].append(a)
+t = X.connectMatch(t)
+t, stats = D2.distribute(t, 3)
+
+# measured costs (zone 0 is twice slower)
+costs = {}
+for z in Internal.getZones(t): costs[z[0]] = C.getNPts(z)*1.e-6
+z0 = Internal.getZones(t)[0][0]
+costs[z0] *= 2.
+t, stats = D2.rebalance(t, costs, maxMigration=0.2)
+print(stats['moves'], stats['imbalance0'], stats['imbalance'])
+C.convertPyTree2File(t, 'out.cgns')
@@ -0,0 +1,39 @@
+# - rebalance (pyTree) -
+import Generator.PyTree as G
+import Distributor2.PyTree as D2
+import Converter.PyTree as C
+import Converter.Internal as Internal
+import KCore.test as test
+
+N = 20
+t = C.newPyTree(['Base'])
+pos = 0
+for i in range(N):
+    a = G.cart((pos,0,0), (1,1,1), (10+i, 10, 10))
+    pos += 10 + i - 1
+    t[2][1][2].append(a)
+t, stats = D2.distribute(t, 4, algorithm='fast')
+
+# Le proc 0 est deux fois plus lent
+costs = {}
+for z in Internal.getZones(t):
+    costs[z[0]] = C.getNPts(z)*1.e-6
+    if D2.getProc(z) == 0: costs[z[0]] *= 2.
+
+# Sans limite
+t2, stats = D2.rebalance(t, costs, maxMigration=None)
+test.testT(t2, 1)
+test.testO(stats['moves'], 2)
+assert stats['imbalance'] <= stats['imbalance0']
+
+# Migration limitee a 5% des points
+t2, stats = D2.rebalance(t, costs, maxMigration=0.05)
+test.testO(stats['moves'], 3)
+npts = 0
+for z in Internal.getZones(t): npts += C.getNPts(z)
+assert stats['volume'] <= 0.05*npts
+
+# Zones imposees
+prescribed = {Internal.getZones(t)[0][0]:0}
+t2, stats = D2.rebalance(t, costs, prescribed=prescribed, maxMigration=None)
+test.testO(stats['graph'], 4)
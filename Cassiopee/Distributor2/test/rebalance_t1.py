@@ -0,0 +1,18 @@
+# - rebalance (array) -
+import Distributor2 as D2
+import KCore.test as test
+
+# 40 blocs sur 4 procs, proc 0 deux fois plus lent
+costs = []; procs = []
+for i in range(40):
+    procs.append(i%4)
+    c = 1.+(i%7)
+    if i%4 == 0: c *= 2.
+    costs.append(c)
+
+out = D2.rebalance(costs, procs, NProc=4)
+test.testO(out, 1)
+out = D2.rebalance(costs, procs, NProc=4, maxMigration=0.05)
+test.testO(out, 2)
+out = D2.rebalance(costs, procs, NProc=4, maxMigration=3)
+test.testO(out, 3)
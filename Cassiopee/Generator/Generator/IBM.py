@@ -13,8 +13,10 @@ import Converter.GhostCells as CGC
 import Connector.PyTree as X
 import Converter.Mpi as Cmpi
 import Converter.Filter as Filter
+import Transform
 import numpy
 import math
+import itertools
 
 EPSCART = 1.e-6
 
@@ -431,7 +433,7 @@ def mergeByParent__(zones, parent, sizeMax):
     return res
 
 # only in generateIBMMesh and generateCartMesh__
-def octree2StructLoc__(o, parento=None, vmin=15, ext=0, optimized=0, sizeMax=4e6, tbOneOver=None):
+def octree2StructLoc__(o, parento=None, vmin=15, ext=0, optimized=0, sizeMax=4e6, tbOneOver=None, bbox=None):
     sizeMax=int(sizeMax)
     dim = Internal.getZoneDim(o)
     if dim[3] == 'QUAD': dimPb = 2
@@ -644,8 +646,9 @@ def octree2StructLoc__(o, parento=None, vmin=15, ext=0, optimized=0, sizeMax=4e6
             zones = X.connectNearMatch(zones,ratio=ratio0,dim=dimPb)
         return zones
     else:
-        bbox0 = G.bbox(o)
-        _addBCOverlaps(zones, bbox0)
+        # bbox de l'octree complet si o est reparti
+        if bbox is None: bbox = G.bbox(o)
+        _addBCOverlaps(zones, bbox)
     return zones
 
 # only in generateIBMMesh and generateIBMMesh
@@ -691,7 +694,7 @@ def buildParentOctrees__(o, tb, dimPb=3, vmin=15, snears=0.01, snearFactor=1., d
 # main function
 def generateIBMMesh(tb, dimPb=3, vmin=15, snears=0.01, dfars=10., dfarDir=0,
                     tbox=None, snearsf=None, check=False, to=None,
-                    ext=2, optimized=1, expand=3, octreeMode=0):
+                    ext=2, optimized=1, expand=3, octreeMode=0, distributed=False):
     """Generates the full Cartesian mesh for IBMs."""
     import KCore.test as test
     # refinementSurfFile: surface meshes describing refinement zones
@@ -713,7 +716,7 @@ def generateIBMMesh(tb, dimPb=3, vmin=15, snears=0.01, dfars=10., dfarDir=0,
         tbox        = Internal.rmNodesByName(Internal.rmNodesByName(tbox, '*OneOver*'), '*KeepF1*')
         if len(Internal.getBases(tbox))==0: tbox=None
 
-    # Octree identical on all procs
+    # Octree identical on all procs (distributed: local part of the octree)
     if to is not None:
         if isinstance(to, str):
             o = C.convertFile2PyTree(to)
@@ -723,12 +726,15 @@ def generateIBMMesh(tb, dimPb=3, vmin=15, snears=0.01, dfars=10., dfarDir=0,
         parento = None
     else:
         o = buildOctree(tb, dimPb=dimPb, vmin=vmin, snears=snears, snearFactor=1., dfars=dfars, dfarDir=dfarDir,
-                        tbox=tbox, snearsf=snearsf, to=to, expand=expand, octreeMode=octreeMode)
+                        tbox=tbox, snearsf=snearsf, to=to, expand=expand, octreeMode=octreeMode, distributed=distributed)
+    if to is not None: distributed = False
 
     # build parent octree 3 levels higher
     # returns a list of 4 octants of the parent octree in 2D and 8 in 3D
-    parento = buildParentOctrees__(o, tb, dimPb=dimPb, vmin=vmin, snears=snears, snearFactor=4., dfars=dfars, dfarDir=dfarDir,
-                                   tbox=tbox, snearsf=snearsf, to=to, octreeMode=octreeMode)
+    if distributed: parento = None
+    else:
+        parento = buildParentOctrees__(o, tb, dimPb=dimPb, vmin=vmin, snears=snears, snearFactor=4., dfars=dfars, dfarDir=dfarDir,
+                                       tbox=tbox, snearsf=snearsf, to=to, octreeMode=octreeMode)
 
     # adjust the extent of the box defining the symmetry plane if in tb
     baseSYM = Internal.getNodeFromName1(tb,"SYM")
@@ -748,7 +754,7 @@ def generateIBMMesh(tb, dimPb=3, vmin=15, snears=0.01, dfars=10., dfarDir=0,
 
         if octreeMode==1:
             Internal._rmNodesFromType(baseSYM,"Zone_t")
-            [xmin,ymin,zmin,xmax,ymax,zmax] = G.bbox(o)
+            [xmin,ymin,zmin,xmax,ymax,zmax] = getOctreeBBox__(o, distributed)
             L = 0.5*(xmax+xmin); eps = 0.2*L
             xmin = xmin-eps; ymin = ymin-eps; zmin = zmin-eps
             xmax = xmax+eps; ymax = ymax+eps; zmax = zmax+eps
@@ -767,17 +773,21 @@ def generateIBMMesh(tb, dimPb=3, vmin=15, snears=0.01, dfars=10., dfarDir=0,
             to = P.selectCells(to,'{centers:cellN}>0.')
             o = Internal.getZones(to)[0]
 
-    if Cmpi.rank==0 and check: C.convertPyTree2File(o, 'octree.cgns')
+    if check:
+        if distributed: C.convertPyTree2File(o, 'octree%d.cgns'%Cmpi.rank)
+        elif Cmpi.rank == 0: C.convertPyTree2File(o, 'octree.cgns')
 
     # Split octree
-    bb = G.bbox(o)
+    bb = getOctreeBBox__(o, distributed)
     NPI = Cmpi.size
+    bbp = None
     if NPI == 1: p = Internal.copyRef(o) # keep reference
+    elif distributed: p = Internal.copyRef(o); bbp = bb
     else: p = T.splitNParts(o, N=NPI, recoverBC=False)[Cmpi.rank]
     del o
 
     # fill vmin + merge in parallel
-    res = octree2StructLoc__(p, vmin=vmin, ext=-1, optimized=0, parento=parento, sizeMax=1000000, tbOneOver=tbOneOverF1)
+    res = octree2StructLoc__(p, vmin=vmin, ext=-1, optimized=0, parento=parento, sizeMax=1000000, tbOneOver=tbOneOverF1, bbox=bbp)
     del p
     if parento is not None:
         for po in parento: del po
@@ -881,6 +891,13 @@ def generateIBMMesh(tb, dimPb=3, vmin=15, snears=0.01, dfars=10., dfarDir=0,
 
     return t
 
+# bbox de l'octree (globale si l'octree est reparti)
+def getOctreeBBox__(o, distributed=False):
+    if distributed:
+        from . import Mpi as Gmpi
+        return Gmpi.bbox(o)
+    return G.bbox(o)
+
 # alias generateIBMMesh new version
 generateIBMMeshPara = generateIBMMesh
 #==============================================================================
@@ -902,7 +919,7 @@ generateIBMMeshPara = generateIBMMesh
 #   t (tree): mesh Tree
 #==============================================================================
 # only in buildOctree
-def addRefinementZones__(o, tb, tbox, snearsf, vmin, dim):
+def addRefinementZones__(o, tb, tbox, snearsf, vmin, dim, volmin=None):
     tbSolid = Internal.rmNodesByName(tb, 'IBCFil*')
     if dim == 2:
         tbSolid = T.addkplane(tbSolid)
@@ -934,8 +951,10 @@ def addRefinementZones__(o, tb, tbox, snearsf, vmin, dim):
     to = C.newPyTree(['Base', o])
     end = 0
     G._getVolumeMap(to)
-    volmin0 = C.getMinValue(to, 'centers:vol')
     # volume minimum au dela duquel on ne peut pas raffiner
+    # (global si l'octree est reparti)
+    if volmin is None: volmin0 = C.getMinValue(to, 'centers:vol')
+    else: volmin0 = volmin
     volmin0 = 1.*volmin0
     while end == 0:
         # Do not refine inside obstacles
@@ -979,8 +998,84 @@ def addRefinementZones__(o, tb, tbox, snearsf, vmin, dim):
 
     return Internal.getNodeFromType2(to, 'Zone_t')
 
+# only in buildOctree
+# Expansion de la couche de cellules les plus fines pres des corps
+def expandOctree__(o, tb, dimPb, vmin, expand):
+    if expand == 0:
+        G._expandLayer(o, level=0, corners=1, balancing=1)
+    elif expand == 1:
+        vmint = 31
+        if vmin < vmint:
+            if Cmpi.rank==0: print('buildOctree: octree finest level expanded (expandLayer activated).')
+            to = C.newPyTree(['Base',o])
+            to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
+            C._initVars(o, "centers:indicator", 0.)
+            cellN = C.getField("centers:cellN", to)[0]
+            octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
+            indic = C.getField("centers:indicator", o)[0]
+            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, 0, 2)
+            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 1, 0, 2) # CB
+            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 2, 0, 2) # CB
+            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 3, 0, 2) # CB
+            indic = Converter.addVars([indic,cellN])
+            indic = Converter.initVars(indic, "{indicator}={indicator}*({cellN}>0.)")
+            octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
+            o = C.convertArrays2ZoneNode(o[0], [octreeA])
+
+        to = C.newPyTree(['Base',o])
+        to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
+        indic = C.getField("centers:cellN",to)[0]
+        octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
+        indic = Converter.initVars(indic, 'indicator', 0.)
+        indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0,0,1)
+        indic = Converter.extractVars(indic, ["indicator"])
+        octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
+        o = C.convertArrays2ZoneNode(o[0], [octreeA])
+
+    else: #expand = 2, 3 or 4
+        corner = 0
+        to = C.newPyTree(['Base',o])
+        to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
+        C._initVars(o, "centers:indicator", 0.)
+        cellN = C.getField("centers:cellN", to)[0]
+        octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
+        indic = C.getField("centers:indicator", o)[0]
+        indic = Converter.addVars([indic,cellN])
+        indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, corner, 3)
+        octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
+        o = C.convertArrays2ZoneNode(o[0], [octreeA])
+
+        if expand > 2: # expand minimum + 1 couche propagee
+            # passe 2
+            to = C.newPyTree(['Base',o])
+            to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
+            C._initVars(o, "centers:indicator", 0.)
+            cellN = C.getField("centers:cellN", to)[0]
+            octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
+            indic = C.getField("centers:indicator", o)[0]
+            indic = Converter.addVars([indic,cellN])
+            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, corner, 4)
+            octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
+            o = C.convertArrays2ZoneNode(o[0], [octreeA])
+            # fin passe 2
+
+        if expand > 3:# expand minimum + 2 couche propagee
+            # passe 3
+            to = C.newPyTree(['Base',o])
+            to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
+            C._initVars(o, "centers:indicator", 0.)
+            cellN = C.getField("centers:cellN", to)[0]
+            octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
+            indic = C.getField("centers:indicator", o)[0]
+            indic = Converter.addVars([indic,cellN])
+            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, corner, 6)
+            octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
+            o = C.convertArrays2ZoneNode(o[0], [octreeA])
+            # fin passe 3
+    return o
+
 def buildOctree(tb, dimPb=3, vmin=15, snears=0.01, snearFactor=1., dfars=10., dfarDir=0,
-                tbox=None, snearsf=None, to=None, balancing=2, expand=2, octreeMode=0):
+                tbox=None, snearsf=None, to=None, balancing=2, expand=2, octreeMode=0, distributed=False):
 
     """Builds an octree from the surface definitions."""
 
@@ -1018,6 +1113,9 @@ def buildOctree(tb, dimPb=3, vmin=15, snears=0.01, snearFactor=1., dfars=10., df
 
     if to is not None:
         o = Internal.getZones(to)[0]
+    elif distributed:
+        o = buildOctreeDist__(tb, surfaces, snearso, dfarListL, dfarDir, dxmin0, dimPb=dimPb, vmin=vmin,
+                              tbox=tbox, snearsf=snearsf, balancing=balancing, expand=expand, octreeMode=octreeMode)
     else:
         o = G.octree(surfaces, snearList=snearso, dfar=dfar, dfarList=dfarListL, balancing=balancing, dfarDir=dfarDir, octreeMode=octreeMode)
         G._getVolumeMap(o); volmin = C.getMinValue(o, 'centers:vol')
@@ -1030,77 +1128,7 @@ def buildOctree(tb, dimPb=3, vmin=15, snears=0.01, snearFactor=1., dfars=10., df
             o = addRefinementZones__(o, tb, tbox, snearsf, vmin, dimPb)
             C._rmVars(o, ['centers:indicator', 'centers:cellN', 'centers:vol', 'centers:cellNBody'])
 
-        if expand == 0:
-            G._expandLayer(o, level=0, corners=1, balancing=1)
-        elif expand == 1:
-            vmint = 31
-            if vmin < vmint:
-                if Cmpi.rank==0: print('buildOctree: octree finest level expanded (expandLayer activated).')
-                to = C.newPyTree(['Base',o])
-                to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
-                C._initVars(o, "centers:indicator", 0.)
-                cellN = C.getField("centers:cellN", to)[0]
-                octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
-                indic = C.getField("centers:indicator", o)[0]
-                indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, 0, 2)
-                indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 1, 0, 2) # CB
-                indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 2, 0, 2) # CB
-                indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 3, 0, 2) # CB
-                indic = Converter.addVars([indic,cellN])
-                indic = Converter.initVars(indic, "{indicator}={indicator}*({cellN}>0.)")
-                octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
-                o = C.convertArrays2ZoneNode(o[0], [octreeA])
-
-            to = C.newPyTree(['Base',o])
-            to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
-            indic = C.getField("centers:cellN",to)[0]
-            octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
-            indic = Converter.initVars(indic, 'indicator', 0.)
-            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0,0,1)
-            indic = Converter.extractVars(indic, ["indicator"])
-            octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
-            o = C.convertArrays2ZoneNode(o[0], [octreeA])
-
-        else: #expand = 2, 3 or 4
-            corner = 0
-            to = C.newPyTree(['Base',o])
-            to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
-            C._initVars(o, "centers:indicator", 0.)
-            cellN = C.getField("centers:cellN", to)[0]
-            octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
-            indic = C.getField("centers:indicator", o)[0]
-            indic = Converter.addVars([indic,cellN])
-            indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, corner, 3)
-            octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
-            o = C.convertArrays2ZoneNode(o[0], [octreeA])
-
-            if expand > 2: # expand minimum + 1 couche propagee
-                # passe 2
-                to = C.newPyTree(['Base',o])
-                to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
-                C._initVars(o, "centers:indicator", 0.)
-                cellN = C.getField("centers:cellN", to)[0]
-                octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
-                indic = C.getField("centers:indicator", o)[0]
-                indic = Converter.addVars([indic,cellN])
-                indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, corner, 4)
-                octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
-                o = C.convertArrays2ZoneNode(o[0], [octreeA])
-                # fin passe 2
-
-            if expand > 3:# expand minimum + 2 couche propagee
-                # passe 3
-                to = C.newPyTree(['Base',o])
-                to = X_IBM.blankByIBCBodies(to, tb, 'centers', dimPb)
-                C._initVars(o, "centers:indicator", 0.)
-                cellN = C.getField("centers:cellN", to)[0]
-                octreeA = C.getFields(Internal.__GridCoordinates__, o)[0]
-                indic = C.getField("centers:indicator", o)[0]
-                indic = Converter.addVars([indic,cellN])
-                indic = Generator.generator.modifyIndicToExpandLayer(octreeA, indic, 0, corner, 6)
-                octreeA = Generator.adaptOctree(octreeA, indic, balancing=2)
-                o = C.convertArrays2ZoneNode(o[0], [octreeA])
-                # fin passe 3
+        o = expandOctree__(o, tb, dimPb, vmin, expand)
 
         G._getVolumeMap(o); volmin = C.getMinValue(o, 'centers:vol')
         C._rmVars(o, 'centers:vol')
@@ -1123,6 +1151,268 @@ def buildOctree(tb, dimPb=3, vmin=15, snears=0.01, snearFactor=1., dfars=10., df
 
     return o
 
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+## DISTRIBUTED OCTREE
+#+++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# L'octree grossier (feuilles de niveau <= lc) est construit a l'identique sur
+# tous les procs. Ses feuilles sont reparties le long d'une courbe de Morton,
+# ponderees par le raffinement attendu. Chaque proc raffine ses feuilles et
+# une couche de feuilles fantomes, equilibre 2:1 et echange ses cellules aux
+# frontieres de partition jusqu'a convergence. Seules les cellules locales
+# sont gardees.
+
+# Cles de Morton (Z-order) d'indices entiers
+def getMortonKeys__(ic, jc, kc, dimPb, nbits):
+    keys = numpy.zeros(ic.size, dtype=numpy.int64)
+    for b in range(nbits):
+        keys |= ((ic >> b) & 1) << (dimPb*b)
+        keys |= ((jc >> b) & 1) << (dimPb*b+1)
+        if dimPb == 3: keys |= ((kc >> b) & 1) << (dimPb*b+2)
+    return keys
+
+# Coin min et taille des cellules d'un octree (array)
+def getOctreeCells__(a):
+    cn = a[2]-1
+    x = a[1][0][cn]; y = a[1][1][cn]; z = a[1][2][cn]
+    xmin = x.min(axis=0); ymin = y.min(axis=0); zmin = z.min(axis=0)
+    return xmin, ymin, zmin, x.max(axis=0)-xmin
+
+# Dilatation d'un masque d'une cellule (coins compris)
+def dilateMask__(mask):
+    for ax in range(mask.ndim):
+        m = mask.copy()
+        s1 = [slice(None)]*mask.ndim; s2 = [slice(None)]*mask.ndim
+        s1[ax] = slice(1, None); s2[ax] = slice(0, -1)
+        m[tuple(s1)] |= mask[tuple(s2)]
+        m[tuple(s2)] |= mask[tuple(s1)]
+        mask = m
+    return mask
+
+# Recouvrement d'un masque par des cubes alignes maximaux
+def getCubes__(mask, ijk, n, cubes):
+    sub = mask[tuple(slice(i, i+n) for i in ijk)]
+    if not sub.any(): return None
+    if n == 1 or sub.all(): cubes.append((ijk, n)); return None
+    n2 = n//2
+    for off in itertools.product((0,n2), repeat=len(ijk)):
+        getCubes__(mask, tuple(i+o for i, o in zip(ijk, off)), n2, cubes)
+    return None
+
+def balanceLocalOctree__(a, balancing):
+    if balancing == 1: return Generator.balanceOctree__(a, 2, corners=0)
+    elif balancing == 2: return Generator.balanceOctree__(a, 2, corners=1)
+    return a
+
+# Octree grossier identique sur tous les procs
+# le niveau max lc croit jusqu'a avoir assez de feuilles par proc
+def buildCoarseOctree__(stls, snearso, dfarListL, dfarDir, octreeMode, dimPb):
+    if dimPb == 3: lmax = 7
+    else: lmax = 10
+    nmin = 16*Cmpi.size
+    lc = 2
+    while True:
+        c = Generator.octree(stls, snearso, dfarListL, -1., 0, lc, 2, None, dfarDir, octreeMode)
+        dh = getOctreeCells__(c)[3]
+        d = numpy.max(c[1][0])-numpy.min(c[1][0])
+        # pas de feuille au niveau lc : l'octree est deja complet
+        if dh.size >= nmin or lc >= lmax or dh.min() > 0.75*d/2**lc: break
+        lc += 1
+    return c, lc
+
+# Partition des feuilles de l'octree grossier entre les procs
+# OUT: grille dense des feuilles au niveau lc, proc de chaque feuille,
+# graphe d'echange, feuilles envoyees a chaque voisin
+def partitionCoarseOctree__(c, lc, stls, snearso, dimPb):
+    NP = Cmpi.size; rank = Cmpi.rank
+    xmin, ymin, zmin, dh = getOctreeCells__(c)
+    nleaves = dh.size
+    if nleaves < NP:
+        raise ValueError('buildOctree: too few coarse octree cells (%d) for %d processes.'%(nleaves, NP))
+    x0 = [xmin.min(), ymin.min(), zmin.min()]
+    n = 2**lc
+    h = (numpy.max(c[1][0])-x0[0])/n
+    ic = numpy.rint((xmin-x0[0])/h).astype(numpy.int64)
+    jc = numpy.rint((ymin-x0[1])/h).astype(numpy.int64)
+    if dimPb == 3: kc = numpy.rint((zmin-x0[2])/h).astype(numpy.int64)
+    else: kc = numpy.zeros(nleaves, dtype=numpy.int64)
+    ijk = (ic,jc,kc)[:dimPb]
+    sc = numpy.rint(dh/h).astype(numpy.int64)
+
+    # numero de feuille de chaque cellule de niveau lc
+    grid = numpy.empty((n,)*dimPb, dtype=numpy.int32)
+    for e in numpy.nonzero(sc > 1)[0]:
+        grid[tuple(slice(i[e], i[e]+sc[e]) for i in ijk)] = e
+    e = numpy.nonzero(sc == 1)[0]
+    grid[tuple(i[e] for i in ijk)] = e
+
+    # poids : 1 + nombre estime de cellules fines sur la peau
+    smin = numpy.full(nleaves, numpy.inf)
+    for v, s in enumerate(stls):
+        cn = s[2]-1
+        idx = []
+        for d in range(dimPb):
+            xc = s[1][d][cn].mean(axis=0)
+            idx.append(numpy.clip(numpy.floor((xc-x0[d])/h).astype(numpy.int64), 0, n-1))
+        numpy.minimum.at(smin, grid[tuple(idx)], snearso[v])
+    w = numpy.ones(nleaves)
+    r = smin < numpy.inf
+    w[r] += (dh[r]/smin[r])**(dimPb-1)
+
+    # decoupage de la courbe de Morton en NP morceaux de poids egal
+    # (au moins une feuille par proc)
+    order = numpy.argsort(getMortonKeys__(ic, jc, kc, dimPb, lc), kind='stable')
+    cw = numpy.cumsum(w[order])
+    starts = numpy.searchsorted(cw, numpy.arange(1,NP)*cw[-1]/NP)
+    for p in range(NP-1):
+        if p == 0: starts[p] = max(starts[p], 1)
+        else: starts[p] = max(starts[p], starts[p-1]+1)
+        starts[p] = min(starts[p], nleaves-NP+1+p)
+    owner = numpy.empty(nleaves, dtype=numpy.int32)
+    owner[order] = numpy.searchsorted(starts, numpy.arange(nleaves), side='right')
+
+    # graphe des procs voisins (identique sur tous les procs)
+    ownerGrid = owner[grid]
+    pairs = []
+    for off in itertools.product((-1,0,1), repeat=dimPb):
+        if off.count(0) == dimPb: continue
+        s1 = tuple(slice(max(o,0), n+min(o,0)) for o in off)
+        s2 = tuple(slice(max(-o,0), n+min(-o,0)) for o in off)
+        p1 = ownerGrid[s1]; p2 = ownerGrid[s2]
+        m = p1 != p2
+        pairs.append(p1[m].astype(numpy.int64)*NP+p2[m])
+    graph = {}
+    for pq in numpy.unique(numpy.concatenate(pairs)):
+        p = int(pq//NP); q = int(pq%NP)
+        if p not in graph: graph[p] = {}
+        graph[p][q] = []
+
+    # feuilles locales fantomes des voisins
+    mine = ownerGrid == rank
+    send = {}
+    for q in graph.get(rank, {}):
+        m = numpy.zeros(nleaves, dtype=bool)
+        m[grid[dilateMask__(ownerGrid == q) & mine]] = True
+        send[q] = m
+    # feuilles locales et fantomes
+    sel = numpy.zeros(nleaves, dtype=bool)
+    sel[grid[dilateMask__(mine)]] = True
+
+    return {'x0':x0, 'h':h, 'n':n, 'dim':dimPb, 'grid':grid, 'owner':owner,
+            'sel':sel, 'graph':graph, 'send':send}
+
+# Numero de la feuille grossiere contenant chaque cellule d'un octree (array)
+def getCellLeaves__(a, info):
+    cn = a[2]-1; x0 = info['x0']; h = info['h']; n = info['n']
+    idx = []
+    for d in range(info['dim']):
+        xc = a[1][d][cn].mean(axis=0)
+        idx.append(numpy.clip(numpy.floor((xc-x0[d])/h).astype(numpy.int64), 0, n-1))
+    return info['grid'][tuple(idx)]
+
+# Raffinement des feuilles locales et fantomes de l'octree grossier
+# chaque cube aligne est raffine par un octree restreint (octant) aux
+# triangles qui l'intersectent
+def refineLocalOctree__(c, stls, snearso, info, balancing):
+    dimPb = info['dim']; x0 = info['x0']; h = info['h']; grid = info['grid']
+    tbbs = []
+    for s in stls:
+        cn = s[2]-1
+        tbbs.append([(s[1][d][cn].min(axis=0), s[1][d][cn].max(axis=0)) for d in range(dimPb)])
+    cubes = []
+    getCubes__(info['sel'][grid], (0,)*dimPb, info['n'], cubes)
+    pieces = []
+    coarse = numpy.zeros(info['owner'].size, dtype=bool)
+    for (ijk, n) in cubes:
+        bmin = [x0[d]+ijk[d]*h for d in range(dimPb)]
+        bmax = [x0[d]+(ijk[d]+n)*h for d in range(dimPb)]
+        eps = 1.e-6*n*h
+        cs = []; ss = []
+        for v, tbb in enumerate(tbbs):
+            m = numpy.ones(tbb[0][0].size, dtype=bool)
+            for d in range(dimPb): m &= (tbb[d][1] >= bmin[d]-eps)*(tbb[d][0] <= bmax[d]+eps)
+            elts = numpy.nonzero(m)[0]
+            if elts.size > 0:
+                cs.append(Transform.subzone(stls[v], elts, type='elements'))
+                ss.append(snearso[v])
+        if cs != []: pieces.append(Generator.octree(cs, ss, [], 1., 0, 1000, 2, bmin+bmax, 0, 0))
+        else: coarse[grid[tuple(slice(i, i+n) for i in ijk)]] = True
+    if coarse.any(): pieces.append(Transform.subzone(c, numpy.nonzero(coarse)[0], type='elements'))
+    a = Transform.join(pieces, tol=1.e-8*h)
+    return balanceLocalOctree__(a, balancing)
+
+# Echange des cellules aux frontieres de partition et equilibrage 2:1
+# jusqu'a ce qu'aucun proc ne raffine ses cellules
+def exchangeOctree__(a, info, balancing):
+    if Cmpi.size == 1 or balancing == 0: return a
+    owner = info['owner']; rank = Cmpi.rank
+    changed = 1
+    while changed > 0:
+        leaves = getCellLeaves__(a, info)
+        own = owner[leaves]; mine = own == rank
+        datas = {}
+        for q in info['send']:
+            elts = numpy.nonzero(mine*info['send'][q][leaves])[0]
+            datas[q] = Transform.subzone(a, elts, type='elements')
+        rcvDatas = Cmpi.sendRecv(datas, info['graph'])
+        # les cellules fantomes sont remplacees par celles de leur proc
+        keep = numpy.nonzero(~numpy.isin(own, list(rcvDatas.keys())))[0]
+        pieces = [Transform.subzone(a, keep, type='elements')]
+        for q in rcvDatas: pieces.append(rcvDatas[q])
+        a = Transform.join(pieces, tol=1.e-8*info['h'])
+        nmine = numpy.count_nonzero(mine)
+        a = balanceLocalOctree__(a, balancing)
+        nmine = numpy.count_nonzero(owner[getCellLeaves__(a, info)] == rank)-nmine
+        changed = Cmpi.allreduce(int(nmine != 0), op=Cmpi.MAX)
+    return a
+
+# Pas minimum global d'un octree reparti
+def getDistMinSpacing__(a):
+    dh = getOctreeCells__(a)[3].min()
+    return Cmpi.allreduce(dh, op=Cmpi.MIN)
+
+# Octree reparti : chaque proc ne garde que ses cellules
+def buildOctreeDist__(tb, surfaces, snearso, dfarListL, dfarDir, dxmin0, dimPb=3, vmin=15,
+                      tbox=None, snearsf=None, balancing=2, expand=2, octreeMode=0):
+    surfaces = C.convertArray2Tetra(surfaces)
+    stls = C.getFields(Internal.__GridCoordinates__, surfaces)
+
+    for it in range(2):
+        c, lc = buildCoarseOctree__(stls, snearso, dfarListL, dfarDir, octreeMode, dimPb)
+        info = partitionCoarseOctree__(c, lc, stls, snearso, dimPb)
+        a = refineLocalOctree__(c, stls, snearso, info, balancing)
+        a = exchangeOctree__(a, info, balancing)
+        dxmin = getDistMinSpacing__(a)
+        if dxmin >= 0.65*dxmin0: break
+        snearso = [2.*i for i in snearso]
+    del c
+
+    # Adaptation avant expandLayer (volume minimum global)
+    if tbox is not None:
+        o = C.convertArrays2ZoneNode('octree', [a])
+        o = addRefinementZones__(o, tb, tbox, snearsf, vmin, dimPb, volmin=dxmin**dimPb)
+        a = C.getFields(Internal.__GridCoordinates__, o)[0]
+        a = exchangeOctree__(a, info, balancing)
+
+    # l'expansion part du niveau le plus fin : seuls les procs qui le
+    # voient (cellules locales ou fantomes) l'appliquent
+    o = C.convertArrays2ZoneNode('octree', [a])
+    if getOctreeCells__(a)[3].min() < 1.001*dxmin:
+        o = expandOctree__(o, tb, dimPb, vmin, expand)
+    a = C.getFields(Internal.__GridCoordinates__, o)[0]
+    a = exchangeOctree__(a, info, balancing)
+
+    # cellules locales seulement
+    elts = numpy.nonzero(info['owner'][getCellLeaves__(a, info)] == Cmpi.rank)[0]
+    a = Transform.subzone(a, elts, type='elements')
+    o = C.convertArrays2ZoneNode('octree', [a])
+
+    dxmin = getDistMinSpacing__(a)
+    if Cmpi.rank == 0: print('Minimum spacing of Cartesian mesh= %f (targeted %f)'%(dxmin/(vmin-1),dxmin0/(vmin-1)))
+    nelts = a[2].shape[1]
+    if nelts > 20000:
+        print('Warning: number of zones (%d) on rank %d is high (block merging might last a long time).'%(nelts, Cmpi.rank))
+    return o
+
 #==============================================================================
 #
 #==============================================================================
@@ -0,0 +1,20 @@
+# - buildOctree distribue (pyTree) -
+import Converter.PyTree as C
+import Converter.Internal as Internal
+import Converter.Mpi as Cmpi
+import Geom.PyTree as D
+import Generator.IBM as G_IBM
+import KCore.test as test
+
+tb = D.circle((0.,0.,0.), 1., N=200)
+tb = C.newPyTree(['Base', tb])
+
+# octree complet
+o = G_IBM.buildOctree(tb, dimPb=2, vmin=11, snears=0.01, dfars=10., expand=0)
+nelts = Internal.getZoneDim(o)[2]
+
+# octree reparti : la somme des cellules locales est l'octree complet
+o = G_IBM.buildOctree(tb, dimPb=2, vmin=11, snears=0.01, dfars=10., expand=0, distributed=True)
+neltsDist = Cmpi.allreduce(Internal.getZoneDim(o)[2], op=Cmpi.SUM)
+if Cmpi.rank == 0:
+    test.testO([nelts, neltsDist], 1)
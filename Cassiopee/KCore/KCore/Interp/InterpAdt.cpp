@@ -17,6 +17,7 @@
     along with Cassiopee.  If not, see <http://www.gnu.org/licenses/>.
 */
 # include <stack>
+# include <vector>
 # include "CompGeom/compGeom.h"
 # include "Interp/InterpAdt.h"
 #include "Loc/loc.h"
@@ -51,7 +52,7 @@ void K_INTERP::InterpAdt::destroy()
   stackData dataForStack;
 
   dataForStack.current = current;
-  stack.push(dataForStack);
+  if (current != NULL) stack.push(dataForStack);
   
   while (stack.size() != 0)
   {
@@ -85,7 +86,7 @@ K_INTERP::InterpAdt::InterpAdt(E_Int npts,
                                void* a1, void* a2, void* a3, E_Int& built):
   InterpData()
 {
-  _cylCoord = false; 
+  _cylCoord = false; _npts = npts;
   _centerX = 0; _centerY = 0; _centerZ = 0;
   _axisX = -1; _axisY = -1; _axisZ = -1;
   _theta_min = K_CONST::E_MAX_FLOAT;
@@ -120,7 +121,7 @@ K_INTERP::InterpAdt::InterpAdt(E_Int npts,
     InterpData()
 {
     // keep data for cart2Cyl
-    _cylCoord = true;
+    _cylCoord = true; _npts = npts;
     _centerX = centerX; _centerY = centerY; _centerZ = centerZ;
     _axisX = axisX; _axisY = axisY; _axisZ = axisZ; _thetaShift = thetaShift;
 
@@ -496,6 +497,84 @@ E_Int K_INTERP::InterpAdt::buildUnstrAdt(E_Int npts, FldArrayI& connect,
   return 1;
 }
 
+//=============================================================================
+/* Constructeur a partir d'un arbre a plat (cf getFlatTree)
+   Les autres attributs (topologie, bbox, coord. cylindriques) sont a
+   positionner par l'appelant */
+//=============================================================================
+K_INTERP::InterpAdt::InterpAdt(E_Int nnodes, E_Int* ind, 
+                               E_Int* left, E_Int* right, E_Float* bb):
+  InterpData()
+{
+  _cylCoord = false; _npts = 0;
+  _centerX = 0; _centerY = 0; _centerZ = 0;
+  _axisX = -1; _axisY = -1; _axisZ = -1;
+  _xlc = NULL; _ylc = NULL; _zlc = NULL;
+  _theta_min = K_CONST::E_MAX_FLOAT;
+  _theta_max =-K_CONST::E_MAX_FLOAT;
+  _thetaShift = 0.;
+  _tree = NULL;
+  if (nnodes == 0) return;
+
+  vector<IntTreeNode*> nodes(nnodes);
+  for (E_Int i = 0; i < nnodes; i++)
+  {
+    E_Float* b = bb+6*i;
+    nodes[i] = new IntTreeNode(ind[i], b[0], b[1], b[2], b[3], b[4], b[5]);
+  }
+  for (E_Int i = 0; i < nnodes; i++)
+  {
+    if (left[i] >= 0) nodes[i]->_left = nodes[left[i]];
+    if (right[i] >= 0) nodes[i]->_right = nodes[right[i]];
+  }
+  _tree = nodes[0];
+}
+
+//=============================================================================
+/* Nombre de noeuds de l'ADT */
+//=============================================================================
+E_Int K_INTERP::InterpAdt::getTreeSize()
+{
+  if (_tree == NULL) return 0;
+  E_Int n = 0;
+  stack<IntTreeNode*> st;
+  st.push(_tree);
+  while (st.size() != 0)
+  {
+    IntTreeNode* current = st.top(); st.pop(); n++;
+    if (current->_left != NULL) st.push(current->_left);
+    if (current->_right != NULL) st.push(current->_right);
+  }
+  return n;
+}
+
+//=============================================================================
+/* Arbre a plat (parcours en largeur, racine en 0)
+   OUT: ind: indice de la cellule de chaque noeud
+   OUT: left, right: no des fils (-1 si pas de fils)
+   OUT: bb: bbox de chaque noeud (6 par noeud, xmax,ymax,zmax,xmin,ymin,zmin)
+   Les tableaux sont alloues par l'appelant (cf getTreeSize) */
+//=============================================================================
+void K_INTERP::InterpAdt::getFlatTree(E_Int* ind, E_Int* left, E_Int* right,
+                                      E_Float* bb)
+{
+  if (_tree == NULL) return;
+  vector<IntTreeNode*> nodes;
+  nodes.push_back(_tree);
+  for (size_t i = 0; i < nodes.size(); i++)
+  {
+    IntTreeNode* current = nodes[i];
+    ind[i] = current->_ind;
+    for (E_Int j = 0; j < 6; j++) bb[6*i+j] = current->_BB[j];
+    if (current->_left != NULL) 
+    { left[i] = nodes.size(); nodes.push_back(current->_left); }
+    else left[i] = -1;
+    if (current->_right != NULL) 
+    { right[i] = nodes.size(); nodes.push_back(current->_right); }
+    else right[i] = -1;
+  }
+}
+
 //=============================================================================
 // Insert cell in ADT tree
 //=============================================================================
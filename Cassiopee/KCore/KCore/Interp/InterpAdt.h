@@ -52,7 +52,15 @@ class InterpAdt  : public InterpData
               E_Float axisX, E_Float axisY, E_Float axisZ,
               E_Float thetaShift, E_Int depth, 
               E_Int& built);
+    /* Construit l'ADT a partir d'un arbre a plat (cf getFlatTree) */
+    InterpAdt(E_Int nnodes, E_Int* ind, E_Int* left, E_Int* right, 
+              E_Float* bb);
     
+    /* Nombre de noeuds de l'ADT */
+    E_Int getTreeSize();
+    /* Arbre a plat: ind, left, right (nnodes), bb (6*nnodes) */
+    void getFlatTree(E_Int* ind, E_Int* left, E_Int* right, E_Float* bb);
+
     private:
     /* Construit l'adt a partir d'un maillage structure 
     Retourne 0 si nk=1 mais maillage non plan, 1 dans les autres cas. */
@@ -138,6 +146,7 @@ class InterpAdt  : public InterpData
     E_Float _centerX, _centerY, _centerZ; // centre pour les coord. cylindriques
     E_Float _axisX, _axisY, _axisZ; // axe pour les coord. cylindriques
     E_Float *_xlc, *_ylc, *_zlc; // coords cylindrique
+    E_Int _npts; // nbre de pts des coords cylindriques
     E_Float _theta_min, _theta_max, _thetaShift;
     
     protected:
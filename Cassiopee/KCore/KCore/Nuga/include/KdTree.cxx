@@ -29,7 +29,7 @@
 template <typename CoordArrayType>
 K_SEARCH::KdTree<CoordArrayType>::KdTree(const coord_access_type& posAcc,
                                          E_Float tolerance, bool do_omp)
-:_posAcc(posAcc), _tree_sz(0), _dim(posAcc.stride()), _tolerance(tolerance*tolerance)
+:_posAcc(posAcc), _tree_sz(0), _dim(posAcc.stride()), _tolerance(tolerance*tolerance), _shared(false)
 {
   size_type none = IDX_NONE;
   _tree.resize(3, posAcc.size(), &none);
@@ -68,7 +68,7 @@ template <typename CoordArrayType>
 K_SEARCH::KdTree<CoordArrayType>::KdTree(const coord_access_type& posAcc, 
                                          std::vector<size_type> indices/*passed by value*/,
                                          E_Float tolerance, bool do_omp)
- :_posAcc(posAcc), _tree_sz(0), _dim(posAcc.stride()), _tolerance(tolerance*tolerance)
+ :_posAcc(posAcc), _tree_sz(0), _dim(posAcc.stride()), _tolerance(tolerance*tolerance), _shared(false)
 {
   size_type none = IDX_NONE;
   _tree.resize(3, _tree_sz + indices.size(), &none);
@@ -92,6 +92,41 @@ K_SEARCH::KdTree<CoordArrayType>::KdTree(const coord_access_type& posAcc,
   }
 }
 
+// ============================================================================
+/// Builds a tree from an existing flat tree (no insertion).
+/// If shared, the tree memory is just referenced (read-only use).
+// ============================================================================
+template <typename CoordArrayType>
+K_SEARCH::KdTree<CoordArrayType>::KdTree(const coord_access_type& posAcc,
+                                         E_Int* tree, E_Int tree_sz,
+                                         E_Float tolerance, bool shared)
+ :_posAcc(posAcc), _tree_sz(tree_sz), _dim(posAcc.stride()), _tolerance(tolerance*tolerance), _shared(shared)
+{
+  if (shared)
+  {
+    E_Int* data = tree;
+    tree_array_type t(data, 3, tree_sz);
+    _tree = std::move(t);
+  }
+  else
+  {
+    size_type none = IDX_NONE;
+    _tree.resize(3, tree_sz, &none);
+    std::copy(tree, tree+3*tree_sz, _tree.begin());
+  }
+}
+
+// ============================================================================
+/// Detach the tree memory (not owned).
+// ============================================================================
+template <typename CoordArrayType>
+void K_SEARCH::KdTree<CoordArrayType>::__detach_tree()
+{
+  E_Int* data; E_Int rows, cols; bool calloc;
+  _tree.relay_mem(data, rows, cols, calloc);
+  _tree_sz = 0;
+}
+
 // ============================================================================
 /// Reset.
 // ============================================================================
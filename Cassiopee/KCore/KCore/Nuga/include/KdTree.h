@@ -27,6 +27,7 @@
 #include <functional>
 #include <algorithm>
 #include <vector>
+#include <cmath>
 
 namespace K_SEARCH
 {
@@ -55,8 +56,13 @@ class KdTree {
            std::vector<size_type> indices/*passed by value to preserve input*/,
 	   E_Float tolerance=EPSILON, bool use_omp=false);
 
+    /// Builds a tree from an existing flat tree (3 x tree_sz, as given by tree()) without insertion.
+    /** If shared, tree memory is not owned (nor freed) by the KdTree.*/
+    KdTree(const coord_access_type& posAcc, E_Int* tree, E_Int tree_sz,
+           E_Float tolerance=EPSILON, bool shared=false);
+
     /// Destructor.
-    ~KdTree(){};
+    ~KdTree(){ if (_shared) __detach_tree(); };
 
     void build(std::vector<size_type>* indices = nullptr, E_Float tolerance = EPSILON);
 
@@ -66,6 +72,12 @@ class KdTree {
     
     E_Int nb_nodes(){ return _tree_sz;}
 
+    /// Flat tree (3 x nb_nodes).
+    const tree_array_type& tree() const { return _tree;}
+
+    /// Tolerance (not squared).
+    E_Float tolerance() const { return std::sqrt(_tolerance);}
+
   public: /** Insertion methods */
 
     /** Insert a node in the tree. */
@@ -128,6 +140,9 @@ class KdTree {
     /// Underneath algorithm for the getClose method (close to node).
     void __getClosest_through_path(size_type n, const E_Float *Xn, size_type & m, E_Float& d2) const;
     
+    /// Forget the tree memory without freeing it (shared tree).
+    void __detach_tree();
+
     /// Underneath algorithm for the getInBox method.
     void __getInBox(size_type ci, size_type axis, const E_Float* mBox, const E_Float* MBox, std::vector<size_type>& out) const;   
 
@@ -148,6 +163,9 @@ class KdTree {
     /// tolerance
     E_Float         _tolerance;
 
+    /// tree memory is not owned
+    bool            _shared;
+
     /// to extract the coordinates.
     mutable E_Float _Xn[3], _mB[3], _MB[3];
     
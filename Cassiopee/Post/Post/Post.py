@@ -140,6 +140,64 @@ def extractMesh(arrays, extractArray, order=2, extrapOrder=1,
         return post.extractMesh(inl, [extractArray], order, extrapOrder,
                                 constraint, hook)[0]
 
+# Plan d'extraction : cellules donneuses et coefficients de extractMesh
+# pour un maillage d'extraction fixe
+# OUT: pour chaque maillage d'extraction : [npts, [(noblk, rcvInd, starts, donorInd, coefs)]]
+# par domaine donneur noblk utilise, la valeur au point rcvInd[p] est
+# sum(coefs[l]*f[donorInd[l]]) pour l de starts[p] a starts[p+1]
+def extractMeshPlan(arrays, extractArray, order=2, extrapOrder=1,
+                    constraint=40., tol=1.e-6, hook=None):
+    """Compute donor cells and interpolation coefficients of extractMesh.
+    Usage: extractMeshPlan(arrays, extractArray, order, extrapOrder, constraint, tol, hook)"""
+    # indice des sommets donneurs, suivi a travers growOfEps__
+    inda = []
+    for a in arrays:
+        ind = numpy.arange(a[1].shape[1], dtype=numpy.float64)
+        inda.append([a[0]+',__ind__', numpy.vstack([a[1], ind])]+a[2:])
+    inl, modified = growOfEps__(inda, tol, nlayers=2, planarity=False)
+    if isinstance(extractArray[0], list):
+        res = post.extractMeshPlan(inl, extractArray, order, extrapOrder, constraint, hook)
+        return [compileExtractMeshPlan__(r, inl) for r in res]
+    else:
+        res = post.extractMeshPlan(inl, [extractArray], order, extrapOrder, constraint, hook)
+        return compileExtractMeshPlan__(res[0], inl)
+
+# Regroupe les molecules par domaine donneur, en numerotation des arrays donneurs
+def compileExtractMeshPlan__(res, inl):
+    (blk, offset, inds, coefs) = res
+    count = offset[1:]-offset[:-1]
+    eblk = numpy.repeat(blk, count)
+    plan = []
+    for b in numpy.unique(blk[blk >= 0]):
+        b = int(b)
+        rcvInd = numpy.nonzero(blk == b)[0]
+        mask = eblk == b
+        pos = inl[b][0].split(',').index('__ind__')
+        ind = inl[b][1][pos][inds[mask]]
+        donorInd = numpy.rint(ind)
+        if numpy.any(numpy.abs(ind-donorInd) > 1.e-6):
+            raise ValueError("extractMeshPlan: donor %d is not supported (NGON donors are remeshed)."%b)
+        starts = numpy.zeros(rcvInd.size, dtype=offset.dtype)
+        starts[1:] = numpy.cumsum(count[rcvInd])[:-1]
+        plan.append((b, rcvInd, starts, donorInd.astype(offset.dtype), coefs[mask]))
+    return [blk.size, plan]
+
+# Extrait des champs avec un plan d'extraction
+# IN: fields: champs des domaines donneurs (numpy (nfld,npts)), indexes
+# par numero de donneur (liste ou dictionnaire)
+# OUT: champs extraits (numpy (nfld,npts)), nuls aux points non trouves
+def applyExtractMeshPlan(fields, plan):
+    """Extract fields with an extraction plan."""
+    (npts, items) = plan
+    nfld = 0
+    for it in items: nfld = fields[it[0]].shape[0]; break
+    out = numpy.zeros((nfld, npts), dtype=numpy.float64)
+    for (b, rcvInd, starts, donorInd, coefs) in items:
+        v = fields[b][:, donorInd]
+        v *= coefs
+        out[:, rcvInd] = numpy.add.reduceat(v, starts, axis=1)
+    return out
+
 def slice(a, type=None, eq=None):
     """Extract a slice of different shapes."""
     if eq is not None:
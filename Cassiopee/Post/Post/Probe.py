@@ -9,6 +9,7 @@ import Converter.Distributed as Distributed
 import Distributor2.PyTree as D2
 import Connector.PyTree as X
 import Connector.Mpi as Xmpi
+from . import ProbeWriter
 import numpy, os
 
 # Probe class
@@ -66,6 +67,10 @@ class Probe:
         # zones storing probe data
         self._probeZones = None
 
+        # ecriture asynchrone (processus ecrivain)
+        self._async = False
+        self._writer = None
+
     # init from position X/ind+blockName/None
     def __init__(self, fileName,
                  t=None,
@@ -73,10 +78,12 @@ class Probe:
                  ind=None, blockName=None,
                  tPermeable=None,
                  fields=None, append=False,
-                 bufferSize=100, writeCoords=True, modeForce=0):
+                 bufferSize=100, writeCoords=True, modeForce=0,
+                 asyncWrite=False):
         """Create a probe."""
         self.init0()
         self._bsize = bufferSize
+        self._async = asyncWrite
         self._fileName = fileName
         self._coords = writeCoords
         self._append = append
@@ -687,6 +694,8 @@ class Probe:
     # IN: _fileName: nom du fichier
     def flush(self):
         """Flush probe to file."""
+        if self._async and self._icur >= self._bsize:
+            return self.flushAsync__()
         if self._mode == 0 or self._mode == 1:
             if Cmpi.rank != self._proc: return None
             print('Info: probe: flush #%d [%s].'%(self._filecur, self._fileName))
@@ -699,30 +708,13 @@ class Probe:
             Cmpi.seq(self.flush__)
 
     def flush__(self):
+        # les ecritures asynchrones doivent etre finies
+        self.wait__()
         if self._icur >= self._bsize: # because buffer is out
             for pzone in self._probeZones:
-                nodes = []; paths = []
-                gc = Internal.getNodeFromName1(pzone, 'GridCoordinates')
-                if gc is not None:
-                    gc = Internal.copyNode(gc)
-                    gc[0] = 'GridCoordinates#%d'%self._filecur
-                    nodes += [gc]
-                    paths += ['CGNSTree/Base/%s'%pzone[0]]
-                fc = Internal.getNodeFromName1(pzone, 'FlowSolution')
-                if fc is not None:
-                    fc = Internal.copyNode(fc)
-                    fc[0] = 'FlowSolution#%d'%self._filecur
-                    nodes += [fc]
-                    paths += ['CGNSTree/Base/%s'%pzone[0]]
-                fcc = Internal.getNodeFromName1(pzone, 'FlowSolution#Centers')
-                if fcc is not None:
-                    fcc = Internal.copyNode(fcc)
-                    fcc[0] = 'FlowSolution#Centers#%d'%self._filecur
-                    nodes += [fcc]
-                    paths += ['CGNSTree/Base/%s'%pzone[0]]
+                (paths, nodes) = self.getFlushNodes__(pzone)
                 Distributed.writeNodesFromPaths(self._fileName, paths, nodes, None, -1, 0)
-                C._initVars(pzone, '{time}=-1.') # time sentinel
-                for v in self._fields:C._initVars(pzone, '{%s}=0.'%v)
+                self.resetBuffers__(pzone)
             #print('self._filecur=',self._filecur)
             self._filecur += 1
             self._icur = 0
@@ -746,12 +738,83 @@ class Probe:
 
         return None
 
+    # Flush d'un buffer plein par le processus ecrivain
+    # Les containers sont copies dans le buffer partage de l'ecrivain,
+    # puis le buffer de la probe est reinitialise et le calcul continue.
+    # En mode 2 et 3, les containers sont rassembles sur le proc 0
+    # qui est le seul a ecrire.
+    def flushAsync__(self):
+        if (self._mode == 0 or self._mode == 1) and Cmpi.rank != self._proc: return None
+        if self._writer is None: self._writer = ProbeWriter.ProbeWriter()
+        paths = []; nodes = []
+        for pzone in self._probeZones:
+            (p, n) = self.getFlushNodes__(pzone)
+            paths += p; nodes += n
+        if self._mode == 2 or self._mode == 3:
+            if Cmpi.rank == 0: print('Info: probe: async flush #%d [%s].'%(self._filecur, self._fileName))
+            datas = Cmpi.gather((paths, Distributed.packNodes__(nodes)), root=0)
+            if Cmpi.rank == 0:
+                paths = []; bufs = []
+                for d in datas: paths += d[0]; bufs.append(d[1])
+                self._writer.writeBuffers(self._fileName, paths, bufs, 0)
+            datas = None
+        else:
+            print('Info: probe: async flush #%d [%s].'%(self._filecur, self._fileName))
+            self._writer.writeNodes(self._fileName, paths, nodes, 0)
+        for pzone in self._probeZones: self.resetBuffers__(pzone)
+        self._filecur += 1
+        self._icur = 0
+        return None
+
+    # Containers d'une zone de probe a ecrire dans le container #_filecur
+    # Les noeuds retournes partagent les numpys de la probe
+    def getFlushNodes__(self, pzone):
+        nodes = []; paths = []
+        for name in [Internal.__GridCoordinates__, Internal.__FlowSolutionNodes__, Internal.__FlowSolutionCenters__]:
+            n = Internal.getNodeFromName1(pzone, name)
+            if n is not None:
+                nodes += [['%s#%d'%(name,self._filecur), n[1], n[2], n[3]]]
+                paths += ['CGNSTree/Base/%s'%pzone[0]]
+        return (paths, nodes)
+
+    # Reinitialise le buffer d'une zone de probe (time=-1, champs=0)
+    def resetBuffers__(self, pzone):
+        self.fillVar__(pzone, 'time', -1.) # time sentinel
+        for v in self._fields: self.fillVar__(pzone, v, 0.)
+        return None
+
+    def fillVar__(self, pzone, v, val):
+        vs = v.split(':')
+        if len(vs) == 2 and vs[0] == 'centers': cont = Internal.__FlowSolutionCenters__
+        else: cont = Internal.__FlowSolutionNodes__
+        c = Internal.getNodeFromName1(pzone, cont)
+        if c is not None:
+            n = Internal.getNodeFromName1(c, vs[-1])
+            if n is not None and isinstance(n[1], numpy.ndarray):
+                n[1].fill(val); return None
+        C._initVars(pzone, v, val)
+        return None
+
+    # Attend la fin de l'ecriture asynchrone en cours
+    def wait__(self):
+        if self._writer is not None: self._writer.wait()
+        return None
+
+    # Termine les ecritures asynchrones et arrete le processus ecrivain
+    def close(self):
+        """Wait for pending writes and stop the writer."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return None
+
     # read all probe times as a single zone
     # IN: _fileName: nom du fichier
     # IN: cont: container a extraire -> all points
     # IN: index: point a extraire -> all times
     def read(self, cont=None, ind=None, probeName=None):
         """Reread all data from probe file."""
+        self.wait__()
         if cont is not None:
             return self.readCont(cont)
         elif ind is not None:
@@ -0,0 +1,136 @@
+# Ecrivain asynchrone des buffers de probe
+# Le processus maitre serialise les containers a ecrire dans un buffer
+# partage (fichier mappe, /dev/shm si possible) puis rend la main ;
+# un processus fils (qui n'importe pas MPI) ecrit ces containers dans
+# le fichier de la probe pendant que le calcul continue.
+# Le buffer partage est le second buffer du double buffer de la probe :
+# on ne bloque que si l'ecriture precedente n'est pas terminee.
+import Converter.Distributed as Distributed
+import numpy, os, sys, pickle, subprocess, tempfile, atexit
+
+# Processus ecrivain vu du maitre
+class ProbeWriter:
+    """Background writer process for probe buffers."""
+    def __init__(self):
+        self._proc = None
+        # buffer partage
+        self._shmFile = None
+        self._shm = None
+        self._shmNo = 0
+        # une ecriture est en cours
+        self._pending = False
+
+    def start__(self):
+        if self._proc is not None: return None
+        self._proc = subprocess.Popen([sys.executable, '-m', 'Post.ProbeWriter'],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        # termine les ecritures en cours en fin d'execution
+        atexit.register(self.close)
+        return None
+
+    # Retourne un buffer partage d'au moins size octets
+    def getBuffer__(self, size):
+        if self._shm is not None and self._shm.size >= size: return self._shm
+        self.removeBuffer__()
+        if os.path.isdir('/dev/shm'): dir = '/dev/shm'
+        else: dir = None
+        (fd, self._shmFile) = tempfile.mkstemp(prefix='probe%d_%d_'%(os.getpid(),self._shmNo), dir=dir)
+        os.close(fd)
+        self._shmNo += 1
+        self._shm = numpy.memmap(self._shmFile, dtype=numpy.uint8, mode='w+', shape=(max(size,1),))
+        return self._shm
+
+    def removeBuffer__(self):
+        self._shm = None
+        if self._shmFile is not None:
+            try: os.remove(self._shmFile)
+            except: pass
+        self._shmFile = None
+
+    def send__(self, cmd):
+        pickle.dump(cmd, self._proc.stdin, protocol=pickle.HIGHEST_PROTOCOL)
+        self._proc.stdin.flush()
+
+    # Attend la fin de l'ecriture en cours
+    def wait(self):
+        """Wait for pending write."""
+        if not self._pending: return None
+        self._pending = False
+        try: ret = pickle.load(self._proc.stdout)
+        except EOFError: ret = ('error', 'writer process died.')
+        if ret[0] != 'ok': raise ValueError('probe: async write failed: %s'%ret[1])
+        return None
+
+    # Ecrit les noeuds nodes aux chemins paths de fileName
+    # Les noeuds sont serialises directement dans le buffer partage
+    # Ne bloque que si l'ecriture precedente n'est pas finie
+    def writeNodes(self, fileName, paths, nodes, mode=0):
+        """Write nodes to file in background."""
+        preps = [Distributed.preparePack__(n) for n in nodes]
+        self.start__()
+        self.wait()
+        size = 0
+        for p in preps: size += p[2]
+        shm = self.getBuffer__(size)
+        off = 0
+        for p in preps: off = Distributed.packInto__(shm, off, p)
+        self.post__(fileName, paths, size, mode)
+        return None
+
+    # Idem mais avec des noeuds deja serialises (cf Distributed.packNodes__)
+    def writeBuffers(self, fileName, paths, bufs, mode=0):
+        """Write packed nodes to file in background."""
+        self.start__()
+        self.wait()
+        size = 0
+        for b in bufs: size += b.size
+        shm = self.getBuffer__(size)
+        off = 0
+        for b in bufs:
+            shm[off:off+b.size] = b; off += b.size
+        self.post__(fileName, paths, size, mode)
+        return None
+
+    def post__(self, fileName, paths, size, mode):
+        self.send__(('write', fileName, paths, self._shmFile, size, mode))
+        self._pending = True
+        return None
+
+    def close(self):
+        """Flush pending write and stop writer."""
+        if self._proc is None: return None
+        try:
+            self.wait()
+        finally:
+            try: self.send__(('close',)); self._proc.stdin.close()
+            except: pass
+            self._proc.wait()
+            self._proc = None
+            self.removeBuffer__()
+            atexit.unregister(self.close)
+        return None
+
+# Boucle du processus ecrivain
+def main__():
+    # stdout est reserve au protocole, les prints vont sur stderr
+    out = os.fdopen(os.dup(1), 'wb')
+    os.dup2(2, 1)
+    inp = sys.stdin.buffer
+    shm = None; shmFile = None
+    while True:
+        try: cmd = pickle.load(inp)
+        except EOFError: break
+        if cmd[0] == 'close': break
+        (_, fileName, paths, name, size, mode) = cmd
+        try:
+            if name != shmFile:
+                shm = numpy.memmap(name, dtype=numpy.uint8, mode='r'); shmFile = name
+            nodes = Distributed.unpackNodes__(shm, 0, size)
+            Distributed.writeNodesFromPaths(fileName, paths, nodes, None, -1, mode)
+            nodes = None
+            ret = ('ok',)
+        except Exception as e: ret = ('error', str(e))
+        pickle.dump(ret, out); out.flush()
+    return None
+
+if __name__ == '__main__': main__()
@@ -161,25 +161,32 @@ def _prepareProjectCloudSolution(cloud, surf, dim=3, loc='nodes', ibm=False):
     return None
 
 # hook is a list of pointers on ADT for donor zones of t - created by C.createHook(a,'extractMesh')
+# plan is an extraction plan created by createExtractionPlan(t, extractionMesh)
 def extractMesh(t, extractionMesh, order=2, extrapOrder=1,
-                constraint=40., tol=1.e-6, hook=None, mode='robust'):
+                constraint=40., tol=1.e-6, hook=None, mode='robust', plan=None):
     """Extract the solution on a given mesh.
-    Usage: extractMesh(t, extractMesh, order, extrapOrder, constraint, tol, hook)"""
+    Usage: extractMesh(t, extractMesh, order, extrapOrder, constraint, tol, hook, mode, plan)"""
     te = Internal.copyRef(extractionMesh)
-    _extractMesh(t, te, order, extrapOrder, constraint, tol, hook, mode)
+    _extractMesh(t, te, order, extrapOrder, constraint, tol, hook, mode, plan)
     return te
 
-def _extractMesh(t, extractionMesh, order=2, extrapOrder=1,
-                 constraint=40., tol=1.e-6, hook=None, mode='robust'):
-    """Extract the solution on a given mesh.
-    Usage: extractMesh(t, extractMesh, order, extrapOrder, constraint, tol, hook)"""
-
-    # we sort structured then unstructured
+# Retourne les numeros des zones structurees puis non structurees
+def getOrderedZones__(extractionMesh):
     orderedZones=[]
     for i,z in enumerate(Internal.getZones(extractionMesh)):
         if Internal.getZoneType(z)==1: orderedZones.append(i)
     for i,z in enumerate(Internal.getZones(extractionMesh)):
         if Internal.getZoneType(z)==2: orderedZones.append(i)
+    return orderedZones
+
+def _extractMesh(t, extractionMesh, order=2, extrapOrder=1,
+                 constraint=40., tol=1.e-6, hook=None, mode='robust', plan=None):
+    """Extract the solution on a given mesh.
+    Usage: extractMesh(t, extractMesh, order, extrapOrder, constraint, tol, hook, mode, plan)"""
+    if plan is not None: return _extractMeshWithPlan__(t, extractionMesh, plan)
+
+    # we sort structured then unstructured
+    orderedZones = getOrderedZones__(extractionMesh)
 
     if mode == 'robust':
         tc = C.center2Node(t, Internal.__FlowSolutionCenters__)
@@ -260,6 +267,105 @@ def _extractMesh(t, extractionMesh, order=2, extrapOrder=1,
                     nor += 1
     return None
 
+#==============================================================================
+# Plan d'extraction : cellules donneuses et coefficients d'interpolation de
+# extractMesh (mode robust) pour un maillage d'extraction fixe.
+# Les extractions suivantes (extractMesh(..., plan=plan)) ne font plus que
+# rassembler et ponderer les champs des zones donneuses utilisees.
+#==============================================================================
+def createExtractionPlan(t, extractionMesh, order=2, extrapOrder=1,
+                         constraint=40., tol=1.e-6, hook=None):
+    """Compute donor cells and interpolation coefficients of extractMesh for a fixed extraction mesh.
+    Usage: createExtractionPlan(t, extractionMesh, order, extrapOrder, constraint, tol, hook)"""
+    plan = {'order':order, 'extrapOrder':extrapOrder, 'constraint':constraint, 'tol':tol}
+    _updateExtractionPlan(plan, t, extractionMesh, hook)
+    return plan
+
+# Recalcule le plan (si les coordonnees des donneurs ont change)
+def _updateExtractionPlan(plan, t, extractionMesh, hook=None):
+    """Update an extraction plan when donor coordinates have moved."""
+    # geometrie des donneurs : coordonnees et cellN en noeuds (comme en mode robust)
+    if C.isNamePresent(t, 'centers:cellN') >= 0: tc = C.center2Node(t, 'centers:cellN')
+    else: tc = t
+    fa = C.getFields(Internal.__GridCoordinates__, tc)
+    fn = C.getField('cellN', tc)
+    for i in range(len(fa)):
+        if fn[i] != []: fa[i] = Converter.addVars([fa[i], fn[i]])
+    del tc
+    if hook is not None:
+        if not isinstance(hook,list): raise TypeError("updateExtractionPlan: hook must be a list of hooks on ADTs.")
+    an = C.getFields(Internal.__GridCoordinates__, extractionMesh)
+    res = Post.extractMeshPlan(fa, an, plan['order'], plan['extrapOrder'],
+                               plan['constraint'], plan['tol'], hook)
+    orderedZones = getOrderedZones__(extractionMesh)
+    if len(res) != len(orderedZones):
+        raise ValueError("updateExtractionPlan: invalid number of zones.")
+    receivers = [None]*len(res)
+    for nor, r in enumerate(res): receivers[orderedZones[nor]] = r
+    plan['donors'] = [z[0] for z in Internal.getZones(t)]
+    plan['receivers'] = receivers
+    return None
+
+# center2Node restreint a une liste de zones (les cellules fictives sont
+# remplies a partir de t)
+def center2NodeZones__(t, zones):
+    ghost = Internal.getNodeFromName(t, 'ZoneRind')
+    if ghost is None:
+        a = Internal.addGhostCells(t, zones, 1, adaptBCs=0,
+                                   modified=[Internal.__FlowSolutionCenters__])
+    else: a = Internal.copyRef(zones)
+    fieldc = C.getFields(Internal.__FlowSolutionCenters__, a, api=3)
+    fieldn = []; listVar = []
+    for i in fieldc:
+        if i != []:
+            b = Converter.center2Node(i, 0); fieldn.append(b)
+            for va in b[0].split(','):
+                if va not in listVar: listVar.append(va)
+        else: fieldn.append([])
+    C._patchArrayForCenter2NodeNK1__(fieldn, a)
+    C.setFields(fieldn, a, 'nodes', writeDim=False)
+    if ghost is None:
+        a = Internal.rmGhostCells(a, a, 1, adaptBCs=0,
+                                  modified=[listVar, Internal.__FlowSolutionCenters__])
+    return a
+
+def _extractMeshWithPlan__(t, extractionMesh, plan):
+    zones = Internal.getZones(t)
+    if [z[0] for z in zones] != plan['donors']:
+        raise ValueError("extractMesh: plan does not match donor zones.")
+    used = set()
+    for r in plan['receivers']:
+        for it in r[1]: used.add(it[0])
+    used = sorted(used)
+    if used == []: return None
+    # champs en noeuds des seules zones donneuses utilisees
+    zd = [zones[b] for b in used]
+    centers = False
+    for z in zd:
+        fc = Internal.getNodeFromName1(z, Internal.__FlowSolutionCenters__)
+        if fc is not None and Internal.getNodesFromType1(fc, 'DataArray_t') != []: centers = True
+    if centers: zd = center2NodeZones__(t, zd)
+    coords = ['CoordinateX', 'CoordinateY', 'CoordinateZ']
+    varNames = None; fields = {}
+    for b, z in zip(used, zd):
+        f = C.getAllFields(z, 'nodes')[0]
+        names = f[0].split(',')
+        if varNames is None: varNames = [v for v in names if v not in coords]
+        try: pos = [names.index(v) for v in varNames]
+        except ValueError:
+            raise ValueError("extractMesh: all donor zones must have the same variables.")
+        fields[b] = f[1][pos]
+    if varNames == []: return None
+    varString = ','.join(varNames)
+    for i, z in enumerate(Internal.getZones(extractionMesh)):
+        r = plan['receivers'][i]
+        a = C.getFields(Internal.__GridCoordinates__, z)[0]
+        if a[1].shape[1] != r[0]:
+            raise ValueError("extractMesh: plan does not match extraction mesh.")
+        out = Post.applyExtractMeshPlan(fields, r)
+        C.setFields([[varString, out]+a[2:]], z, 'nodes', writeDim=False)
+    return None
+
 def coarsen(t, indicName='indic', argqual=0.1, tol=1.e6):
     """Coarsen a surface TRI-type mesh given a coarsening indicator for each
     element.
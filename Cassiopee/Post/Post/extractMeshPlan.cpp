@@ -0,0 +1,344 @@
+/*    
+    Copyright 2013-2025 Onera.
+
+    This file is part of Cassiopee.
+
+    Cassiopee is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Cassiopee is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Cassiopee.  If not, see <http://www.gnu.org/licenses/>.
+*/
+// Donor cells and interpolation coefficients of extractMesh
+// for a fixed extraction mesh (extraction plan)
+
+# include <string.h>
+# include <stdio.h>
+# include "post.h"
+# include "kcore.h"
+
+using namespace K_FLD;
+using namespace std;
+
+//=============================================================================
+// Developpe la molecule d'interpolation (cf compOneInterpolatedValue) en
+// une liste de (indice du sommet donneur, poids)
+// Retourne le nombre de sommets (0 si type inconnu)
+//=============================================================================
+static E_Int getStencil__(E_Int* indi, E_Float* cfp, void* a2, void* a3, void* a4,
+                          E_Int type, E_Int* inds, E_Float* ws)
+{
+  E_Int ni, nj, ninj, i, j, k, n = 0;
+  switch (type)
+  {
+    case 0:
+      for (E_Int no = 1; no <= indi[0]; no++)
+      { inds[n] = indi[no]; ws[n] = cfp[no-1]; n++; }
+      break;
+
+    case 1:
+      inds[0] = indi[0]; ws[0] = cfp[0]; n = 1;
+      break;
+
+    case 2:
+      ni = *(E_Int*)a2; nj = *(E_Int*)a3; ninj = ni*nj;
+      k = indi[0]/ninj; j = (indi[0]-k*ninj)/ni; i = indi[0]-j*ni-k*ninj;
+      for (E_Int k0 = 0; k0 < 2; k0++)
+        for (E_Int j0 = 0; j0 < 2; j0++)
+          for (E_Int i0 = 0; i0 < 2; i0++)
+          { inds[n] = (i+i0)+(j+j0)*ni+(k+k0)*ninj; ws[n] = cfp[n]; n++; }
+      break;
+
+    case 22:
+      ni = *(E_Int*)a2;
+      j = indi[0]/ni; i = indi[0]-j*ni;
+      for (E_Int j0 = 0; j0 < 2; j0++)
+        for (E_Int i0 = 0; i0 < 2; i0++)
+        { inds[n] = (i+i0)+(j+j0)*ni; ws[n] = cfp[n]; n++; }
+      break;
+
+    case 3:
+    case 5:
+    {
+      E_Int p = type; // 3 ou 5 coefs par direction
+      ni = *(E_Int*)a2; nj = *(E_Int*)a3; ninj = ni*nj;
+      k = indi[0]/ninj; j = (indi[0]-k*ninj)/ni; i = indi[0]-j*ni-k*ninj;
+      for (E_Int k0 = 0; k0 < p; k0++)
+        for (E_Int j0 = 0; j0 < p; j0++)
+          for (E_Int i0 = 0; i0 < p; i0++)
+          {
+            inds[n] = (i+i0)+(j+j0)*ni+(k+k0)*ninj;
+            ws[n] = cfp[i0]*cfp[j0+p]*cfp[k0+2*p]; n++;
+          }
+      break;
+    }
+
+    case 4:
+      if (a4 != NULL) // structure : indice de la cellule
+      {
+        ni = *(E_Int*)a2; E_Int nic = K_FUNC::E_max(1,ni-1);
+        nj = *(E_Int*)a3; E_Int njc = K_FUNC::E_max(1,nj-1);
+        E_Int nicnjc = nic*njc; ninj = ni*nj;
+        k = indi[0]/nicnjc; j = (indi[0]-k*nicnjc)/nic; i = indi[0]-j*nic-k*nicnjc;
+        E_Int ind0 = i+j*ni+k*ninj;
+        E_Int v[8] = {ind0, ind0+1, ind0+ni, ind0+ni+1,
+                      ind0+ninj, ind0+1+ninj, ind0+ni+ninj, ind0+ni+1+ninj};
+        for (n = 0; n < 8; n++) { inds[n] = v[n]; ws[n] = cfp[n]; }
+      }
+      else // non structure : sommets de l'element
+      {
+        FldArrayI& cn0 = *(FldArrayI*)a2;
+        E_Int nvert = cn0.getNfld();
+        for (E_Int nov = 1; nov <= nvert; nov++)
+        { inds[n] = cn0(indi[0],nov)-1; ws[n] = cfp[nov-1]; n++; }
+      }
+      break;
+
+    default:
+      n = 0;
+  }
+  return n;
+}
+
+// ============================================================================
+/*  
+    IN: arrays des domaines donneurs (x,y,z et eventuellement cellN)
+    IN: arrays des maillages d'extraction
+    OUT: pour chaque maillage d'extraction (structures puis non structures) :
+    (noblk, offset, indices, poids)
+    noblk[ind]: numero du domaine donneur du point ind (-1 si non trouve)
+    la valeur extraite au point ind est :
+    sum_{offset[ind] <= l < offset[ind+1]} poids[l]*f_noblk[indices[l]]
+*/
+// ============================================================================
+PyObject* K_POST::extractMeshPlan(PyObject* self, PyObject* args)
+{
+  PyObject* listFields; PyObject* arrays;
+  E_Int interpOrder;
+  E_Int extrapOrder;
+  E_Float constraint;
+  PyObject* allHooks;
+  if (!PYPARSETUPLE_(args, OO_ II_ R_ O_,
+                    &listFields, &arrays, &interpOrder, &extrapOrder, &constraint, &allHooks))
+  {
+      return NULL;
+  }
+
+  // Maillages d'extraction
+  vector<E_Int> res0;
+  vector<char*> structVarString0; vector<char*> unstrVarString0;
+  vector<FldArrayF*> structF0; vector<FldArrayF*> unstrF0;
+  vector<E_Int> nit0; vector<E_Int> njt0; vector<E_Int> nkt0;
+  vector<FldArrayI*> cnt0; vector<char*> eltType0;
+  vector<PyObject*> objst0, objut0;
+  E_Int isOk = K_ARRAY::getFromArrays(
+    arrays, res0, structVarString0, unstrVarString0,
+    structF0, unstrF0, nit0, njt0, nkt0, cnt0, eltType0, objst0, objut0, 
+    true, true, false, false, true);
+  E_Int ns0 = structF0.size(); E_Int nu0 = unstrF0.size();
+  if (isOk == -1)
+  {
+    PyErr_SetString(PyExc_TypeError,
+                    "extractMeshPlan: invalid list of extraction arrays.");
+    for (E_Int nos = 0; nos < ns0; nos++)
+      RELEASESHAREDS(objst0[nos], structF0[nos]);
+    for (E_Int nos = 0; nos < nu0; nos++)
+      RELEASESHAREDU(objut0[nos], unstrF0[nos], cnt0[nos]);
+    return NULL;
+  }
+  // structures puis non structures (comme extractMesh)
+  vector<FldArrayF*> rcvF; vector<char*> rcvVarString;
+  for (E_Int i = 0; i < ns0; i++) { rcvF.push_back(structF0[i]); rcvVarString.push_back(structVarString0[i]); }
+  for (E_Int i = 0; i < nu0; i++) { rcvF.push_back(unstrF0[i]); rcvVarString.push_back(unstrVarString0[i]); }
+
+  E_Int nindi; E_Int ncf;
+  K_INTERP::InterpData::InterpolationType interpType;
+  switch (interpOrder)
+  {
+    case 3: 
+      interpType = K_INTERP::InterpData::O3ABC;
+      ncf = 9; nindi = 1;
+      break;
+    case 5:
+      interpType = K_INTERP::InterpData::O5ABC;
+      ncf = 15; nindi = 1;
+      break;
+    default:
+      interpType = K_INTERP::InterpData::O2CF;
+      ncf = 8; nindi = 1;
+      break;
+  }
+
+  // Domaines donneurs
+  vector<E_Int> resl;  vector<char*> varString;
+  vector<FldArrayF*> fields; 
+  vector<void*> a2; vector<void*> a3; vector<void*> a4;
+  vector<PyObject*> objs;
+  isOk = K_ARRAY::getFromArrays(
+    listFields, resl, varString, fields, a2, a3, a4, objs,  
+    false, true, false, false, true);
+  E_Int nzones = objs.size();
+
+# define RELEASEALL \
+  for (E_Int nos = 0; nos < ns0; nos++) \
+    RELEASESHAREDS(objst0[nos], structF0[nos]); \
+  for (E_Int nos = 0; nos < nu0; nos++) \
+    RELEASESHAREDU(objut0[nos], unstrF0[nos], cnt0[nos]); \
+  for (E_Int no = 0; no < nzones; no++) \
+    RELEASESHAREDA(resl[no],objs[no],fields[no],a2[no],a3[no],a4[no]);
+
+  if (isOk == -1)
+  {
+    RELEASEALL;
+    PyErr_SetString(PyExc_TypeError,
+                    "extractMeshPlan: invalid list of arrays.");
+    return NULL;
+  }
+
+  E_Int nzonesS = 0; E_Int nzonesU = 0;
+  vector<E_Int> posxa; vector<E_Int> posya; vector<E_Int> posza; 
+  vector<E_Int> posca;
+  vector<void*> a5;
+  for (E_Int no = 0; no < nzones; no++)
+  {
+    E_Int posx = K_ARRAY::isCoordinateXPresent(varString[no]); posx++;
+    E_Int posy = K_ARRAY::isCoordinateYPresent(varString[no]); posy++;
+    E_Int posz = K_ARRAY::isCoordinateZPresent(varString[no]); posz++;
+    E_Int posc = K_ARRAY::isCellNatureField2Present(varString[no]); posc++;
+    if (a4[no] == NULL) nzonesU++;
+    else nzonesS++;
+    posxa.push_back(posx); posya.push_back(posy); 
+    posza.push_back(posz); posca.push_back(posc); 
+    a5.push_back(NULL);
+  }
+  if (nzonesU != 0 && nzonesS == 0) ncf = 4;
+
+  // interpDatas
+  vector<K_INTERP::InterpData*> interpDatas;
+  if (allHooks == Py_None)
+  {
+    E_Int isBuilt;
+    for (E_Int no = 0; no < nzones; no++)
+    {
+      K_INTERP::InterpAdt* adt = new K_INTERP::InterpAdt(
+        fields[no]->getSize(), 
+        fields[no]->begin(posxa[no]),
+        fields[no]->begin(posya[no]),
+        fields[no]->begin(posza[no]),
+        a2[no], a3[no], a4[no], isBuilt);
+      if (isBuilt == 1) interpDatas.push_back(adt);
+      else 
+      {
+        delete adt;
+        for (size_t noi = 0; noi < interpDatas.size(); noi++)
+          delete interpDatas[noi];
+        RELEASEALL;
+        PyErr_SetString(PyExc_TypeError,
+                        "extractMeshPlan: 2D structured donor zones must be z=constant.");
+        return NULL;
+      }
+    }
+  }
+  else
+  {
+    E_Int oki = 1;
+    if (PyList_Check(allHooks) == false || PyList_Size(allHooks) != nzones) oki = 0;
+    else oki = K_INTERP::extractADTFromHooks(allHooks, interpDatas);
+    if (oki < 1)
+    {
+      RELEASEALL;
+      PyErr_SetString(PyExc_TypeError,
+                      "extractMeshPlan: hook must be a list of hooks (one per donor zone).");
+      return NULL;
+    }
+  }
+
+  PyObject* l = PyList_New(0);
+  for (size_t v = 0; v < rcvF.size(); v++)
+  {
+    FldArrayF& f = *rcvF[v];
+    E_Int nbI = f.getSize();
+    E_Int posxi = K_ARRAY::isCoordinateXPresent(rcvVarString[v]); posxi++;
+    E_Int posyi = K_ARRAY::isCoordinateYPresent(rcvVarString[v]); posyi++;
+    E_Int poszi = K_ARRAY::isCoordinateZPresent(rcvVarString[v]); poszi++;
+    E_Float* xt = f.begin(posxi);
+    E_Float* yt = f.begin(posyi);
+    E_Float* zt = f.begin(poszi);
+
+    // recherche des cellules donneuses
+    FldArrayI blk(nbI); FldArrayI types(nbI);
+    FldArrayI indis(nbI*nindi*2); FldArrayF cfs(nbI*ncf);
+    E_Int* blkp = blk.begin(); E_Int* typep = types.begin();
+    E_Float vol; E_Int noblk, type;
+#pragma omp parallel default(shared) private(vol, noblk, type) if (nbI > 50)
+    {
+      FldArrayI indi(nindi*2); FldArrayF cf(ncf);
+      FldArrayI tmpIndi(nindi*2); FldArrayF tmpCf(ncf);
+      short ok;
+
+#pragma omp for schedule(dynamic)
+      for (E_Int ind = 0; ind < nbI; ind++)
+      {
+        vol = K_CONST::E_MAX_FLOAT;
+        ok = K_INTERP::getInterpolationCell(
+          xt[ind], yt[ind], zt[ind], interpDatas, fields,
+          a2, a3, a4, a5, posxa, posya, posza, posca,
+          vol, indi, cf, tmpIndi, tmpCf, type, noblk, interpType, 0, 0);
+        if (ok != 1)
+        {
+          ok = K_INTERP::getExtrapolationCell(
+            xt[ind], yt[ind], zt[ind], interpDatas, fields,
+            a2, a3, a4, a5, posxa, posya, posza, posca,
+            vol, indi, cf, type, noblk, interpType, 0, 0, 
+            constraint, extrapOrder); 
+        }
+        blkp[ind] = noblk-1; typep[ind] = type;
+        for (E_Int i = 0; i < nindi*2; i++) indis[ind*nindi*2+i] = indi[i];
+        for (E_Int i = 0; i < ncf; i++) cfs[ind*ncf+i] = cf[i];
+      }
+    }
+
+    // developpement des molecules
+    E_Int nmax = 125; // O5ABC
+    FldArrayI offset(nbI+1);
+    vector<E_Int> inds; vector<E_Float> ws;
+    inds.reserve(8*nbI); ws.reserve(8*nbI);
+    vector<E_Int> ti(nmax); vector<E_Float> tw(nmax);
+    offset[0] = 0;
+    for (E_Int ind = 0; ind < nbI; ind++)
+    {
+      E_Int n = 0;
+      E_Int no = blkp[ind];
+      if (no >= 0)
+      {
+        n = getStencil__(&indis[ind*nindi*2], &cfs[ind*ncf], a2[no], a3[no], a4[no],
+                         typep[ind], ti.data(), tw.data());
+        if (n == 0) blkp[ind] = -1;
+      }
+      for (E_Int i = 0; i < n; i++) { inds.push_back(ti[i]); ws.push_back(tw[i]); }
+      offset[ind+1] = offset[ind]+n;
+    }
+    E_Int nnz = inds.size();
+    PyObject* tpl = PyTuple_New(4);
+    PyTuple_SET_ITEM(tpl, 0, K_NUMPY::buildNumpyArray(blkp, nbI, 1));
+    PyTuple_SET_ITEM(tpl, 1, K_NUMPY::buildNumpyArray(offset.begin(), nbI+1, 1));
+    PyTuple_SET_ITEM(tpl, 2, K_NUMPY::buildNumpyArray(inds.data(), nnz, 1));
+    PyTuple_SET_ITEM(tpl, 3, K_NUMPY::buildNumpyArray(ws.data(), nnz, 1));
+    PyList_Append(l, tpl); Py_DECREF(tpl);
+  }
+
+  if (allHooks == Py_None)
+  {
+    for (E_Int no = 0; no < nzones; no++) delete interpDatas[no];
+  }
+  RELEASEALL;
+# undef RELEASEALL
+  return l;
+}
@@ -33,6 +33,7 @@ static PyMethodDef Pypost [] =
   {"prepareProjectCloudSolution2Triangle", K_POST::prepareProjectCloudSolution2Triangle, METH_VARARGS},
   {"projectCloudSolution2TriangleWithInterpData", K_POST::projectCloudSolution2TriangleWithInterpData, METH_VARARGS},
   {"extractMesh", K_POST::extractMesh, METH_VARARGS},
+  {"extractMeshPlan", K_POST::extractMeshPlan, METH_VARARGS},
   {"coarsen", K_POST::coarsen, METH_VARARGS},
   {"refine", K_POST::refine, METH_VARARGS},
   {"refineButterfly", K_POST::refineButterfly, METH_VARARGS},
@@ -33,6 +33,7 @@ namespace K_POST
   PyObject* extractPoint(PyObject* self, PyObject* args);
   PyObject* extractPlane(PyObject* self, PyObject* args);
   PyObject* extractMesh(PyObject* self, PyObject* args);
+  PyObject* extractMeshPlan(PyObject* self, PyObject* args);
   PyObject* projectCloudSolution2Triangle(PyObject* self, PyObject* args);
   PyObject* prepareProjectCloudSolution2Triangle(PyObject* self, PyObject* args);
   PyObject* projectCloudSolution2TriangleWithInterpData(PyObject* self, PyObject* args);
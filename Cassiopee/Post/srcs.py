@@ -52,6 +52,7 @@ cpp_srcs = ["Post/coarsen.cpp",
             "Post/zipper.cpp",
             "Post/extractPoint.cpp",
             "Post/extractMesh.cpp",
+            "Post/extractMeshPlan.cpp",
             "Post/projectCloudSolution2Triangle.cpp",
             "Post/extractPlane.cpp",
             "Post/cutPlane/cutPlane.cpp",
@@ -0,0 +1,19 @@
+# - createExtractionPlan (pyTree) -
+import Converter.PyTree as C
+import Post.PyTree as P
+import Generator.PyTree as G
+
+ni = 30; nj = 40; nk = 10
+m = G.cart((0,0,0), (10./(ni-1),10./(nj-1),1), (ni,nj,nk))
+C._initVars(m, '{Density}={CoordinateX}')
+C._initVars(m, 'centers:cellN', 1)
+
+# Extraction mesh
+a = G.cart((0.,0.,0.5), (1., 0.1, 1.), (20, 20, 1)); a[0] = 'extraction'
+
+# Donor cells are searched once
+plan = P.createExtractionPlan(m, a)
+for it in range(3):
+    C._initVars(m, '{Density}={CoordinateX}+%g'%it)
+    P._extractMesh(m, a, plan=plan)
+C.convertPyTree2File(a, 'out.cgns')
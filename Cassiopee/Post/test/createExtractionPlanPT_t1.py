@@ -0,0 +1,42 @@
+# - createExtractionPlan (pyTree) -
+import Converter.PyTree as C
+import Post.PyTree as P
+import Generator.PyTree as G
+import Transform.PyTree as T
+import KCore.test as test
+
+# Donneurs : deux zones structurees, une zone tetra
+m1 = G.cart((0,0,0), (0.1,0.1,0.1), (11,11,11))
+m2 = G.cart((1,0,0), (0.1,0.1,0.1), (11,11,11))
+m3 = G.cartTetra((0,1,0), (0.1,0.1,0.1), (21,6,11))
+t = C.newPyTree(['Base', [m1,m2,m3]])
+C._initVars(t, '{Density}={CoordinateX}*{CoordinateY}')
+C._initVars(t, '{centers:MomentumX}={centers:CoordinateZ}')
+C._initVars(t, 'centers:cellN', 1)
+
+# Maillages d'extraction
+a = G.cart((0.05,0.05,0.5), (0.1,0.1,1), (19,14,1))
+b = G.cartTetra((0.05,0.05,0.25), (0.1,0.1,0.1), (19,14,3))
+e = C.newPyTree(['Extraction', [a,b]])
+
+# le plan donne la meme extraction que extractMesh
+e1 = P.extractMesh(t, e)
+plan = P.createExtractionPlan(t, e)
+e2 = P.extractMesh(t, e, plan=plan)
+test.testT(e1, 1)
+test.testT(e2, 1)
+
+# nouvelle solution
+C._initVars(t, '{Density}={CoordinateX}+{CoordinateZ}')
+e1 = P.extractMesh(t, e)
+P._extractMesh(t, e, plan=plan)
+test.testT(e1, 2)
+test.testT(e, 2)
+
+# deplacement des donneurs
+T._translate(t, (0.02,0.,0.))
+P._updateExtractionPlan(plan, t, e)
+e1 = P.extractMesh(t, e)
+e2 = P.extractMesh(t, e, plan=plan)
+test.testT(e1, 3)
+test.testT(e2, 3)
@@ -0,0 +1,42 @@
+# - Probe (pyTree) -
+# ecriture asynchrone
+import Post.Probe as Probe
+import Converter.PyTree as C
+import Generator.PyTree as G
+import KCore.test as test
+
+LOCAL = test.getLocal()
+
+# test case
+a = G.cartRx((0,0,0), (1,1,1), (20,20,20), (3,3,3), depth=0, addCellN=False)
+C._initVars(a, '{centers:F} = {centers:CoordinateX}')
+t = C.newPyTree(['Base',a])
+
+# create a probe with X
+p1 = Probe.Probe(LOCAL+'/probe1.cgns', t, X=(10.,10.,10.), fields=['centers:F'], append=False, bufferSize=15, asyncWrite=True)
+for i in range(50):
+    time = 0.1*i
+    C._initVars(t, '{centers:F} = {centers:CoordinateX}+10.*sin(%20.16g)'%time)
+    p1.extract(t, time=time)
+p1.flush()
+p1.close()
+test.testT(p1._probeZones, 1)
+
+# create probe from zones
+p1 = Probe.Probe(LOCAL+'/probe3.cgns', fields=['centers:F'], append=False, bufferSize=15, asyncWrite=True)
+for i in range(50):
+    time = 0.1*i
+    a = G.cart((0,0,0), (1,1,1), (5,5,1))
+    C._initVars(a, '{centers:F} = %20.16g'%time)
+    p1.extract(a, time=time)
+p1.flush()
+p1.close()
+
+# reread probe
+p1 = Probe.Probe(LOCAL+'/probe1.cgns')
+out = p1.read()
+test.testT(out, 2)
+
+p1 = Probe.Probe(LOCAL+'/probe3.cgns')
+out = p1.read()
+test.testT(out, 3)
@@ -8,9 +8,8 @@ try:
     import Converter
     import Converter.PyTree as C
     import Converter.Internal as Internal
-    import Transform.PyTree as T
 except ImportError:
-    raise ImportError("RigidMotion: requires Converter, Transform modules.")
+    raise ImportError("RigidMotion: requires Converter module.")
 
 import numpy
 from math import cos, sin, sqrt, pi
@@ -268,9 +267,12 @@ def _setPrescribedMotion3(t, name, transl_speed=(0.,0.,0.),
 def evalTimeString__(m, string, time):
     st = Internal.getNodeFromName1(m, string)
     st = Internal.getValue(st)
-    st = st.replace('{t}', str(time))
-    tx = eval(st)
-    return tx
+    code = __MOTIONCACHE__.get(st, None)
+    if code is None:
+        code = compile(compileTimeString__(st), '<%s>'%string, 'eval')
+        if len(__MOTIONCACHE__) >= __MOTIONCACHESIZE__: __MOTIONCACHE__.clear()
+        __MOTIONCACHE__[st] = code
+    return eval(code, globals(), {'__t__':time})
 
 def getTimeString__(m, string):
     st = Internal.getNodeFromName1(m, string)
@@ -297,104 +299,170 @@ def getNodeValue__(m, string):
     st = Internal.getNodeFromName1(m, string)
     return st[1]
 
-def _moveZone__(z, time):
+#==============================================================================
+# Mouvements compiles
+# Un noeud mouvement est compile une seule fois (cache indexe par son contenu) :
+# les chaines du type 1 sont compilees en une seule expression, les
+# parametres des types 2 et 3 sont extraits une fois pour toutes.
+# A un instant donne, un mouvement est une transformation affine XP=R*X+d ;
+# les mouvements enchaines d'une zone sont composes en une seule
+# transformation appliquee en une passe sur les coordonnees.
+#==============================================================================
+__MOTIONCACHE__ = {}
+__MOTIONCACHESIZE__ = 10000
+__TIMESTRINGS__ = ['tx','ty','tz','cx','cy','cz','ex','ey','ez','angle']
+
+# Cle d'un noeud mouvement (contenu de ses fils)
+def getMotionKey__(m):
+    key = []
+    for n in m[2]:
+        v = n[1]
+        if isinstance(v, numpy.ndarray): key.append((n[0], v.dtype.char, v.shape, v.tobytes()))
+        else: key.append((n[0], v))
+    return tuple(key)
+
+# Compile une chaine dependant de {t} (variable __t__)
+def compileTimeString__(st):
+    return st.replace('{t}', '(__t__)')
+
+# Retourne le mouvement compile : (key, dtype, data)
+def compileMotion__(m):
+    key = getMotionKey__(m)
+    cm = __MOTIONCACHE__.get(key, None)
+    if cm is not None: return cm
+    dtype = Internal.getNodeFromName1(m, 'MotionType')[1][0]
+    if dtype == 1: # type 1: time strings
+        st = [compileTimeString__(getTimeString__(m, s)) for s in __TIMESTRINGS__]
+        data = compile('('+','.join(st)+',)', '<motion %s>'%m[0], 'eval')
+    elif dtype == 2: # type 2: rotor motion
+        data = getRotorMotionArgs__(m)
+    elif dtype == 3: # type 3: constant rotation+translation speed
+        transl_speed = Internal.getNodeFromName1(m, 'transl_speed')
+        if transl_speed is None: transl_speed = (0.,0.,0.)
+        else: transl_speed = tuple(transl_speed[1].tolist())
+        axis_pnt = Internal.getNodeFromName1(m, 'axis_pnt')
+        if axis_pnt is None: axis_pnt = (0.,0.,0.)
+        else: axis_pnt = tuple(axis_pnt[1].tolist())
+        axis_vct = Internal.getNodeFromName1(m, 'axis_vct')
+        if axis_vct is None: axis_vct = (0.,0.,1.)
+        else: axis_vct = tuple(axis_vct[1].tolist())
+        omega = Internal.getNodeFromName1(m, 'omega')
+        if omega is None: omega = 0.
+        else: omega = float(Internal.getValue(omega))
+        data = (transl_speed, axis_pnt, axis_vct, omega)
+    else: data = None
+    if len(__MOTIONCACHE__) >= __MOTIONCACHESIZE__: __MOTIONCACHE__.clear()
+    cm = (key, dtype, data)
+    __MOTIONCACHE__[key] = cm
+    return cm
+
+# Arguments de rigidMotion._computeRotorMotionInfo (apres time)
+def getRotorMotionArgs__(m):
+    transl_speed = Internal.getValue(Internal.getNodeFromName(m, 'transl_speed'))
+    psi0 = Internal.getValue(Internal.getNodeFromName(m, 'psi0'))
+    psi0_b = Internal.getValue(Internal.getNodeFromName(m, 'psi0_b'))
+    alp_pnt = Internal.getValue(Internal.getNodeFromName(m, 'alp_pnt'))
+    alp_vct = Internal.getValue(Internal.getNodeFromName(m, 'alp_vct'))
+    alp0 = Internal.getValue(Internal.getNodeFromName(m, 'alp0'))
+    rot_pnt = Internal.getValue(Internal.getNodeFromName(m, 'rot_pnt'))
+    rot_vct = Internal.getValue(Internal.getNodeFromName(m, 'rot_vct'))
+    rot_omg = Internal.getValue(Internal.getNodeFromName(m, 'rot_omg'))
+    del_pnt = Internal.getValue(Internal.getNodeFromName(m, 'del_pnt'))
+    del_vct = Internal.getValue(Internal.getNodeFromName(m, 'del_vct'))
+    del0 = Internal.getValue(Internal.getNodeFromName(m, 'del0'))
+    delc = getNodeValue__(m, 'delc')
+    dels = getNodeValue__(m, 'dels')
+    bet_pnt = Internal.getValue(Internal.getNodeFromName(m, 'bet_pnt'))
+    bet_vct = Internal.getValue(Internal.getNodeFromName(m, 'bet_vct'))
+    bet0 = Internal.getValue(Internal.getNodeFromName(m, 'bet0'))
+    betc = getNodeValue__(m, 'betc')
+    bets = getNodeValue__(m, 'bets')
+    tet_pnt = Internal.getValue(Internal.getNodeFromName(m, 'tet_pnt'))
+    tet_vct = Internal.getValue(Internal.getNodeFromName(m, 'tet_vct'))
+    tet0 = Internal.getValue(Internal.getNodeFromName(m, 'tet0'))
+    tetc = getNodeValue__(m, 'tetc')
+    tets = getNodeValue__(m, 'tets')
+    span_vct = Internal.getValue(Internal.getNodeFromName(m, 'span_vct'))
+    pre_lag_ang = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_ang'))
+    pre_lag_pnt = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_pnt'))
+    pre_lag_vct = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_vct'))
+    pre_con_ang = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_ang'))
+    pre_con_pnt = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_pnt'))
+    pre_con_vct = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_vct'))
+    return (transl_speed.tolist(), psi0, psi0_b,
+            alp_pnt.tolist(), alp_vct.tolist(), alp0,
+            rot_pnt.tolist(), rot_vct.tolist(), rot_omg,
+            del_pnt.tolist(), del_vct.tolist(), del0, delc.tolist(), dels.tolist(),
+            bet_pnt.tolist(), bet_vct.tolist(), bet0, betc.tolist(), bets.tolist(),
+            tet_pnt.tolist(), tet_vct.tolist(), tet0, tetc.tolist(), tets.tolist(),
+            span_vct.tolist(),
+            pre_lag_ang, pre_lag_pnt.tolist(), pre_lag_vct.tolist(),
+            pre_con_ang, pre_con_pnt.tolist(), pre_con_vct.tolist())
+
+# Evalue un mouvement compile a l'instant time
+# OUT: (R, d, s0, x0, omega) : XP = R*X+d et vitesse s = s0 + omega ^ (X-x0)
+# evals: dictionnaire des mouvements deja evalues a cet instant
+def evalMotion__(cm, time, evals=None):
+    (key, dtype, data) = cm
+    if evals is not None:
+        ev = evals.get(key, None)
+        if ev is not None: return ev
+    I = numpy.identity(3, numpy.float64)
+    zero = numpy.zeros(3, numpy.float64)
+    if dtype == 1: # type 1: time string
+        (tx,ty,tz,cx,cy,cz,ex,ey,ez,angle) = eval(data, globals(), {'__t__':time})
+        c = numpy.array([cx,cy,cz], numpy.float64)
+        if angle != 0: R = getRotationMatrix__(cx,cy,cz,ex-cx,ey-cy,ez-cz,angle*__DEG2RAD__)
+        else: R = I
+        d = numpy.dot(R, numpy.array([tx,ty,tz], numpy.float64)-c)+c
+        # vitesse non evaluee pour ce type
+        ev = (R, d, zero, zero, zero)
+    elif dtype == 2: # type 2: rotor motion
+        [r0,x0,rotMat,s0,omega] = rigidMotion._computeRotorMotionInfo(time, *data)
+        R = numpy.array(rotMat, numpy.float64)
+        x0 = numpy.array(x0[0:3], numpy.float64)
+        d = numpy.array(r0[0:3], numpy.float64)-numpy.dot(R, x0)
+        ev = (R, d, numpy.array(s0[0:3], numpy.float64), x0, numpy.array(omega[0:3], numpy.float64))
+    elif dtype == 3: # type 3: constant rotation+translation speed
+        (transl_speed, axis_pnt, axis_vct, omega) = data
+        c = numpy.array(axis_pnt, numpy.float64)
+        R = getRotationMatrix__(c[0],c[1],c[2],axis_vct[0],axis_vct[1],axis_vct[2],omega*time)
+        v = numpy.array(transl_speed, numpy.float64)
+        d = c-numpy.dot(R, c)+v*time
+        ev = (R, d, v, c, omega*numpy.array(axis_vct, numpy.float64))
+    else:
+        print("Warning: Motion type not found. Nothing done.")
+        ev = (I, zero, zero, zero, zero)
+    if evals is not None: evals[key] = ev
+    return ev
+
+# Transformation affine de la zone a l'instant time (composition des
+# mouvements enchaines). Retourne None si la zone n'a pas de mouvement.
+def getZoneMotion__(z, time, evals=None):
     cont = Internal.getNodeFromName1(z, 'TimeMotion')
-    if cont is not None:
-        motions = Internal.getNodesFromType1(cont, 'TimeRigidMotion_t')
-        motions.reverse()
-        for m in motions:
-            mtype = Internal.getNodeFromName1(m, 'MotionType')
-            dtype = mtype[1][0]
-            if dtype == 1: # type 1: time string
-                tx = evalTimeString__(m, 'tx', time)
-                ty = evalTimeString__(m, 'ty', time)
-                tz = evalTimeString__(m, 'tz', time)
-                cx = evalTimeString__(m, 'cx', time)
-                cy = evalTimeString__(m, 'cy', time)
-                cz = evalTimeString__(m, 'cz', time)
-                ex = evalTimeString__(m, 'ex', time)
-                ey = evalTimeString__(m, 'ey', time)
-                ez = evalTimeString__(m, 'ez', time)
-                angle = evalTimeString__(m, 'angle', time)
-                T._translate(z, (tx,ty,tz))
-                if angle != 0:
-                    angle = angle #*__RAD2DEG__
-                    T._rotate(z, (cx,cy,cz), (ex-cx,ey-cy,ez-cz), angle, vectors=[])
-
-            elif dtype == 2: # type 2: rotor_motion for helicopters in FF
-                transl_speed = Internal.getValue(Internal.getNodeFromName(m, 'transl_speed'))
-                psi0 = Internal.getValue(Internal.getNodeFromName(m, 'psi0'))
-                psi0_b = Internal.getValue(Internal.getNodeFromName(m, 'psi0_b'))
-                alp_pnt = Internal.getValue(Internal.getNodeFromName(m, 'alp_pnt'))
-                alp_vct = Internal.getValue(Internal.getNodeFromName(m, 'alp_vct'))
-                alp0 = Internal.getValue(Internal.getNodeFromName(m, 'alp0'))
-                rot_pnt = Internal.getValue(Internal.getNodeFromName(m, 'rot_pnt'))
-                rot_vct = Internal.getValue(Internal.getNodeFromName(m, 'rot_vct'))
-                rot_omg = Internal.getValue(Internal.getNodeFromName(m, 'rot_omg'))
-                del_pnt = Internal.getValue(Internal.getNodeFromName(m, 'del_pnt'))
-                del_vct = Internal.getValue(Internal.getNodeFromName(m, 'del_vct'))
-                del0 = Internal.getValue(Internal.getNodeFromName(m, 'del0'))
-                delc = getNodeValue__(m, 'delc')
-                dels = getNodeValue__(m, 'dels')
-                bet_pnt = Internal.getValue(Internal.getNodeFromName(m, 'bet_pnt'))
-                bet_vct = Internal.getValue(Internal.getNodeFromName(m, 'bet_vct'))
-                bet0 = Internal.getValue(Internal.getNodeFromName(m, 'bet0'))
-                betc = getNodeValue__(m, 'betc')
-                bets = getNodeValue__(m, 'bets')
-                betc = getNodeValue__(m, 'betc')
-                bets = getNodeValue__(m, 'bets')
-                tet_pnt = Internal.getValue(Internal.getNodeFromName(m, 'tet_pnt'))
-                tet_vct = Internal.getValue(Internal.getNodeFromName(m, 'tet_vct'))
-                tet0 = Internal.getValue(Internal.getNodeFromName(m, 'tet0'))
-                tetc = getNodeValue__(m, 'tetc')
-                tets = getNodeValue__(m, 'tets')
-                span_vct = Internal.getValue(Internal.getNodeFromName(m, 'span_vct'))
-                pre_lag_ang = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_ang'))
-                pre_lag_pnt = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_pnt'))
-                pre_lag_vct = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_vct'))
-                pre_con_ang = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_ang'))
-                pre_con_pnt = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_pnt'))
-                pre_con_vct = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_vct'))
-                [r0,x0,rotMat,s0,omega] = rigidMotion._computeRotorMotionInfo(
-                    time, transl_speed.tolist(), psi0, psi0_b,
-                    alp_pnt.tolist(),alp_vct.tolist(),alp0,
-                    rot_pnt.tolist(),rot_vct.tolist(),rot_omg,
-                    del_pnt.tolist(),del_vct.tolist(),del0, delc.tolist(), dels.tolist(),
-                    bet_pnt.tolist(), bet_vct.tolist(), bet0, betc.tolist(), bets.tolist(),
-                    tet_pnt.tolist(), tet_vct.tolist(), tet0, tetc.tolist(), tets.tolist(),
-                    span_vct.tolist(),
-                    pre_lag_ang, pre_lag_pnt.tolist(), pre_lag_vct.tolist(),
-                    pre_con_ang, pre_con_pnt.tolist(), pre_con_vct.tolist())
-                coordsC = [x0[0], x0[1], x0[2]]
-                coordsD = [r0[0], r0[1], r0[2]]
-                GC = Internal.getNodeFromName(z,Internal.__GridCoordinates__)
-                XN = Internal.getNodeFromName(GC,'CoordinateX')
-                YN = Internal.getNodeFromName(GC,'CoordinateY')
-                ZN = Internal.getNodeFromName(GC,'CoordinateZ')
-                XI = Internal.getValue(XN)
-                YI = Internal.getValue(YN)
-                ZI = Internal.getValue(ZN)
-                _moveN([XI,YI,ZI], coordsD, coordsC, rotMat)
-                Internal.setValue(XN,XI)
-                Internal.setValue(YN,YI)
-                Internal.setValue(ZN,ZI)
-
-            elif dtype == 3: # type 3: constant rotation+translation speed
-                transl_speed = getNodeValue__(m, 'transl_speed')
-                axis_pnt = getNodeValue__(m, 'axis_pnt')
-                axis_vct = getNodeValue__(m, 'axis_vct')
-                omega = getNodeValue__(m, 'omega')
-                cx = axis_pnt[0]
-                cy = axis_pnt[1]
-                cz = axis_pnt[2]
-                ex = axis_vct[0]
-                ey = axis_vct[1]
-                ez = axis_vct[2]
-                angle = omega[0]*time*__RAD2DEG__
-                T._rotate(z, (cx,cy,cz), (ex,ey,ez), angle, vectors=[])
-                T._translate(z, (transl_speed[0]*time,transl_speed[1]*time,transl_speed[2]*time))
-            else:
-                print("Warning: Motion type not found. Nothing done.")
+    if cont is None: return None
+    motions = Internal.getNodesFromType1(cont, 'TimeRigidMotion_t')
+    if motions == []: return None
+    motions.reverse()
+    R = None; d = None
+    for m in motions:
+        (Rm, dm, s0, x0, omega) = evalMotion__(compileMotion__(m), time, evals)
+        if R is None: R = Rm; d = dm
+        else: R = numpy.dot(Rm, R); d = numpy.dot(Rm, d)+dm
+    return (R, d)
+
+def _moveZone__(z, time, evals=None):
+    mo = getZoneMotion__(z, time, evals)
+    if mo is None: return None
+    (R, d) = mo
+    GC = Internal.getNodeFromName1(z, Internal.__GridCoordinates__)
+    if GC is None: return None
+    XN = Internal.getNodeFromName1(GC, 'CoordinateX')
+    YN = Internal.getNodeFromName1(GC, 'CoordinateY')
+    ZN = Internal.getNodeFromName1(GC, 'CoordinateZ')
+    if XN is None or YN is None or ZN is None: return None
+    # XP = R*X+d en une passe
+    _moveN([XN[1],YN[1],ZN[1]], d, (0.,0.,0.), R)
     return None
 
 # Recopie GridCoordinates#Init (s'il existe) dans GridCoordinates
@@ -527,7 +595,9 @@ def _evalDeformationSpeed(t):
 def _evalPosition__(a, time):
     _copyGridInit2Grid(a)
     zones = Internal.getZones(a)
-    for z in zones: _moveZone__(z, time)
+    # les zones partageant un meme mouvement ne l'evaluent qu'une fois
+    evals = {}
+    for z in zones: _moveZone__(z, time, evals)
     return None
 
 def evalPosition__(t, time):
@@ -539,9 +609,10 @@ def evalPosition__(t, time):
         np = Internal.copyTree(n)
         #for c, p in enumerate(n[2]): n[2][c] = np[2][c]
         n[2][:] = np[2][:]
+    evals = {}
     for z in zones:
         _copyGridInit2Grid(z)
-        _moveZone__(z, time)
+        _moveZone__(z, time, evals)
     return a
 
 #==============================================================================
@@ -690,6 +761,7 @@ def evalGridSpeed(a, time):
 def _evalGridSpeed(a, time, out=0):
     """Eval grid speed at given time. Position must be already at time."""
     zones = Internal.getZones(a)
+    evals = {}
     for z in zones:
         # Find Coordinates pointers (must already be updated)
         grid = Internal.getNodeFromName1(z, 'GridCoordinates')
@@ -710,103 +782,15 @@ def _evalGridSpeed(a, time, out=0):
             sz = Internal.getNodeFromName1(mmo, 'VelocityZ')
             if sz is None: sz = Internal.copyNode(xcoord); sz[0] = 'VelocityZ'; mmo[2].append(sz); sz[1] = sz[1].reshape((sz[1].size))
 
+            # La vitesse est celle du dernier mouvement : s = s0 + omega ^ (X-x0)
+            # evaluee en une passe
             motions = Internal.getNodesFromType1(cont, 'TimeRigidMotion_t')
-            for m in motions:
-                mtype = Internal.getNodeFromName1(m, 'MotionType')
-                dtype = mtype[1][0]
-
-                if dtype == 1: # type 1: time string
-                    tx = getTimeString__(m, 'tx')
-                    ty = getTimeString__(m, 'ty')
-                    tz = getTimeString__(m, 'tz')
-                    cx = getTimeString__(m, 'cx')
-                    cy = getTimeString__(m, 'cy')
-                    cz = getTimeString__(m, 'cz')
-                    ex = getTimeString__(m, 'ex')
-                    ey = getTimeString__(m, 'ey')
-                    ez = getTimeString__(m, 'ez')
-                    theta = getTimeString__(m, 'angle')
-
-                    # dtx, dty, dtz
-                    dtx = evalTimeDerivativeString__(m, 'tx', time)
-                    dty = evalTimeDerivativeString__(m, 'ty', time)
-                    dtz = evalTimeDerivativeString__(m, 'tz', time)
-
-                    # dcx, dcy, dcz
-                    dcx = evalTimeDerivativeString__(m, 'cx', time)
-                    dcy = evalTimeDerivativeString__(m, 'cy', time)
-                    dcz = evalTimeDerivativeString__(m, 'cz', time)
-
-                    sx[1][:] = 0.; sy[1][:] = 0.; sz[1][:] = 0.
-
-                elif dtype == 2: # rotor motion
-                    transl_speed=Internal.getValue(Internal.getNodeFromName(m, 'transl_speed'))
-                    psi0 = Internal.getValue(Internal.getNodeFromName(m, 'psi0'))
-                    psi0_b = Internal.getValue(Internal.getNodeFromName(m, 'psi0_b'))
-                    alp_pnt = Internal.getValue(Internal.getNodeFromName(m, 'alp_pnt'))
-                    alp_vct = Internal.getValue(Internal.getNodeFromName(m, 'alp_vct'))
-                    alp0 = Internal.getValue(Internal.getNodeFromName(m, 'alp0'))
-                    rot_pnt = Internal.getValue(Internal.getNodeFromName(m, 'rot_pnt'))
-                    rot_vct = Internal.getValue(Internal.getNodeFromName(m, 'rot_vct'))
-                    rot_omg = Internal.getValue(Internal.getNodeFromName(m, 'rot_omg'))
-                    del_pnt = Internal.getValue(Internal.getNodeFromName(m, 'del_pnt'))
-                    del_vct = Internal.getValue(Internal.getNodeFromName(m, 'del_vct'))
-                    del0 = Internal.getValue(Internal.getNodeFromName(m, 'del0'))
-                    delc = getNodeValue__(m, 'delc')
-                    dels = getNodeValue__(m, 'dels')
-                    bet_pnt = Internal.getValue(Internal.getNodeFromName(m, 'bet_pnt'))
-                    bet_vct = Internal.getValue(Internal.getNodeFromName(m, 'bet_vct'))
-                    bet0 = Internal.getValue(Internal.getNodeFromName(m, 'bet0'))
-                    betc = getNodeValue__(m, 'betc')
-                    bets = getNodeValue__(m, 'bets')
-                    betc = getNodeValue__(m, 'betc')
-                    bets = getNodeValue__(m, 'bets')
-                    tet_pnt = Internal.getValue(Internal.getNodeFromName(m, 'tet_pnt'))
-                    tet_vct = Internal.getValue(Internal.getNodeFromName(m, 'tet_vct'))
-                    tet0 = Internal.getValue(Internal.getNodeFromName(m, 'tet0'))
-                    tetc = getNodeValue__(m, 'tetc')
-                    tets = getNodeValue__(m, 'tets')
-                    span_vct = Internal.getValue(Internal.getNodeFromName(m, 'span_vct'))
-                    pre_lag_ang = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_ang'))
-                    pre_lag_pnt = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_pnt'))
-                    pre_lag_vct = Internal.getValue(Internal.getNodeFromName(m, 'pre_lag_vct'))
-                    pre_con_ang = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_ang'))
-                    pre_con_pnt = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_pnt'))
-                    pre_con_vct = Internal.getValue(Internal.getNodeFromName(m, 'pre_con_vct'))
-                    [r0,x0,rotMat,s0,omega]=rigidMotion._computeRotorMotionInfo(
-                        time, transl_speed.tolist(), psi0, psi0_b,
-                        alp_pnt.tolist(),alp_vct.tolist(),alp0,
-                        rot_pnt.tolist(),rot_vct.tolist(),rot_omg,
-                        del_pnt.tolist(),del_vct.tolist(),del0, delc.tolist(), dels.tolist(),
-                        bet_pnt.tolist(), bet_vct.tolist(), bet0, betc.tolist(), bets.tolist(),
-                        tet_pnt.tolist(), tet_vct.tolist(), tet0, tetc.tolist(), tets.tolist(),
-                        span_vct.tolist(),
-                        pre_lag_ang, pre_lag_pnt.tolist(), pre_lag_vct.tolist(),
-                        pre_con_ang, pre_con_pnt.tolist(), pre_con_vct.tolist())
-                    #print('omega', omega)
-                    #print('s0', s0)
-                    # sx = s0 - omega ^ x0 + omega ^ x
-                    rigidMotion.evalGridMotionN([xcoord[1],ycoord[1],zcoord[1]],[sx[1],sy[1],sz[1]],(s0[0],s0[1],s0[2]),(x0[0],x0[1],x0[2]),(omega[0],omega[1],omega[2]))
-
-                elif dtype == 3: # type 3: constant rotation / translation
-                    transl_speed = Internal.getNodeFromName1(m, 'transl_speed')
-                    if transl_speed is None: transl_speed = [0.,0.,0.]
-                    else: transl_speed = transl_speed[1]
-                    axis_pnt = Internal.getNodeFromName1(m, 'axis_pnt')
-                    if axis_pnt is None: axis_pnt = [0.,0.,0.]
-                    else: axis_pnt = axis_pnt[1]
-                    axis_vct = Internal.getNodeFromName1(m, 'axis_vct')
-                    if axis_vct is None: axis_vct = [0.,0.,1.]
-                    else: axis_vct = axis_vct[1]
-                    omega = Internal.getNodeFromName1(m, 'omega')
-                    if omega is None: omega = 0.
-                    else: omega = Internal.getValue(omega)
-
-                    rigidMotion.evalSpeed3(xcoord[1], ycoord[1], zcoord[1],
-                                           sx[1], sy[1], sz[1], omega, omega*time,
-                                           transl_speed[0], transl_speed[1], transl_speed[2],
-                                           axis_pnt[0], axis_pnt[1], axis_pnt[2],
-                                           axis_vct[0], axis_vct[1], axis_vct[2])
+            ev = None
+            for m in motions: ev = evalMotion__(compileMotion__(m), time, evals)
+            if ev is not None:
+                (R, d, s0, x0, omega) = ev
+                rigidMotion.evalGridMotionN([xcoord[1],ycoord[1],zcoord[1]],[sx[1],sy[1],sz[1]],
+                                            (s0[0],s0[1],s0[2]),(x0[0],x0[1],x0[2]),(omega[0],omega[1],omega[2]))
 
             # Recopie le champ dans un FlowSolution pour visu
             if out == 1:
@@ -0,0 +1,36 @@
+# - evalPosition (pyTree) -
+# mouvements enchaines sur plusieurs zones partageant le meme mouvement
+import RigidMotion.PyTree as R
+import Converter.PyTree as C
+import Converter.Internal as Internal
+import Generator.PyTree as G
+import Transform.PyTree as T
+import KCore.test as test
+from math import sin, pi
+
+zones = []
+for i in range(10):
+    zones.append(G.cart((i,0,0), (0.1,0.1,0.1), (11,11,11)))
+t = C.newPyTree(['Base', zones])
+R._setPrescribedMotion3(t, 'rot', transl_speed=(0.1,0,0),
+                        axis_pnt=(0.,0.,0.), axis_vct=(0,0,1), omega=1.)
+R._setPrescribedMotion1(t, 'trans', tx="0.2*{t}", ty="sin({t})",
+                        cx="1.", ex="1.", ez="1.", angle="20*{t}")
+R._copyGrid2GridInit(t)
+time = 0.3
+t2 = R.evalPosition(t, time)
+test.testT(t2, 1)
+
+# reference : mouvements appliques successivement
+t3 = C.newPyTree(['Base', Internal.copyTree(zones)])
+T._translate(t3, (0.2*time, sin(time), 0.))
+T._rotate(t3, (1.,0.,0.), (0.,0.,1.), 20*time)
+T._rotate(t3, (0.,0.,0.), (0.,0.,1.), time*180./pi)
+T._translate(t3, (0.1*time,0.,0.))
+for z2, z3 in zip(Internal.getZones(t2), Internal.getZones(t3)):
+    for c in ['CoordinateX', 'CoordinateY', 'CoordinateZ']:
+        d = Internal.getNodeFromName2(z2, c)[1]-Internal.getNodeFromName2(z3, c)[1]
+        assert abs(d).max() < 1.e-10
+
+R._evalGridSpeed(t2, time)
+test.testT(t2, 2)